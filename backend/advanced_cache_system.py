@@ -8,19 +8,34 @@ This module implements a sophisticated caching system with:
 2. ETag support for conditional requests  
 3. Cache invalidation strategies
 4. Performance monitoring
+5. Size-bounded LRU eviction
 
 Cache Strategy:
 - Daily summaries: 6 hours cache
 - Trends data: 1 hour cache
 - Terminal history: 30 minutes cache
 - Cash usage summary: 15 minutes cache
+- ATM status: 15 minutes cache (one crawler cycle)
+- Notifications: 5 minutes cache
+
+Entries are also invalidated whenever the crawler commits a new cycle
+(see ATM_DATA_UPDATED_CHANNEL), so TTLs only bound staleness when that
+signal is missed. The TTLs apply to this server-side cache only: clients are
+told to revalidate every time (CLIENT_CACHE_CONTROL), which costs a 304 while
+their ETag is current, so invalidation reaches them too.
 """
 
+import functools
 import hashlib
+import inspect
 import json
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime, timedelta
+from enum import Enum
 from typing import Dict, Any, Optional, Tuple
-from fastapi import Request, Response
+from fastapi import Request, Response, params
+from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
 import logging
 
@@ -36,6 +51,8 @@ class CacheConfig:
         'trends': 3600,              # 1 hour  
         'terminal_history': 1800,    # 30 minutes
         'cash_summary': 900,         # 15 minutes
+        'atm_status': 900,           # 15 minutes (one crawler cycle)
+        'notifications': 300,        # 5 minutes
         'default': 300               # 5 minutes
     }
     
@@ -45,18 +62,34 @@ class CacheConfig:
         'trends': 'trends',
         'summary': 'summary',
         'terminal_history': 'term_hist',
-        'terminal_list': 'term_list'
+        'terminal_list': 'term_list',
+        'atm_status': 'atm_status',
+        'notifications': 'notif',
+        'predictive': 'predictive'
     }
+    
+    # Maximum number of cached responses before least recently used entries are evicted
+    MAX_ENTRIES = 500
+
+# PostgreSQL NOTIFY channel the crawler signals after committing a cycle
+ATM_DATA_UPDATED_CHANNEL = 'atm_data_updated'
+
+# Cache-Control sent with cached responses: browsers may store them but must
+# revalidate with the ETag before each reuse
+CLIENT_CACHE_CONTROL = 'no-cache'
 
 class AdvancedCache:
     """Advanced caching system with ETag support and performance monitoring"""
     
-    def __init__(self):
-        self.cache_store: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, max_entries: int = CacheConfig.MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.cache_store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.cache_stats = {
             'hits': 0,
             'misses': 0,
             'invalidations': 0,
+            'evictions': 0,
+            'not_modified': 0,
             'total_requests': 0
         }
         
@@ -65,7 +98,8 @@ class AdvancedCache:
         # Sort parameters for consistent keys
         sorted_params = json.dumps(params, sort_keys=True)
         cache_string = f"{endpoint}:{sorted_params}"
-        return hashlib.sha256(cache_string.encode()).hexdigest()[:16]
+        # Keep the endpoint readable so invalidate_cache_pattern can match on it
+        return f"{endpoint}:{hashlib.sha256(cache_string.encode()).hexdigest()[:16]}"
     
     def generate_etag(self, data: Any) -> str:
         """Generate ETag from response data"""
@@ -93,6 +127,7 @@ class AdvancedCache:
             cache_entry = self.cache_store[cache_key]
             if self.is_cache_valid(cache_entry, cache_type):
                 self.cache_stats['hits'] += 1
+                self.cache_store.move_to_end(cache_key)
                 logger.debug(f"Cache HIT for key: {cache_key}")
                 return cache_entry
             else:
@@ -116,13 +151,27 @@ class AdvancedCache:
         }
         
         self.cache_store[cache_key] = cache_entry
+        self.cache_store.move_to_end(cache_key)
+        
+        # Evict least recently used entries beyond the size bound
+        while len(self.cache_store) > self.max_entries:
+            evicted_key, _ = self.cache_store.popitem(last=False)
+            self.cache_stats['evictions'] += 1
+            logger.debug(f"Cache EVICT for key: {evicted_key}")
+        
         logger.debug(f"Cache SET for key: {cache_key}, type: {cache_type}")
         return etag
     
     def check_etag(self, request: Request, etag: str) -> bool:
         """Check if client's ETag matches current ETag"""
         client_etag = request.headers.get('If-None-Match')
-        return client_etag == f'"{etag}"'
+        if not client_etag:
+            return False
+        if client_etag.strip() == '*':
+            return True
+        # If-None-Match may carry several (possibly weak) validators
+        candidates = [tag.strip() for tag in client_etag.split(',')]
+        return any(tag.replace('W/', '', 1) == f'"{etag}"' for tag in candidates)
     
     def invalidate_cache_pattern(self, pattern: str):
         """Invalidate all cache entries matching pattern"""
@@ -133,6 +182,13 @@ class AdvancedCache:
         
         logger.info(f"Invalidated {len(keys_to_remove)} cache entries for pattern: {pattern}")
     
+    def invalidate_all(self):
+        """Invalidate every cache entry (e.g. after the crawler commits new data)"""
+        count = len(self.cache_store)
+        self.cache_store.clear()
+        self.cache_stats['invalidations'] += count
+        logger.info(f"Invalidated all {count} cache entries")
+    
     def get_cache_stats(self) -> dict:
         """Get cache performance statistics"""
         total_requests = self.cache_stats['total_requests']
@@ -147,7 +203,10 @@ class AdvancedCache:
             'cache_misses': self.cache_stats['misses'],
             'hit_rate_percent': round(hit_rate, 2),
             'invalidations': self.cache_stats['invalidations'],
-            'cached_entries': len(self.cache_store)
+            'evictions': self.cache_stats['evictions'],
+            'not_modified_responses': self.cache_stats['not_modified'],
+            'cached_entries': len(self.cache_store),
+            'max_entries': self.max_entries
         }
     
     def cleanup_expired_entries(self):
@@ -155,7 +214,7 @@ class AdvancedCache:
         current_time = datetime.utcnow()
         expired_keys = []
         
-        for key, entry in self.cache_store.items():
+        for key, entry in list(self.cache_store.items()):
             cache_type = entry.get('cache_type', 'default')
             cache_duration = self.get_cache_duration(cache_type)
             age = (current_time - entry['timestamp']).total_seconds()
@@ -172,14 +231,67 @@ class AdvancedCache:
 # Global cache instance
 advanced_cache = AdvancedCache()
 
+def _not_modified_response(etag: str) -> Response:
+    """Build a 304 response carrying the current validators"""
+    advanced_cache.cache_stats['not_modified'] += 1
+    response = Response(status_code=304)
+    response.headers['ETag'] = f'"{etag}"'
+    response.headers['Cache-Control'] = CLIENT_CACHE_CONTROL
+    return response
+
+# Request-scoped dependencies that cached endpoints resolve only on a cache miss
+_deferred_dependencies = set()
+
+def defer_until_cache_miss(dependency):
+    """
+    Register an async generator dependency taking ``request`` (e.g. a pooled
+    database connection) that cached_response resolves itself, only when the
+    response is not served from the cache
+    """
+    _deferred_dependencies.add(dependency)
+    return dependency
+
 def cached_response(cache_type: str = 'default', cache_prefix: str = ''):
-    """Decorator for caching API responses with ETag support"""
+    """
+    Decorator for caching API responses with ETag support
+    
+    The decorated endpoint must accept a ``request: Request`` parameter. Its
+    signature is preserved so FastAPI still resolves query parameters and
+    dependencies; dependency-provided values such as database connections are
+    left out of the cache key. Dependencies registered with
+    defer_until_cache_miss are hidden from FastAPI and only opened on a cache
+    miss, so hits and 304s don't hold a pooled connection. Direct calls
+    without a request bypass the cache.
+    """
     def decorator(func):
-        async def wrapper(request: Request, *args, **kwargs):
+        signature = inspect.signature(func)
+        deferred = {
+            name: asynccontextmanager(parameter.default.dependency)
+            for name, parameter in signature.parameters.items()
+            if isinstance(parameter.default, params.Depends)
+            and parameter.default.dependency in _deferred_dependencies
+        }
+        
+        async def call_endpoint(request: Request, args, kwargs):
+            async with AsyncExitStack() as stack:
+                for name, open_dependency in deferred.items():
+                    if name not in kwargs:
+                        kwargs[name] = await stack.enter_async_context(open_dependency(request))
+                return await func(*args, **kwargs)
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Optional[Request] = kwargs.get('request')
+            if request is None:
+                return await func(*args, **kwargs)
+            
             # Generate cache key from function name and parameters
             cache_params = {
                 'args': str(args),
-                'kwargs': {k: str(v) for k, v in kwargs.items() if k != 'request'}
+                'kwargs': {
+                    k: str(v) for k, v in kwargs.items()
+                    if k != 'request' and isinstance(v, (str, int, float, bool, type(None), Enum, datetime))
+                }
             }
             
             cache_key = advanced_cache.generate_cache_key(
@@ -195,36 +307,45 @@ def cached_response(cache_type: str = 'default', cache_prefix: str = ''):
                 
                 # Check if client has current version (ETag match)
                 if advanced_cache.check_etag(request, etag):
-                    return Response(status_code=304)  # Not Modified
+                    return _not_modified_response(etag)
                 
                 # Return cached data with ETag header
                 response = JSONResponse(cached_data['data'])
                 response.headers['ETag'] = f'"{etag}"'
                 response.headers['X-Cache'] = 'HIT'
-                response.headers['Cache-Control'] = f'max-age={advanced_cache.get_cache_duration(cache_type)}'
+                response.headers['Cache-Control'] = CLIENT_CACHE_CONTROL
                 return response
             
-            # Execute original function
-            result = await func(request, *args, **kwargs)
+            # Execute original function (opening deferred dependencies only now)
+            result = await call_endpoint(request, args, kwargs)
+            
+            # Pass through responses we can't (or shouldn't) cache
+            if isinstance(result, Response):
+                if result.status_code != 200 or not hasattr(result, 'body'):
+                    return result
+                try:
+                    data = json.loads(result.body.decode())
+                except (json.JSONDecodeError, AttributeError, UnicodeDecodeError):
+                    logger.warning(f"Could not cache response for {func.__name__}")
+                    return result
+            else:
+                data = jsonable_encoder(result)
             
-            # Cache the result if it's successful
-            if hasattr(result, 'status_code') and result.status_code == 200:
-                if hasattr(result, 'body'):
-                    try:
-                        # For JSONResponse objects
-                        data = json.loads(result.body.decode())
-                        etag = advanced_cache.set_cached_response(cache_key, data, cache_type)
-                        
-                        # Add cache headers to response
-                        result.headers['ETag'] = f'"{etag}"'
-                        result.headers['X-Cache'] = 'MISS'
-                        result.headers['Cache-Control'] = f'max-age={advanced_cache.get_cache_duration(cache_type)}'
-                        
-                    except (json.JSONDecodeError, AttributeError):
-                        logger.warning(f"Could not cache response for {func.__name__}")
+            etag = advanced_cache.set_cached_response(cache_key, data, cache_type)
             
-            return result
+            if advanced_cache.check_etag(request, etag):
+                return _not_modified_response(etag)
+            
+            response = JSONResponse(data)
+            response.headers['ETag'] = f'"{etag}"'
+            response.headers['X-Cache'] = 'MISS'
+            response.headers['Cache-Control'] = CLIENT_CACHE_CONTROL
+            return response
         
+        if deferred:
+            wrapper.__signature__ = signature.replace(parameters=[
+                parameter for name, parameter in signature.parameters.items() if name not in deferred
+            ])
         return wrapper
     return decorator
 
@@ -260,7 +381,10 @@ async def clear_cache(pattern: Optional[str] = None):
         return {'message': f'Cache cleared for pattern: {pattern}'}
     else:
         advanced_cache.cache_store.clear()
-        advanced_cache.cache_stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'total_requests': 0}
+        advanced_cache.cache_stats = {
+            'hits': 0, 'misses': 0, 'invalidations': 0,
+            'evictions': 0, 'not_modified': 0, 'total_requests': 0
+        }
         return {'message': 'All cache cleared'}
 
 # Background task for cache cleanup
@@ -46,39 +46,54 @@ import sys
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Tuple
 from enum import Enum
 import asyncio
 import asyncpg
+import time
 from contextlib import asynccontextmanager
 import pytz
 from decimal import Decimal
 
 # FastAPI imports
-from fastapi import FastAPI, HTTPException, Query, Path, Depends, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, Query, Path, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field, validator
 import uvicorn
 
 # Additional imports for background task management
-import subprocess
 import threading
 from concurrent.futures import ThreadPoolExecutor
-import uuid
-from pathlib import Path as PathLib
 
 # Additional imports for predictive analytics
 
-# Import advanced optimization modules (temporarily disabled for testing)
-# from advanced_cache_system import (
-#     advanced_cache, cached_response, create_optimized_cache_response,
-#     get_cache_statistics, clear_cache, cache_cleanup_task, CacheConfig
-# )
+# Import advanced optimization modules
+from advanced_cache_system import (
+    advanced_cache, cached_response,
+    get_cache_statistics, clear_cache, cache_cleanup_task, CacheConfig,
+    ATM_DATA_UPDATED_CHANNEL, defer_until_cache_miss
+)
+from performance_metrics import performance_metrics
+from refresh_job_runner import RefreshJobRunner
+from predictive_fleet_engine import FLEET_FAULTS_QUERY, summarize_fleet
+from fault_history_engine import FAULT_CYCLES_QUERY, FAULT_REPORT_FETCH_SIZE, FaultReportAccumulator
+from fault_cycles import FAULT_CYCLES_BACKFILLED_QUERY, FAULT_CYCLES_RANGE_QUERY, ONGOING_FAULTS_QUERY
+from prepared_statements import (
+    api_statements, CURRENT_STATE_STATUS, CURRENT_STATE_DETAILS, OVERALL_TRENDS_ROLLUP, OVERALL_TRENDS_DETAILS,
+    TERMINAL_HISTORY, ATM_LIST, TERMINAL_FAULT_HISTORY, CASH_INFORMATION, TERMINAL_CASH_INFORMATION,
+    DAILY_CASH_USAGE, CASH_USAGE_TRENDS, CASH_USAGE_SUMMARY, TERMINAL_CASH_RANKINGS,
+    DAILY_CASH_USAGE_LIVE, CASH_USAGE_TRENDS_LIVE, CASH_USAGE_SUMMARY_LIVE, TERMINAL_CASH_RANKINGS_LIVE
+)
+import cash_daily_rollup
+from fault_classifier import COMPONENT_TYPES, score_fault_history, predict_failure
+from predictive_scores import (
+    SCORES_ANALYSIS_DAYS, OVERALL_COMPONENT, SELECT_TERMINAL_SCORES_QUERY, SELECT_FLEET_SCORES_QUERY
+)
 # from database_optimizer import get_database_optimizer, DatabaseOptimizer
-import numpy as np
 import pandas as pd
-from collections import defaultdict, Counter
+from collections import defaultdict
 from statistics import mean, median
 import re
 
@@ -116,10 +131,15 @@ logger = logging.getLogger('ATM_FastAPI')
 
 # Notification service import
 try:
-    from notification_service import NotificationService
+    from notification_service import NotificationService, notification_broadcaster, NOTIFICATION_EVENTS_CHANNEL
 except ImportError as e:
     logger.warning(f"Could not import notification service: {e}")
     NotificationService = None
+    notification_broadcaster = None
+    NOTIFICATION_EVENTS_CHANNEL = None
+
+# Seconds between keep-alive comments on idle notification streams
+NOTIFICATION_STREAM_KEEPALIVE = 15
 
 # Database configuration using the updated credentials for development_db
 DB_CONFIG = {
@@ -310,11 +330,11 @@ class RefreshJobResponse(BaseModel):
     started_at: Optional[datetime] = Field(None, description="Job start timestamp")
     completed_at: Optional[datetime] = Field(None, description="Job completion timestamp")
     progress: float = Field(0.0, ge=0, le=100, description="Job progress percentage")
+    phase: Optional[str] = Field(None, description="Current retrieval phase")
     message: str = Field("", description="Current status message")
     error: Optional[str] = Field(None, description="Error message if job failed")
 
 class RefreshJobRequest(BaseModel):
-    force: bool = Field(False, description="Force refresh even if recent data exists")
     use_new_tables: bool = Field(True, description="Use new database tables for storage")
 
 # Fault History Report Models
@@ -347,9 +367,9 @@ class FaultHistoryReportResponse(BaseModel):
     terminal_count: int = Field(..., description="Number of terminals included")
     chart_data: Dict[str, Any] = Field(..., description="Chart configuration and data")
 
-# Global job tracking
-refresh_jobs: Dict[str, RefreshJobResponse] = {}
-job_executor = ThreadPoolExecutor(max_workers=2)  # Limit concurrent refresh jobs
+# Refresh jobs run in-process; the job store and dedup live in atm_refresh_jobs
+job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="atm-refresh")
+refresh_job_runner = RefreshJobRunner(lambda: db_pool, job_executor)
 
 # Lifespan management
 @asynccontextmanager
@@ -358,6 +378,9 @@ async def lifespan(app: FastAPI):
     logger.info("Starting ATM FastAPI application with advanced optimizations...")
     await create_db_pool()
     
+    # Report whether the cash usage endpoints can read the daily cash rollup
+    await check_cash_daily_rollup()
+    
     # Initialize database optimizer (simplified version)
     db_optimizer = None
     try:
@@ -366,10 +389,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to initialize database optimizer: {e}")
     
-    # Start cache cleanup background task (simplified)
-    # cache_cleanup = asyncio.create_task(cache_cleanup_task())
+    # Start cache cleanup and crawler-driven invalidation background tasks
+    cache_cleanup = asyncio.create_task(cache_cleanup_task())
+    cache_invalidation = asyncio.create_task(cache_invalidation_listener())
     logger.info("✅ Cache system ready")
     
+    # Start background pool health probe
+    health_probe_task = asyncio.create_task(pool_health_probe())
+    logger.info(f"Database pool health probe started ({POOL_HEALTH_INTERVAL}s interval)")
+    
+    # Feed this worker's notification streams with events from every worker
+    notification_events = None
+    if notification_broadcaster is not None:
+        notification_events = asyncio.create_task(notification_event_listener())
+    
     # Start background notification checker
     background_task = None
     if NotificationService is not None:
@@ -380,6 +413,7 @@ async def lifespan(app: FastAPI):
                     service = await get_notification_service()
                     changes = await service.check_status_changes()
                     if changes:
+                        advanced_cache.invalidate_cache_pattern(CacheConfig.CACHE_PREFIXES['notifications'])
                         logger.info(f"Background check found {len(changes)} status changes")
                 except Exception as e:
                     logger.error(f"Error in background notification checker: {e}")
@@ -395,20 +429,38 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down optimization systems...")
     
-    # Cancel cache cleanup (simplified)
-    # cache_cleanup.cancel()
-    # try:
-    #     await cache_cleanup
-    # except asyncio.CancelledError:
-    #     logger.info("Cache cleanup task stopped")
+    # Cancel cache background tasks
+    for task in (cache_cleanup, cache_invalidation):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    logger.info("Cache background tasks stopped")
+    
+    # Stop pool health probe
+    health_probe_task.cancel()
+    try:
+        await health_probe_task
+    except asyncio.CancelledError:
+        logger.info("Database pool health probe stopped")
     
-    # Stop background notification task
+    # Stop background notification tasks
     if background_task:
         background_task.cancel()
         try:
             await background_task
         except asyncio.CancelledError:
             logger.info("Background notification checker stopped")
+    if notification_events:
+        notification_events.cancel()
+        try:
+            await notification_events
+        except asyncio.CancelledError:
+            logger.info("Notification event listener stopped")
+    
+    # Record refresh jobs interrupted by this shutdown
+    await refresh_job_runner.shutdown()
     
     # Close database optimizer (simplified)
     try:
@@ -459,10 +511,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record per-route latency, status codes and cache outcomes for /api/v1/performance"""
+    started = time.perf_counter()
+    status_code = 500
+    cache_status = None
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        cache_status = response.headers.get('X-Cache')
+        return response
+    finally:
+        # Use the route template so /atm/{terminal_id}/... is aggregated as one route
+        route = request.scope.get('route')
+        performance_metrics.record_request(
+            getattr(route, 'path', 'unmatched'),
+            request.method,
+            status_code,
+            time.perf_counter() - started,
+            cache_status=cache_status
+        )
+
 # Global variables
 app_start_time = datetime.now()
 db_pool = None
 
+# Prepared statement executions bypass connection query loggers; record them as "prepared:<name>"
+api_statements.set_execution_listener(performance_metrics.record_query)
+
 # Database connection functions
 async def create_db_pool():
     """Create database connection pool"""
@@ -476,7 +553,9 @@ async def create_db_pool():
             password=DB_CONFIG['password'],
             min_size=2,
             max_size=10,
-            command_timeout=30
+            command_timeout=30,
+            # Prepare the registered statements once per pooled connection
+            init=api_statements.prepare_connection
         )
         logger.info("Database connection pool created successfully")
         return True
@@ -492,7 +571,10 @@ async def get_db_connection() -> Optional[asyncpg.Connection]:
     
     if db_pool:
         try:
-            return await db_pool.acquire()
+            started = time.perf_counter()
+            conn = await db_pool.acquire()
+            performance_metrics.record_pool_wait(time.perf_counter() - started)
+            return conn
         except Exception as e:
             logger.error(f"Failed to acquire database connection: {e}")
             return None
@@ -519,22 +601,148 @@ def calculate_health_status(availability_percentage: float) -> HealthStatusEnum:
     else:
         return HealthStatusEnum.CRITICAL
 
+# Pool health state maintained by the background probe (see pool_health_probe)
+POOL_HEALTH_INTERVAL = int(os.getenv('DB_POOL_HEALTH_INTERVAL', '30'))
+db_pool_health: Dict[str, Any] = {
+    'healthy': None,
+    'last_check': None,
+    'last_error': None,
+    'latency_ms': None,
+    'consecutive_failures': 0
+}
+
+async def check_pool_health() -> bool:
+    """Run a single SELECT 1 against the pool and record the outcome in db_pool_health"""
+    started = datetime.utcnow()
+    conn = await get_db_connection()
+    try:
+        if not conn:
+            raise RuntimeError("Unable to acquire a pooled connection")
+        await conn.fetchval("SELECT 1")
+        db_pool_health['healthy'] = True
+        db_pool_health['last_error'] = None
+        db_pool_health['consecutive_failures'] = 0
+    except Exception as e:
+        db_pool_health['healthy'] = False
+        db_pool_health['last_error'] = str(e)
+        db_pool_health['consecutive_failures'] += 1
+        logger.error(f"Database pool health check failed: {e}")
+    finally:
+        await release_db_connection(conn)
+        db_pool_health['last_check'] = datetime.utcnow()
+        db_pool_health['latency_ms'] = round((datetime.utcnow() - started).total_seconds() * 1000, 2)
+    return bool(db_pool_health['healthy'])
+
+async def pool_health_probe():
+    """Background task that checks pool health instead of a per-request SELECT 1"""
+    while True:
+        try:
+            await check_pool_health()
+        except Exception as e:
+            logger.error(f"Error in database pool health probe: {e}")
+        await asyncio.sleep(POOL_HEALTH_INTERVAL)
+
+async def listen_on_channel(channel: str, on_payload, on_listening):
+    """
+    Call on_payload(payload) for every NOTIFY on a PostgreSQL channel
+    
+    Holds a dedicated connection (outside the pool) that LISTENs on the channel,
+    and reconnects if that connection drops. on_listening(True) is called once
+    the listener is in place and on_listening(False) whenever it is lost, as
+    anything sent while disconnected is missed.
+    """
+    def on_notification(connection, pid, notified_channel, payload):
+        on_payload(payload)
+    
+    while True:
+        listener_conn = None
+        try:
+            listener_conn = await asyncpg.connect(
+                host=DB_CONFIG['host'],
+                port=DB_CONFIG['port'],
+                database=DB_CONFIG['database'],
+                user=DB_CONFIG['user'],
+                password=DB_CONFIG['password']
+            )
+            await listener_conn.add_listener(channel, on_notification)
+            on_listening(True)
+            logger.info(f"Listening on '{channel}'")
+            
+            while not listener_conn.is_closed():
+                await asyncio.sleep(POOL_HEALTH_INTERVAL)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Listener on '{channel}' error: {e}")
+        finally:
+            on_listening(False)
+            if listener_conn and not listener_conn.is_closed():
+                await listener_conn.close()
+        
+        await asyncio.sleep(POOL_HEALTH_INTERVAL)
+
+async def cache_invalidation_listener():
+    """Background task that clears the response cache when the crawler commits new data"""
+    def on_data_updated(payload):
+        logger.info(f"Crawler committed new data ({payload or 'no details'}), invalidating response cache")
+        advanced_cache.invalidate_all()
+    
+    def on_listening(listening):
+        if not listening:
+            # Anything committed while we were disconnected was missed
+            advanced_cache.invalidate_all()
+    
+    await listen_on_channel(ATM_DATA_UPDATED_CHANNEL, on_data_updated, on_listening)
+
+async def notification_event_listener():
+    """
+    Background task publishing notification events to this worker's streams
+    
+    Status checks, mark-read and cleanup on any worker send their events over
+    NOTIFICATION_EVENTS_CHANNEL once committed. Each event also clears this
+    worker's cached notification responses.
+    """
+    def on_event(payload):
+        advanced_cache.invalidate_cache_pattern(CacheConfig.CACHE_PREFIXES['notifications'])
+        notification_broadcaster.handle_event(payload)
+    
+    def on_listening(listening):
+        # Changes made while we were disconnected were missed
+        advanced_cache.invalidate_cache_pattern(CacheConfig.CACHE_PREFIXES['notifications'])
+        notification_broadcaster.set_listening(listening)
+    
+    await listen_on_channel(NOTIFICATION_EVENTS_CHANNEL, on_event, on_listening)
+
 # Dependency functions
-async def validate_db_connection():
-    """Dependency to validate database connection"""
+@defer_until_cache_miss
+async def get_request_db_connection(request: Request):
+    """
+    Dependency that provides one pooled connection for the whole request
+    
+    The connection is released when the request finishes. Connectivity is
+    monitored by pool_health_probe, so no extra round trip is made here.
+    On @cached_response endpoints it is only acquired on a cache miss.
+    Query times are recorded per endpoint/table for /api/v1/performance.
+    """
     conn = await get_db_connection()
     if not conn:
         raise HTTPException(status_code=503, detail="Database connection unavailable")
     
+    endpoint_name = getattr(request.scope.get('endpoint'), '__name__', 'unknown')
+    
+    def record_query(record):
+        performance_metrics.record_query(
+            performance_metrics.query_name(endpoint_name, record.query),
+            record.elapsed,
+            failed=record.exception is not None
+        )
+    
+    conn.add_query_logger(record_query)
     try:
-        # Test connection
-        await conn.fetchval("SELECT 1")
-        await release_db_connection(conn)
-        return True
-    except Exception as e:
+        yield conn
+    finally:
+        conn.remove_query_logger(record_query)
         await release_db_connection(conn)
-        logger.error(f"Database connection test failed: {e}")
-        raise HTTPException(status_code=503, detail="Database connection test failed")
 
 # API Endpoints
 
@@ -546,18 +754,8 @@ async def health_check():
     Returns the current status of the API and database connectivity.
     """
     try:
-        # Test database connection
-        conn = await get_db_connection()
-        db_connected = False
-        
-        if conn:
-            try:
-                await conn.fetchval("SELECT 1")
-                db_connected = True
-            except Exception as e:
-                logger.warning(f"Database health check failed: {e}")
-            finally:
-                await release_db_connection(conn)
+        # Test database connection (also refreshes the pool health probe state)
+        db_connected = await check_pool_health()
         
         uptime = (datetime.now() - app_start_time).total_seconds()
         
@@ -571,9 +769,11 @@ async def health_check():
         raise HTTPException(status_code=500, detail="Health check failed")
 
 @app.get("/api/v1/atm/status/summary", response_model=ATMSummaryResponse, tags=["ATM Status"])
+@cached_response(cache_type='atm_status', cache_prefix='atm_status')
 async def get_atm_summary(
+    request: Request,
     table_type: TableTypeEnum = Query(TableTypeEnum.LEGACY, description="Database table to query"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get overall ATM status summary across all regions
@@ -583,23 +783,13 @@ async def get_atm_summary(
     
     NOTE: Now uses terminal_details table to match ATM Information page data source
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         # Use terminal_details table as single source of truth (EXACTLY like ATM Information page)
         # This fixes the data discrepancy between dashboard cards and ATM info page
         # Use identical query logic to ATM information endpoint for perfect consistency
-        query = """
-            SELECT DISTINCT ON (terminal_id)
-                terminal_id, fetched_status, retrieved_date
-            FROM terminal_details
-            WHERE retrieved_date >= NOW() - INTERVAL '24 hours'
-            ORDER BY terminal_id, retrieved_date DESC
-        """
-        
-        rows = await conn.fetch(query)
+        # terminal_current_state holds one row per terminal (maintained on ingest),
+        # so this no longer scans the full terminal_details history
+        rows = await api_statements.fetch(conn, CURRENT_STATE_STATUS, 24)
         
         # Enhanced fallback logic: if no data found for 24h, try longer periods
         actual_hours_used = 24
@@ -610,15 +800,7 @@ async def get_atm_summary(
             logger.info(f"No data found for 24h period in summary, trying longer fallback periods: {fallback_periods}")
             
             for fallback_hours in fallback_periods:
-                fallback_query = """
-                    SELECT DISTINCT ON (terminal_id)
-                        terminal_id, fetched_status, retrieved_date
-                    FROM terminal_details
-                    WHERE retrieved_date >= NOW() - INTERVAL '%s hours'
-                    ORDER BY terminal_id, retrieved_date DESC
-                """ % fallback_hours
-                
-                rows = await conn.fetch(fallback_query)
+                rows = await api_statements.fetch(conn, CURRENT_STATE_STATUS, fallback_hours)
                 if rows:
                     actual_hours_used = fallback_hours
                     logger.info(f"Found {len(rows)} ATM records using {fallback_hours}h fallback period")
@@ -677,14 +859,14 @@ async def get_atm_summary(
     except Exception as e:
         logger.error(f"Error fetching ATM summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch ATM summary data")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/status/regional", response_model=RegionalResponse, tags=["ATM Status"])
+@cached_response(cache_type='atm_status', cache_prefix='atm_status')
 async def get_regional_data(
+    request: Request,
     region_code: Optional[str] = Query(None, description="Filter by specific region code"),
     table_type: TableTypeEnum = Query(TableTypeEnum.LEGACY, description="Database table to query"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get regional breakdown of ATM status counts
@@ -692,10 +874,6 @@ async def get_regional_data(
     Returns detailed breakdown by region with health status classification.
     Availability includes both AVAILABLE and WARNING ATMs as they are operational.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         # Build query based on table type - TL-DL region only
         if table_type == TableTypeEnum.LEGACY:
@@ -815,143 +993,45 @@ async def get_regional_data(
     except Exception as e:
         logger.error(f"Error fetching regional data: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch regional data")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/status/trends/overall", response_model=TrendResponse, tags=["ATM Status"])
+@cached_response(cache_type='trends', cache_prefix='trends')
 async def get_overall_atm_trends(
+    request: Request,
     hours: int = Query(24, ge=1, le=720, description="Number of hours to look back (1-720)"),
     interval_minutes: int = Query(60, ge=15, le=360, description="Data aggregation interval in minutes (15-360)"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get historical trends for overall ATM availability using real ATM data
     
     Returns time-series data showing aggregated ATM status changes over time from all individual ATMs.
-    This endpoint uses terminal_details table (real ATM data) instead of regional aggregates,
-    ensuring consistency with the dashboard summary that uses the same data source.
+    Data comes from the availability_rollup table (15-minute buckets built from terminal_details),
+    ensuring consistency with the dashboard summary that uses the same source data.
+    Each point reflects the latest bucket within its interval.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
-        # Query terminal_details table to get time-series data for all ATMs
-        # Group by time intervals to aggregate the data points
-        query = """
-            WITH time_intervals AS (
-                SELECT generate_series(
-                    date_trunc('hour', NOW() - INTERVAL '%s hours'),
-                    date_trunc('hour', NOW()),
-                    INTERVAL '%s minutes'
-                ) AS interval_start
-            ),
-            atm_status_at_intervals AS (
-                SELECT 
-                    ti.interval_start,
-                    td.terminal_id,
-                    td.fetched_status,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY ti.interval_start, td.terminal_id 
-                        ORDER BY td.retrieved_date DESC
-                    ) as rn
-                FROM time_intervals ti
-                LEFT JOIN terminal_details td ON 
-                    td.retrieved_date >= ti.interval_start 
-                    AND td.retrieved_date < ti.interval_start + INTERVAL '%s minutes'
-                WHERE td.retrieved_date >= NOW() - INTERVAL '%s hours'
-            ),
-            latest_status_per_interval AS (
-                SELECT 
-                    interval_start,
-                    terminal_id,
-                    COALESCE(fetched_status, 'OUT_OF_SERVICE') as status
-                FROM atm_status_at_intervals 
-                WHERE rn = 1 OR fetched_status IS NULL
-            )
-            SELECT 
-                interval_start,
-                COUNT(*) as total_atms,
-                COUNT(CASE WHEN status = 'AVAILABLE' THEN 1 END) as count_available,
-                COUNT(CASE WHEN status = 'WARNING' THEN 1 END) as count_warning,
-                COUNT(CASE WHEN status = 'ZOMBIE' THEN 1 END) as count_zombie,
-                COUNT(CASE WHEN status IN ('WOUNDED', 'HARD', 'CASH') THEN 1 END) as count_wounded,
-                COUNT(CASE WHEN status IN ('OUT_OF_SERVICE', 'UNAVAILABLE') THEN 1 END) as count_out_of_service
-            FROM latest_status_per_interval
-            GROUP BY interval_start
-            HAVING COUNT(*) > 0
-            ORDER BY interval_start ASC
-        """ % (hours, interval_minutes, interval_minutes, hours)
-        
-        rows = await conn.fetch(query)
-        
-        # Enhanced fallback logic: if no data found for requested period, try shorter periods
+        # Read pre-aggregated 15-minute buckets from availability_rollup (maintained by the
+        # crawler on ingest) and keep the latest bucket within each requested interval
+        data_source = 'availability_rollup'
+        try:
+            rows = await api_statements.fetch(conn, OVERALL_TRENDS_ROLLUP, hours, interval_minutes * 60)
+        except asyncpg.UndefinedTableError:
+            logger.warning("availability_rollup table not found - run availability_rollup.py to backfill it")
+            rows = []
+        
+        # Shorter windows are subsets of the requested one, so an empty window is final;
+        # the only remaining fallback is aggregating terminal_details when the rollup hasn't been backfilled
         actual_hours_used = hours
         fallback_message = None
         
         if not rows:
-            # Define fallback periods to try in descending order (shorter periods)
-            fallback_periods = [12, 6, 3, 1]  # 12h, 6h, 3h, 1h
-            fallback_periods = [period for period in fallback_periods if period < hours]
-            
-            logger.info(f"No data found for {hours}h period in overall trends, trying shorter fallback periods: {fallback_periods}")
-            
-            for fallback_hours in fallback_periods:
-                fallback_query = """
-                    WITH time_intervals AS (
-                        SELECT generate_series(
-                            date_trunc('hour', NOW() - INTERVAL '%s hours'),
-                            date_trunc('hour', NOW()),
-                            INTERVAL '%s minutes'
-                        ) AS interval_start
-                    ),
-                    atm_status_at_intervals AS (
-                        SELECT 
-                            ti.interval_start,
-                            td.terminal_id,
-                            td.fetched_status,
-                            ROW_NUMBER() OVER (
-                                PARTITION BY ti.interval_start, td.terminal_id 
-                                ORDER BY td.retrieved_date DESC
-                            ) as rn
-                        FROM time_intervals ti
-                        LEFT JOIN terminal_details td ON 
-                            td.retrieved_date >= ti.interval_start 
-                            AND td.retrieved_date < ti.interval_start + INTERVAL '%s minutes'
-                        WHERE td.retrieved_date >= NOW() - INTERVAL '%s hours'
-                    ),
-                    latest_status_per_interval AS (
-                        SELECT 
-                            interval_start,
-                            terminal_id,
-                            COALESCE(fetched_status, 'OUT_OF_SERVICE') as status
-                        FROM atm_status_at_intervals 
-                        WHERE rn = 1 OR fetched_status IS NULL
-                    )
-                    SELECT 
-                        interval_start,
-                        COUNT(*) as total_atms,
-                        COUNT(CASE WHEN status = 'AVAILABLE' THEN 1 END) as count_available,
-                        COUNT(CASE WHEN status = 'WARNING' THEN 1 END) as count_warning,
-                        COUNT(CASE WHEN status = 'ZOMBIE' THEN 1 END) as count_zombie,
-                        COUNT(CASE WHEN status IN ('WOUNDED', 'HARD', 'CASH') THEN 1 END) as count_wounded,
-                        COUNT(CASE WHEN status IN ('OUT_OF_SERVICE', 'UNAVAILABLE') THEN 1 END) as count_out_of_service
-                    FROM latest_status_per_interval
-                    GROUP BY interval_start
-                    HAVING COUNT(*) > 0
-                    ORDER BY interval_start ASC
-                """ % (fallback_hours, interval_minutes, interval_minutes, fallback_hours)
-                
-                rows = await conn.fetch(fallback_query)
-                if rows:
-                    actual_hours_used = fallback_hours
-                    fallback_message = f"Requested {hours}h data unavailable, showing available {fallback_hours}h data instead"
-                    logger.info(f"Found {len(rows)} data points for {fallback_hours}h fallback period")
-                    break
+            logger.info(f"No availability_rollup data for {hours}h, aggregating terminal_details directly")
+            rows = await api_statements.fetch(conn, OVERALL_TRENDS_DETAILS, hours, interval_minutes)
+            data_source = 'terminal_details'
             
-            # If still no data found, raise 404
             if not rows:
-                raise HTTPException(status_code=404, detail=f"No overall trend data found in any time period")
+                raise HTTPException(status_code=404, detail=f"No overall trend data found for the last {hours} hours")
         
         trends = []
         availability_values = []
@@ -995,7 +1075,7 @@ async def get_overall_atm_trends(
             'max_availability': round(max(availability_values), 2) if availability_values else 0,
             'first_reading': trends[0].timestamp.isoformat() if trends else None,
             'last_reading': trends[-1].timestamp.isoformat() if trends else None,
-            'data_source': 'terminal_details',
+            'data_source': data_source,
             'total_atms_tracked': trends[-1].status_counts.total if trends else 0
         }
         
@@ -1015,13 +1095,89 @@ async def get_overall_atm_trends(
     except Exception as e:
         logger.error(f"Error fetching overall ATM trends: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch overall trend data")
-    finally:
-        await release_db_connection(conn)
+
+# Status -> slot in the fleet counts array used by the event sweep
+# (HARD/CASH count as wounded, UNAVAILABLE as out of service; anything else only adds to the total)
+FLEET_STATUS_SLOTS = {
+    'AVAILABLE': 0,
+    'WARNING': 1,
+    'ZOMBIE': 2,
+    'WOUNDED': 3,
+    'HARD': 3,
+    'CASH': 3,
+    'OUT_OF_SERVICE': 4,
+    'UNAVAILABLE': 4,
+}
+FLEET_OTHER_SLOT = 5
+
+async def sweep_fleet_status_events(conn: asyncpg.Connection, hours: int) -> List[Dict[str, Any]]:
+    """
+    Build fleet-wide status counts at every point where they change
+
+    Reads terminal_details once in retrieved_date order through a server-side cursor,
+    keeps each terminal's current status slot and a running counts array, and emits a
+    point after each timestamp whose readings changed the counts. The last timestamp
+    is always emitted so the chart extends to the most recent reading.
+    """
+    query = """
+        SELECT terminal_id, fetched_status, retrieved_date
+        FROM terminal_details
+        WHERE retrieved_date >= NOW() - make_interval(hours => $1::int)
+        ORDER BY retrieved_date ASC
+    """
+    
+    terminal_slots: Dict[str, int] = {}
+    counts = [0] * (FLEET_OTHER_SLOT + 1)
+    events: List[Dict[str, Any]] = []
+    last_emitted: Optional[tuple] = None
+    current_time = None
+    
+    def emit(event_time):
+        nonlocal last_emitted
+        snapshot = tuple(counts)
+        if snapshot == last_emitted:
+            return
+        last_emitted = snapshot
+        events.append({
+            'event_time': event_time,
+            'total_atms': len(terminal_slots),
+            'count_available': counts[0],
+            'count_warning': counts[1],
+            'count_zombie': counts[2],
+            'count_wounded': counts[3],
+            'count_out_of_service': counts[4]
+        })
+    
+    async with conn.transaction():
+        async for record in conn.cursor(query, hours, prefetch=5000):
+            retrieved_date = record['retrieved_date']
+            if current_time is not None and retrieved_date != current_time:
+                emit(current_time)
+            current_time = retrieved_date
+            
+            slot = FLEET_STATUS_SLOTS.get(record['fetched_status'] or 'OUT_OF_SERVICE', FLEET_OTHER_SLOT)
+            previous_slot = terminal_slots.get(record['terminal_id'])
+            if previous_slot != slot:
+                if previous_slot is not None:
+                    counts[previous_slot] -= 1
+                counts[slot] += 1
+                terminal_slots[record['terminal_id']] = slot
+    
+    if current_time is not None:
+        emit(current_time)
+        # Make sure the final reading is present even when it didn't change the counts
+        if events[-1]['event_time'] != current_time:
+            last_emitted = None
+            emit(current_time)
+    
+    return events
 
 @app.get("/api/v1/atm/status/trends/overall/events", response_model=TrendResponse, tags=["ATM Status"])
+@cached_response(cache_type='trends', cache_prefix='trends')
 async def get_overall_atm_trends_events(
+    request: Request,
     hours: int = Query(168, ge=1, le=2160, description="Number of hours to look back (1-2160, default 168=7 days)"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get historical trends for overall ATM availability using event-based status changes
@@ -1030,126 +1186,17 @@ async def get_overall_atm_trends_events(
     similar to individual ATM history but aggregated. This provides event-driven timestamps
     instead of fixed time intervals, making it consistent with individual ATM charts.
     
-    This endpoint uses terminal_details table to collect all status change events
-    and calculates overall availability at each event timestamp.
+    This endpoint streams terminal_details once in time order, tracking each ATM's current
+    status, and emits overall availability at every timestamp where the fleet counts change.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
-        # Query terminal_details table to get all status change events across all ATMs
-        # We'll get distinct timestamps when any ATM changed status, then calculate overall availability at each timestamp
-        query = """
-            WITH status_events AS (
-                SELECT DISTINCT retrieved_date
-                FROM terminal_details
-                WHERE retrieved_date >= NOW() - INTERVAL '%s hours'
-                ORDER BY retrieved_date ASC
-            ),
-            atm_status_at_events AS (
-                SELECT 
-                    se.retrieved_date as event_time,
-                    td.terminal_id,
-                    td.fetched_status,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY se.retrieved_date, td.terminal_id 
-                        ORDER BY td.retrieved_date DESC
-                    ) as rn
-                FROM status_events se
-                LEFT JOIN terminal_details td ON 
-                    td.retrieved_date <= se.retrieved_date
-                    AND td.retrieved_date >= NOW() - INTERVAL '%s hours'
-                WHERE td.terminal_id IS NOT NULL
-            ),
-            latest_status_per_event AS (
-                SELECT 
-                    event_time,
-                    terminal_id,
-                    COALESCE(fetched_status, 'OUT_OF_SERVICE') as status
-                FROM atm_status_at_events 
-                WHERE rn = 1
-            )
-            SELECT 
-                event_time,
-                COUNT(*) as total_atms,
-                COUNT(CASE WHEN status = 'AVAILABLE' THEN 1 END) as count_available,
-                COUNT(CASE WHEN status = 'WARNING' THEN 1 END) as count_warning,
-                COUNT(CASE WHEN status = 'ZOMBIE' THEN 1 END) as count_zombie,
-                COUNT(CASE WHEN status IN ('WOUNDED', 'HARD', 'CASH') THEN 1 END) as count_wounded,
-                COUNT(CASE WHEN status IN ('OUT_OF_SERVICE', 'UNAVAILABLE') THEN 1 END) as count_out_of_service
-            FROM latest_status_per_event
-            GROUP BY event_time
-            HAVING COUNT(*) > 0
-            ORDER BY event_time ASC
-        """ % (hours, hours)
-        
-        rows = await conn.fetch(query)
-        
-        # Enhanced fallback logic: if no data found for requested period, try shorter periods
+        # Single pass over terminal_details in time order, emitting fleet counts on each change
+        rows = await sweep_fleet_status_events(conn, hours)
+        
+        # Shorter windows are subsets of the requested one, so there is nothing to fall back to
         actual_hours_used = hours
         fallback_message = None
         
-        if not rows:
-            # Define fallback periods to try in descending order (shorter periods)
-            fallback_periods = [720, 168, 72, 24, 12, 6, 1]  # 30 days, 7 days, 3 days, 1 day, 12h, 6h, 1h
-            fallback_periods = [period for period in fallback_periods if period < hours]
-            
-            logger.info(f"No event data found for {hours}h period in overall trends, trying shorter fallback periods: {fallback_periods}")
-            
-            for fallback_hours in fallback_periods:
-                fallback_query = """
-                    WITH status_events AS (
-                        SELECT DISTINCT retrieved_date
-                        FROM terminal_details
-                        WHERE retrieved_date >= NOW() - INTERVAL '%s hours'
-                        ORDER BY retrieved_date ASC
-                    ),
-                    atm_status_at_events AS (
-                        SELECT 
-                            se.retrieved_date as event_time,
-                            td.terminal_id,
-                            td.fetched_status,
-                            ROW_NUMBER() OVER (
-                                PARTITION BY se.retrieved_date, td.terminal_id 
-                                ORDER BY td.retrieved_date DESC
-                            ) as rn
-                        FROM status_events se
-                        LEFT JOIN terminal_details td ON 
-                            td.retrieved_date <= se.retrieved_date
-                            AND td.retrieved_date >= NOW() - INTERVAL '%s hours'
-                        WHERE td.terminal_id IS NOT NULL
-                    ),
-                    latest_status_per_event AS (
-                        SELECT 
-                            event_time,
-                            terminal_id,
-                            COALESCE(fetched_status, 'OUT_OF_SERVICE') as status
-                        FROM atm_status_at_events 
-                        WHERE rn = 1
-                    )
-                    SELECT 
-                        event_time,
-                        COUNT(*) as total_atms,
-                        COUNT(CASE WHEN status = 'AVAILABLE' THEN 1 END) as count_available,
-                        COUNT(CASE WHEN status = 'WARNING' THEN 1 END) as count_warning,
-                        COUNT(CASE WHEN status = 'ZOMBIE' THEN 1 END) as count_zombie,
-                        COUNT(CASE WHEN status IN ('WOUNDED', 'HARD', 'CASH') THEN 1 END) as count_wounded,
-                        COUNT(CASE WHEN status IN ('OUT_OF_SERVICE', 'UNAVAILABLE') THEN 1 END) as count_out_of_service
-                    FROM latest_status_per_event
-                    GROUP BY event_time
-                    HAVING COUNT(*) > 0
-                    ORDER BY event_time ASC
-                """ % (fallback_hours, fallback_hours)
-                
-                fallback_rows = await conn.fetch(fallback_query)
-                if fallback_rows:
-                    rows = fallback_rows
-                    actual_hours_used = fallback_hours
-                    fallback_message = f"Data for {hours}h unavailable, showing {fallback_hours}h"
-                    logger.info(f"Using fallback period of {fallback_hours}h for overall event trends")
-                    break
-        
         if not rows:
             logger.warning("No overall event trend data found even after fallback attempts")
             return TrendResponse(
@@ -1168,7 +1215,7 @@ async def get_overall_atm_trends_events(
                     'last_reading': None,
                     'data_source': 'terminal_details_events',
                     'total_atms_tracked': 0,
-                    'fallback_message': 'No event data available for any period'
+                    'fallback_message': f'No event data available for the last {hours} hours'
                 }
             )
         
@@ -1235,24 +1282,20 @@ async def get_overall_atm_trends_events(
     except Exception as e:
         logger.error(f"Error fetching overall ATM event trends: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch overall event trend data")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/status/latest", tags=["ATM Status"])
+@cached_response(cache_type='atm_status', cache_prefix='atm_status')
 async def get_latest_data(
+    request: Request,
     table_type: TableTypeEnum = Query(TableTypeEnum.BOTH, description="Database table to query"),
     include_terminal_details: bool = Query(False, description="Include terminal details data"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get latest data from all available tables
     
     Returns the most recent data from specified database tables.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         result: Dict[str, Any] = {"data_sources": []}
         
@@ -1324,16 +1367,7 @@ async def get_latest_data(
         # Terminal details if requested
         if include_terminal_details:
             try:
-                terminal_query = """
-                    SELECT DISTINCT ON (terminal_id)
-                        terminal_id, location, issue_state_name, serial_number,
-                        fetched_status, retrieved_date, fault_data, metadata,
-                        raw_terminal_data
-                    FROM terminal_details
-                    WHERE retrieved_date >= NOW() - INTERVAL '24 hours'
-                    ORDER BY terminal_id, retrieved_date DESC
-                """
-                terminal_rows = await conn.fetch(terminal_query)
+                terminal_rows = await api_statements.fetch(conn, CURRENT_STATE_DETAILS, 24)
                 
                 # Enhanced fallback logic: if no terminal data found for 24h, try longer periods
                 actual_hours_used = 24
@@ -1344,17 +1378,7 @@ async def get_latest_data(
                     logger.info(f"No terminal details found for 24h period, trying longer fallback periods: {fallback_periods}")
                     
                     for fallback_hours in fallback_periods:
-                        fallback_query = """
-                            SELECT DISTINCT ON (terminal_id)
-                                terminal_id, location, issue_state_name, serial_number,
-                                fetched_status, retrieved_date, fault_data, metadata,
-                                raw_terminal_data
-                            FROM terminal_details
-                            WHERE retrieved_date >= NOW() - INTERVAL '%s hours'
-                            ORDER BY terminal_id, retrieved_date DESC
-                        """ % fallback_hours
-                        
-                        terminal_rows = await conn.fetch(fallback_query)
+                        terminal_rows = await api_statements.fetch(conn, CURRENT_STATE_DETAILS, fallback_hours)
                         if terminal_rows:
                             actual_hours_used = fallback_hours
                             logger.info(f"Found {len(terminal_rows)} terminal records using {fallback_hours}h fallback period")
@@ -1430,15 +1454,15 @@ async def get_latest_data(
     except Exception as e:
         logger.error(f"Error fetching latest data: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch latest data")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/{terminal_id}/history", response_model=ATMHistoricalResponse, tags=["ATM Historical"])
+@cached_response(cache_type='terminal_history', cache_prefix='term_hist')
 async def get_atm_history(
+    request: Request,
     terminal_id: str = Path(..., description="Terminal ID to get history for"),
     hours: int = Query(168, ge=1, le=2160, description="Number of hours to look back (1-2160, default 168=7 days)"),
     include_fault_details: bool = Query(True, description="Include fault descriptions in history"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get historical status data for a specific ATM terminal
@@ -1452,29 +1476,9 @@ async def get_atm_history(
     - Fault descriptions when status changes occur
     - Chart configuration for frontend display
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         # Query terminal_details table for historical data of specific terminal
-        query = """
-            SELECT 
-                terminal_id,
-                location,
-                issue_state_name,
-                serial_number,
-                retrieved_date,
-                fetched_status,
-                fault_data,
-                raw_terminal_data
-            FROM terminal_details
-            WHERE terminal_id = $1 
-                AND retrieved_date >= NOW() - INTERVAL '%s hours'
-            ORDER BY retrieved_date ASC
-        """ % hours
-        
-        rows = await conn.fetch(query, terminal_id)
+        rows = await api_statements.fetch(conn, TERMINAL_HISTORY, terminal_id, hours)
         
         # Enhanced fallback logic for individual ATM
         actual_hours_used = hours
@@ -1488,23 +1492,7 @@ async def get_atm_history(
             logger.info(f"No data found for ATM {terminal_id} in {hours}h period, trying fallback periods: {fallback_periods}")
             
             for fallback_hours in fallback_periods:
-                fallback_query = """
-                    SELECT 
-                        terminal_id,
-                        location,
-                        issue_state_name,
-                        serial_number,
-                        retrieved_date,
-                        fetched_status,
-                        fault_data,
-                        raw_terminal_data
-                    FROM terminal_details
-                    WHERE terminal_id = $1 
-                        AND retrieved_date >= NOW() - INTERVAL '%s hours'
-                    ORDER BY retrieved_date ASC
-                """ % fallback_hours
-                
-                rows = await conn.fetch(fallback_query, terminal_id)
+                rows = await api_statements.fetch(conn, TERMINAL_HISTORY, terminal_id, fallback_hours)
                 if rows:
                     actual_hours_used = fallback_hours
                     fallback_message = f"Requested {hours}h data unavailable, showing available {fallback_hours}h data instead"
@@ -1648,15 +1636,15 @@ async def get_atm_history(
     except Exception as e:
         logger.error(f"Error fetching history for ATM {terminal_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch ATM historical data")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/list", tags=["ATM Historical"])
+@cached_response(cache_type='atm_status', cache_prefix='term_list')
 async def get_atm_list(
+    request: Request,
     region_code: Optional[str] = Query(None, description="Filter by region code"),
     status_filter: Optional[ATMStatusEnum] = Query(None, description="Filter by current status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of ATMs to return"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get list of available ATMs for historical analysis
@@ -1664,61 +1652,21 @@ async def get_atm_list(
     Returns a list of ATMs that have historical data available,
     useful for populating dropdown menus or selection lists.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
-        # Build query to get latest status for each ATM
-        base_query = """
-            WITH latest_atm_data AS (
-                SELECT DISTINCT ON (terminal_id)
-                    terminal_id,
-                    location,
-                    issue_state_name,
-                    serial_number,
-                    retrieved_date,
-                    fetched_status
-                FROM terminal_details
-                ORDER BY terminal_id, retrieved_date DESC
-            )
-            SELECT 
-                terminal_id,
-                location,
-                issue_state_name,
-                serial_number,
-                retrieved_date,
-                fetched_status
-            FROM latest_atm_data
-        """
-        
-        # Add filters
-        conditions = []
-        params = []
-        
-        if region_code:
-            # For simplicity, we'll check if location contains region info
-            conditions.append("location ILIKE $" + str(len(params) + 1))
-            params.append(f"%{region_code}%")
+        # Latest status for each ATM; filters left as NULL match every row
+        location_pattern = f"%{region_code}%" if region_code else None
+        fetched_statuses = issue_states = None
         
         if status_filter:
             # Handle status mapping
             if status_filter == ATMStatusEnum.WOUNDED:
-                conditions.append("(fetched_status = $" + str(len(params) + 1) + " OR issue_state_name = 'HARD')")
-                params.append('WOUNDED')
+                fetched_statuses, issue_states = ['WOUNDED'], ['HARD']
             elif status_filter == ATMStatusEnum.OUT_OF_SERVICE:
-                conditions.append("(fetched_status IN ($" + str(len(params) + 1) + ", $" + str(len(params) + 2) + ") OR issue_state_name IN ('CASH', 'UNAVAILABLE'))")
-                params.extend(['OUT_OF_SERVICE', 'UNAVAILABLE'])
+                fetched_statuses, issue_states = ['OUT_OF_SERVICE', 'UNAVAILABLE'], ['CASH', 'UNAVAILABLE']
             else:
-                conditions.append("(fetched_status = $" + str(len(params) + 1) + " OR issue_state_name = $" + str(len(params) + 2) + ")")
-                params.extend([status_filter.value, status_filter.value])
-        
-        if conditions:
-            base_query += " WHERE " + " AND ".join(conditions)
-        
-        base_query += f" ORDER BY terminal_id LIMIT {limit}"
+                fetched_statuses, issue_states = [status_filter.value], [status_filter.value]
         
-        rows = await conn.fetch(base_query, *params)
+        rows = await api_statements.fetch(conn, ATM_LIST, location_pattern, fetched_statuses, issue_states, limit)
         
         atm_list = []
         for row in rows:
@@ -1751,8 +1699,6 @@ async def get_atm_list(
     except Exception as e:
         logger.error(f"Error fetching ATM list: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch ATM list")
-    finally:
-        await release_db_connection(conn)
 
 # ========================
 # NOTIFICATION ENDPOINTS
@@ -1778,6 +1724,7 @@ class NotificationListResponse(BaseModel):
     page: int = Field(..., ge=1, description="Current page number")
     per_page: int = Field(..., ge=1, description="Items per page")
     has_more: bool = Field(..., description="Whether there are more notifications")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page (None on the last page)")
 
 # Initialize notification service
 notification_service = None
@@ -1796,17 +1743,21 @@ async def get_notification_service():
     return notification_service
 
 @app.get("/api/v1/notifications", response_model=NotificationListResponse, tags=["Notifications"])
+@cached_response(cache_type='notifications', cache_prefix='notif')
 async def get_notifications(
+    request: Request,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     unread_only: bool = Query(False, description="Get only unread notifications"),
-    db_check: bool = Depends(validate_db_connection)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (takes precedence over page)")
 ):
     """
     Get paginated list of notifications for ATM status changes
     
     Returns notifications sorted by creation time (newest first).
-    Supports filtering by read status.
+    Supports filtering by read status. Pass next_cursor back as cursor to
+    fetch the following page; page numbers are still accepted but page through
+    with OFFSET.
     """
     try:
         if NotificationService is None:
@@ -1814,15 +1765,19 @@ async def get_notifications(
             
         service = await get_notification_service()
         
-        # Calculate offset for pagination
-        offset = (page - 1) * per_page
+        # Offset is only used by page-number clients that don't send a cursor
+        offset = 0 if cursor else (page - 1) * per_page
         
-        # Get notifications with pagination
-        notifications, total_count = await service.get_notifications(
-            unread_only=unread_only,
-            limit=per_page,
-            offset=offset
-        )
+        # Get notifications with keyset pagination
+        try:
+            notifications, total_count, next_cursor = await service.get_notifications(
+                unread_only=unread_only,
+                limit=per_page,
+                offset=offset,
+                cursor=cursor
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
         
         # Convert to response format
         notification_responses = []
@@ -1849,32 +1804,31 @@ async def get_notifications(
                 metadata=metadata
             ))
         
-        # Calculate unread count
-        unread_count = 0
+        # Unread count comes from the maintained counter
         if not unread_only:
-            _, unread_count = await service.get_notifications(unread_only=True, limit=1)
+            unread_count = await service.get_unread_count()
         else:
             unread_count = total_count
         
-        has_more = offset + per_page < total_count
-        
         return NotificationListResponse(
             notifications=notification_responses,
             total_count=total_count,
             unread_count=unread_count,
             page=page,
             per_page=per_page,
-            has_more=has_more
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching notifications: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch notifications")
 
 @app.post("/api/v1/notifications/{notification_id}/mark-read", tags=["Notifications"])
 async def mark_notification_as_read(
-    notification_id: str = Path(..., description="Notification ID to mark as read"),
-    db_check: bool = Depends(validate_db_connection)
+    notification_id: str = Path(..., description="Notification ID to mark as read")
 ):
     """
     Mark a specific notification as read
@@ -1888,6 +1842,7 @@ async def mark_notification_as_read(
         service = await get_notification_service()
         
         success = await service.mark_notification_read(notification_id)
+        advanced_cache.invalidate_cache_pattern(CacheConfig.CACHE_PREFIXES['notifications'])
         
         if not success:
             raise HTTPException(status_code=404, detail="Notification not found")
@@ -1907,7 +1862,6 @@ async def mark_notification_as_read(
 
 @app.post("/api/v1/notifications/mark-all-read", tags=["Notifications"])
 async def mark_all_notifications_as_read(
-    db_check: bool = Depends(validate_db_connection)
 ):
     """
     Mark all notifications as read
@@ -1921,6 +1875,7 @@ async def mark_all_notifications_as_read(
         service = await get_notification_service()
         
         updated_count = await service.mark_all_notifications_read()
+        advanced_cache.invalidate_cache_pattern(CacheConfig.CACHE_PREFIXES['notifications'])
         
         return {
             "success": True,
@@ -1935,7 +1890,6 @@ async def mark_all_notifications_as_read(
 
 @app.post("/api/v1/notifications/check-changes", tags=["Notifications"])
 async def check_status_changes(
-    db_check: bool = Depends(validate_db_connection)
 ):
     """
     Manually trigger a check for ATM status changes
@@ -1950,6 +1904,7 @@ async def check_status_changes(
         service = await get_notification_service()
         
         new_notifications = await service.check_status_changes()
+        advanced_cache.invalidate_cache_pattern(CacheConfig.CACHE_PREFIXES['notifications'])
         
         return {
             "success": True,
@@ -1971,8 +1926,9 @@ async def check_status_changes(
         raise HTTPException(status_code=500, detail="Failed to check status changes")
 
 @app.get("/api/v1/notifications/unread-count", tags=["Notifications"])
+@cached_response(cache_type='notifications', cache_prefix='notif')
 async def get_unread_count(
-    db_check: bool = Depends(validate_db_connection)
+    request: Request
 ):
     """
     Get count of unread notifications
@@ -1985,8 +1941,8 @@ async def get_unread_count(
             
         service = await get_notification_service()
         
-        # Get unread notifications count
-        _, unread_count = await service.get_notifications(unread_only=True, limit=1)
+        # Get unread notifications count (maintained counter, no table scan)
+        unread_count = await service.get_unread_count()
         
         return {
             "unread_count": unread_count,
@@ -1997,152 +1953,89 @@ async def get_unread_count(
         logger.error(f"Error getting unread count: {e}")
         raise HTTPException(status_code=500, detail="Failed to get unread count")
 
-# Cache for expensive summary operations
-from functools import lru_cache
-import hashlib
-import time
-
-# In-memory cache for summary data (will be replaced with Redis in production)
-summary_cache = {}
-CACHE_DURATION = 300  # 5 minutes cache duration
-def run_atm_refresh_script(job_id: str, use_new_tables: bool = True):
+@app.get("/api/v1/notifications/stream", tags=["Notifications"])
+async def stream_notifications(
+    request: Request
+):
     """
-  
+    Stream notification events (Server-Sent Events)
+    
+    Sends an `unread_count` event on connect, then pushes `notification` events
+    as status changes are detected and `unread_count` events whenever the badge
+    count changes. Replaces polling /notifications/unread-count: every open
+    stream is fed from this worker's broadcaster, which receives the events of
+    every worker over one LISTEN connection, so database load does not grow
+    with the number of connected clients.
     """
-    try:
-        # Update job status to running
-        if job_id in refresh_jobs:
-            refresh_jobs[job_id].status = RefreshJobStatus.RUNNING
-            refresh_jobs[job_id].started_at = datetime.utcnow()
-            refresh_jobs[job_id].message = "Starting ATM data retrieval..."
-            refresh_jobs[job_id].progress = 10.0
-
-        # Get the script path (should be in the same directory as this API file)
-        script_path = PathLib(__file__).parent / "combined_atm_retrieval_script.py"
-        
-        if not script_path.exists():
-            raise FileNotFoundError(f"Combined ATM retrieval script not found at {script_path}")
-
-        # Prepare command arguments
-        cmd = [sys.executable, str(script_path), "--save-to-db"]
-        if use_new_tables:
-            cmd.append("--use-new-tables")
-
-        logger.info(f"Starting ATM refresh job {job_id} with command: {' '.join(cmd)}")
-
-        # Update progress
-        if job_id in refresh_jobs:
-            refresh_jobs[job_id].message = "Executing data retrieval script..."
-            refresh_jobs[job_id].progress = 30.0
-
-        # Run the script
-        result = subprocess.run(
-            cmd,
-            cwd=str(script_path.parent),
-            capture_output=True,
-            text=True,
-            timeout=900  # 15 minutes timeout
-        )
-
-        # Update progress
-        if job_id in refresh_jobs:
-            refresh_jobs[job_id].progress = 80.0
-            refresh_jobs[job_id].message = "Processing results..."
-
-        if result.returncode == 0:
-            # Success
-            if job_id in refresh_jobs:
-                refresh_jobs[job_id].status = RefreshJobStatus.COMPLETED
-                refresh_jobs[job_id].completed_at = datetime.utcnow()
-                refresh_jobs[job_id].progress = 100.0
-                refresh_jobs[job_id].message = "ATM data refresh completed successfully"
-                
-            logger.info(f"ATM refresh job {job_id} completed successfully")
-            logger.debug(f"Script output: {result.stdout}")
-        else:
-            # Script failed
-            error_msg = f"Script failed with return code {result.returncode}"
-            if result.stderr:
-                error_msg += f": {result.stderr}"
-                
-            if job_id in refresh_jobs:
-                refresh_jobs[job_id].status = RefreshJobStatus.FAILED
-                refresh_jobs[job_id].completed_at = datetime.utcnow()
-                refresh_jobs[job_id].error = error_msg
-                refresh_jobs[job_id].message = "ATM data refresh failed"
-                
-            logger.error(f"ATM refresh job {job_id} failed: {error_msg}")
-            logger.debug(f"Script stderr: {result.stderr}")
-            logger.debug(f"Script stdout: {result.stdout}")
-
-    except subprocess.TimeoutExpired:
-        error_msg = "Script execution timed out after 15 minutes"
-        if job_id in refresh_jobs:
-            refresh_jobs[job_id].status = RefreshJobStatus.FAILED
-            refresh_jobs[job_id].completed_at = datetime.utcnow()
-            refresh_jobs[job_id].error = error_msg
-            refresh_jobs[job_id].message = "ATM data refresh timed out"
-        logger.error(f"ATM refresh job {job_id} timed out")
-        
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        if job_id in refresh_jobs:
-            refresh_jobs[job_id].status = RefreshJobStatus.FAILED
-            refresh_jobs[job_id].completed_at = datetime.utcnow()
-            refresh_jobs[job_id].error = error_msg
-            refresh_jobs[job_id].message = "ATM data refresh failed"
-        logger.error(f"ATM refresh job {job_id} failed with error: {e}")
+    if NotificationService is None or notification_broadcaster is None:
+        raise HTTPException(status_code=503, detail="Notification service not available")
+    
+    # Seed the first event from the broadcaster's cached count when it has one
+    # (only kept while its listener is connected, so it can't go stale)
+    unread_count = notification_broadcaster.last_unread_count
+    if unread_count is None:
+        try:
+            service = await get_notification_service()
+            unread_count = await service.get_unread_count()
+            if notification_broadcaster.listening:
+                notification_broadcaster.last_unread_count = unread_count
+        except Exception as e:
+            logger.error(f"Error getting unread count for notification stream: {e}")
+            raise HTTPException(status_code=500, detail="Failed to open notification stream")
+    
+    subscriber = notification_broadcaster.subscribe()
+    
+    def format_event(event_type: str, data: Dict[str, Any]) -> str:
+        return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+    
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            yield format_event("unread_count", {
+                "unread_count": unread_count,
+                "timestamp": convert_to_dili_time(datetime.utcnow()).isoformat()
+            })
+            
+            while not await request.is_disconnected():
+                try:
+                    event_type, data = await asyncio.wait_for(
+                        subscriber.get(), timeout=NOTIFICATION_STREAM_KEEPALIVE
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event_type, data)
+        finally:
+            notification_broadcaster.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering (nginx)
+        }
+    )
 
 # Refresh endpoints
 @app.post("/api/v1/atm/refresh", response_model=RefreshJobResponse, tags=["ATM Refresh"])
 async def trigger_atm_refresh(
-    background_tasks: BackgroundTasks,
-    refresh_request: RefreshJobRequest = RefreshJobRequest(force=False, use_new_tables=True)
+    refresh_request: RefreshJobRequest = RefreshJobRequest(use_new_tables=True)
 ):
     """
     Trigger an immediate refresh of ATM data
     
-    This endpoint starts a background job to run the combined ATM retrieval script,
-    which will fetch fresh data from the ATM monitoring system and update the database.
-    The job runs asynchronously, so you can check its status using the job ID returned.
+    Starts a background job that runs the ATM retriever in-process, fetching fresh
+    data from the ATM monitoring system and updating the database. The job runs
+    asynchronously; check its progress with the returned job ID. If a refresh is
+    already queued or running on any API worker, that job is returned instead of
+    starting a second one.
     """
     try:
-        # Check if there's already a running job
-        running_jobs = [job for job in refresh_jobs.values() if job.status == RefreshJobStatus.RUNNING]
-        if running_jobs and not refresh_request.force:
-            raise HTTPException(
-                status_code=409, 
-                detail="A refresh job is already running. Use force=true to queue another job."
-            )
-
-        # Create new job
-        job_id = str(uuid.uuid4())
-        job = RefreshJobResponse(
-            job_id=job_id,
-            status=RefreshJobStatus.QUEUED,
-            created_at=datetime.utcnow(),
-            started_at=None,
-            completed_at=None,
-            progress=0.0,
-            message="Refresh job queued",
-            error=None
-        )
-        
-        refresh_jobs[job_id] = job
-        
-        # Add background task
-        background_tasks.add_task(
-            run_atm_refresh_script, 
-            job_id, 
-            refresh_request.use_new_tables
-        )
-        
-        logger.info(f"ATM refresh job {job_id} queued")
-        
-        return job
-
-    except HTTPException:
-        raise
+        job, created = await refresh_job_runner.submit(use_new_tables=refresh_request.use_new_tables)
+        if not created:
+            logger.info(f"Refresh request joined active job {job['job_id']}")
+        return RefreshJobResponse(**job)
     except Exception as e:
         logger.error(f"Error triggering ATM refresh: {e}")
         raise HTTPException(status_code=500, detail="Failed to trigger refresh")
@@ -2154,10 +2047,16 @@ async def get_refresh_job_status(job_id: str = Path(..., description="Job ID to
     
     Check the current status, progress, and any error messages for a specific refresh job.
     """
-    if job_id not in refresh_jobs:
+    try:
+        job = await refresh_job_runner.get(job_id)
+    except Exception as e:
+        logger.error(f"Error fetching refresh job {job_id}: {e}")
+        raise HTTPException(status_code=503, detail="Refresh job store unavailable")
+    
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    return refresh_jobs[job_id]
+    return RefreshJobResponse(**job)
 
 @app.get("/api/v1/atm/refresh", response_model=List[RefreshJobResponse], tags=["ATM Refresh"])
 async def list_refresh_jobs(
@@ -2167,19 +2066,15 @@ async def list_refresh_jobs(
     """
     List refresh jobs
     
-    Get a list of recent refresh jobs, optionally filtered by status.
+    Get a list of recent refresh jobs (newest first), optionally filtered by status.
     """
-    jobs = list(refresh_jobs.values())
-    
-    # Filter by status if specified
-    if status:
-        jobs = [job for job in jobs if job.status == status]
-    
-    # Sort by creation time (newest first)
-    jobs.sort(key=lambda x: x.created_at, reverse=True)
+    try:
+        jobs = await refresh_job_runner.list_jobs(limit=limit, status=status.value if status else None)
+    except Exception as e:
+        logger.error(f"Error listing refresh jobs: {e}")
+        raise HTTPException(status_code=503, detail="Refresh job store unavailable")
     
-    # Apply limit
-    return jobs[:limit]
+    return [RefreshJobResponse(**job) for job in jobs]
 
 # Custom exception handlers
 @app.exception_handler(Exception)
@@ -2227,211 +2122,56 @@ class ATMPredictiveAnalytics(BaseModel):
     data_quality_score: float = Field(..., ge=0, le=100, description="Quality of data used for prediction")
     last_analysis: datetime = Field(..., description="When analysis was performed")
     analysis_period: str = Field(..., description="Data period used for analysis")
+    as_of: datetime = Field(..., description="When the scores were computed (end of the last ingest cycle for stored scores)")
 
 class PredictiveAnalyticsResponse(BaseModel):
     atm_analytics: ATMPredictiveAnalytics
     analysis_metadata: Dict[str, Any] = Field(..., description="Metadata about the analysis")
 
 # Utility functions for predictive analytics using existing JSONB data
+def calculate_component_health_scores(fault_history: List[Dict[str, Any]],
+                                      component_types: List[str]) -> Tuple[List[ComponentHealthScore], int]:
+    """
+    Calculate health scores for all components from one pass over the JSONB fault history
+
+    Returns:
+        Tuple of (component health scores, number of faults in the last 7 days)
+    """
+    scores = score_fault_history(fault_history, component_types)
+    component_health = [
+        ComponentHealthScore(
+            component_type=stats.component_type,
+            health_score=stats.health_score,
+            failure_risk=stats.risk_level,
+            last_fault_date=stats.last_fault_date,
+            fault_frequency=stats.fault_count
+        )
+        for stats in scores.components.values()
+    ]
+    return component_health, scores.recent_faults
+
 def calculate_component_health_score(fault_history: List[Dict[str, Any]], component_type: str) -> ComponentHealthScore:
     """Calculate health score for a specific component based on fault history from JSONB data"""
-    now = datetime.now()
-    thirty_days_ago = now - timedelta(days=30)
-    
-    component_faults = []
-    last_fault_date = None
-    
-    # Component mapping - map component types to keywords in fault descriptions
-    component_keywords = {
-        'DISPENSER': ['CDM', 'dispenser', 'notes', 'cash', 'bills', 'currency'],
-        'READER': ['reader', 'card', 'magnetic', 'chip'],
-        'PRINTER': ['printer', 'receipt', 'paper', 'print'],
-        'NETWORK_MODULE': ['network', 'communications', 'connection', 'comms'],
-        'DEPOSIT_MODULE': ['deposit', 'check', 'envelope'],
-        'SENSOR': ['sensor', 'detect', 'proximity', 'motion']
-    }
+    component_health, _ = calculate_component_health_scores(fault_history, [component_type])
+    return component_health[0]
+
+def predict_atm_failure(fault_history: List[Dict[str, Any]], component_health: List[ComponentHealthScore],
+                        recent_fault_count: Optional[int] = None) -> FailurePrediction:
+    """
+    Predict ATM failure based on existing fault data
     
-    for fault in fault_history:
-        # Try to parse the creation date from the actual fault data structure
-        creation_date = fault.get('agentErrorDescription')
-        fault_date = None
-        
-        if creation_date:
-            try:
-                if isinstance(creation_date, str):
-                    # Handle different date formats found in the data
-                    # Format: "11:06:2025 11:40:18" (day:month:year hour:minute:second)
-                    if ':' in creation_date and len(creation_date.split(' ')) == 2:
-                        date_part, time_part = creation_date.split(' ')
-                        day, month_num, year = date_part.split(':')
-                        hour, minute, second = time_part.split(':')
-                        
-                        # Convert month number to actual month
-                        month_map = {
-                            '01': 1, '02': 2, '03': 3, '04': 4, '05': 5, '06': 6,
-                            '07': 7, '08': 8, '09': 9, '10': 10, '11': 11, '12': 12,
-                            'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4,
-                            'MAY': 5, 'JUNE': 6, 'JULY': 7, 'AUGUST': 8,
-                            'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12
-                        }
-                        
-                        month_int = month_map.get(month_num, int(month_num) if month_num.isdigit() else 1)
-                        fault_date = datetime(int(year), month_int, int(day), int(hour), int(minute), int(second))
-                    else:
-                        # Try ISO format
-                        fault_date = datetime.fromisoformat(creation_date.replace('Z', '+00:00'))
-                elif isinstance(creation_date, (int, float)):
-                    # Unix timestamp
-                    fault_date = datetime.fromtimestamp(creation_date / 1000)
-            except Exception as e:
-                # If date parsing fails, include the fault anyway but without date filtering
-                fault_date = now  # Treat as recent
-        
-        # Check if this fault is related to the specified component
-        fault_description = fault.get('agentErrorDescription', '').lower()
-        external_fault_id = fault.get('externalFaultId', '').lower()
-        
-        # Check if fault relates to this component type
-        is_component_fault = False
-        if component_type in component_keywords:
-            keywords = component_keywords[component_type]
-            for keyword in keywords:
-                if keyword.lower() in fault_description or keyword.lower() in external_fault_id:
-                    is_component_fault = True
-                    break
-        
-        if is_component_fault:
-            if fault_date and fault_date >= thirty_days_ago:
-                component_faults.append(fault)
-                if not last_fault_date or fault_date > last_fault_date:
-                    last_fault_date = fault_date
-            elif not fault_date:
-                # Include faults without parseable dates
-                component_faults.append(fault)
+    recent_fault_count (faults in the last 7 days) is taken from
+    calculate_component_health_scores when available; otherwise it is
+    counted from fault_history here.
+    """
+    # Calculate risk based on component health and fault patterns
+    avg_component_health = mean([comp.health_score for comp in component_health]) if component_health else 100
     
-    fault_count = len(component_faults)
-    base_score = 100
+    # Count recent faults (last 7 days)
+    if recent_fault_count is None:
+        recent_fault_count = score_fault_history(fault_history, []).recent_faults
     
-    # Reduce score based on fault frequency and severity
-    for fault in component_faults:
-        # Determine severity based on fault description keywords
-        fault_description = fault.get('agentErrorDescription', '').lower()
-        
-        # Critical keywords that indicate severe issues
-        critical_keywords = ['timeout', 'failure', 'error', 'jam', 'stuck', 'blocked']
-        warning_keywords = ['out of', 'empty', 'low', 'warning', 'check']
-        
-        if any(keyword in fault_description for keyword in critical_keywords):
-            severity_impact = 12  # Critical impact
-        elif any(keyword in fault_description for keyword in warning_keywords):
-            severity_impact = 6   # Warning impact
-        else:
-            severity_impact = 8   # Default moderate impact
-        
-        base_score -= severity_impact
-    
-    health_score = max(0, min(100, base_score))
-    
-    # Determine risk level
-    if health_score >= 85:
-        risk_level = "LOW"
-    elif health_score >= 70:
-        risk_level = "MEDIUM" 
-    elif health_score >= 50:
-        risk_level = "HIGH"
-    else:
-        risk_level = "CRITICAL"
-    
-    return ComponentHealthScore(
-        component_type=component_type,
-        health_score=round(health_score, 1),
-        failure_risk=risk_level,
-        last_fault_date=last_fault_date,
-        fault_frequency=fault_count
-    )
-
-def predict_atm_failure(fault_history: List[Dict[str, Any]], component_health: List[ComponentHealthScore]) -> FailurePrediction:
-    """Predict ATM failure based on existing fault data"""
-    # Calculate risk based on component health and fault patterns
-    avg_component_health = mean([comp.health_score for comp in component_health]) if component_health else 100
-    
-    # Count recent faults (last 7 days)
-    now = datetime.now()
-    seven_days_ago = now - timedelta(days=7)
-    recent_faults = []
-    
-    for fault in fault_history:
-        creation_date = fault.get('creationDate')
-        fault_date = None
-        
-        if creation_date:
-            try:
-                if isinstance(creation_date, str):
-                    # Handle the specific date format found in the data
-                    # Format: "11:06:2025 11:40:18" (day:month:year hour:minute:second)
-                    if ':' in creation_date and len(creation_date.split(' ')) == 2:
-                        date_part, time_part = creation_date.split(' ')
-                        day, month_num, year = date_part.split(':')
-                        hour, minute, second = time_part.split(':')
-                        
-                        # Convert month number to actual month
-                        month_map = {
-                            '01': 1, '02': 2, '03': 3, '04': 4, '05': 5, '06': 6,
-                            '07': 7, '08': 8, '09': 9, '10': 10, '11': 11, '12': 12
-                        }
-                        
-                        month_int = month_map.get(month_num, int(month_num) if month_num.isdigit() else 1)
-                        fault_date = datetime(int(year), month_int, int(day), int(hour), int(minute), int(second))
-                    else:
-                        # Try ISO format
-                        fault_date = datetime.fromisoformat(creation_date.replace('Z', '+00:00'))
-                elif isinstance(creation_date, (int, float)):
-                    fault_date = datetime.fromtimestamp(creation_date / 1000)
-                    
-                if fault_date and fault_date >= seven_days_ago:
-                    recent_faults.append(fault)
-            except Exception as e:
-                # If date parsing fails, include the fault anyway as potentially recent
-                recent_faults.append(fault)
-    
-    # Calculate risk score
-    risk_score = (100 - avg_component_health) * 0.6 + min(len(recent_faults) * 15, 40)
-    risk_score = max(0, min(100, risk_score))
-    
-    # Determine risk level and prediction horizon
-    if risk_score < 25:
-        risk_level = "LOW"
-        horizon = "30+ days"
-        confidence = 75
-    elif risk_score < 50:
-        risk_level = "MEDIUM"
-        horizon = "14-30 days"
-        confidence = 80
-    elif risk_score < 75:
-        risk_level = "HIGH"
-        horizon = "7-14 days"
-        confidence = 85
-    else:
-        risk_level = "CRITICAL"
-        horizon = "1-7 days"
-        confidence = 90
-    
-    # Contributing factors
-    factors = []
-    if avg_component_health < 70:
-        factors.append("Component degradation detected")
-    if len(recent_faults) > 3:
-        factors.append("High recent fault frequency")
-    if not factors:
-        factors = ["Normal operational patterns"]
-    
-    return FailurePrediction(
-        risk_score=round(risk_score, 1),
-        risk_level=risk_level,
-        prediction_horizon=horizon,
-        confidence=confidence,
-        contributing_factors=factors
-    )
+    return FailurePrediction(**predict_failure(avg_component_health, recent_fault_count))
 
 def generate_maintenance_recommendations(component_health: List[ComponentHealthScore], 
                                        failure_prediction: FailurePrediction) -> List[MaintenanceRecommendation]:
@@ -2473,11 +2213,87 @@ def generate_maintenance_recommendations(component_health: List[ComponentHealthS
     
     return recommendations
 
+async def fetch_stored_predictive_analytics(conn: asyncpg.Connection, terminal_id: str) -> Optional[PredictiveAnalyticsResponse]:
+    """
+    Build the predictive analytics response from atm_predictive_scores
+    
+    Scores are computed by the crawler once per ingest cycle (see predictive_scores.py),
+    so this is a primary-key lookup. Returns None when the terminal has not been scored.
+    """
+    try:
+        rows = await conn.fetch(SELECT_TERMINAL_SCORES_QUERY, terminal_id)
+    except asyncpg.UndefinedTableError:
+        logger.warning("atm_predictive_scores table not found - run predictive_scores.py to build it")
+        return None
+    
+    by_component = {row['component_type']: row for row in rows}
+    overall = by_component.get(OVERALL_COMPONENT)
+    if overall is None:
+        return None
+    
+    component_health = [
+        ComponentHealthScore(
+            component_type=component,
+            health_score=by_component[component]['health_score'],
+            failure_risk=by_component[component]['risk_level'],
+            last_fault_date=by_component[component]['last_fault_date'],
+            fault_frequency=by_component[component]['fault_frequency']
+        )
+        for component in COMPONENT_TYPES if component in by_component
+    ]
+    
+    contributing_factors = overall['contributing_factors']
+    if isinstance(contributing_factors, str):
+        contributing_factors = json.loads(contributing_factors)
+    
+    failure_prediction = FailurePrediction(
+        risk_score=overall['risk_score'],
+        risk_level=overall['risk_level'],
+        prediction_horizon=overall['prediction_horizon'],
+        confidence=overall['confidence'],
+        contributing_factors=contributing_factors or []
+    )
+    
+    analysis_days = overall['analysis_days']
+    data_points = overall['data_points']
+    data_quality = min(100, (data_points / analysis_days) * 100) if analysis_days > 0 else 0
+    as_of = convert_to_dili_time(overall['as_of'])
+    
+    atm_analytics = ATMPredictiveAnalytics(
+        terminal_id=terminal_id,
+        location=overall['location'],
+        overall_health_score=overall['health_score'],
+        failure_prediction=failure_prediction,
+        component_health=component_health,
+        maintenance_recommendations=generate_maintenance_recommendations(component_health, failure_prediction),
+        data_quality_score=round(data_quality, 1),
+        last_analysis=as_of,
+        analysis_period=f"{analysis_days} days",
+        as_of=as_of
+    )
+    
+    analysis_metadata = {
+        "data_points_analyzed": data_points,
+        "analysis_period_days": analysis_days,
+        "components_analyzed": len(component_health),
+        "algorithm_version": "1.0-jsonb",
+        "analysis_timestamp": as_of.isoformat(),
+        "as_of": as_of.isoformat(),
+        "data_source": "atm_predictive_scores"
+    }
+    
+    return PredictiveAnalyticsResponse(
+        atm_analytics=atm_analytics,
+        analysis_metadata=analysis_metadata
+    )
+
 @app.get("/api/v1/atm/{terminal_id}/predictive-analytics", response_model=PredictiveAnalyticsResponse, tags=["Predictive Analytics"])
+@cached_response(cache_type='default', cache_prefix='predictive')
 async def get_atm_predictive_analytics(
+    request: Request,
     terminal_id: str = Path(..., description="Terminal ID to analyze"),
     analysis_days: int = Query(30, ge=7, le=90, description="Days of data to analyze"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get predictive analytics for a specific ATM using existing JSONB fault data
@@ -2488,25 +2304,19 @@ async def get_atm_predictive_analytics(
     - Maintenance recommendations
     - Data quality assessment
     
-    No database schema changes required - uses existing JSONB fault data.
+    Scores for the default 30-day window are precomputed by the crawler after each
+    ingest cycle (atm_predictive_scores); other windows are computed from the JSONB
+    fault data on request.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
-        # Get latest terminal info and fault data
-        query = """
-            SELECT 
-                terminal_id, location, fault_data, retrieved_date
-            FROM terminal_details
-            WHERE terminal_id = $1 
-                AND retrieved_date >= NOW() - INTERVAL '%s days'
-                AND fault_data IS NOT NULL
-            ORDER BY retrieved_date DESC
-        """ % analysis_days
+        # Precomputed scores: a primary-key lookup instead of re-scoring raw fault data
+        if analysis_days == SCORES_ANALYSIS_DAYS:
+            stored = await fetch_stored_predictive_analytics(conn, terminal_id)
+            if stored is not None:
+                return stored
         
-        rows = await conn.fetch(query, terminal_id)
+        # Get latest terminal info and fault data
+        rows = await api_statements.fetch(conn, TERMINAL_FAULT_HISTORY, terminal_id, analysis_days)
         
         if not rows:
             raise HTTPException(status_code=404, detail=f"No fault data found for terminal {terminal_id} in the last {analysis_days} days")
@@ -2545,19 +2355,15 @@ async def get_atm_predictive_analytics(
                 detail=f"No valid fault data found for terminal {terminal_id} in the last {analysis_days} days"
             )
         
-        # Analyze component health
+        # Analyze component health (one classification pass covers every component)
         component_types = ["DISPENSER", "READER", "PRINTER", "NETWORK_MODULE", "DEPOSIT_MODULE", "SENSOR"]
-        component_health = []
-        
-        for comp_type in component_types:
-            health_score = calculate_component_health_score(fault_history, comp_type)
-            component_health.append(health_score)
+        component_health, recent_fault_count = calculate_component_health_scores(fault_history, component_types)
         
         # Calculate overall health
         overall_health = mean([comp.health_score for comp in component_health])
         
         # Predict failure
-        failure_prediction = predict_atm_failure(fault_history, component_health)
+        failure_prediction = predict_atm_failure(fault_history, component_health, recent_fault_count)
         
         # Generate recommendations
         maintenance_recommendations = generate_maintenance_recommendations(component_health, failure_prediction)
@@ -2568,6 +2374,7 @@ async def get_atm_predictive_analytics(
         data_quality = min(100, (data_points / expected_data_points) * 100) if expected_data_points > 0 else 0
         
         # Create response
+        analysis_time = convert_to_dili_time(datetime.utcnow())
         atm_analytics = ATMPredictiveAnalytics(
             terminal_id=terminal_id,
             location=location,
@@ -2576,8 +2383,9 @@ async def get_atm_predictive_analytics(
             component_health=component_health,
             maintenance_recommendations=maintenance_recommendations,
             data_quality_score=round(data_quality, 1),
-            last_analysis=convert_to_dili_time(datetime.utcnow()),
-            analysis_period=f"{analysis_days} days"
+            last_analysis=analysis_time,
+            analysis_period=f"{analysis_days} days",
+            as_of=analysis_time
         )
         
         analysis_metadata = {
@@ -2585,7 +2393,8 @@ async def get_atm_predictive_analytics(
             "analysis_period_days": analysis_days,
             "components_analyzed": len(component_types),
             "algorithm_version": "1.0-jsonb",
-            "analysis_timestamp": convert_to_dili_time(datetime.utcnow()).isoformat(),
+            "analysis_timestamp": analysis_time.isoformat(),
+            "as_of": analysis_time.isoformat(),
             "data_source": "terminal_details.fault_data (JSONB)"
         }
         
@@ -2599,39 +2408,48 @@ async def get_atm_predictive_analytics(
     except Exception as e:
         logger.error(f"Error generating predictive analytics for ATM {terminal_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate predictive analytics")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/predictive-analytics/summary", tags=["Predictive Analytics"])
+@cached_response(cache_type='default', cache_prefix='predictive')
 async def get_predictive_analytics_summary(
+    request: Request,
     risk_level_filter: Optional[str] = Query(None, description="Filter by risk level (LOW, MEDIUM, HIGH, CRITICAL)"),
-    limit: int = Query(20, ge=1, le=100, description="Maximum number of ATMs to analyze"),
-    db_check: bool = Depends(validate_db_connection)
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of ATMs to return, highest risk first (default: whole fleet)"),
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
-    Get predictive analytics summary for multiple ATMs using existing data
+    Get predictive analytics summary for the ATM fleet using existing data
     
     Provides a quick overview of failure risks across the ATM fleet.
-    Uses existing JSONB fault data without requiring database changes.
+    Reads the scores the crawler stores in atm_predictive_scores after each ingest
+    cycle. Until that table is populated, all fault rows of the window are fetched
+    with one query and every terminal is scored in a single vectorized pass (see
+    predictive_fleet_engine). The whole fleet is analyzed; `limit` only trims the
+    returned list.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
-        # Get terminals with recent fault data
-        terminals_query = """
-            SELECT DISTINCT terminal_id, location
-            FROM terminal_details
-            WHERE retrieved_date >= NOW() - INTERVAL '7 days'
-                AND fault_data IS NOT NULL
-            ORDER BY terminal_id
-            LIMIT $1
-        """
-        
-        terminal_rows = await conn.fetch(terminals_query, limit)
+        try:
+            stored_rows = await conn.fetch(SELECT_FLEET_SCORES_QUERY)
+        except asyncpg.UndefinedTableError:
+            logger.warning("atm_predictive_scores table not found - run predictive_scores.py to build it")
+            stored_rows = []
+        
+        if stored_rows:
+            scores = pd.DataFrame([dict(row) for row in stored_rows])
+            scores['as_of'] = scores['as_of'].map(convert_to_dili_time)
+            data_source = "atm_predictive_scores"
+        else:
+            # One query for every terminal with fault data in the last 7 days, over the same
+            # history window and components as the stored scores
+            fault_rows = await conn.fetch(FLEET_FAULTS_QUERY, SCORES_ANALYSIS_DAYS, 7)
+            
+            # Parsing and scoring are CPU-bound; keep them off the event loop
+            scores = await asyncio.get_running_loop().run_in_executor(None, summarize_fleet, fault_rows)
+            if not scores.empty:
+                scores['as_of'] = convert_to_dili_time(datetime.utcnow())
+            data_source = "terminal_details.fault_data (JSONB)"
         
-        if not terminal_rows:
+        if scores.empty:
             return {
                 "summary": [],
                 "fleet_statistics": {
@@ -2644,84 +2462,33 @@ async def get_predictive_analytics_summary(
                 "message": "No terminals with recent fault data found"
             }
         
-        summary_results = []
-        
-        for terminal_row in terminal_rows:
-            terminal_id = terminal_row['terminal_id']
-            
-            try:
-                # Get fault data for this terminal
-                fault_query = """
-                    SELECT fault_data
-                    FROM terminal_details
-                    WHERE terminal_id = $1 
-                        AND retrieved_date >= NOW() - INTERVAL '14 days'
-                        AND fault_data IS NOT NULL
-                    ORDER BY retrieved_date DESC
-                """
-                
-                fault_rows = await conn.fetch(fault_query, terminal_id)
-                
-                fault_history = []
-                for fault_row in fault_rows:
-                    if fault_row['fault_data']:
-                        try:
-                            fault_data = fault_row['fault_data']
-                            
-                            # Parse JSON string if needed
-                            if isinstance(fault_data, str):
-                                try:
-                                    fault_data = json.loads(fault_data)
-                                except json.JSONDecodeError:
-                                    continue
-                    
-                            if isinstance(fault_data, dict):
-                                fault_history.append(fault_data)
-                        except:
-                            continue
-                
-                if not fault_history:
-                    continue
-                
-                # Quick analysis
-                component_types = ["DISPENSER", "READER", "PRINTER", "NETWORK_MODULE"]
-                component_health = []
-                
-                for comp_type in component_types:
-                    health_score = calculate_component_health_score(fault_history, comp_type)
-                    component_health.append(health_score)
-                
-                overall_health = mean([comp.health_score for comp in component_health])
-                failure_prediction = predict_atm_failure(fault_history, component_health)
-                
-                # Apply filter if specified
-                if risk_level_filter and failure_prediction.risk_level != risk_level_filter:
-                    continue
-                
-                summary_results.append({
-                    "terminal_id": terminal_id,
-                    "location": terminal_row['location'],
-                    "overall_health_score": round(overall_health, 1),
-                    "risk_level": failure_prediction.risk_level,
-                    "risk_score": failure_prediction.risk_score,
-                    "prediction_horizon": failure_prediction.prediction_horizon,
-                    "confidence": failure_prediction.confidence,
-                    "critical_components": len([comp for comp in component_health if comp.failure_risk == "CRITICAL"]),
-                    "last_analysis": convert_to_dili_time(datetime.utcnow()).isoformat()
-                })
-                
-            except Exception as e:
-                logger.warning(f"Could not analyze terminal {terminal_id}: {e}")
-                continue
-        
-        # Sort by risk score (highest first)
-        summary_results.sort(key=lambda x: x['risk_score'], reverse=True)
+        # Apply filter if specified
+        if risk_level_filter:
+            scores = scores[scores['risk_level'] == risk_level_filter]
+        
+        analysis_time = convert_to_dili_time(datetime.utcnow()).isoformat()
+        returned = scores if limit is None else scores.head(limit)
+        summary_results = [
+            {
+                "terminal_id": row.terminal_id,
+                "location": row.location if isinstance(row.location, str) else None,
+                "overall_health_score": float(row.overall_health_score),
+                "risk_level": row.risk_level,
+                "risk_score": float(row.risk_score),
+                "prediction_horizon": row.prediction_horizon,
+                "confidence": float(row.confidence),
+                "critical_components": int(row.critical_components),
+                "last_analysis": row.as_of.isoformat(),
+                "as_of": row.as_of.isoformat()
+            }
+            for row in returned.itertuples(index=False)
+        ]
         
-        # Calculate fleet statistics
-        if summary_results:
-            risk_distribution = Counter([result['risk_level'] for result in summary_results])
-            avg_health = mean([result['overall_health_score'] for result in summary_results])
-            avg_risk = mean([result['risk_score'] for result in summary_results])
+        # Fleet statistics cover every analyzed terminal, not just the returned page
+        if not scores.empty:
+            risk_distribution = scores['risk_level'].value_counts().to_dict()
+            avg_health = float(scores['overall_health_score'].mean())
+            avg_risk = float(scores['risk_score'].mean())
         else:
             risk_distribution = {}
             avg_health = 0
@@ -2730,17 +2497,17 @@ async def get_predictive_analytics_summary(
         return {
             "summary": summary_results,
             "fleet_statistics": {
-                "total_atms_analyzed": len(summary_results),
+                "total_atms_analyzed": len(scores),
                 "average_health_score": round(avg_health, 1),
                 "average_risk_score": round(avg_risk, 1),
-                "risk_distribution": dict(risk_distribution),
-                "analysis_timestamp": convert_to_dili_time(datetime.utcnow()).isoformat()
+                "risk_distribution": {level: int(count) for level, count in risk_distribution.items()},
+                "analysis_timestamp": analysis_time
             },
             "filters_applied": {
                 "risk_level_filter": risk_level_filter,
                 "limit": limit
             },
-            "data_source": "terminal_details.fault_data (JSONB)"
+            "data_source": data_source
         }
         
     except HTTPException:
@@ -2748,20 +2515,25 @@ async def get_predictive_analytics_summary(
     except Exception as e:
         logger.error(f"Error generating predictive analytics summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate predictive analytics summary")
-    finally:
-        await release_db_connection(conn)
 
 # ========================
 # FAULT HISTORY REPORT ENDPOINT
 # ========================
 
+async def fault_cycles_available(conn) -> bool:
+    """Whether fault_cycles has been backfilled from the full terminal_details history"""
+    try:
+        return await conn.fetchval(FAULT_CYCLES_BACKFILLED_QUERY)
+    except asyncpg.UndefinedTableError:
+        logger.warning("fault_cycles table not found - run fault_cycles.py to build it")
+        return False
+
 @app.get("/api/v1/atm/fault-history-report", response_model=FaultHistoryReportResponse, tags=["Fault Analysis"])
 async def get_fault_history_report(
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
     terminal_ids: Optional[str] = Query(None, description="Comma-separated terminal IDs, or 'all' for all terminals"),
-    include_ongoing: bool = Query(True, description="Include ongoing faults that haven't been resolved"),
-    db_check: bool = Depends(validate_db_connection)
+    include_ongoing: bool = Query(True, description="Include ongoing faults that haven't been resolved")
 ):
     """
     Generate comprehensive fault history report showing how long ATMs stay in fault states
@@ -2771,256 +2543,153 @@ async def get_fault_history_report(
     - When they return to AVAILABLE state
     - Average fault durations by state
     - Fault patterns and trends
+    
+    Fault cycles are read from the fault_cycles table the crawler maintains (a
+    range scan on start_time); until it has been backfilled (python fault_cycles.py)
+    they are found in one windowed pass over terminal_details (see
+    fault_history_engine). The report is streamed: fault_duration_data is written
+    as rows arrive from a server-side cursor, followed by the summaries, so long
+    ranges neither build the whole result in memory nor wait for it before the
+    first byte is sent.
     """
+    # Parse and validate dates
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=UTC_TZ)
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=UTC_TZ)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    
+    if start_dt > end_dt:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    
+    # Build terminal filter (NULL means every terminal)
+    terminal_list = None
+    if terminal_ids and terminal_ids.lower() != "all":
+        terminal_list = [tid.strip() for tid in terminal_ids.split(",") if tid.strip()] or None
+    
+    # The stream holds its own connection for as long as it runs (a Depends connection
+    # would be released before the body is sent). The cursor is opened and the first
+    # batch fetched before responding, so database errors still return a 500
     conn = await get_db_connection()
     if not conn:
         raise HTTPException(status_code=503, detail="Database connection unavailable")
     
-    try:
-        # Parse and validate dates
+    transaction = conn.transaction(readonly=True)
+    released = False
+    
+    async def finish():
+        nonlocal released
+        if released:
+            return
+        released = True
         try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=UTC_TZ)
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=UTC_TZ)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
-        
-        if start_dt > end_dt:
-            raise HTTPException(status_code=400, detail="Start date must be before end date")
-        
-        # Build terminal filter
-        terminal_filter = ""
-        if terminal_ids and terminal_ids.lower() != "all":
-            terminal_list = [tid.strip() for tid in terminal_ids.split(",") if tid.strip()]
-            if terminal_list:
-                placeholders = ",".join([f"${i+3}" for i in range(len(terminal_list))])
-                terminal_filter = f"AND td.terminal_id IN ({placeholders})"
-        
-        # Enhanced fault cycle analysis query - tracks complete fault cycles
-        fault_analysis_query = f"""
-        WITH status_transitions AS (
-            SELECT 
-                terminal_id,
-                location,
-                fetched_status,
-                retrieved_date,
-                LAG(fetched_status) OVER (PARTITION BY terminal_id ORDER BY retrieved_date) as prev_status,
-                LEAD(fetched_status) OVER (PARTITION BY terminal_id ORDER BY retrieved_date) as next_status,
-                LEAD(retrieved_date) OVER (PARTITION BY terminal_id ORDER BY retrieved_date) as next_time,
-                fault_data,
-                ROW_NUMBER() OVER (PARTITION BY terminal_id ORDER BY retrieved_date) as row_num
-            FROM terminal_details td
-            WHERE retrieved_date BETWEEN $1 AND $2
-            {terminal_filter}
-            ORDER BY terminal_id, retrieved_date
-        ),
-        fault_cycle_starts AS (
-            -- Find all entries where ATM enters fault state from AVAILABLE/ONLINE
-            SELECT 
-                terminal_id,
-                location,
-                fetched_status as fault_state,
-                retrieved_date as fault_start,
-                fault_data
-            FROM status_transitions
-            WHERE fetched_status IN ('WARNING', 'WOUNDED', 'ZOMBIE', 'OUT_OF_SERVICE')
-            AND (prev_status IS NULL OR prev_status IN ('AVAILABLE', 'ONLINE'))
-        ),
-        fault_cycle_ends AS (
-            -- Find all entries where ATM returns to AVAILABLE/ONLINE from fault state
-            SELECT 
-                terminal_id,
-                prev_status as end_fault_state,
-                retrieved_date as fault_end
-            FROM status_transitions
-            WHERE fetched_status IN ('AVAILABLE', 'ONLINE')
-            AND prev_status IN ('WARNING', 'WOUNDED', 'ZOMBIE', 'OUT_OF_SERVICE')
-        ),
-        complete_fault_cycles AS (
-            SELECT 
-                fcs.terminal_id,
-                fcs.location,
-                fcs.fault_state,
-                fcs.fault_start,
-                fcs.fault_data,
-                -- Find the next resolution for this fault cycle
-                (SELECT MIN(fce.fault_end) 
-                 FROM fault_cycle_ends fce 
-                 WHERE fce.terminal_id = fcs.terminal_id 
-                 AND fce.fault_end > fcs.fault_start) as fault_end
-            FROM fault_cycle_starts fcs
-        )
-        SELECT 
-            cfc.terminal_id,
-            cfc.location,
-            cfc.fault_state,
-            cfc.fault_start,
-            cfc.fault_end,
-            -- Calculate actual duration from fault start to resolution (or ongoing)
-            CASE 
-                WHEN cfc.fault_end IS NOT NULL THEN 
-                    EXTRACT(EPOCH FROM (cfc.fault_end - cfc.fault_start))/60
-                WHEN cfc.fault_end IS NULL AND $2 > cfc.fault_start THEN
-                    EXTRACT(EPOCH FROM ($2 - cfc.fault_start))/60
-                ELSE NULL
-            END as duration_minutes,
-            -- Mark as resolved only when fault_end exists (returned to AVAILABLE)
-            CASE 
-                WHEN cfc.fault_end IS NOT NULL THEN true
-                ELSE false
-            END as resolved,
-            COALESCE(cfc.fault_data->>'agentErrorDescription', cfc.fault_data->>'fault_description', 'No description') as fault_description,
-            COALESCE(cfc.fault_data->>'fault_type', 'Unknown') as fault_type,
-            COALESCE(cfc.fault_data->>'component_type', 'Unknown') as component_type,
-            cfc.fault_data->>'agentErrorDescription' as agent_error_description
-        FROM complete_fault_cycles cfc
-        {"WHERE 1=1" if include_ongoing else "WHERE cfc.fault_end IS NOT NULL"}
-        ORDER BY cfc.terminal_id, cfc.fault_start
-        """
-        
-        # Execute query with parameters
-        query_params: List[Any] = [start_dt, end_dt]
-        if terminal_ids and terminal_ids.lower() != "all":
-            terminal_list = [tid.strip() for tid in terminal_ids.split(",") if tid.strip()]
-            query_params.extend(terminal_list)
-        
-        rows = await conn.fetch(fault_analysis_query, *query_params)
-        
-        # Process results
-        fault_duration_data = []
-        summary_by_state = {}
-        
-        for row in rows:
-            # Convert timestamps to Dili time
-            start_time = convert_to_dili_time(row['fault_start'])
-            end_time = convert_to_dili_time(row['fault_end']) if row['fault_end'] else None
-            
-            fault_data = FaultDurationData(
-                fault_state=row['fault_state'],
-                terminal_id=row['terminal_id'],
-                start_time=start_time,
-                end_time=end_time,
-                duration_minutes=float(row['duration_minutes']) if row['duration_minutes'] else None,
-                fault_description=row['fault_description'],
-                fault_type=row['fault_type'],
-                component_type=row['component_type'],
-                terminal_name=f"ATM {row['terminal_id']}",
-                location=row['location'],
-                agent_error_description=row.get('agent_error_description')
-            )
-            fault_duration_data.append(fault_data)
-            
-            # Build summary by state
-            state = row['fault_state']
-            if state not in summary_by_state:
-                summary_by_state[state] = {
-                    'total_faults': 0,
-                    'durations': [],
-                    'resolved': 0,
-                    'ongoing': 0
-                }
-            
-            summary_by_state[state]['total_faults'] += 1
-            if row['duration_minutes']:
-                summary_by_state[state]['durations'].append(row['duration_minutes'])
-                
-            # Use the resolved flag from the database query
-            if row['resolved']:
-                summary_by_state[state]['resolved'] += 1
-            else:
-                summary_by_state[state]['ongoing'] += 1
-        
-        # Calculate summaries
-        final_summary_by_state = {}
-        overall_durations = []
-        total_faults = 0
-        total_resolved = 0
-        total_ongoing = 0
-        
-        for state, data in summary_by_state.items():
-            durations = data['durations']
-            avg_duration = sum(durations) / len(durations) if durations else 0
-            max_duration = max(durations) if durations else 0
-            min_duration = min(durations) if durations else 0
-            
-            final_summary_by_state[state] = FaultDurationSummary(
-                total_faults=data['total_faults'],
-                avg_duration_minutes=round(avg_duration, 2),
-                max_duration_minutes=int(max_duration),
-                min_duration_minutes=int(min_duration),
-                faults_resolved=data['resolved'],
-                faults_ongoing=data['ongoing']
-            )
-            
-            overall_durations.extend(durations)
-            total_faults += data['total_faults']
-            total_resolved += data['resolved']
-            total_ongoing += data['ongoing']
-        
-        # Overall summary
-        overall_avg = sum(overall_durations) / len(overall_durations) if overall_durations else 0
-        overall_max = max(overall_durations) if overall_durations else 0
-        overall_min = min(overall_durations) if overall_durations else 0
-        
-        overall_summary = FaultDurationSummary(
-            total_faults=total_faults,
-            avg_duration_minutes=round(overall_avg, 2),
-            max_duration_minutes=int(overall_max),
-            min_duration_minutes=int(overall_min),
-            faults_resolved=total_resolved,
-            faults_ongoing=total_ongoing
-        )
-        
-        # Get unique terminal count
-        unique_terminals = len(set(row['terminal_id'] for row in rows))
-        
-        # Generate chart data
-        chart_data = {
-            "duration_by_state": [
-                {
-                    "state": state,
-                    "avg_duration_hours": round(summary.avg_duration_minutes / 60, 2),
-                    "total_faults": summary.total_faults,
-                    "resolution_rate": round((summary.faults_resolved / summary.total_faults * 100), 2) if summary.total_faults > 0 else 0
-                }
-                for state, summary in final_summary_by_state.items()
-            ],
-            "timeline_data": [
-                {
-                    "terminal_id": fault.terminal_id,
-                    "fault_state": fault.fault_state,
-                    "start_time": fault.start_time.isoformat(),
-                    "duration_hours": round(fault.duration_minutes / 60, 2) if fault.duration_minutes else None,
-                    "resolved": fault.end_time is not None
-                }
-                for fault in fault_duration_data
-            ],
-            "colors": {
-                "WARNING": "#ffc107",
-                "WOUNDED": "#fd7e14", 
-                "ZOMBIE": "#6f42c1",
-                "OUT_OF_SERVICE": "#dc3545"
-            }
-        }
-        
-        return FaultHistoryReportResponse(
-            fault_duration_data=fault_duration_data,
-            summary_by_state=final_summary_by_state,
-            overall_summary=overall_summary,
-            date_range={
-                "start_date": start_date,
-                "end_date": end_date
-            },
-            terminal_count=unique_terminals,
-            chart_data=chart_data
-        )
-        
-    except HTTPException:
-        raise
+            if not conn.is_closed() and conn.is_in_transaction():
+                await transaction.rollback()
+        finally:
+            await release_db_connection(conn)
+    
+    try:
+        cycles_query = FAULT_CYCLES_RANGE_QUERY if await fault_cycles_available(conn) else FAULT_CYCLES_QUERY
+        await transaction.start()
+        cursor = await conn.cursor(cycles_query, start_dt, end_dt, terminal_list, include_ongoing)
+        batch = await cursor.fetch(FAULT_REPORT_FETCH_SIZE)
     except Exception as e:
+        await finish()
         logger.error(f"Error generating fault history report: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate fault history report")
-    finally:
-        await release_db_connection(conn)
+    
+    async def report_stream():
+        nonlocal batch
+        accumulator = FaultReportAccumulator()
+        try:
+            yield '{"fault_duration_data": ['
+            first = True
+            while batch:
+                for row in batch:
+                    # Convert timestamps to Dili time
+                    start_time = convert_to_dili_time(row['fault_start']).isoformat()
+                    end_time = convert_to_dili_time(row['fault_end']).isoformat() if row['fault_end'] else None
+                    duration = float(row['duration_minutes']) if row['duration_minutes'] else None
+                    
+                    item = {
+                        "fault_state": row['fault_state'],
+                        "terminal_id": row['terminal_id'],
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "duration_minutes": duration,
+                        "fault_description": row['fault_description'],
+                        "fault_type": row['fault_type'],
+                        "component_type": row['component_type'],
+                        "terminal_name": f"ATM {row['terminal_id']}",
+                        "location": row['location'],
+                        "agent_error_description": row['agent_error_description']
+                    }
+                    accumulator.add(row['terminal_id'], row['fault_state'], start_time, duration, row['resolved'])
+                    
+                    yield ('' if first else ', ') + json.dumps(item)
+                    first = False
+                batch = await cursor.fetch(FAULT_REPORT_FETCH_SIZE) if len(batch) == FAULT_REPORT_FETCH_SIZE else []
+            
+            yield '], "summary_by_state": ' + json.dumps(accumulator.summary_by_state())
+            yield ', "overall_summary": ' + json.dumps(accumulator.overall_summary())
+            yield ', "date_range": ' + json.dumps({"start_date": start_date, "end_date": end_date})
+            yield ', "terminal_count": ' + str(accumulator.terminal_count)
+            yield ', "chart_data": ' + accumulator.chart_data_json() + '}'
+        except Exception as e:
+            # Headers are already sent; ending the stream early leaves invalid JSON for the client to reject
+            logger.error(f"Error generating fault history report: {e}")
+            raise
+        finally:
+            await finish()
+    
+    # Also release the connection if the client disconnects before the stream starts
+    return StreamingResponse(report_stream(), media_type="application/json", background=BackgroundTask(finish))
+
+@app.get("/api/v1/atm/faults/ongoing", tags=["Fault Analysis"])
+async def get_ongoing_faults(
+    terminal_ids: Optional[str] = Query(None, description="Comma-separated terminal IDs, or 'all' for all terminals"),
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
+):
+    """
+    Fault cycles that have not ended yet, oldest first
+
+    An index lookup on the open rows of fault_cycles; durations run up to now.
+    """
+    terminal_list = None
+    if terminal_ids and terminal_ids.lower() != "all":
+        terminal_list = [tid.strip() for tid in terminal_ids.split(",") if tid.strip()] or None
+    
+    try:
+        rows = await conn.fetch(ONGOING_FAULTS_QUERY, terminal_list)
+    except asyncpg.UndefinedTableError:
+        logger.error("fault_cycles table not found - run fault_cycles.py to build it")
+        raise HTTPException(status_code=503, detail="Fault cycles not available")
+    except Exception as e:
+        logger.error(f"Error fetching ongoing faults: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch ongoing faults")
+    
+    ongoing_faults = [
+        FaultDurationData(
+            fault_state=row['fault_state'],
+            terminal_id=row['terminal_id'],
+            start_time=convert_to_dili_time(row['start_time']),
+            end_time=None,
+            duration_minutes=float(row['duration_minutes']) if row['duration_minutes'] is not None else None,
+            fault_description=row['fault_description'],
+            fault_type=row['fault_type'],
+            component_type=row['component_type'],
+            terminal_name=f"ATM {row['terminal_id']}",
+            location=row['location'],
+            agent_error_description=row['agent_error_description']
+        )
+        for row in rows
+    ]
+    
+    return {
+        "ongoing_faults": ongoing_faults,
+        "total_count": len(ongoing_faults),
+        "timestamp": convert_to_dili_time(datetime.now(UTC_TZ)).isoformat()
+    }
 
 # ========================
 # CASH INFORMATION ENDPOINTS
@@ -3085,36 +2754,59 @@ class CashInformationResponse(BaseModel):
     filters_applied: Dict[str, Any] = Field(..., description="Applied filters")
     timestamp: str = Field(..., description="Response timestamp")
 
+async def cash_daily_available(conn) -> bool:
+    """Whether terminal_cash_daily has been backfilled from the full cash reading history"""
+    try:
+        return await conn.fetchval(cash_daily_rollup.CASH_DAILY_BACKFILLED_QUERY)
+    except asyncpg.UndefinedTableError:
+        return False
+
+async def check_cash_daily_rollup():
+    """
+    Log whether terminal_cash_daily is ready
+    
+    The rollup and its trigger are installed by cash_daily_rollup.py (run by the
+    owner of terminal_cash_information); the API only reads them.
+    """
+    conn = await get_db_connection()
+    if not conn:
+        return
+    try:
+        if not await cash_daily_available(conn):
+            logger.warning("terminal_cash_daily not backfilled yet - cash usage is aggregated from raw readings "
+                           "until cash_daily_rollup.py has been run")
+    except Exception as e:
+        logger.warning(f"Could not check terminal_cash_daily: {e}")
+    finally:
+        await release_db_connection(conn)
+
 @app.get("/api/v1/atm/cash-usage/daily", response_model=DailyCashUsageResponse, tags=["Cash Usage Analysis"])
-# @cached_response(cache_type='daily_summaries', cache_prefix='daily_cash')  # Disabled for now
+@cached_response(cache_type='daily_summaries', cache_prefix='daily_cash')
 async def get_daily_cash_usage(
     request: Request,
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
     terminal_ids: Optional[str] = Query(None, description="Comma-separated terminal IDs, or 'all' for all terminals"),
     include_partial_data: bool = Query(True, description="Include days with incomplete data"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     🚀 OPTIMIZED: Calculate daily cash usage for terminals within a date range
     
-    Performance optimizations applied:
-    - Database indexes (96.4% performance improvement achieved!)
-    - Optimized queries with CTEs
-    - Efficient date range processing
+    Reads the terminal_cash_daily rollup (one row per terminal per Dili day,
+    maintained as cash readings arrive - see cash_daily_rollup.py), so the cost
+    grows with the number of days and terminals rather than raw readings and
+    ranges are not capped. Until the rollup has been backfilled the same days
+    are aggregated from the raw readings.
     
     This endpoint calculates how much cash each terminal dispensed per day by:
-    1. Finding the first cash reading of each day (start amount)
-    2. Finding the last cash reading of each day (end amount)  
+    1. Finding the highest cash reading of each day (start amount)
+    2. Finding the lowest cash reading of each day (end amount)  
     3. Calculating usage as: start_amount - end_amount
     4. Providing data quality indicators for each calculation
     
     Returns detailed daily usage data suitable for trend analysis and charts.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         # Parse and validate date inputs
         try:
@@ -3126,94 +2818,16 @@ async def get_daily_cash_usage(
         if start_dt > end_dt:
             raise HTTPException(status_code=400, detail="Start date must be before or equal to end date")
         
-        # Limit date range to prevent excessive queries
         date_diff = (end_dt - start_dt).days
-        if date_diff > 90:
-            raise HTTPException(status_code=400, detail="Date range cannot exceed 90 days")
         
-        # Parse terminal IDs
+        # Parse terminal IDs (NULL means every terminal)
         terminal_list = None
         if terminal_ids and terminal_ids.lower() != 'all':
-            terminal_list = [tid.strip() for tid in terminal_ids.split(',') if tid.strip()]
-        
-        # Use optimized database query (simplified version)
-        # Build terminal filter
-        terminal_filter = ""
-        if terminal_list:
-            placeholders = ','.join([f"'{tid}'" for tid in terminal_list])
-            terminal_filter = f"AND terminal_id IN ({placeholders})"
-        
-        # Optimized query using the database indexes we created
-        query = f"""
-        WITH date_range AS (
-            SELECT generate_series(
-                date_trunc('day', $1::timestamp),
-                date_trunc('day', $2::timestamp),
-                interval '1 day'
-            )::date as usage_date
-        ),
-        terminal_filter AS (
-            SELECT DISTINCT terminal_id 
-            FROM terminal_cash_information 
-            WHERE retrieval_timestamp >= $1 
-              AND retrieval_timestamp <= $2
-              {terminal_filter}
-        ),
-        daily_cash_stats AS (
-            SELECT 
-                tci.terminal_id,
-                date(tci.retrieval_timestamp AT TIME ZONE 'Asia/Dili') as usage_date,
-                MIN(tci.total_cash_amount) as min_cash,
-                MAX(tci.total_cash_amount) as max_cash,
-                AVG(tci.total_cash_amount) as avg_cash,
-                COUNT(*) as reading_count,
-                STDDEV(tci.total_cash_amount) as cash_variance
-            FROM terminal_cash_information tci
-            INNER JOIN terminal_filter tf ON tci.terminal_id = tf.terminal_id
-            WHERE tci.retrieval_timestamp >= $1 
-              AND tci.retrieval_timestamp <= $2
-              AND tci.total_cash_amount IS NOT NULL 
-              AND tci.total_cash_amount > 0
-            GROUP BY tci.terminal_id, date(tci.retrieval_timestamp AT TIME ZONE 'Asia/Dili')
-        ),
-        terminal_locations AS (
-            SELECT DISTINCT ON (terminal_id)
-                terminal_id,
-                location,
-                'Unknown' as region_code,
-                'Unknown' as bank_code
-            FROM terminal_details
-            WHERE retrieved_date >= (CURRENT_DATE - INTERVAL '30 days')
-            ORDER BY terminal_id, retrieved_date DESC
-        )
-        SELECT 
-            dr.usage_date,
-            COALESCE(tl.terminal_id, tf.terminal_id) as terminal_id,
-            COALESCE(tl.location, 'Unknown Location') as location,
-            COALESCE(tl.region_code, 'Unknown') as region_code,
-            COALESCE(tl.bank_code, 'Unknown') as bank_code,
-            COALESCE(dcs.min_cash, 0) as min_cash_amount,
-            COALESCE(dcs.max_cash, 0) as max_cash_amount,
-            COALESCE(dcs.avg_cash, 0) as avg_cash_amount,
-            COALESCE(dcs.reading_count, 0) as reading_count,
-            COALESCE(dcs.cash_variance, 0) as cash_variance,
-            CASE 
-                WHEN dcs.max_cash > dcs.min_cash 
-                THEN dcs.max_cash - dcs.min_cash 
-                ELSE 0 
-            END as cash_usage_amount
-        FROM date_range dr
-        CROSS JOIN terminal_filter tf
-        LEFT JOIN daily_cash_stats dcs ON dr.usage_date = dcs.usage_date 
-                                       AND tf.terminal_id = dcs.terminal_id
-        LEFT JOIN terminal_locations tl ON tf.terminal_id = tl.terminal_id
-        ORDER BY dr.usage_date, tf.terminal_id
-        """
+            terminal_list = [tid.strip() for tid in terminal_ids.split(',') if tid.strip()] or None
         
-        # Execute the optimized query
         logger.info(f"Executing daily cash usage query with date range {start_dt} to {end_dt}")
-        logger.debug(f"Query: {query[:500]}...")  # Log first 500 characters for debugging
-        rows = await conn.fetch(query, start_dt, end_dt)
+        statement = DAILY_CASH_USAGE if await cash_daily_available(conn) else DAILY_CASH_USAGE_LIVE
+        rows = await api_statements.fetch(conn, statement, start_dt.date(), end_dt.date(), terminal_list)
         
         if not rows:
             raise HTTPException(status_code=404, detail="No cash data found for the specified criteria")
@@ -3331,33 +2945,10 @@ async def get_daily_cash_usage(
     except Exception as e:
         logger.error(f"Error in get_daily_cash_usage: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
-    finally:
-        await release_db_connection(conn)
 
-@app.get("/api/v1/atm/cash-usage/trends", response_model=CashUsageTrendResponse, tags=["Cash Usage Analysis"])
-async def get_cash_usage_trends(
-    terminal_id: Optional[str] = Query(None, description="Specific terminal ID for individual trends, omit for overall trends"),
-    days: int = Query(30, ge=1, le=365, description="Number of days to look back (1-365)"),
-    aggregation: str = Query("daily", description="Aggregation level: daily, weekly, monthly"),
-    db_check: bool = Depends(validate_db_connection)
-):
-    """
-    Get cash usage trends over time for line chart visualization
-    
-    This endpoint provides time-series data perfect for creating line charts showing:
-    - Daily cash usage trends for individual terminals or overall fleet
-    - Weekly/monthly aggregations for longer-term analysis
-    - Statistical measures (min, max, average) for each time period
-    
-    Returns data formatted specifically for frontend chart libraries with:
-    - X-axis: Date/time periods
-    - Y-axis: Cash usage amounts
-    - Multiple series support for comparing terminals
-    """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
+async def build_cash_usage_trends(conn: asyncpg.Connection, terminal_id: Optional[str], days: int,
+                                  aggregation: str) -> CashUsageTrendResponse:
+    """Cash usage trend series shared by the trends and terminal history endpoints"""
     try:
         # Validate aggregation parameter
         if aggregation not in ['daily', 'weekly', 'monthly']:
@@ -3367,71 +2958,19 @@ async def get_cash_usage_trends(
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days)
         
-        # Build terminal filter
-        terminal_filter = ""
-        if terminal_id:
-            terminal_filter = f"AND tci.terminal_id = '{terminal_id}'"
-        
-        # Determine date grouping based on aggregation
+        # Period the daily rollup rows are grouped into
         if aggregation == 'daily':
-            date_group = "DATE(tci.retrieval_timestamp AT TIME ZONE 'UTC' AT TIME ZONE 'Asia/Dili')"
+            period = 'day'
             date_format = '%Y-%m-%d'
         elif aggregation == 'weekly':
-            date_group = "DATE_TRUNC('week', tci.retrieval_timestamp AT TIME ZONE 'UTC' AT TIME ZONE 'Asia/Dili')::date"
+            period = 'week'
             date_format = '%Y-W%U'
         else:  # monthly
-            date_group = "DATE_TRUNC('month', tci.retrieval_timestamp AT TIME ZONE 'UTC' AT TIME ZONE 'Asia/Dili')::date"
+            period = 'month'
             date_format = '%Y-%m'
         
-        # Determine interval for date series based on aggregation
-        if aggregation == 'daily':
-            interval_str = '1 day'
-        elif aggregation == 'weekly':
-            interval_str = '1 week'
-        else:  # monthly
-            interval_str = '1 month'
-        
-        # Optimized query for trends with simplified aggregation
-        query = f"""
-            WITH date_series AS (
-                SELECT generate_series(
-                    $1::date, 
-                    $2::date, 
-                    '{interval_str}'::interval
-                )::date as period_date
-            ),
-            terminal_daily_usage AS (
-                SELECT 
-                    tci.terminal_id,
-                    {date_group} as period_date,
-                    CASE 
-                        WHEN COUNT(*) >= 2 THEN 
-                            GREATEST(0, MIN(tci.total_cash_amount) - MAX(tci.total_cash_amount))
-                        ELSE 0
-                    END as daily_usage
-                FROM terminal_cash_information tci
-                WHERE tci.retrieval_timestamp >= $1
-                  AND tci.retrieval_timestamp <= $2::timestamp + INTERVAL '1 day'
-                  AND tci.total_cash_amount IS NOT NULL
-                  AND tci.total_cash_amount > 0
-                  {terminal_filter}
-                GROUP BY tci.terminal_id, {date_group}
-                HAVING COUNT(*) > 0
-            )
-            SELECT 
-                ds.period_date,
-                COALESCE(COUNT(DISTINCT tdu.terminal_id), 0) as terminal_count,
-                COALESCE(SUM(tdu.daily_usage), 0) as total_usage,
-                COALESCE(AVG(tdu.daily_usage), 0) as avg_usage_per_terminal,
-                COALESCE(MAX(tdu.daily_usage), 0) as max_usage,
-                COALESCE(MIN(tdu.daily_usage), 0) as min_usage
-            FROM date_series ds
-            LEFT JOIN terminal_daily_usage tdu ON ds.period_date = tdu.period_date
-            GROUP BY ds.period_date
-            ORDER BY ds.period_date ASC
-        """
-        
-        rows = await conn.fetch(query, start_date, end_date)
+        statement = CASH_USAGE_TRENDS if await cash_daily_available(conn) else CASH_USAGE_TRENDS_LIVE
+        rows = await api_statements.fetch(conn, statement, start_date, end_date, terminal_id, period)
         
         if not rows:
             # If no data found, return empty trend with proper structure
@@ -3551,15 +3090,39 @@ async def get_cash_usage_trends(
     except Exception as e:
         logger.error(f"Error fetching cash usage trends: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch cash usage trends")
-    finally:
-        await release_db_connection(conn)
+
+@app.get("/api/v1/atm/cash-usage/trends", response_model=CashUsageTrendResponse, tags=["Cash Usage Analysis"])
+@cached_response(cache_type='trends', cache_prefix='trends')
+async def get_cash_usage_trends(
+    request: Request,
+    terminal_id: Optional[str] = Query(None, description="Specific terminal ID for individual trends, omit for overall trends"),
+    days: int = Query(30, ge=1, le=365, description="Number of days to look back (1-365)"),
+    aggregation: str = Query("daily", description="Aggregation level: daily, weekly, monthly"),
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
+):
+    """
+    Get cash usage trends over time for line chart visualization
+    
+    This endpoint provides time-series data perfect for creating line charts showing:
+    - Daily cash usage trends for individual terminals or overall fleet
+    - Weekly/monthly aggregations for longer-term analysis
+    - Statistical measures (min, max, average) for each time period
+    
+    Returns data formatted specifically for frontend chart libraries with:
+    - X-axis: Date/time periods
+    - Y-axis: Cash usage amounts
+    - Multiple series support for comparing terminals
+    """
+    return await build_cash_usage_trends(conn, terminal_id, days, aggregation)
 
 @app.get("/api/v1/atm/{terminal_id}/cash-usage/history", response_model=CashUsageTrendResponse, tags=["Cash Usage Analysis"])
+@cached_response(cache_type='terminal_history', cache_prefix='term_hist')
 async def get_terminal_cash_usage_history(
+    request: Request,
     terminal_id: str = Path(..., description="Terminal ID to get cash usage history for"),
     days: int = Query(30, ge=1, le=365, description="Number of days to look back (1-365)"),
     include_raw_readings: bool = Query(False, description="Include individual cash readings for detailed analysis"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get detailed cash usage history for a specific terminal
@@ -3572,68 +3135,20 @@ async def get_terminal_cash_usage_history(
     
     Perfect for creating individual terminal cash usage line charts and detailed analysis.
     """
-    # Reuse the trends endpoint but with terminal-specific logic
-    return await get_cash_usage_trends(
-        terminal_id=terminal_id,
-        days=days,
-        aggregation="daily",
-        db_check=db_check
-    )
-
-def get_cache_key(endpoint: str, params: dict) -> str:
-    """Generate a cache key for the given endpoint and parameters"""
-    param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-    cache_string = f"{endpoint}:{param_str}"
-    return hashlib.md5(cache_string.encode()).hexdigest()
-
-def is_cache_valid(cache_entry: dict) -> bool:
-    """Check if cache entry is still valid"""
-    if not cache_entry:
-        return False
-    return (datetime.utcnow() - cache_entry['timestamp']).total_seconds() < CACHE_DURATION
+    # Same series as the trends endpoint, for one terminal at daily granularity
+    return await build_cash_usage_trends(conn, terminal_id, days, "daily")
 
-async def get_optimized_terminal_rankings(conn, start_date, end_date, limit=10):
-    """Optimized query for terminal rankings with better performance"""
-    # Use a more efficient query with subqueries to reduce data processing
-    query = """
-        WITH terminal_cash_stats AS (
-            SELECT 
-                tci.terminal_id,
-                AVG(tci.total_cash_amount) as avg_cash,
-                SUM(tci.total_cash_amount) as total_cash,
-                COUNT(*) as reading_count
-            FROM terminal_cash_information tci
-            WHERE tci.retrieval_timestamp >= $1
-              AND tci.retrieval_timestamp <= $2::timestamp + INTERVAL '1 day'
-              AND tci.total_cash_amount IS NOT NULL
-              AND tci.total_cash_amount > 0
-            GROUP BY tci.terminal_id
-        ),
-        terminal_locations AS (
-            SELECT DISTINCT ON (terminal_id) 
-                terminal_id, location
-            FROM terminal_details 
-            WHERE terminal_id IN (SELECT terminal_id FROM terminal_cash_stats)
-            ORDER BY terminal_id, retrieved_date DESC
-        )
-        SELECT 
-            tcs.terminal_id,
-            tl.location,
-            tcs.total_cash,
-            tcs.avg_cash,
-            tcs.reading_count
-        FROM terminal_cash_stats tcs
-        LEFT JOIN terminal_locations tl ON tcs.terminal_id = tl.terminal_id
-        ORDER BY tcs.total_cash DESC
-        LIMIT $3
-    """
-    
-    return await conn.fetch(query, start_date, end_date, limit)
+async def get_optimized_terminal_rankings(conn, start_date, end_date, limit=10, rollup_ready=True):
+    """Terminals ranked by total cash tracked, from the terminal_cash_daily rollup"""
+    statement = TERMINAL_CASH_RANKINGS if rollup_ready else TERMINAL_CASH_RANKINGS_LIVE
+    return await api_statements.fetch(conn, statement, start_date, end_date, limit)
 
 @app.get("/api/v1/atm/cash-usage/summary", tags=["Cash Usage Analysis"])
+@cached_response(cache_type='cash_summary', cache_prefix='summary')
 async def get_cash_usage_summary(
-    days: int = Query(7, ge=1, le=90, description="Number of days to analyze for summary (1-90)"),
-    db_check: bool = Depends(validate_db_connection)
+    request: Request,
+    days: int = Query(7, ge=1, le=365, description="Number of days to analyze for summary (1-365)"),
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get summary statistics for cash usage across all terminals (OPTIMIZED)
@@ -3646,21 +3161,10 @@ async def get_cash_usage_summary(
     - Cash flow trends
     
     Performance optimizations:
-    - Caching for 5 minutes
+    - Caching for 15 minutes
     - Optimized queries with CTEs
     - Reduced data processing
     """
-    # Check cache first
-    cache_key = get_cache_key("cash-usage-summary", {"days": days})
-    
-    if cache_key in summary_cache and is_cache_valid(summary_cache[cache_key]):
-        logger.info(f"Returning cached summary for days={days}")
-        return JSONResponse(content=summary_cache[cache_key]['data'])
-    
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         start_time = time.time()
         
@@ -3670,44 +3174,11 @@ async def get_cash_usage_summary(
         
         logger.info(f"Generating cash usage summary for {days} days ({start_date} to {end_date})")
         
-        # Optimized main summary query - single pass
-        summary_query = """
-            WITH daily_cash_stats AS (
-                SELECT 
-                    terminal_id,
-                    DATE(retrieval_timestamp AT TIME ZONE 'Asia/Dili') as cash_date,
-                    MIN(total_cash_amount) as min_daily_cash,
-                    MAX(total_cash_amount) as max_daily_cash,
-                    AVG(total_cash_amount) as avg_daily_cash,
-                    COUNT(*) as daily_readings
-                FROM terminal_cash_information
-                WHERE retrieval_timestamp >= $1
-                  AND retrieval_timestamp < $2::timestamp + INTERVAL '1 day'
-                  AND total_cash_amount IS NOT NULL
-                  AND total_cash_amount > 0
-                GROUP BY terminal_id, DATE(retrieval_timestamp AT TIME ZONE 'Asia/Dili')
-            ),
-            terminal_summary AS (
-                SELECT 
-                    terminal_id,
-                    COUNT(DISTINCT cash_date) as active_days,
-                    SUM(max_daily_cash) as total_cash,
-                    AVG(avg_daily_cash) as avg_cash,
-                    SUM(daily_readings) as total_readings
-                FROM daily_cash_stats
-                GROUP BY terminal_id
-            )
-            SELECT 
-                COUNT(DISTINCT terminal_id) as active_terminals,
-                COALESCE(SUM(total_cash), 0) as fleet_total_cash_tracked,
-                COALESCE(AVG(avg_cash), 0) as fleet_avg_cash_amount,
-                COALESCE(MAX(avg_cash), 0) as fleet_max_cash_amount,
-                COALESCE(MIN(avg_cash), 0) as fleet_min_cash_amount,
-                COALESCE(SUM(total_readings), 0) as total_readings
-            FROM terminal_summary
-        """
-        
-        result = await conn.fetchrow(summary_query, start_date, end_date)
+        # Per-terminal daily rows from the terminal_cash_daily rollup (or the raw readings
+        # until it has been backfilled)
+        rollup_ready = await cash_daily_available(conn)
+        statement = CASH_USAGE_SUMMARY if rollup_ready else CASH_USAGE_SUMMARY_LIVE
+        result = await api_statements.fetchrow(conn, statement, start_date, end_date)
         
         if not result or result['active_terminals'] == 0:
             empty_response = {
@@ -3730,7 +3201,7 @@ async def get_cash_usage_summary(
             return JSONResponse(content=empty_response)
         
         # Get terminal rankings using optimized query
-        ranking_results = await get_optimized_terminal_rankings(conn, start_date, end_date, 20)
+        ranking_results = await get_optimized_terminal_rankings(conn, start_date, end_date, 20, rollup_ready)
         
         # Process results efficiently with safe decimal conversion
         summary = {
@@ -3790,7 +3261,7 @@ async def get_cash_usage_summary(
         # Add performance insight
         generation_time = summary['generation_time_ms']
         if generation_time < 1000:
-            insights.append(f"✓ Summary generated in {generation_time}ms (cached for 5 minutes)")
+            insights.append(f"✓ Summary generated in {generation_time}ms (cached for 15 minutes)")
         
         response_data = {
             "summary": summary,
@@ -3800,13 +3271,6 @@ async def get_cash_usage_summary(
             "timestamp": convert_to_dili_time(datetime.utcnow()).isoformat()
         }
         
-        # Cache the result with safe decimal conversion
-        safe_response_data = safe_decimal_conversion(response_data)
-        summary_cache[cache_key] = {
-            'data': safe_response_data,
-            'timestamp': datetime.utcnow()
-        }
-        
         logger.info(f"Cash usage summary generated in {generation_time}ms for {days} days")
         
         return JSONResponse(content=safe_decimal_conversion(response_data))
@@ -3816,18 +3280,18 @@ async def get_cash_usage_summary(
     except Exception as e:
         logger.error(f"Error generating cash usage summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to generate cash usage summary")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/cash-information", response_model=CashInformationResponse, tags=["Cash Information"])
+@cached_response(cache_type='cash_summary', cache_prefix='summary')
 async def get_terminal_cash_information(
+    request: Request,
     terminal_id: Optional[str] = Query(None, description="Filter by specific terminal ID"),
     location_filter: Optional[str] = Query(None, description="Filter by location (partial match)"),
     cash_status: Optional[str] = Query(None, description="Filter by cash status (LOW, NORMAL, HIGH)"),
     hours_back: int = Query(24, ge=1, le=720, description="Hours to look back for data (1-720)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
     include_raw_data: bool = Query(False, description="Include raw cash data in response"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get terminal cash information from the terminal_cash_information table
@@ -3841,65 +3305,18 @@ async def get_terminal_cash_information(
     
     Supports filtering by terminal ID, location, cash status, and time range.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
-        # Build query with dynamic filters - JOIN with terminal_details to get proper location
-        base_query = """
-            SELECT 
-                tci.terminal_id,
-                tci.business_code,
-                tci.technical_code,
-                tci.external_id,
-                tci.total_cash_amount,
-                tci.total_currency,
-                tci.cassette_count,
-                tci.cassettes_data,
-                tci.has_low_cash_warning,
-                tci.has_cash_errors,
-                tci.retrieval_timestamp,
-                tci.event_date,
-                tci.raw_cash_data,
-                td.location
-            FROM terminal_cash_information tci
-            LEFT JOIN (
-                SELECT DISTINCT ON (terminal_id) 
-                    terminal_id, 
-                    location
-                FROM terminal_details 
-                ORDER BY terminal_id, retrieved_date DESC
-            ) td ON tci.terminal_id = td.terminal_id
-            WHERE tci.retrieval_timestamp >= NOW() - INTERVAL '%s hours'
-        """ % hours_back
-        
-        # Add filters
-        conditions = []
-        params = []
-        
-        if terminal_id:
-            conditions.append("tci.terminal_id = $" + str(len(params) + 1))
-            params.append(terminal_id)
-        
-        if location_filter:
-            # Now search in both business_code and the actual location from terminal_details
-            conditions.append("(tci.business_code ILIKE $" + str(len(params) + 1) + " OR td.location ILIKE $" + str(len(params) + 1) + ")")
-            params.append(f"%{location_filter}%")
-        
-        if cash_status:
-            # Map cash_status to our warning system
-            if cash_status.upper() == "LOW":
-                conditions.append("tci.has_low_cash_warning = true")
-            elif cash_status.upper() == "ERROR":
-                conditions.append("tci.has_cash_errors = true")
-        
-        if conditions:
-            base_query += " AND " + " AND ".join(conditions)
-        
-        base_query += f" ORDER BY tci.retrieval_timestamp DESC LIMIT {limit}"
-        
-        rows = await conn.fetch(base_query, *params)
+        # JOIN with terminal_current_state to get proper location; filters left as NULL
+        # match every row. The location pattern searches both business_code and location
+        location_pattern = f"%{location_filter}%" if location_filter else None
+        # Map cash_status to our warning system
+        low_cash_only = bool(cash_status) and cash_status.upper() == "LOW"
+        cash_errors_only = bool(cash_status) and cash_status.upper() == "ERROR"
+        
+        rows = await api_statements.fetch(
+            conn, CASH_INFORMATION, hours_back, terminal_id, location_pattern,
+            low_cash_only, cash_errors_only, limit
+        )
         
         if not rows:
             return CashInformationResponse(
@@ -4020,15 +3437,13 @@ async def get_terminal_cash_information(
     except Exception as e:
         logger.error(f"Error fetching terminal cash information: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch terminal cash information")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/{terminal_id}/cash-information", response_model=CashInformationResponse, tags=["Cash Information"])
 async def get_specific_terminal_cash_information(
     terminal_id: str = Path(..., description="Terminal ID to get cash information for"),
     hours_back: int = Query(72, ge=1, le=720, description="Hours to look back for data (1-720, default 72)"),
     include_raw_data: bool = Query(True, description="Include raw cash data in response"),
-    db_check: bool = Depends(validate_db_connection)
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get cash information for a specific terminal
@@ -4039,33 +3454,8 @@ async def get_specific_terminal_cash_information(
     - Cash replenishment history
     - Trends and patterns
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
-        query = """
-            SELECT 
-                terminal_id,
-                business_code,
-                technical_code,
-                external_id,
-                total_cash_amount,
-                total_currency,
-                cassette_count,
-                cassettes_data,
-                has_low_cash_warning,
-                has_cash_errors,
-                retrieval_timestamp,
-                event_date,
-                raw_cash_data
-            FROM terminal_cash_information
-            WHERE terminal_id = $1 
-                AND retrieval_timestamp >= NOW() - INTERVAL '%s hours'
-            ORDER BY retrieval_timestamp DESC
-        """ % hours_back
-        
-        rows = await conn.fetch(query, terminal_id)
+        rows = await api_statements.fetch(conn, TERMINAL_CASH_INFORMATION, terminal_id, hours_back)
         
         if not rows:
             raise HTTPException(
@@ -4195,12 +3585,12 @@ async def get_specific_terminal_cash_information(
     except Exception as e:
         logger.error(f"Error fetching cash information for terminal {terminal_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch cash information for terminal {terminal_id}")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/cash-information/summary", tags=["Cash Information"])
+@cached_response(cache_type='cash_summary', cache_prefix='summary')
 async def get_cash_information_summary(
-    db_check: bool = Depends(validate_db_connection)
+    request: Request,
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get summary statistics for all terminal cash information
@@ -4212,10 +3602,6 @@ async def get_cash_information_summary(
     - Low cash alerts
     - Recent replenishments
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         # Get latest cash information for each terminal
         query = """
@@ -4341,31 +3727,25 @@ async def get_cash_information_summary(
     except Exception as e:
         logger.error(f"Error fetching cash information summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch cash information summary")
-    finally:
-        await release_db_connection(conn)
 
 @app.get("/api/v1/atm/terminals", tags=["Terminals"])
+@cached_response(cache_type='atm_status', cache_prefix='term_list')
 async def get_all_terminals(
-    db_check: bool = Depends(validate_db_connection)
+    request: Request,
+    conn: asyncpg.Connection = Depends(get_request_db_connection)
 ):
     """
     Get all distinct terminals with their latest location information
     
     Returns a list of all terminal IDs with their corresponding locations
-    from the terminal_details table for use in dropdown filters.
+    from the terminal_current_state table for use in dropdown filters.
     """
-    conn = await get_db_connection()
-    if not conn:
-        raise HTTPException(status_code=503, detail="Database connection unavailable")
-    
     try:
         # Get distinct terminals with their latest location data
         query = """
-            SELECT DISTINCT ON (terminal_id)
-                terminal_id,
-                location
-            FROM terminal_details
-            ORDER BY terminal_id, retrieved_date DESC
+            SELECT terminal_id, location
+            FROM terminal_current_state
+            ORDER BY terminal_id
         """
         
         results = await conn.fetch(query)
@@ -4391,56 +3771,47 @@ async def get_all_terminals(
     except Exception as e:
         logger.error(f"Error fetching terminals list: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch terminals list")
-    finally:
-        await release_db_connection(conn)
 
 # ========================
 # PERFORMANCE MANAGEMENT ENDPOINTS
 # ========================
 
+def get_pool_info() -> Dict[str, Any]:
+    """Current connection pool sizing and health probe state"""
+    return {
+        'size': db_pool.get_size() if db_pool else 0,
+        'idle': db_pool.get_idle_size() if db_pool else 0,
+        'min_size': db_pool.get_min_size() if db_pool else None,
+        'max_size': db_pool.get_max_size() if db_pool else None,
+        'healthy': db_pool_health['healthy'],
+        'last_health_check': db_pool_health['last_check'].isoformat() if db_pool_health['last_check'] else None,
+        'health_check_latency_ms': db_pool_health['latency_ms']
+    }
+
 @app.get("/api/v1/performance/cache-stats", tags=["Performance Management"])
 async def get_cache_performance_stats():
     """
-    Get performance statistics (simplified version)
+    Get measured cache and database performance statistics
     
-    Returns basic metrics about the system performance
+    Returns response cache counters, connection pool state and wait times,
+    and database time per query name since the API started.
     """
     try:
-        # Simplified cache stats
-        cache_stats = {
-            "cache_performance": {
-                "total_requests": 0,
-                "cache_hits": 0,
-                "cache_misses": 0,
-                "hit_rate_percent": 0.0,
-                "invalidations": 0,
-                "cached_entries": 0
-            },
-            "cache_config": {
-                "durations": {
-                    "daily_summaries": 21600,  # 6 hours
-                    "trends": 3600,             # 1 hour
-                    "default": 300              # 5 minutes
-                }
-            }
-        }
+        cache_stats = await get_cache_statistics()
         
-        # Basic database stats
         db_stats = {
             "connection_pool": {
-                "status": "active",
-                "optimization_applied": True
+                **get_pool_info(),
+                "wait_time": performance_metrics.pool_wait.summary()
             },
-            "query_statistics": {
-                "database_indexes": "optimized",
-                "performance_improvement": "96.4%"
-            }
+            "query_statistics": performance_metrics.get_query_stats(),
+            "prepared_statements": api_statements.get_statement_stats()
         }
         
         return {
             "cache_performance": cache_stats,
             "database_performance": db_stats,
-            "system_status": "optimized",
+            "collecting_since": performance_metrics.started_at.isoformat(),
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
@@ -4452,62 +3823,109 @@ async def clear_performance_cache(
     pattern: Optional[str] = Query(None, description="Cache pattern to clear (optional)")
 ):
     """
-    Clear cache entries (simplified version)
+    Clear response cache entries (all, or those whose key contains the pattern)
     """
     try:
-        # Simplified cache clearing
+        entries_before = len(advanced_cache.cache_store)
+        result = await clear_cache(pattern)
+        
         return {
             "success": True,
-            "message": f"Cache clearing simulated for pattern: {pattern or 'all'}",
+            "message": result['message'],
             "cleared_pattern": pattern or "all",
+            "entries_cleared": entries_before - len(advanced_cache.cache_store),
             "timestamp": datetime.utcnow().isoformat()
         }
     except Exception as e:
         logger.error(f"Error clearing cache: {e}")
         raise HTTPException(status_code=500, detail="Failed to clear cache")
 
+@app.get("/api/v1/performance/metrics", tags=["Performance Management"])
+async def get_performance_metrics():
+    """
+    Get all measured request, database, pool and cache metrics
+    
+    Routes are sorted by p95 latency and queries by total database time,
+    so the slowest endpoints appear first.
+    """
+    try:
+        return {
+            **performance_metrics.snapshot(),
+            "prepared_statements": api_statements.get_statement_stats(),
+            "connection_pool": get_pool_info(),
+            "cache": advanced_cache.get_cache_stats(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error getting performance metrics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get performance metrics")
+
+@app.get("/api/v1/performance/metrics/prometheus", response_class=PlainTextResponse, tags=["Performance Management"])
+async def get_prometheus_metrics():
+    """
+    Get all measured metrics in the Prometheus text exposition format
+    """
+    try:
+        body = performance_metrics.render_prometheus(
+            cache_stats=advanced_cache.get_cache_stats(),
+            pool_info=get_pool_info()
+        )
+        return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+    except Exception as e:
+        logger.error(f"Error rendering Prometheus metrics: {e}")
+        raise HTTPException(status_code=500, detail="Failed to render metrics")
+
 @app.get("/api/v1/performance/optimization-report", tags=["Performance Management"])
 async def get_optimization_report():
     """
-    Get comprehensive performance optimization report
+    Get a performance report built from measured metrics
     
-    Returns analysis of current optimizations and recommendations
+    Highlights the slowest routes and queries, pool pressure and cache
+    effectiveness, with recommendations derived from those measurements.
     """
     try:
-        # Performance assessment based on our optimizations
-        optimization_status = {
-            "database_indexes": "✅ Optimized - Composite indexes created (96.4% improvement)",
-            "query_optimization": "✅ Optimized - CTEs and efficient JOINs implemented", 
-            "caching_system": "✅ Ready - In-memory caching with 5-minute duration",
-            "connection_pooling": "✅ Optimized - Async pool management active",
-            "response_compression": "⚠️ Recommended - Consider enabling gzip"
-        }
-        
-        recommendations = [
-            "Database optimization completed successfully",
-            "Consider Redis for production-scale caching",
-            "Monitor query performance in production",
-            "Implement response compression for large payloads"
-        ]
+        routes = performance_metrics.get_route_stats()
+        queries = performance_metrics.get_query_stats()
+        pool_wait = performance_metrics.pool_wait.summary()
+        cache_stats = advanced_cache.get_cache_stats()
+        
+        slow_routes = [r for r in routes if r['p95_ms'] > 3000]
+        recommendations = []
+        for route in slow_routes[:5]:
+            recommendations.append(f"{route['method']} {route['route']} p95 is {route['p95_ms']}ms (target < 3000ms)")
+        for query in queries[:3]:
+            if query['avg_time'] > 1.0:
+                recommendations.append(f"Query '{query['query_name']}' averages {query['avg_time']:.2f}s over {query['count']} runs")
+        if pool_wait['p95_ms'] > 100:
+            recommendations.append(f"Connection pool wait p95 is {pool_wait['p95_ms']}ms - consider a larger pool")
+        if cache_stats['total_requests'] >= 50 and cache_stats['hit_rate_percent'] < 50:
+            recommendations.append(f"Response cache hit rate is {cache_stats['hit_rate_percent']}% - review TTLs and invalidation")
+        if not recommendations:
+            recommendations.append("No slow routes, queries or pool contention measured")
+        
+        total_requests = sum(r['count'] for r in routes)
+        overall_p95 = max((r['p95_ms'] for r in routes), default=0.0)
+        if overall_p95 <= 500:
+            grade = "A"
+        elif overall_p95 <= 1000:
+            grade = "B"
+        elif overall_p95 <= 3000:
+            grade = "C"
+        else:
+            grade = "D"
         
         return {
-            "performance_grade": "A+",
-            "optimization_success": "96.4% performance improvement achieved",
-            "optimization_status": optimization_status,
+            "performance_grade": grade if total_requests else "N/A",
             "recommendations": recommendations,
             "report_timestamp": datetime.utcnow().isoformat(),
-            "optimizations_applied": [
-                "✅ Database composite indexes (4/5 successful)",
-                "✅ Query optimization with CTEs", 
-                "✅ Optimized database queries (0.531s vs 14.878s)",
-                "✅ Connection pooling optimization",
-                "✅ Performance monitoring endpoints"
-            ],
             "performance_metrics": {
-                "before_optimization": "14.878s average response time",
-                "after_optimization": "0.531s average response time", 
-                "improvement_percentage": "96.4%",
-                "target_achieved": "✅ Well under 3s target"
+                "collecting_since": performance_metrics.started_at.isoformat(),
+                "total_requests": total_requests,
+                "worst_route_p95_ms": overall_p95,
+                "slowest_routes": routes[:5],
+                "slowest_queries": queries[:5],
+                "pool_wait": pool_wait,
+                "cache_hit_rate_percent": cache_stats['hit_rate_percent']
             }
         }
     except Exception as e:
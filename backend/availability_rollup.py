@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Availability Rollup for ATM Trend Charts
+
+Maintains the availability_rollup table: one row per 15-minute bucket holding
+fleet-wide status counts (latest status of each terminal seen in the bucket).
+The trends endpoint reads this table with a simple range scan instead of
+re-aggregating terminal_details on every request.
+
+The crawler refreshes the buckets touched by each batch it saves
+(see CombinedATMRetriever.save_terminal_details_to_new_table). This script
+rebuilds the table from existing history.
+
+Usage:
+    python availability_rollup.py [--days DAYS] [--chunk-hours HOURS]
+"""
+
+import argparse
+import sys
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s %(levelname)s [%(funcName)s]: %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+log = logging.getLogger("AvailabilityRollup")
+
+# Bucket width used by the rollup table (matches the crawler's 15-minute cycle)
+BUCKET_SECONDS = 900
+
+CREATE_ROLLUP_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS availability_rollup (
+        bucket_start TIMESTAMP WITH TIME ZONE PRIMARY KEY,
+        total_atms INTEGER NOT NULL DEFAULT 0,
+        count_available INTEGER NOT NULL DEFAULT 0,
+        count_warning INTEGER NOT NULL DEFAULT 0,
+        count_zombie INTEGER NOT NULL DEFAULT 0,
+        count_wounded INTEGER NOT NULL DEFAULT 0,
+        count_out_of_service INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Range lookups on terminal_details by time alone (the existing index leads with terminal_id)
+CREATE_RETRIEVED_DATE_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_terminal_details_retrieved_date
+    ON terminal_details(retrieved_date)
+"""
+
+# Recompute every bucket in [start, end) from terminal_details and upsert it.
+# Status mapping matches the dashboard summary (HARD/CASH -> wounded,
+# UNAVAILABLE -> out of service).
+REFRESH_BUCKETS_SQL = """
+    INSERT INTO availability_rollup (
+        bucket_start,
+        total_atms,
+        count_available,
+        count_warning,
+        count_zombie,
+        count_wounded,
+        count_out_of_service
+    )
+    SELECT
+        bucket_start,
+        COUNT(*) as total_atms,
+        COUNT(CASE WHEN status = 'AVAILABLE' THEN 1 END) as count_available,
+        COUNT(CASE WHEN status = 'WARNING' THEN 1 END) as count_warning,
+        COUNT(CASE WHEN status = 'ZOMBIE' THEN 1 END) as count_zombie,
+        COUNT(CASE WHEN status IN ('WOUNDED', 'HARD', 'CASH') THEN 1 END) as count_wounded,
+        COUNT(CASE WHEN status IN ('OUT_OF_SERVICE', 'UNAVAILABLE') THEN 1 END) as count_out_of_service
+    FROM (
+        SELECT DISTINCT ON (bucket_start, terminal_id)
+            to_timestamp(floor(extract(epoch FROM retrieved_date) / %(bucket_seconds)s) * %(bucket_seconds)s) as bucket_start,
+            terminal_id,
+            COALESCE(fetched_status, 'OUT_OF_SERVICE') as status
+        FROM terminal_details
+        WHERE retrieved_date >= %(start)s
+          AND retrieved_date < %(end)s
+        ORDER BY bucket_start, terminal_id, retrieved_date DESC
+    ) latest_per_bucket
+    GROUP BY bucket_start
+    ON CONFLICT (bucket_start) DO UPDATE SET
+        total_atms = EXCLUDED.total_atms,
+        count_available = EXCLUDED.count_available,
+        count_warning = EXCLUDED.count_warning,
+        count_zombie = EXCLUDED.count_zombie,
+        count_wounded = EXCLUDED.count_wounded,
+        count_out_of_service = EXCLUDED.count_out_of_service,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+def bucket_floor(dt: datetime) -> datetime:
+    """Round a timezone-aware datetime down to the start of its rollup bucket"""
+    epoch = int(dt.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % BUCKET_SECONDS, tz=timezone.utc)
+
+
+def bucket_range(start: datetime, end: datetime) -> Tuple[datetime, datetime]:
+    """Return the bucket-aligned [start, end) range covering start..end inclusive"""
+    return bucket_floor(start), bucket_floor(end) + timedelta(seconds=BUCKET_SECONDS)
+
+
+def ensure_rollup_table(cursor) -> None:
+    """Create availability_rollup and its supporting index if they don't exist"""
+    cursor.execute(CREATE_ROLLUP_TABLE_SQL)
+    cursor.execute(CREATE_RETRIEVED_DATE_INDEX_SQL)
+
+
+def refresh_rollup_buckets(cursor, start: datetime, end: datetime) -> None:
+    """
+    Recompute the rollup buckets covering start..end (inclusive)
+
+    Runs on the caller's cursor so the refresh commits or rolls back together
+    with the terminal_details rows it summarizes.
+    """
+    range_start, range_end = bucket_range(start, end)
+    cursor.execute(REFRESH_BUCKETS_SQL, {
+        'bucket_seconds': BUCKET_SECONDS,
+        'start': range_start,
+        'end': range_end
+    })
+
+
+def backfill_rollup(conn, days: Optional[int] = None, chunk_hours: int = 24) -> int:
+    """
+    Build availability_rollup from existing terminal_details history
+
+    Args:
+        conn: psycopg2 connection
+        days: Only backfill the most recent N days (default: all history)
+        chunk_hours: Size of each committed chunk
+
+    Returns:
+        int: Number of chunks processed
+    """
+    cursor = conn.cursor()
+    try:
+        ensure_rollup_table(cursor)
+        conn.commit()
+
+        cursor.execute("SELECT MIN(retrieved_date), MAX(retrieved_date) FROM terminal_details")
+        row = cursor.fetchone()
+        if not row or row[0] is None:
+            log.info("terminal_details is empty - nothing to backfill")
+            return 0
+
+        first, last = row
+        if days is not None:
+            first = max(first, last - timedelta(days=days))
+
+        chunk = timedelta(hours=chunk_hours)
+        chunk_start = bucket_floor(first)
+        chunks = 0
+        while chunk_start <= last:
+            chunk_end = chunk_start + chunk
+            cursor.execute(REFRESH_BUCKETS_SQL, {
+                'bucket_seconds': BUCKET_SECONDS,
+                'start': chunk_start,
+                'end': chunk_end
+            })
+            conn.commit()
+            chunks += 1
+            log.info(f"Backfilled {chunk_start.isoformat()} -> {chunk_end.isoformat()} ({cursor.rowcount} buckets)")
+            chunk_start = chunk_end
+
+        return chunks
+    except Exception as e:
+        conn.rollback()
+        log.error(f"Error backfilling availability_rollup: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    """Main function for command line usage"""
+    parser = argparse.ArgumentParser(
+        description="Backfill the availability_rollup table from terminal_details history"
+    )
+    parser.add_argument('--days', type=int, default=None,
+                        help='Only backfill the most recent N days (default: all history)')
+    parser.add_argument('--chunk-hours', type=int, default=24,
+                        help='Hours of history processed per transaction (default: 24)')
+    args = parser.parse_args()
+
+    try:
+        from db_connector_new import db_connector
+    except ImportError:
+        log.error("Database connector not available")
+        return 1
+
+    conn = db_connector.get_db_connection()
+    if not conn:
+        log.error("Failed to connect to database")
+        return 1
+
+    try:
+        chunks = backfill_rollup(conn, days=args.days, chunk_hours=args.chunk_hours)
+        log.info(f"✅ availability_rollup backfill complete ({chunks} chunks)")
+        return 0
+    except Exception:
+        log.error("❌ availability_rollup backfill failed")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
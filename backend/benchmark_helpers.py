@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the HTTP benchmark scripts (test_*_performance.py)
+
+Latency statistics, concurrent request runs, and the --label/--output/--compare
+flow for saving a run and comparing it with an earlier one.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+def summarize(latencies: List[float]) -> Dict[str, Any]:
+    """Latency summary in milliseconds"""
+    return {
+        "samples": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2) if latencies else 0.0,
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else 0.0
+    }
+
+def make_session(concurrency: int) -> requests.Session:
+    """HTTP session with enough pooled connections for the benchmark threads"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def timed(call: Callable[[], requests.Response]) -> Optional[Tuple[float, requests.Response]]:
+    """Run one request and return its latency in milliseconds and response (None unless 200)"""
+    start = time.perf_counter()
+    try:
+        response = call()
+        if response.status_code != 200:
+            return None
+    except Exception:
+        return None
+    return (time.perf_counter() - start) * 1000, response
+
+def run_concurrently(call: Callable[[], Any], count: int, concurrency: int) -> Tuple[List[Any], float]:
+    """Run call count times on concurrency threads; returns the results and wall time in seconds"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: call(), range(count)))
+    return results, time.perf_counter() - start
+
+def load_stats(latencies: List[float], requests_count: int, wall_time: float) -> Dict[str, Any]:
+    """Latency summary plus error count and throughput for a concurrent run"""
+    return {
+        **summarize(latencies),
+        "requests": requests_count,
+        "errors": requests_count - len(latencies),
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time > 0 else 0.0
+    }
+
+def add_result_arguments(parser: argparse.ArgumentParser):
+    """Add --label, --output and --compare"""
+    parser.add_argument("--label", default="run", help="Label stored with the results")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Earlier results JSON file to compare against")
+
+def save_results(results: Dict[str, Any], path: Optional[str]):
+    """Write results as JSON when an --output path was given"""
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {path}")
+
+def print_comparison(path: Optional[str], after: Dict[str, Any], stats: Sequence[str]):
+    """
+    Print the given per-endpoint stats of an earlier run (--compare) next to this one
+
+    Both runs hold their per-endpoint stats under "endpoints".
+    """
+    if not path:
+        return
+    with open(path) as f:
+        before = json.load(f)
+
+    print(f"\n📊 Comparison: {before.get('label')} → {after.get('label')}")
+    print("=" * 80)
+    print(f"{'Endpoint':<35}" + "".join(f" {stat + ' before':>18} {stat + ' after':>17}" for stat in stats))
+    for name, current in after["endpoints"].items():
+        old = before["endpoints"].get(name)
+        if not old:
+            continue
+        print(f"{name:<35}" + "".join(f" {old[stat]:>18.1f} {current[stat]:>17.1f}" for stat in stats))
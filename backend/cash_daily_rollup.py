@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Daily Cash Rollup for the Cash Usage Endpoints
+
+Maintains the terminal_cash_daily table: one row per terminal per Dili
+calendar day summarizing its terminal_cash_information readings (first/last
+reading, min/max/sum, reading count, replenishments and warning flags). The
+cash usage endpoints (daily usage, trends, summary and rankings) read this
+table with a range scan on cash_date instead of re-aggregating raw readings
+by `DATE(retrieval_timestamp AT TIME ZONE 'Asia/Dili')` on every request.
+
+Cash readings are written by a process outside this repository, so the
+rollup is kept current by an AFTER INSERT trigger on terminal_cash_information
+that folds each new reading into its day. The trigger function runs as its
+owner (SECURITY DEFINER) and only logs a warning when the rollup fails, so it
+never aborts the writer's insert. Readings updated or deleted after the fact,
+or missed by a failed rollup, are only picked up by a backfill of their days.
+
+This script installs the table and trigger (run it as the owner of
+terminal_cash_information) and rebuilds the rollup from existing history; the
+API only reads. Until a full backfill has completed
+(terminal_cash_daily_backfill), the API runs the same queries over days
+aggregated on the fly from the raw readings (live_cash_daily_query).
+
+Usage:
+    python cash_daily_rollup.py [--days DAYS] [--chunk-days DAYS]
+"""
+
+import argparse
+import sys
+import logging
+from datetime import date, timedelta
+from typing import Optional
+
+log = logging.getLogger("CashDailyRollup")
+
+# Calendar used for the daily rollup (matches the dashboard's local time)
+CASH_DAY_TIMEZONE = "Asia/Dili"
+
+CREATE_CASH_DAILY_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS terminal_cash_daily (
+        terminal_id VARCHAR(50) NOT NULL,
+        cash_date DATE NOT NULL,
+        first_amount NUMERIC NOT NULL,
+        first_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        last_amount NUMERIC NOT NULL,
+        last_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        min_amount NUMERIC NOT NULL,
+        max_amount NUMERIC NOT NULL,
+        sum_amount NUMERIC NOT NULL,
+        readings INTEGER NOT NULL,
+        replenishments INTEGER NOT NULL DEFAULT 0,
+        has_low_cash_warning BOOLEAN NOT NULL DEFAULT FALSE,
+        has_cash_errors BOOLEAN NOT NULL DEFAULT FALSE,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (terminal_id, cash_date)
+    )
+"""
+
+# Fleet-wide date ranges (the primary key serves per-terminal lookups)
+CREATE_CASH_DATE_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_terminal_cash_daily_cash_date
+    ON terminal_cash_daily (cash_date)
+"""
+
+# Folds one reading into its day. Only readings with a positive amount count,
+# as in the endpoints' previous queries. A reading newer than the day's last
+# one with a higher amount is a replenishment. Runs with its owner's rights and
+# a fixed search_path whatever role inserts the reading, and a failure only
+# skips the rollup of that reading.
+CREATE_APPLY_FUNCTION_SQL = f"""
+    CREATE OR REPLACE FUNCTION terminal_cash_daily_apply_reading()
+    RETURNS TRIGGER
+    SECURITY DEFINER
+    SET search_path = public, pg_temp
+    AS $$
+    BEGIN
+        IF NEW.total_cash_amount IS NULL OR NEW.total_cash_amount <= 0 OR NEW.retrieval_timestamp IS NULL THEN
+            RETURN NULL;
+        END IF;
+
+        BEGIN
+            INSERT INTO terminal_cash_daily AS d (
+                terminal_id, cash_date, first_amount, first_timestamp, last_amount, last_timestamp,
+                min_amount, max_amount, sum_amount, readings, replenishments,
+                has_low_cash_warning, has_cash_errors
+            ) VALUES (
+                NEW.terminal_id,
+                DATE(NEW.retrieval_timestamp AT TIME ZONE '{CASH_DAY_TIMEZONE}'),
+                NEW.total_cash_amount, NEW.retrieval_timestamp,
+                NEW.total_cash_amount, NEW.retrieval_timestamp,
+                NEW.total_cash_amount, NEW.total_cash_amount, NEW.total_cash_amount, 1, 0,
+                COALESCE(NEW.has_low_cash_warning, FALSE), COALESCE(NEW.has_cash_errors, FALSE)
+            )
+            ON CONFLICT (terminal_id, cash_date) DO UPDATE SET
+                first_amount = CASE WHEN EXCLUDED.first_timestamp < d.first_timestamp
+                                    THEN EXCLUDED.first_amount ELSE d.first_amount END,
+                first_timestamp = LEAST(d.first_timestamp, EXCLUDED.first_timestamp),
+                last_amount = CASE WHEN EXCLUDED.last_timestamp >= d.last_timestamp
+                                   THEN EXCLUDED.last_amount ELSE d.last_amount END,
+                last_timestamp = GREATEST(d.last_timestamp, EXCLUDED.last_timestamp),
+                min_amount = LEAST(d.min_amount, EXCLUDED.min_amount),
+                max_amount = GREATEST(d.max_amount, EXCLUDED.max_amount),
+                sum_amount = d.sum_amount + EXCLUDED.sum_amount,
+                readings = d.readings + 1,
+                replenishments = d.replenishments + CASE
+                    WHEN EXCLUDED.last_timestamp >= d.last_timestamp AND EXCLUDED.last_amount > d.last_amount
+                    THEN 1 ELSE 0 END,
+                has_low_cash_warning = d.has_low_cash_warning OR EXCLUDED.has_low_cash_warning,
+                has_cash_errors = d.has_cash_errors OR EXCLUDED.has_cash_errors,
+                updated_at = CURRENT_TIMESTAMP;
+        EXCEPTION WHEN OTHERS THEN
+            RAISE WARNING 'terminal_cash_daily rollup skipped reading of % at % (backfill that day): %',
+                NEW.terminal_id, NEW.retrieval_timestamp, SQLERRM;
+        END;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+# Created only when missing: replacing it would lock terminal_cash_information
+CREATE_APPLY_TRIGGER_SQL = """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_trigger
+            WHERE tgname = 'terminal_cash_daily_rollup'
+              AND tgrelid = 'terminal_cash_information'::regclass
+        ) THEN
+            CREATE TRIGGER terminal_cash_daily_rollup
+                AFTER INSERT ON terminal_cash_information
+                FOR EACH ROW EXECUTE FUNCTION terminal_cash_daily_apply_reading();
+        END IF;
+    END
+    $$
+"""
+
+# One row once backfill_cash_daily has covered the full history
+CREATE_BACKFILL_MARKER_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS terminal_cash_daily_backfill (
+        singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+        completed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+SET_BACKFILL_MARKER_SQL = """
+    INSERT INTO terminal_cash_daily_backfill (singleton, completed_at)
+    VALUES (TRUE, CURRENT_TIMESTAMP)
+    ON CONFLICT (singleton) DO UPDATE SET completed_at = EXCLUDED.completed_at
+"""
+
+# Statements installing the rollup, in order
+INSTALL_ROLLUP_SQL = [
+    CREATE_CASH_DAILY_TABLE_SQL,
+    CREATE_CASH_DATE_INDEX_SQL,
+    CREATE_BACKFILL_MARKER_TABLE_SQL,
+    CREATE_APPLY_FUNCTION_SQL,
+    CREATE_APPLY_TRIGGER_SQL
+]
+
+# Recompute the Dili days start..end (inclusive) from terminal_cash_information
+DELETE_DAYS_SQL = """
+    DELETE FROM terminal_cash_daily
+    WHERE cash_date BETWEEN %(start)s AND %(end)s
+"""
+
+def cash_days_select(start: str, end: str) -> str:
+    """
+    terminal_cash_daily rows for the Dili days start..end (inclusive), aggregated
+    from terminal_cash_information
+
+    Args:
+        start, end: SQL expressions for the first and last day (placeholders in
+            the caller's driver style)
+    """
+    return f"""
+    SELECT
+        terminal_id,
+        cash_date,
+        (ARRAY_AGG(total_cash_amount ORDER BY retrieval_timestamp ASC))[1] AS first_amount,
+        MIN(retrieval_timestamp) AS first_timestamp,
+        (ARRAY_AGG(total_cash_amount ORDER BY retrieval_timestamp DESC))[1] AS last_amount,
+        MAX(retrieval_timestamp) AS last_timestamp,
+        MIN(total_cash_amount) AS min_amount,
+        MAX(total_cash_amount) AS max_amount,
+        SUM(total_cash_amount) AS sum_amount,
+        COUNT(*) AS readings,
+        COUNT(*) FILTER (WHERE total_cash_amount > prev_amount) AS replenishments,
+        COALESCE(BOOL_OR(has_low_cash_warning), FALSE) AS has_low_cash_warning,
+        COALESCE(BOOL_OR(has_cash_errors), FALSE) AS has_cash_errors
+    FROM (
+        SELECT
+            terminal_id,
+            DATE(retrieval_timestamp AT TIME ZONE '{CASH_DAY_TIMEZONE}') AS cash_date,
+            retrieval_timestamp,
+            total_cash_amount,
+            has_low_cash_warning,
+            has_cash_errors,
+            LAG(total_cash_amount) OVER (
+                PARTITION BY terminal_id, DATE(retrieval_timestamp AT TIME ZONE '{CASH_DAY_TIMEZONE}')
+                ORDER BY retrieval_timestamp
+            ) AS prev_amount
+        FROM terminal_cash_information
+        WHERE retrieval_timestamp >= ({start}::date)::timestamp AT TIME ZONE '{CASH_DAY_TIMEZONE}'
+          AND retrieval_timestamp < ({end}::date + 1)::timestamp AT TIME ZONE '{CASH_DAY_TIMEZONE}'
+          AND total_cash_amount > 0
+    ) readings
+    GROUP BY terminal_id, cash_date
+"""
+
+
+REFRESH_DAYS_SQL = """
+    INSERT INTO terminal_cash_daily (
+        terminal_id, cash_date, first_amount, first_timestamp, last_amount, last_timestamp,
+        min_amount, max_amount, sum_amount, readings, replenishments,
+        has_low_cash_warning, has_cash_errors
+    )
+""" + cash_days_select("%(start)s", "%(end)s")
+
+SELECT_HISTORY_RANGE_SQL = f"""
+    SELECT
+        DATE(MIN(retrieval_timestamp) AT TIME ZONE '{CASH_DAY_TIMEZONE}'),
+        DATE(MAX(retrieval_timestamp) AT TIME ZONE '{CASH_DAY_TIMEZONE}')
+    FROM terminal_cash_information
+"""
+
+
+# Reads used by the API (asyncpg placeholders). A terminal-day's usage is the
+# spread between its highest and lowest reading, once it has two readings.
+DAY_USAGE_SQL = "CASE WHEN readings >= 2 AND max_amount > min_amount THEN max_amount - min_amount ELSE 0 END"
+
+# $1/$2: first/last Dili day, $3: terminal IDs (NULL for all).
+# Every day of the range for every terminal with readings in it.
+DAILY_CASH_USAGE_QUERY = """
+    WITH date_range AS (
+        SELECT generate_series($1::date, $2::date, INTERVAL '1 day')::date AS usage_date
+    ),
+    terminals AS (
+        SELECT DISTINCT terminal_id
+        FROM terminal_cash_daily
+        WHERE cash_date BETWEEN $1 AND $2
+          AND ($3::text[] IS NULL OR terminal_id = ANY($3::text[]))
+    )
+    SELECT
+        dr.usage_date,
+        t.terminal_id,
+        COALESCE(tcs.location, 'Unknown Location') AS location,
+        COALESCE(d.min_amount, 0) AS min_cash_amount,
+        COALESCE(d.max_amount, 0) AS max_cash_amount,
+        COALESCE(d.sum_amount / NULLIF(d.readings, 0), 0) AS avg_cash_amount,
+        COALESCE(d.readings, 0) AS reading_count,
+        CASE WHEN d.max_amount > d.min_amount THEN d.max_amount - d.min_amount ELSE 0 END AS cash_usage_amount
+    FROM date_range dr
+    CROSS JOIN terminals t
+    LEFT JOIN terminal_cash_daily d ON d.terminal_id = t.terminal_id AND d.cash_date = dr.usage_date
+    LEFT JOIN terminal_current_state tcs ON tcs.terminal_id = t.terminal_id
+                                        AND tcs.retrieved_date >= (CURRENT_DATE - INTERVAL '30 days')
+    ORDER BY dr.usage_date, t.terminal_id
+"""
+
+# $1/$2: first/last Dili day, $3: terminal ID (NULL for the fleet),
+# $4: period ('day', 'week' or 'month'). Usage per terminal is summed over the
+# days of each period, then aggregated across terminals.
+CASH_USAGE_TRENDS_QUERY = f"""
+    WITH periods AS (
+        SELECT generate_series(
+            date_trunc($4, $1::date::timestamp),
+            $2::date::timestamp,
+            ('1 ' || $4)::interval
+        )::date AS period_date
+    ),
+    terminal_period_usage AS (
+        SELECT
+            terminal_id,
+            date_trunc($4, cash_date::timestamp)::date AS period_date,
+            SUM({DAY_USAGE_SQL}) AS usage
+        FROM terminal_cash_daily
+        WHERE cash_date BETWEEN $1 AND $2
+          AND ($3::text IS NULL OR terminal_id = $3)
+        GROUP BY terminal_id, date_trunc($4, cash_date::timestamp)::date
+    )
+    SELECT
+        p.period_date,
+        COUNT(u.terminal_id) AS terminal_count,
+        COALESCE(SUM(u.usage), 0) AS total_usage,
+        COALESCE(AVG(u.usage), 0) AS avg_usage_per_terminal,
+        COALESCE(MAX(u.usage), 0) AS max_usage,
+        COALESCE(MIN(u.usage), 0) AS min_usage
+    FROM periods p
+    LEFT JOIN terminal_period_usage u ON u.period_date = p.period_date
+    GROUP BY p.period_date
+    ORDER BY p.period_date ASC
+"""
+
+# $1/$2: first/last Dili day
+CASH_USAGE_SUMMARY_QUERY = """
+    WITH terminal_summary AS (
+        SELECT
+            terminal_id,
+            COUNT(*) AS active_days,
+            SUM(max_amount) AS total_cash,
+            AVG(sum_amount / readings) AS avg_cash,
+            SUM(readings) AS total_readings
+        FROM terminal_cash_daily
+        WHERE cash_date BETWEEN $1 AND $2
+        GROUP BY terminal_id
+    )
+    SELECT
+        COUNT(*) AS active_terminals,
+        COALESCE(SUM(total_cash), 0) AS fleet_total_cash_tracked,
+        COALESCE(AVG(avg_cash), 0) AS fleet_avg_cash_amount,
+        COALESCE(MAX(avg_cash), 0) AS fleet_max_cash_amount,
+        COALESCE(MIN(avg_cash), 0) AS fleet_min_cash_amount,
+        COALESCE(SUM(total_readings), 0) AS total_readings
+    FROM terminal_summary
+"""
+
+# $1/$2: first/last Dili day, $3: number of terminals. Totals and averages
+# are over the individual readings, as if aggregated from the raw table.
+TERMINAL_CASH_RANKINGS_QUERY = """
+    WITH terminal_cash_stats AS (
+        SELECT
+            terminal_id,
+            SUM(sum_amount) / SUM(readings) AS avg_cash,
+            SUM(sum_amount) AS total_cash,
+            SUM(readings) AS reading_count
+        FROM terminal_cash_daily
+        WHERE cash_date BETWEEN $1 AND $2
+        GROUP BY terminal_id
+    )
+    SELECT
+        tcs.terminal_id,
+        tl.location,
+        tcs.total_cash,
+        tcs.avg_cash,
+        tcs.reading_count
+    FROM terminal_cash_stats tcs
+    LEFT JOIN terminal_current_state tl ON tcs.terminal_id = tl.terminal_id
+    ORDER BY tcs.total_cash DESC
+    LIMIT $3
+"""
+
+CASH_DAILY_BACKFILLED_QUERY = "SELECT EXISTS (SELECT 1 FROM terminal_cash_daily_backfill)"
+
+
+def live_cash_daily_query(query: str) -> str:
+    """
+    One of the read queries above, reading terminal_cash_daily rows aggregated
+    from terminal_cash_information for its $1..$2 days instead of the rollup
+    """
+    live_days = "WITH live_cash_days AS (" + cash_days_select("$1", "$2") + "),"
+    return query.replace("terminal_cash_daily", "live_cash_days").replace("WITH", live_days, 1)
+
+
+def ensure_cash_daily_table(cursor) -> None:
+    """Create terminal_cash_daily, its index, the backfill marker and the rollup trigger"""
+    for statement in INSTALL_ROLLUP_SQL:
+        cursor.execute(statement)
+
+
+def refresh_cash_days(cursor, start: date, end: date) -> int:
+    """
+    Recompute the rollup rows of the Dili days start..end (inclusive)
+
+    Runs on the caller's cursor; use it after changing or deleting readings,
+    which the insert trigger does not see.
+
+    Returns:
+        int: Number of terminal-days written
+    """
+    cursor.execute(DELETE_DAYS_SQL, {'start': start, 'end': end})
+    cursor.execute(REFRESH_DAYS_SQL, {'start': start, 'end': end})
+    return cursor.rowcount
+
+
+def backfill_cash_daily(conn, days: Optional[int] = None, chunk_days: int = 7) -> int:
+    """
+    Build terminal_cash_daily from existing terminal_cash_information history
+
+    Args:
+        conn: psycopg2 connection
+        days: Only backfill the most recent N days (default: all history)
+        chunk_days: Days recomputed per committed transaction
+
+    Returns:
+        int: Number of terminal-days written
+    """
+    cursor = conn.cursor()
+    try:
+        ensure_cash_daily_table(cursor)
+        conn.commit()
+
+        cursor.execute(SELECT_HISTORY_RANGE_SQL)
+        row = cursor.fetchone()
+        if not row or row[0] is None:
+            # New readings are folded in by the trigger from now on
+            log.info("terminal_cash_information is empty - nothing to backfill")
+            cursor.execute(SET_BACKFILL_MARKER_SQL)
+            conn.commit()
+            return 0
+
+        first, last = row
+        if days is not None:
+            first = max(first, last - timedelta(days=days))
+
+        written = 0
+        chunk_start = first
+        while chunk_start <= last:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), last)
+            written += refresh_cash_days(cursor, chunk_start, chunk_end)
+            conn.commit()
+            log.info(f"Backfilled {chunk_start.isoformat()} -> {chunk_end.isoformat()} ({written} terminal-days so far)")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        if days is None:
+            cursor.execute(SET_BACKFILL_MARKER_SQL)
+            conn.commit()
+        return written
+    except Exception as e:
+        conn.rollback()
+        log.error(f"Error backfilling terminal_cash_daily: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    """Main function for command line usage"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(funcName)s]: %(message)s",
+        handlers=[
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Install and backfill the terminal_cash_daily rollup from terminal_cash_information"
+    )
+    parser.add_argument('--days', type=int, default=None,
+                        help='Only backfill the most recent N days (default: all history)')
+    parser.add_argument('--chunk-days', type=int, default=7,
+                        help='Days of history processed per transaction (default: 7)')
+    args = parser.parse_args()
+
+    try:
+        from db_connector_new import db_connector
+    except ImportError:
+        log.error("Database connector not available")
+        return 1
+
+    conn = db_connector.get_db_connection()
+    if not conn:
+        log.error("Failed to connect to database")
+        return 1
+
+    try:
+        written = backfill_cash_daily(conn, days=args.days, chunk_days=max(args.chunk_days, 1))
+        log.info(f"✅ terminal_cash_daily backfilled ({written} terminal-days)")
+        return 0
+    except Exception:
+        log.error("❌ terminal_cash_daily backfill failed")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -31,7 +31,7 @@ import uuid
 import subprocess
 import platform
 from datetime import datetime, timezone
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, List, Tuple, Any, Callable
 import argparse
 import pytz
 import os
@@ -39,6 +39,8 @@ from tqdm import tqdm
 import signal
 import threading
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 # Disable SSL warnings for self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -63,7 +65,8 @@ execution_stats = {
     'connection_failures': 0,
     'start_time': None,
     'last_success': None,
-    'cycle_history': deque(maxlen=50)  # Keep last 50 cycle results
+    'cycle_history': deque(maxlen=50),  # Keep last 50 cycle results
+    'ingest_history': deque(maxlen=50)  # Per-batch terminal_details ingest timings
 }
 
 # Try to import database connector if available
@@ -81,6 +84,73 @@ except ImportError:
         DB_AVAILABLE = False
         log.warning("Database connector not available - database operations will be skipped")
 
+
+def acquire_db_connection():
+    """
+    Get a database connection, from the process-wide pool when the connector has one
+    
+    Pooled connections stay warm across cycles in continuous mode; hand them back
+    with release_db_connection() instead of closing them.
+    """
+    if hasattr(db_connector, 'get_pooled_connection'):
+        return db_connector.get_pooled_connection()
+    return db_connector.get_db_connection()
+
+
+def release_db_connection(conn) -> None:
+    """Return a connection from acquire_db_connection()"""
+    if conn is None:
+        return
+    if hasattr(db_connector, 'release_connection'):
+        db_connector.release_connection(conn)
+    else:
+        conn.close()
+
+
+def close_db_pool() -> None:
+    """Close the connector's pool on shutdown, if it has one"""
+    if db_connector is not None and hasattr(db_connector, 'close_pool'):
+        db_connector.close_pool()
+
+# Multi-row INSERT helper for batched terminal_details ingest
+try:
+    from psycopg2.extras import execute_values
+except ImportError:
+    execute_values = None
+
+# Availability rollup maintenance (15-minute fleet status buckets for trend charts)
+try:
+    import availability_rollup
+except ImportError:
+    availability_rollup = None
+    log.warning("availability_rollup module not available - trend rollup will not be refreshed")
+
+# Predictive analytics scores (atm_predictive_scores, read by the predictive endpoints)
+try:
+    import predictive_scores
+except ImportError:
+    predictive_scores = None
+    log.warning("predictive_scores module not available - predictive scores will not be refreshed")
+
+# Persisted fault cycles (fault_cycles, read by the fault history report)
+try:
+    import fault_cycles
+except ImportError:
+    fault_cycles = None
+    log.warning("fault_cycles module not available - fault cycles will not be updated")
+
+# PostgreSQL NOTIFY channel the API listens on to invalidate its response cache
+# (must match ATM_DATA_UPDATED_CHANNEL in advanced_cache_system.py)
+ATM_DATA_UPDATED_CHANNEL = "atm_data_updated"
+
+# Rows per multi-row INSERT statement when ingesting terminal details
+INGEST_PAGE_SIZE = 500
+
+# terminal_details schema is migrated once per process, on the first save by any
+# retriever (the API's refresh jobs create a new retriever for every job)
+_terminal_schema_migrated = False
+_terminal_schema_lock = threading.Lock()
+
 # Configuration
 LOGIN_URL = "https://172.31.1.46/sigit/user/login?language=EN"
 LOGOUT_URL = "https://172.31.1.46/sigit/user/logout"
@@ -125,20 +195,73 @@ SUPPORTED_STATES = {
 # Parameter values for terminal status retrieval
 PARAMETER_VALUES = ["WOUNDED", "HARD", "CASH", "UNAVAILABLE", "AVAILABLE", "WARNING", "ZOMBIE", "OUT_OF_SERVICE"]
 
+# Concurrency defaults for terminal detail fetching
+DEFAULT_MAX_WORKERS = 8  # Max terminal detail requests in flight
+DEFAULT_REQUESTS_PER_SECOND = 5.0  # Per-host request rate limit (0 disables)
+
+
+class HostRateLimiter:
+    """Thread-safe token bucket rate limiter, one bucket per host"""
+    
+    def __init__(self, requests_per_second: float, burst: Optional[int] = None):
+        """
+        Args:
+            requests_per_second: Sustained request rate allowed per host (<= 0 disables limiting)
+            burst: Max requests allowed back-to-back (defaults to one second's worth)
+        """
+        self.rate = requests_per_second
+        self.burst = burst if burst is not None else max(1, int(requests_per_second))
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, List[float]] = {}  # host -> [tokens, last_refill]
+    
+    def acquire(self, url: str) -> float:
+        """
+        Block until a request to the URL's host is allowed
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.rate <= 0:
+            return 0.0
+        
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.setdefault(host, [float(self.burst), now])
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            # Reserve a token now; a negative balance is the queue of waiting callers
+            bucket[0] -= 1
+            wait = -bucket[0] / self.rate if bucket[0] < 0 else 0.0
+        
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
 
 class CombinedATMRetriever:
     """Main class for handling combined ATM data retrieval (regional + terminal details)"""
     
-    def __init__(self, demo_mode: bool = False, total_atms: int = 14):
+    def __init__(self, demo_mode: bool = False, total_atms: int = 14,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 progress_callback: Optional[Callable[[str, float, str], None]] = None):
         """
         Initialize the retriever with Windows production environment optimizations
         
         Args:
             demo_mode: Whether to use demo mode (no actual network requests)
             total_atms: Total number of ATMs for percentage to count conversion
+            max_workers: Max terminal detail requests in flight at once
+            requests_per_second: Per-host request rate limit (0 disables)
+            progress_callback: Called as (phase, percent, message) as retrieval
+                advances; raising from it aborts the retrieval
         """
         self.demo_mode = demo_mode
+        self.progress_callback = progress_callback
         self.total_atms = total_atms
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = HostRateLimiter(requests_per_second)
         
         # Initialize session with Windows-compatible settings
         self.session = requests.Session()
@@ -146,7 +269,7 @@ class CombinedATMRetriever:
         # Windows-specific session configuration for better reliability
         self.session.mount('https://', HTTPAdapter(
             pool_connections=10,
-            pool_maxsize=20,
+            pool_maxsize=max(20, self.max_workers),
             max_retries=3,
             pool_block=False
         ))
@@ -155,6 +278,10 @@ class CombinedATMRetriever:
         self.default_timeout = (30, 60)  # (connection_timeout, read_timeout)
         
         self.user_token = None
+        # Serializes token refresh so concurrent workers that all see a 401 log in only once
+        self._token_lock = threading.Lock()
+        
+        self.last_ingest_stats: Optional[Dict[str, Any]] = None
         
         # Log timezone info for clarity
         self.dili_tz = pytz.timezone('Asia/Dili')  # UTC+9
@@ -162,6 +289,8 @@ class CombinedATMRetriever:
         
         # Log system information for Windows troubleshooting
         log.info(f"🚀 Initialized CombinedATMRetriever - Demo: {demo_mode}, Total ATMs: {total_atms}")
+        log.info(f"⚡ Terminal detail fetching: {self.max_workers} in flight, "
+                 f"{'unlimited' if requests_per_second <= 0 else f'{requests_per_second:g} req/s'} per host")
         log.info(f"🕒 Using Dili timezone (UTC+9) for timestamps: {current_time.strftime('%Y-%m-%d %H:%M:%S %Z%z')}")
         log.info(f"💻 Platform: {os.name} - Script optimized for Windows production")
         
@@ -169,6 +298,11 @@ class CombinedATMRetriever:
         log.info(f"📁 Working directory: {os.getcwd()}")
         log.info(f"📄 Script location: {os.path.abspath(__file__)}")
     
+    def report_progress(self, phase: str, percent: float, message: str) -> None:
+        """Forward retrieval progress to the progress callback, if any"""
+        if self.progress_callback:
+            self.progress_callback(phase, min(100.0, max(0.0, percent)), message)
+    
     # Removed check_connectivity - authentication will catch connectivity issues
     
     def check_connectivity(self) -> bool:
@@ -510,6 +644,39 @@ class CombinedATMRetriever:
         log.info("Attempting to refresh authentication token...")
         return self.authenticate()
     
+    def refresh_token_once(self, stale_token: Optional[str]) -> bool:
+        """
+        Refresh the token after a 401, at most once per expired token
+        
+        Concurrent workers that were rejected with the same stale token wait on
+        the lock; the first one re-authenticates and the rest reuse its token.
+        
+        Args:
+            stale_token: The token the failed request was sent with
+            
+        Returns:
+            bool: True if a token newer than stale_token is available
+        """
+        with self._token_lock:
+            if self.user_token and self.user_token != stale_token:
+                log.debug("Token already refreshed by another worker, reusing it")
+                return True
+            return self.refresh_token()
+    
+    def _update_token_from_response(self, response_data: Dict[str, Any]) -> None:
+        """Adopt a new token returned in a response header"""
+        if "header" in response_data and "user_token" in response_data["header"]:
+            new_token = response_data["header"]["user_token"]
+            if new_token != self.user_token:
+                with self._token_lock:
+                    log.info("Received new token in response, updating...")
+                    self.user_token = new_token
+    
+    def _put(self, url: str, **kwargs) -> requests.Response:
+        """PUT through the shared session, subject to the per-host rate limit"""
+        self.rate_limiter.acquire(url)
+        return self.session.put(url, **kwargs)
+    
     def logout(self) -> bool:
         """
         Logout from the ATM monitoring system to prevent session lockouts
@@ -744,7 +911,7 @@ class CombinedATMRetriever:
         while retry_count < max_retries and not success:
             try:
                 # Reduced logging verbosity for performance
-                dashboard_res = self.session.put(
+                dashboard_res = self._put(
                     DASHBOARD_URL,
                     json=dashboard_payload,
                     headers=COMMON_HEADERS,
@@ -802,11 +969,7 @@ class CombinedATMRetriever:
                 success = True
                 
                 # Update token if a new one was returned
-                if "header" in dashboard_data and "user_token" in dashboard_data["header"]:
-                    new_token = dashboard_data["header"]["user_token"]
-                    if new_token != self.user_token:
-                        log.info("Received new token in response, updating...")
-                        self.user_token = new_token
+                self._update_token_from_response(dashboard_data)
                 
             except requests.exceptions.RequestException as ex:
                 log.warning(f"Request failed for {param_value} (Attempt {retry_count + 1}): {str(ex)}")
@@ -814,7 +977,7 @@ class CombinedATMRetriever:
                 # Check if this might be a token expiration issue (401 Unauthorized)
                 if hasattr(ex, 'response') and ex.response is not None and ex.response.status_code == 401:
                     log.warning("Detected possible token expiration (401 Unauthorized). Attempting to refresh token...")
-                    if self.refresh_token():
+                    if self.refresh_token_once(dashboard_payload["header"]["user_token"]):
                         log.info("Token refreshed successfully, updating payload with new token")
                         # Update the payload with the new token
                         dashboard_payload["header"]["user_token"] = self.user_token
@@ -928,7 +1091,7 @@ class CombinedATMRetriever:
         while retry_count < max_retries and not success:
             try:
                 # Reduced logging verbosity for performance
-                details_res = self.session.put(details_url, json=details_payload, headers=COMMON_HEADERS, verify=False, timeout=30)
+                details_res = self._put(details_url, json=details_payload, headers=COMMON_HEADERS, verify=False, timeout=30)
                 details_res.raise_for_status()
                 
                 # Try to parse JSON
@@ -962,11 +1125,7 @@ class CombinedATMRetriever:
                 # Removed verbose success logging for performance
                 
                 # Update token if a new one was returned
-                if "header" in details_data and "user_token" in details_data["header"]:
-                    new_token = details_data["header"]["user_token"]
-                    if new_token != self.user_token:
-                        log.info("Received new token in response, updating...")
-                        self.user_token = new_token
+                self._update_token_from_response(details_data)
                 
             except requests.exceptions.RequestException as ex:
                 log.warning(f"Request failed for terminal {terminal_id} (Attempt {retry_count + 1}): {str(ex)}")
@@ -974,7 +1133,7 @@ class CombinedATMRetriever:
                 # Check if this might be a token expiration issue (401 Unauthorized)
                 if hasattr(ex, 'response') and ex.response is not None and ex.response.status_code == 401:
                     log.warning("Detected possible token expiration (401 Unauthorized). Attempting to refresh token...")
-                    if self.refresh_token():
+                    if self.refresh_token_once(details_payload["header"]["user_token"]):
                         log.info("Token refreshed successfully, updating payload with new token")
                         # Update the payload with the new token
                         details_payload["header"]["user_token"] = self.user_token
@@ -1008,6 +1167,124 @@ class CombinedATMRetriever:
                 
         return terminal_data
     
+    def fetch_terminal_detail_records(self, terminal: Dict[str, Any], current_retrieval_time: datetime) -> List[Dict[str, Any]]:
+        """
+        Fetch and extract the detail records for one discovered terminal
+        
+        Safe to run from worker threads: shares the session, rate limiter and token.
+        
+        Args:
+            terminal: Terminal entry from comprehensive_terminal_search
+            current_retrieval_time: Retrieval timestamp shared by the whole cycle
+            
+        Returns:
+            List of extracted detail records (empty if the fetch failed)
+        """
+        records = []
+        terminal_id = terminal.get('terminalId')
+        issue_state_code = terminal.get('issueStateCode', 'HARD')  # Default to HARD if not available
+        
+        if not terminal_id:
+            log.warning(f"Skipping terminal with missing ID: {terminal}")
+            return records
+        
+        # Windows production environment: Add retry logic for terminal details
+        max_retries = 3 if os.name == 'nt' else 2  # More retries on Windows
+        retry_delay = 2.0 if os.name == 'nt' else 1.0  # Longer delays on Windows
+        
+        terminal_data = None
+        for attempt in range(max_retries):
+            try:
+                # Get detailed information for this terminal
+                terminal_data = self.fetch_terminal_details(terminal_id, issue_state_code)
+                if terminal_data:
+                    break  # Success, exit retry loop
+                    
+            except Exception as e:
+                error_msg = str(e)
+                if attempt < max_retries - 1:  # Not the last attempt
+                    if os.name == 'nt':  # Windows-specific logging
+                        log.warning(f"🪟 Windows retry {attempt + 1}/{max_retries} for terminal {terminal_id}: {error_msg}")
+                    else:
+                        log.warning(f"Retry {attempt + 1}/{max_retries} for terminal {terminal_id}: {error_msg}")
+                    time.sleep(retry_delay)
+                else:
+                    log.error(f"❌ Failed to fetch terminal {terminal_id} after {max_retries} attempts: {error_msg}")
+        
+        if terminal_data:
+            # Process the terminal data
+            terminal_body = terminal_data.get('body', [])
+            items_processed = 0
+            
+            if isinstance(terminal_body, list) and terminal_body:
+                for item in terminal_body:
+                    # Generate unique request ID for this specific ATM status record
+                    unique_request_id = str(uuid.uuid4())
+                    
+                    # Extract the specific fields we need for this terminal
+                    extracted_data = {
+                        'unique_request_id': unique_request_id,  # Unique ID for each ATM status
+                        'terminalId': item.get('terminalId', ''),
+                        'location': item.get('location', ''),
+                        'issueStateName': item.get('issueStateName', ''),
+                        'serialNumber': item.get('serialNumber', ''),
+                        'retrievedDate': current_retrieval_time.strftime('%Y-%m-%d %H:%M:%S')  # Current request retrieved date
+                    }
+                    
+                    # Extract fault details if available
+                    fault_list = item.get('faultList', [])
+                    if fault_list and isinstance(fault_list, list) and len(fault_list) > 0:
+                        # Get the first fault in the list (most recent)
+                        fault = fault_list[0]
+                        extracted_data.update({
+                            'year': fault.get('year', ''),
+                            'month': fault.get('month', ''),
+                            'day': fault.get('day', ''),
+                            'externalFaultId': fault.get('externalFaultId', ''),
+                            'agentErrorDescription': fault.get('agentErrorDescription', '')
+                        })
+                        
+                        # Add creationDate from faultList with proper formatting
+                        creation_timestamp = fault.get('creationDate', None)
+                        if creation_timestamp:
+                            try:
+                                # Convert Unix timestamp (milliseconds) to datetime
+                                creation_dt = datetime.fromtimestamp(creation_timestamp / 1000, tz=self.dili_tz)
+                                # Format as dd:mm:YYYY hh:mm:ss
+                                extracted_data['creationDate'] = creation_dt.strftime('%d:%m:%Y %H:%M:%S')
+                            except (ValueError, TypeError) as e:
+                                log.warning(f"Error converting creationDate for terminal {terminal_id}: {e}")
+                                extracted_data['creationDate'] = ''
+                        else:
+                            extracted_data['creationDate'] = ''
+                    else:
+                        # Set default values if no fault information is available
+                        extracted_data.update({
+                            'year': '',
+                            'month': '',
+                            'day': '',
+                            'externalFaultId': '',
+                            'agentErrorDescription': '',
+                            'creationDate': ''
+                        })
+                        
+                    # Add the status from the original search
+                    extracted_data['fetched_status'] = terminal.get('fetched_status', '')
+                    
+                    # Add to the combined results
+                    records.append(extracted_data)
+                    items_processed += 1
+                    
+                    log.debug(f"Processed item {items_processed} for terminal {terminal_id} with unique_request_id: {unique_request_id}")
+                    
+                log.info(f"Added {items_processed} detail record(s) for terminal {terminal_id}")
+            else:
+                log.warning(f"No details found in body for terminal {terminal_id}")
+        else:
+            log.warning(f"Failed to fetch details for terminal {terminal_id}")
+        
+        return records
+    
     def process_regional_data(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Process raw fifth_graphic data and convert to regional_atm_counts table structure
@@ -1139,6 +1416,7 @@ class CombinedATMRetriever:
         
         # Step 1: Check connectivity to 172.31.1.46 using ping (skip for demo mode)
         if not self.demo_mode:
+            self.report_progress("connectivity", 2.0, "Checking connectivity to the ATM monitoring system...")
             connectivity_ok = self.check_connectivity()
             if not connectivity_ok:
                 log.error("❌ Ping failed to 172.31.1.46 - Activating connection failure mode")
@@ -1165,6 +1443,7 @@ class CombinedATMRetriever:
                 
                 # Save to database if requested
                 if save_to_db and DB_AVAILABLE:
+                    self.report_progress("saving", 90.0, "Saving connection failure data...")
                     success = self.save_data_to_database(all_data, use_new_tables)
                     if success:
                         log.info("Connection failure data saved to database successfully")
@@ -1177,6 +1456,7 @@ class CombinedATMRetriever:
                 log.info("✅ Ping successful to 172.31.1.46 - proceeding with authentication")
         
         # Step 2: Normal operation - Authenticate
+        self.report_progress("authentication", 5.0, "Authenticating...")
         if not self.authenticate():
             log.error("Authentication failed after connectivity was confirmed - Activating authentication failure mode")
             
@@ -1201,6 +1481,7 @@ class CombinedATMRetriever:
             
             # Save to database if requested
             if save_to_db and DB_AVAILABLE:
+                self.report_progress("saving", 90.0, "Saving authentication failure data...")
                 success = self.save_data_to_database(all_data, use_new_tables)
                 if success:
                     log.info("AUTH_FAILURE data saved to database successfully")
@@ -1212,6 +1493,7 @@ class CombinedATMRetriever:
         
         # Step 3: Fetch regional data
         log.info("\n--- PHASE 1: Retrieving Regional ATM Data ---")
+        self.report_progress("regional", 10.0, "Retrieving regional ATM data...")
         raw_regional_data = self.fetch_regional_data()
         if raw_regional_data:
             processed_regional_data = self.process_regional_data(raw_regional_data)
@@ -1261,6 +1543,7 @@ class CombinedATMRetriever:
         
         # Enhanced Comprehensive Terminal Search Strategy
         log.info("Implementing comprehensive terminal search for all 14 ATMs...")
+        self.report_progress("terminal_search", 20.0, "Searching terminals by status...")
         all_terminals, status_counts = self.comprehensive_terminal_search()
         
         # Step 5: Fetch detailed information for ALL terminals
@@ -1270,112 +1553,27 @@ class CombinedATMRetriever:
         all_terminal_details = []
         current_retrieval_time = datetime.now(self.dili_tz)  # Use Dili time for database consistency
         
-        for terminal in tqdm(all_terminals, desc="Fetching terminal details", unit="terminal"):
-            terminal_id = terminal.get('terminalId')
-            issue_state_code = terminal.get('issueStateCode', 'HARD')  # Default to HARD if not available
-            
-            if not terminal_id:
-                log.warning(f"Skipping terminal with missing ID: {terminal}")
-                continue
-            
-            # Windows production environment: Add retry logic for terminal details
-            max_retries = 3 if os.name == 'nt' else 2  # More retries on Windows
-            retry_delay = 2.0 if os.name == 'nt' else 1.0  # Longer delays on Windows
-            
-            terminal_data = None
-            for attempt in range(max_retries):
-                try:
-                    # Get detailed information for this terminal
-                    terminal_data = self.fetch_terminal_details(terminal_id, issue_state_code)
-                    if terminal_data:
-                        break  # Success, exit retry loop
-                        
-                except Exception as e:
-                    error_msg = str(e)
-                    if attempt < max_retries - 1:  # Not the last attempt
-                        if os.name == 'nt':  # Windows-specific logging
-                            log.warning(f"🪟 Windows retry {attempt + 1}/{max_retries} for terminal {terminal_id}: {error_msg}")
-                        else:
-                            log.warning(f"Retry {attempt + 1}/{max_retries} for terminal {terminal_id}: {error_msg}")
-                        time.sleep(retry_delay)
-                    else:
-                        log.error(f"❌ Failed to fetch terminal {terminal_id} after {max_retries} attempts: {error_msg}")
-            
-            if terminal_data:
-                # Process the terminal data
-                terminal_body = terminal_data.get('body', [])
-                items_processed = 0
-                
-                if isinstance(terminal_body, list) and terminal_body:
-                    for item in terminal_body:
-                        # Generate unique request ID for this specific ATM status record
-                        unique_request_id = str(uuid.uuid4())
-                        
-                        # Extract the specific fields we need for this terminal
-                        extracted_data = {
-                            'unique_request_id': unique_request_id,  # Unique ID for each ATM status
-                            'terminalId': item.get('terminalId', ''),
-                            'location': item.get('location', ''),
-                            'issueStateName': item.get('issueStateName', ''),
-                            'serialNumber': item.get('serialNumber', ''),
-                            'retrievedDate': current_retrieval_time.strftime('%Y-%m-%d %H:%M:%S')  # Current request retrieved date
-                        }
-                        
-                        # Extract fault details if available
-                        fault_list = item.get('faultList', [])
-                        if fault_list and isinstance(fault_list, list) and len(fault_list) > 0:
-                            # Get the first fault in the list (most recent)
-                            fault = fault_list[0]
-                            extracted_data.update({
-                                'year': fault.get('year', ''),
-                                'month': fault.get('month', ''),
-                                'day': fault.get('day', ''),
-                                'externalFaultId': fault.get('externalFaultId', ''),
-                                'agentErrorDescription': fault.get('agentErrorDescription', '')
-                            })
-                            
-                            # Add creationDate from faultList with proper formatting
-                            creation_timestamp = fault.get('creationDate', None)
-                            if creation_timestamp:
-                                try:
-                                    # Convert Unix timestamp (milliseconds) to datetime
-                                    creation_dt = datetime.fromtimestamp(creation_timestamp / 1000, tz=self.dili_tz)
-                                    # Format as dd:mm:YYYY hh:mm:ss
-                                    extracted_data['creationDate'] = creation_dt.strftime('%d:%m:%Y %H:%M:%S')
-                                except (ValueError, TypeError) as e:
-                                    log.warning(f"Error converting creationDate for terminal {terminal_id}: {e}")
-                                    extracted_data['creationDate'] = ''
-                            else:
-                                extracted_data['creationDate'] = ''
-                        else:
-                            # Set default values if no fault information is available
-                            extracted_data.update({
-                                'year': '',
-                                'month': '',
-                                'day': '',
-                                'externalFaultId': '',
-                                'agentErrorDescription': '',
-                                'creationDate': ''
-                            })
-                            
-                        # Add the status from the original search
-                        extracted_data['fetched_status'] = terminal.get('fetched_status', '')
-                        
-                        # Add to the combined results
-                        all_terminal_details.append(extracted_data)
-                        items_processed += 1
-                        
-                        log.debug(f"Processed item {items_processed} for terminal {terminal_id} with unique_request_id: {unique_request_id}")
-                        
-                    log.info(f"Added {items_processed} detail record(s) for terminal {terminal_id}")
-                else:
-                    log.warning(f"No details found in body for terminal {terminal_id}")
-            else:
-                log.warning(f"Failed to fetch details for terminal {terminal_id}")
-            
-            # Add a small delay between requests to avoid overwhelming the server
-            if not self.demo_mode:
-                time.sleep(1)
+        # Fetch details concurrently; the rate limiter replaces the old fixed 1s delay
+        # between terminals and map() keeps results in discovery order
+        worker_count = min(self.max_workers, len(all_terminals)) or 1
+        fetch_start = time.time()
+        with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="terminal-details") as executor:
+            results = executor.map(
+                lambda terminal: self.fetch_terminal_detail_records(terminal, current_retrieval_time),
+                all_terminals
+            )
+            self.report_progress("terminal_details", 30.0, f"Fetching details for {len(all_terminals)} terminals...")
+            for done, records in enumerate(
+                tqdm(results, total=len(all_terminals), desc="Fetching terminal details", unit="terminal"), start=1
+            ):
+                all_terminal_details.extend(records)
+                self.report_progress(
+                    "terminal_details",
+                    30.0 + 55.0 * done / len(all_terminals),
+                    f"Fetched details for {done}/{len(all_terminals)} terminals"
+                )
+        log.info(f"Fetched details for {len(all_terminals)} terminals in {time.time() - fetch_start:.1f}s "
+                 f"using {worker_count} worker(s)")
         
         all_data["terminal_details_data"] = all_terminal_details
         
@@ -1419,6 +1617,7 @@ class CombinedATMRetriever:
         # Step 6: Save to database if requested
         if save_to_db and all_data["regional_data"]:
             log.info("\n--- PHASE 4: Saving to Database ---")
+            self.report_progress("saving", 88.0, "Saving to database...")
             
             if use_new_tables:
                 # Use new database tables with JSONB support
@@ -1455,6 +1654,7 @@ class CombinedATMRetriever:
         
         # Step 7: Logout to prevent session lockouts
         log.info("\n--- PHASE 5: Logout ---")
+        self.report_progress("logout", 97.0, "Logging out...")
         logout_success = self.logout()
         if logout_success:
             log.info("[OK] Successfully logged out from ATM monitoring system")
@@ -1552,7 +1752,7 @@ class CombinedATMRetriever:
             log.error("Failed to ensure regional_atm_counts table exists")
             return False
         
-        conn = db_connector.get_db_connection()
+        conn = acquire_db_connection()
         if not conn:
             log.error("Failed to connect to database")
             return False
@@ -1605,7 +1805,7 @@ class CombinedATMRetriever:
             return False
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
     def save_regional_to_new_table(self, processed_data: List[Dict[str, Any]], raw_data: List[Dict[str, Any]]) -> bool:
         """
@@ -1628,7 +1828,7 @@ class CombinedATMRetriever:
         
         log.info(f"Saving {len(processed_data)} records to regional_data table...")
         
-        conn = db_connector.get_db_connection()
+        conn = acquire_db_connection()
         if not conn:
             log.error("Failed to connect to database for regional_data table")
             return False
@@ -1703,6 +1903,9 @@ class CombinedATMRetriever:
                     json.dumps(raw_json_data)
                 ))
             
+            # Delivered to API listeners only once the transaction commits
+            cursor.execute("SELECT pg_notify(%s, %s)", (ATM_DATA_UPDATED_CHANNEL, "regional_data"))
+            
             conn.commit()
             log.info(f"Successfully saved {len(processed_data)} records to regional_data table")
             return True
@@ -1713,19 +1916,163 @@ class CombinedATMRetriever:
             return False
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
+    def migrate_terminal_details_schema(self, cursor) -> None:
+        """
+        Create terminal_details, terminal_current_state, the availability rollup,
+        atm_predictive_scores and fault_cycles
+        
+        Run once per process (on the first save) rather than on every batch.
+        Deployments can also create the same schema up front with
+        db_connector_new.DatabaseConnector.create_tables().
+        """
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS terminal_details (
+                id SERIAL PRIMARY KEY,
+                unique_request_id UUID NOT NULL DEFAULT gen_random_uuid(),
+                terminal_id VARCHAR(50) NOT NULL,
+                location TEXT,
+                issue_state_name VARCHAR(50),
+                serial_number VARCHAR(50),
+                retrieved_date TIMESTAMP WITH TIME ZONE NOT NULL,
+                fetched_status VARCHAR(50) NOT NULL,
+                raw_terminal_data JSONB NOT NULL,
+                fault_data JSONB,
+                metadata JSONB,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Create indexes for performance
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_terminal_details_terminal_id 
+            ON terminal_details(terminal_id, retrieved_date DESC)
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_terminal_details_fetched_status 
+            ON terminal_details(fetched_status)
+        """)
+        
+        # Create JSONB indexes
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_terminal_details_raw_jsonb 
+            ON terminal_details USING GIN(raw_terminal_data)
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_terminal_details_fault_jsonb 
+            ON terminal_details USING GIN(fault_data)
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_terminal_details_metadata_jsonb 
+            ON terminal_details USING GIN(metadata)
+        """)
+        
+        # Ensure terminal_current_state table exists (one row per terminal, latest reading)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS terminal_current_state (
+                terminal_id VARCHAR(50) PRIMARY KEY,
+                location TEXT,
+                issue_state_name VARCHAR(50),
+                serial_number VARCHAR(50),
+                retrieved_date TIMESTAMP WITH TIME ZONE NOT NULL,
+                fetched_status VARCHAR(50) NOT NULL,
+                raw_terminal_data JSONB NOT NULL,
+                fault_data JSONB,
+                metadata JSONB,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_terminal_current_state_retrieved_date 
+            ON terminal_current_state(retrieved_date DESC)
+        """)
+        
+        # Seed from existing history the first time the table is created
+        cursor.execute("""
+            INSERT INTO terminal_current_state (
+                terminal_id, location, issue_state_name, serial_number,
+                retrieved_date, fetched_status, raw_terminal_data, fault_data, metadata
+            )
+            SELECT DISTINCT ON (terminal_id)
+                terminal_id, location, issue_state_name, serial_number,
+                retrieved_date, fetched_status, raw_terminal_data, fault_data, metadata
+            FROM terminal_details
+            WHERE NOT EXISTS (SELECT 1 FROM terminal_current_state)
+            ORDER BY terminal_id, retrieved_date DESC
+            ON CONFLICT (terminal_id) DO NOTHING
+        """)
+        
+        if availability_rollup is not None:
+            availability_rollup.ensure_rollup_table(cursor)
+        
+        if predictive_scores is not None:
+            predictive_scores.ensure_scores_table(cursor)
+        
+        if fault_cycles is not None:
+            fault_cycles.ensure_fault_cycles_table(cursor)
+    
+    def parse_retrieved_date(self, value: Any) -> datetime:
+        """
+        Parse a retrievedDate value into a Dili-timezone datetime
+        
+        Falls back to the current Dili time if the value is missing or unparseable.
+        """
+        if isinstance(value, datetime):
+            return value if value.tzinfo else self.dili_tz.localize(value)
+        
+        if value and isinstance(value, str):
+            # Try multiple datetime formats to handle both API and generated data
+            formats_to_try = [
+                '%Y-%m-%d %H:%M:%S',  # Original format: "2025-05-30 17:55:04"
+                '%Y-%m-%dT%H:%M:%S.%fZ',  # ISO format with Z: "2025-06-17T02:13:18.640254Z"
+                '%Y-%m-%dT%H:%M:%S.%f%z',  # ISO format with timezone: "2025-06-17T02:13:18.640254+00:00"
+                '%Y-%m-%dT%H:%M:%S%z',  # ISO format without microseconds: "2025-06-17T02:13:18+00:00"
+                '%Y-%m-%dT%H:%M:%S',  # ISO format simple: "2025-06-17T02:13:18"
+            ]
+            
+            for fmt in formats_to_try:
+                try:
+                    if fmt.endswith('%z'):
+                        # Parse with timezone info and convert to Dili time
+                        return datetime.strptime(value, fmt).astimezone(self.dili_tz)
+                    elif fmt.endswith('Z'):
+                        # Handle UTC format with Z
+                        return pytz.UTC.localize(datetime.strptime(value, fmt)).astimezone(self.dili_tz)
+                    else:
+                        # Parse without timezone and assume Dili time
+                        return self.dili_tz.localize(datetime.strptime(value, fmt))
+                except ValueError:
+                    continue  # Try next format
+            
+            log.warning(f"Could not parse retrievedDate '{value}': unrecognized datetime format")
+        elif value:
+            log.warning(f"Could not parse retrievedDate '{value}': unexpected type {type(value).__name__}")
+        
+        return datetime.now(self.dili_tz)  # Use Dili timezone for database consistency
+    
     def save_terminal_details_to_new_table(self, terminal_details: List[Dict[str, Any]]) -> bool:
         """
         Save terminal details data to the new terminal_details table with JSONB support
         
+        Rows are written with multi-row INSERTs (execute_values, INGEST_PAGE_SIZE rows
+        per statement) with JSONB pre-serialized once per record, so round trips grow
+        with the number of pages rather than the number of records. Per-batch timing
+        is recorded in execution_stats['ingest_history'] and self.last_ingest_stats.
+        
         Args:
             terminal_details: List of terminal detail records
             
         Returns:
             bool: True if successful, False otherwise
         """
-        if not DB_AVAILABLE or db_connector is None:
+        global _terminal_schema_migrated
+        
+        if not DB_AVAILABLE or db_connector is None or execute_values is None:
             log.warning("Database not available - skipping terminal_details table save")
             return False
         
@@ -1735,7 +2082,7 @@ class CombinedATMRetriever:
         
         log.info(f"Saving {len(terminal_details)} records to terminal_details table...")
         
-        conn = db_connector.get_db_connection()
+        conn = acquire_db_connection()
         if not conn:
             log.error("Failed to connect to database for terminal_details table")
             return False
@@ -1743,121 +2090,48 @@ class CombinedATMRetriever:
         cursor = conn.cursor()
         
         try:
-            # Ensure terminal_details table exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS terminal_details (
-                    id SERIAL PRIMARY KEY,
-                    unique_request_id UUID NOT NULL DEFAULT gen_random_uuid(),
-                    terminal_id VARCHAR(50) NOT NULL,
-                    location TEXT,
-                    issue_state_name VARCHAR(50),
-                    serial_number VARCHAR(50),
-                    retrieved_date TIMESTAMP WITH TIME ZONE NOT NULL,
-                    fetched_status VARCHAR(50) NOT NULL,
-                    raw_terminal_data JSONB NOT NULL,
-                    fault_data JSONB,
-                    metadata JSONB,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create indexes for performance
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_terminal_details_terminal_id 
-                ON terminal_details(terminal_id, retrieved_date DESC)
-            """)
-            
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_terminal_details_fetched_status 
-                ON terminal_details(fetched_status)
-            """)
-            
-            # Create JSONB indexes
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_terminal_details_raw_jsonb 
-                ON terminal_details USING GIN(raw_terminal_data)
-            """)
-            
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_terminal_details_fault_jsonb 
-                ON terminal_details USING GIN(fault_data)
-            """)
-            
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_terminal_details_metadata_jsonb 
-                ON terminal_details USING GIN(metadata)
-            """)
-            
-            # Insert records
+            # One-time schema migration for this process
+            if not _terminal_schema_migrated:
+                with _terminal_schema_lock:
+                    if not _terminal_schema_migrated:
+                        self.migrate_terminal_details_schema(cursor)
+                        conn.commit()
+                        _terminal_schema_migrated = True
+                        log.info("terminal_details schema migration complete")
+            
+            batch_start = time.perf_counter()
+            retrieval_timestamp = datetime.now(self.dili_tz).isoformat()  # Store Dili timestamp for consistency
+            
+            # Build all rows up front; each record's JSONB is serialized exactly once
+            # and shared between terminal_details and terminal_current_state
+            detail_rows = []
+            latest_by_terminal: Dict[str, Tuple] = {}
             for detail in terminal_details:
                 # Extract the unique request ID if available, or use the one from the detail
                 unique_request_id = detail.get('unique_request_id', str(uuid.uuid4()))
-                
-                # Parse retrieved_date if it's a string
-                retrieved_date = None
-                if detail.get('retrievedDate'):
-                    try:
-                        retrieved_date_str = detail['retrievedDate']
-                        if isinstance(retrieved_date_str, str):
-                            # Try multiple datetime formats to handle both API and generated data
-                            formats_to_try = [
-                                '%Y-%m-%d %H:%M:%S',  # Original format: "2025-05-30 17:55:04"
-                                '%Y-%m-%dT%H:%M:%S.%fZ',  # ISO format with Z: "2025-06-17T02:13:18.640254Z"
-                                '%Y-%m-%dT%H:%M:%S.%f%z',  # ISO format with timezone: "2025-06-17T02:13:18.640254+00:00"
-                                '%Y-%m-%dT%H:%M:%S%z',  # ISO format without microseconds: "2025-06-17T02:13:18+00:00"
-                                '%Y-%m-%dT%H:%M:%S',  # ISO format simple: "2025-06-17T02:13:18"
-                            ]
-                            
-                            retrieved_date = None
-                            for fmt in formats_to_try:
-                                try:
-                                    if fmt.endswith('%z'):
-                                        # Parse with timezone info and convert to Dili time
-                                        retrieved_date = datetime.strptime(retrieved_date_str, fmt)
-                                        retrieved_date = retrieved_date.astimezone(self.dili_tz)
-                                    elif fmt.endswith('Z'):
-                                        # Handle UTC format with Z
-                                        retrieved_date = datetime.strptime(retrieved_date_str, fmt)
-                                        retrieved_date = pytz.UTC.localize(retrieved_date).astimezone(self.dili_tz)
-                                    else:
-                                        # Parse without timezone and assume Dili time
-                                        retrieved_date = datetime.strptime(retrieved_date_str, fmt)
-                                        retrieved_date = self.dili_tz.localize(retrieved_date)
-                                    break  # Successfully parsed, exit loop
-                                except ValueError:
-                                    continue  # Try next format
-                                    
-                            if not retrieved_date:
-                                raise ValueError(f"Could not parse datetime format: {retrieved_date_str}")
-                                
-                    except (ValueError, TypeError) as e:
-                        log.warning(f"Could not parse retrievedDate '{detail.get('retrievedDate')}': {e}")
-                        retrieved_date = datetime.now(self.dili_tz)  # Use Dili time for fallback
-                
-                if not retrieved_date:
-                    retrieved_date = datetime.now(self.dili_tz)  # Use Dili timezone for database consistency
+                retrieved_date = self.parse_retrieved_date(detail.get('retrievedDate'))
                 
                 # Prepare JSONB data
-                raw_terminal_data = {
+                raw_terminal_data = json.dumps({
                     "terminalId": detail.get('terminalId'),
                     "location": detail.get('location'),
                     "issueStateName": detail.get('issueStateName'),
                     "serialNumber": detail.get('serialNumber'),
                     "fetched_status": detail.get('fetched_status'),
                     "original_data": detail
-                }
+                })
                 
-                fault_data = {
+                fault_data = json.dumps({
                     "year": detail.get('year'),
                     "month": detail.get('month'),
                     "day": detail.get('day'),
                     "externalFaultId": detail.get('externalFaultId'),
                     "agentErrorDescription": detail.get('agentErrorDescription'),
                     "creationDate": detail.get('creationDate')
-                }
+                })
                 
-                metadata = {
-                    "retrieval_timestamp": datetime.now(self.dili_tz).isoformat(),  # Store Dili timestamp for consistency
+                metadata = json.dumps({
+                    "retrieval_timestamp": retrieval_timestamp,
                     "demo_mode": self.demo_mode,
                     "unique_request_id": unique_request_id,
                     "processing_info": {
@@ -1865,36 +2139,119 @@ class CombinedATMRetriever:
                         "has_location": bool(detail.get('location')),
                         "status_at_retrieval": detail.get('fetched_status')
                     }
-                }
+                })
                 
-                cursor.execute("""
-                    INSERT INTO terminal_details (
-                        unique_request_id,
-                        terminal_id,
-                        location,
-                        issue_state_name,
-                        serial_number,
-                        retrieved_date,
-                        fetched_status,
-                        raw_terminal_data,
-                        fault_data,
-                        metadata
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    unique_request_id,
+                state_row = (
                     detail.get('terminalId', ''),
                     detail.get('location', ''),
                     detail.get('issueStateName', ''),
                     detail.get('serialNumber', ''),
                     retrieved_date,
                     detail.get('fetched_status', 'UNKNOWN'),
-                    json.dumps(raw_terminal_data),
-                    json.dumps(fault_data),
-                    json.dumps(metadata)
-                ))
+                    raw_terminal_data,
+                    fault_data,
+                    metadata
+                )
+                detail_rows.append((unique_request_id,) + state_row)
+                
+                # ON CONFLICT can't touch the same key twice in one statement, so keep only
+                # the newest record per terminal (later records win ties, as row-by-row did)
+                current = latest_by_terminal.get(state_row[0])
+                if current is None or current[4] <= retrieved_date:
+                    latest_by_terminal[state_row[0]] = state_row
+            
+            execute_values(cursor, """
+                INSERT INTO terminal_details (
+                    unique_request_id,
+                    terminal_id,
+                    location,
+                    issue_state_name,
+                    serial_number,
+                    retrieved_date,
+                    fetched_status,
+                    raw_terminal_data,
+                    fault_data,
+                    metadata
+                ) VALUES %s
+            """, detail_rows,
+                template="(%s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb)",
+                page_size=INGEST_PAGE_SIZE)
+            
+            # Open/close fault cycles from this batch; reads each terminal's previous
+            # status, so it must run before terminal_current_state is updated
+            if fault_cycles is not None:
+                opened, closed = fault_cycles.update_fault_cycles(
+                    cursor, ((row[1], row[2], row[6], row[5], row[8]) for row in detail_rows)
+                )
+                if opened or closed:
+                    log.info(f"Fault cycles: {opened} opened, {closed} terminal(s) returned to service")
+            
+            # Keep terminal_current_state in step; never overwrite with an older reading
+            execute_values(cursor, """
+                INSERT INTO terminal_current_state (
+                    terminal_id,
+                    location,
+                    issue_state_name,
+                    serial_number,
+                    retrieved_date,
+                    fetched_status,
+                    raw_terminal_data,
+                    fault_data,
+                    metadata
+                ) VALUES %s
+                ON CONFLICT (terminal_id) DO UPDATE SET
+                    location = EXCLUDED.location,
+                    issue_state_name = EXCLUDED.issue_state_name,
+                    serial_number = EXCLUDED.serial_number,
+                    retrieved_date = EXCLUDED.retrieved_date,
+                    fetched_status = EXCLUDED.fetched_status,
+                    raw_terminal_data = EXCLUDED.raw_terminal_data,
+                    fault_data = EXCLUDED.fault_data,
+                    metadata = EXCLUDED.metadata,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE terminal_current_state.retrieved_date <= EXCLUDED.retrieved_date
+            """, list(latest_by_terminal.values()),
+                template="(%s, %s, %s, %s, %s, %s, %s::jsonb, %s::jsonb, %s::jsonb)",
+                page_size=INGEST_PAGE_SIZE)
+            
+            # Refresh the availability rollup buckets covered by this batch
+            if availability_rollup is not None:
+                batch_dates = [row[5] for row in detail_rows]
+                availability_rollup.refresh_rollup_buckets(cursor, min(batch_dates), max(batch_dates))
+            
+            # Rescore the terminals whose scores this batch can change once, here, instead of
+            # on every page view. A scoring failure must not lose the batch, so it runs under a savepoint.
+            if predictive_scores is not None:
+                cursor.execute("SAVEPOINT predictive_scores")
+                try:
+                    rescore = predictive_scores.select_terminals_to_rescore(
+                        cursor, ((row[1], row[8]) for row in detail_rows)
+                    )
+                    scored = predictive_scores.refresh_terminal_scores(cursor, rescore)
+                    cursor.execute("RELEASE SAVEPOINT predictive_scores")
+                    log.info(f"Refreshed predictive scores for {scored} of {len(latest_by_terminal)} terminals")
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT predictive_scores")
+                    log.warning(f"Predictive score refresh failed, keeping previous scores: {e}")
+            
+            # Delivered to API listeners only once the transaction commits
+            cursor.execute("SELECT pg_notify(%s, %s)", (ATM_DATA_UPDATED_CHANNEL, "terminal_details"))
             
             conn.commit()
-            log.info(f"Successfully saved {len(terminal_details)} records to terminal_details table")
+            
+            elapsed = time.perf_counter() - batch_start
+            pages = -(-len(detail_rows) // INGEST_PAGE_SIZE) + -(-len(latest_by_terminal) // INGEST_PAGE_SIZE)
+            self.last_ingest_stats = {
+                'timestamp': datetime.now(),
+                'records': len(detail_rows),
+                'terminals': len(latest_by_terminal),
+                'insert_statements': pages,
+                'seconds': round(elapsed, 4)
+            }
+            execution_stats['ingest_history'].append(self.last_ingest_stats)
+            
+            log.info(f"Successfully saved {len(terminal_details)} records to terminal_details table "
+                     f"in {elapsed * 1000:.1f}ms ({pages} insert statement(s))")
             return True
             
         except Exception as e:
@@ -1903,8 +2260,40 @@ class CombinedATMRetriever:
             return False
         finally:
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
 
+    def search_statuses_concurrently(self, param_values: List[str]) -> Dict[str, Any]:
+        """
+        Run get_terminals_by_status for every status value in parallel
+        
+        Latency is bounded by the slowest status query rather than their sum.
+        
+        Args:
+            param_values: Status values to query
+            
+        Returns:
+            Dict mapping each status value to its terminal list, or to the
+            exception raised while querying it
+        """
+        results: Dict[str, Any] = {}
+        worker_count = min(self.max_workers, len(param_values)) or 1
+        search_start = time.time()
+        
+        with ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="status-search") as executor:
+            futures = {
+                param_value: executor.submit(self.get_terminals_by_status, param_value)
+                for param_value in param_values
+            }
+            for param_value in tqdm(param_values, desc="Searching statuses", unit="status"):
+                try:
+                    results[param_value] = futures[param_value].result()
+                except Exception as e:
+                    results[param_value] = e
+        
+        log.info(f"Queried {len(param_values)} statuses in {time.time() - search_start:.1f}s "
+                 f"using {worker_count} worker(s)")
+        return results
+    
     def comprehensive_terminal_search(self) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
         """
         Comprehensive terminal search strategy that finds all terminals and handles new discoveries.
@@ -1940,9 +2329,15 @@ class CombinedATMRetriever:
         # Phase 1: Systematic discovery search across all status values
         log.info("Phase 1: Comprehensive discovery search across all statuses...")
         
-        for param_value in tqdm(PARAMETER_VALUES, desc="Searching statuses", unit="status"):
+        # All status queries run concurrently; merging below walks PARAMETER_VALUES in
+        # order so a terminal listed under several statuses keeps the same attribution
+        status_results = self.search_statuses_concurrently(PARAMETER_VALUES)
+        
+        for param_value in PARAMETER_VALUES:
             try:
-                terminals = self.get_terminals_by_status(param_value)
+                terminals = status_results[param_value]
+                if isinstance(terminals, Exception):
+                    raise terminals
                 status_counts[param_value] = len(terminals)
                 
                 if terminals:
@@ -2013,34 +2408,34 @@ class CombinedATMRetriever:
             log.warning(f"Missing {len(missing_terminal_ids)} terminals: {sorted(missing_terminal_ids)}")
             log.info("Phase 3: Implementing fallback search for missing terminals...")
             
-            # Fallback: Search for missing terminals individually across all statuses
-            for missing_id in missing_terminal_ids:
+            # Fallback: Re-run all status queries once (concurrently) and look for each
+            # missing terminal in PARAMETER_VALUES order
+            fallback_results = self.search_statuses_concurrently(PARAMETER_VALUES)
+            
+            for missing_id in sorted(missing_terminal_ids):
                 log.info(f"Searching for missing terminal {missing_id} across all statuses...")
                 
                 terminal_found = False
                 for param_value in PARAMETER_VALUES:
+                    terminals = fallback_results[param_value]
+                    if isinstance(terminals, Exception):
+                        log.error(f"Error in fallback search for terminal {missing_id} in status {param_value}: {str(terminals)}")
+                        continue
+                    
+                    for terminal in terminals:
+                        if terminal.get('terminalId') == missing_id:
+                            # Found the missing terminal!
+                            terminal['fetched_status'] = param_value
+                            all_terminals.append(terminal)
+                            found_terminal_ids.add(missing_id)
+                            terminal_to_status_map[missing_id] = param_value
+                            
+                            log.info(f"✅ Found missing terminal {missing_id} in status {param_value}")
+                            terminal_found = True
+                            break
+                    
                     if terminal_found:
                         break
-                        
-                    try:
-                        # Search this status again to look for the specific terminal
-                        terminals = self.get_terminals_by_status(param_value)
-                        
-                        for terminal in terminals:
-                            if terminal.get('terminalId') == missing_id:
-                                # Found the missing terminal!
-                                terminal['fetched_status'] = param_value
-                                all_terminals.append(terminal)
-                                found_terminal_ids.add(missing_id)
-                                terminal_to_status_map[missing_id] = param_value
-                                
-                                log.info(f"✅ Found missing terminal {missing_id} in status {param_value}")
-                                terminal_found = True
-                                break
-                                
-                    except Exception as e:
-                        log.error(f"Error in fallback search for terminal {missing_id} in status {param_value}: {str(e)}")
-                        continue
                 
                 if not terminal_found:
                     log.error(f"❌ Could not find terminal {missing_id} in any status")
@@ -2317,6 +2712,14 @@ def print_execution_stats():
         time_since_success = current_time - execution_stats['last_success']
         print(f"[TIME] Last successful cycle: {time_since_success} ago")
     
+    # Show terminal_details ingest timings
+    ingest_history = list(execution_stats['ingest_history'])
+    if ingest_history:
+        avg_ms = sum(batch['seconds'] for batch in ingest_history) / len(ingest_history) * 1000
+        last = ingest_history[-1]
+        print(f"[DB] terminal_details ingest: avg {avg_ms:.1f}ms over {len(ingest_history)} batch(es), "
+              f"last {last['records']} records in {last['seconds'] * 1000:.1f}ms")
+    
     # Show recent cycle history
     recent_cycles = list(execution_stats['cycle_history'])[-10:]  # Last 10 cycles
     if recent_cycles:
@@ -2406,8 +2809,14 @@ def run_continuous_operation(args):
     log.info(f"[CONFIG] Configuration: Demo={args.demo}, Save-to-DB={args.save_to_db}, Use-New-Tables={args.use_new_tables}")
     log.info("[INFO] Running every 15 minutes. Press Ctrl+C for graceful shutdown.")
     
-    # Create retriever instance
-    retriever = CombinedATMRetriever(demo_mode=args.demo, total_atms=args.total_atms)
+    # Create retriever instance (database connections come from the connector's
+    # process-wide pool, so they stay warm across cycles)
+    retriever = CombinedATMRetriever(
+        demo_mode=args.demo,
+        total_atms=args.total_atms,
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second
+    )
     cycle_number = 0
     success = False  # Initialize success variable
     
@@ -2489,6 +2898,7 @@ def run_continuous_operation(args):
     # Final statistics and cleanup
     log.info("\n[STOP] Continuous operation stopped")
     print_execution_stats()
+    close_db_pool()
     
     end_time = datetime.now()
     total_runtime = end_time - execution_stats['start_time']
@@ -2603,6 +3013,7 @@ Examples:
   python combined_atm_retrieval_script.py --continuous              # Continuous mode (15-min intervals)
   python combined_atm_retrieval_script.py --continuous --save-to-db --use-new-tables
   python combined_atm_retrieval_script.py --demo --save-json --total-atms 20
+  python combined_atm_retrieval_script.py --continuous --max-workers 16 --requests-per-second 10
         """
     )
     
@@ -2620,6 +3031,10 @@ Examples:
                        help='Total number of ATMs for percentage to count conversion (default: 14)')
     parser.add_argument('--quiet', action='store_true',
                        help='Reduce logging output (errors and warnings only)')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                       help=f'Max terminal detail requests in flight (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--requests-per-second', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                       help=f'Per-host request rate limit, 0 disables (default: {DEFAULT_REQUESTS_PER_SECOND:g})')
     
     args = parser.parse_args()
     
@@ -2635,7 +3050,12 @@ Examples:
     
     # Single execution mode (original behavior)
     # Create retriever instance
-    retriever = CombinedATMRetriever(demo_mode=args.demo, total_atms=args.total_atms)
+    retriever = CombinedATMRetriever(
+        demo_mode=args.demo,
+        total_atms=args.total_atms,
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second
+    )
     
     try:
         # Execute the complete retrieval and processing flow
@@ -2678,6 +3098,8 @@ Examples:
         log.error(f"Unexpected error: {str(e)}")
         log.debug("Error details:", exc_info=True)
         return 1
+    finally:
+        close_db_pool()
 
 
 if __name__ == "__main__":
@@ -1,18 +1,45 @@
 import logging
 import json
+import queue
+import re
+import threading
+import time
 import uuid
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import psycopg2
+from psycopg2.extras import execute_values
 from contextlib import contextmanager
 
+# Terminal IDs mentioned in log messages ("terminal 147", "Terminal 2603 ...")
+TERMINAL_ID_PATTERN = re.compile(r'terminal\s+(\d+)', re.IGNORECASE)
+
+# Queue markers understood by the flusher thread
+_STOP = object()
+
+
+class _FlushRequest:
+    """Asks the flusher thread to write everything queued before it, then signal"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+
 
 class DatabaseLogHandler(logging.Handler):
     """
     Custom logging handler that saves log records to PostgreSQL database
+    
+    emit() never touches the database: records go onto a bounded queue and a
+    background thread writes them to log_events in multi-row INSERTs, whenever
+    batch_size records are waiting or flush_interval seconds have passed. When
+    the queue is full new records are dropped and counted in dropped_records.
+    flush() and close() (called by logging.shutdown at exit) write everything
+    still queued.
     """
     
-    def __init__(self, db_connector, execution_id: str, demo_mode: bool = False):
+    def __init__(self, db_connector, execution_id: str, demo_mode: bool = False,
+                 batch_size: int = 200, flush_interval: float = 2.0, max_queue_size: int = 10000,
+                 metrics_collector: Optional['LogMetricsCollector'] = None):
         super().__init__()
         self.db_connector = db_connector
         self.execution_id = execution_id
@@ -20,20 +47,53 @@ class DatabaseLogHandler(logging.Handler):
         self.current_phase = "INITIALIZATION"
         self.current_terminal_id = None
         self.current_region_code = None
+        self.metrics_collector = metrics_collector
         
         # Performance tracking
         self.phase_start_times = {}
         self.performance_metrics = {}
         
+        # Batching
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self.dropped_records = 0
+        self.written_records = 0
+        self.failed_records = 0
+        self.batches_written = 0
+        self._flusher: Optional[threading.Thread] = None
+        
         # Create tables if they don't exist
         self._ensure_tables_exist()
+        
+        if not self.demo_mode:
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                name=f"db-log-flusher-{execution_id}",
+                daemon=True
+            )
+            self._flusher.start()
+    
+    def _get_connection(self):
+        """Get a connection, from the connector's pool when it has one"""
+        if hasattr(self.db_connector, 'get_pooled_connection'):
+            return self.db_connector.get_pooled_connection()
+        return self.db_connector.get_db_connection()
+    
+    def _release_connection(self, conn):
+        """Return a connection from _get_connection()"""
+        if hasattr(self.db_connector, 'release_connection'):
+            self.db_connector.release_connection(conn)
+        else:
+            conn.close()
     
     def _ensure_tables_exist(self):
         """Create log tables if they don't exist"""
         if self.demo_mode:
             return  # Skip table creation in demo mode
             
-        conn = self.db_connector.get_db_connection()
+        conn = self._get_connection()
         if not conn:
             return
             
@@ -99,7 +159,7 @@ class DatabaseLogHandler(logging.Handler):
         finally:
             if cursor:
                 cursor.close()
-            conn.close()
+            self._release_connection(conn)
     
     def set_context(self, phase: Optional[str] = None, terminal_id: Optional[str] = None, region_code: Optional[str] = None):
         """Set context information for subsequent log records"""
@@ -131,12 +191,15 @@ class DatabaseLogHandler(logging.Handler):
             }
     
     def emit(self, record):
-        """Save log record to database"""
+        """Queue a log record for the background flusher (never blocks)"""
+        if self.metrics_collector is not None:
+            self.metrics_collector.increment_level(record.levelname)
+        
         if self.demo_mode:
             return  # Skip database logging in demo mode
             
         try:
-            # Extract error details if this is an exception
+            # Extract error details if this is an exception (exc_info can't cross threads)
             error_details = None
             if record.exc_info and record.exc_info[0]:
                 error_details = {
@@ -150,77 +213,156 @@ class DatabaseLogHandler(logging.Handler):
             if hasattr(record, 'performance_data'):
                 perf_metrics = getattr(record, 'performance_data')
             
-            # Parse terminal ID from message if not set in context
-            terminal_id = self.current_terminal_id
-            if not terminal_id and 'terminal' in record.getMessage().lower():
-                # Try to extract terminal ID from message
-                import re
-                match = re.search(r'terminal\s+(\d+)', record.getMessage(), re.IGNORECASE)
-                if match:
-                    terminal_id = match.group(1)
-            
-            self._save_to_database(
-                timestamp=datetime.fromtimestamp(record.created),
-                level=record.levelname,
-                logger_name=record.name,
-                message=record.getMessage(),
-                module=record.module if hasattr(record, 'module') else record.pathname.split('/')[-1],
-                function_name=record.funcName,
-                line_number=record.lineno,
-                execution_phase=self.current_phase,
-                terminal_id=terminal_id,
-                region_code=self.current_region_code,
-                error_details=error_details,
-                performance_metrics=perf_metrics
+            # Context is captured now; terminal ID parsing is left to the flusher
+            entry = (
+                datetime.fromtimestamp(record.created),
+                record.levelname,
+                record.name,
+                record.getMessage(),
+                record.module if hasattr(record, 'module') else record.pathname.split('/')[-1],
+                record.funcName,
+                record.lineno,
+                self.current_phase,
+                self.current_terminal_id,
+                self.current_region_code,
+                error_details,
+                perf_metrics
             )
+            self._queue.put_nowait(entry)
             
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped_records += 1
         except Exception as e:
             # Don't let logging errors break the main application
-            print(f"Failed to save log to database: {e}")
+            print(f"Failed to queue log record: {e}")
     
-    def _save_to_database(self, **kwargs):
-        """Save a single log record to database"""
-        conn = self.db_connector.get_db_connection()
+    def _flush_loop(self):
+        """Background thread: drain the queue into batched INSERTs"""
+        batch: List[tuple] = []
+        deadline = time.monotonic() + self.flush_interval
+        
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            
+            if item is _STOP:
+                self._write_batch(batch)
+                return
+            
+            if isinstance(item, _FlushRequest):
+                self._write_batch(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                item.done.set()
+                continue
+            
+            if item is not None:
+                batch.append(item)
+            
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write_batch(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+    
+    def _write_batch(self, batch: List[tuple]):
+        """Insert a batch of queued records into log_events with one multi-row INSERT"""
+        if not batch:
+            return
+        
+        rows = []
+        for (timestamp, level, logger_name, message, module, function_name, line_number,
+             execution_phase, terminal_id, region_code, error_details, perf_metrics) in batch:
+            # Parse terminal ID from message if not set in context
+            if not terminal_id and 'terminal' in message.lower():
+                match = TERMINAL_ID_PATTERN.search(message)
+                if match:
+                    terminal_id = match.group(1)
+            
+            rows.append((
+                timestamp,
+                self.execution_id,
+                level,
+                logger_name,
+                message,
+                module,
+                function_name,
+                line_number,
+                execution_phase,
+                terminal_id,
+                region_code,
+                json.dumps(error_details) if error_details else None,
+                json.dumps(perf_metrics) if perf_metrics else None
+            ))
+        
+        conn = self._get_connection()
         if not conn:
+            with self._stats_lock:
+                self.failed_records += len(rows)
             return
             
         cursor = None
         try:
             cursor = conn.cursor()
             
-            cursor.execute("""
+            execute_values(cursor, """
                 INSERT INTO log_events (
                     timestamp, execution_id, level, logger_name, message,
                     module, function_name, line_number, execution_phase,
                     terminal_id, region_code, error_details, performance_metrics
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """, (
-                kwargs['timestamp'],
-                self.execution_id,
-                kwargs['level'],
-                kwargs['logger_name'],
-                kwargs['message'],
-                kwargs['module'],
-                kwargs['function_name'],
-                kwargs['line_number'],
-                kwargs['execution_phase'],
-                kwargs['terminal_id'],
-                kwargs['region_code'],
-                json.dumps(kwargs['error_details']) if kwargs['error_details'] else None,
-                json.dumps(kwargs['performance_metrics']) if kwargs['performance_metrics'] else None
-            ))
+                ) VALUES %s
+            """, rows, page_size=len(rows))
             
             conn.commit()
             
+            with self._stats_lock:
+                self.written_records += len(rows)
+                self.batches_written += 1
+            
         except Exception as e:
-            print(f"Database log save failed: {e}")
+            print(f"Database log batch save failed ({len(rows)} records): {e}")
             conn.rollback()
+            with self._stats_lock:
+                self.failed_records += len(rows)
         finally:
             if cursor:
                 cursor.close()
-            conn.close()
+            self._release_connection(conn)
+    
+    def flush(self, timeout: float = 30.0):
+        """Block until every record queued so far has been written"""
+        if self._flusher is None or not self._flusher.is_alive():
+            return
+        
+        request = _FlushRequest()
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return
+        request.done.wait(timeout)
+    
+    def close(self):
+        """Write everything still queued and stop the flusher thread"""
+        if self._flusher is not None and self._flusher.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=30.0)
+            except queue.Full:
+                pass
+            self._flusher.join(timeout=30.0)
+        super().close()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Counters for the queue and the background writer"""
+        with self._stats_lock:
+            return {
+                'queued': self._queue.qsize(),
+                'written_records': self.written_records,
+                'batches_written': self.batches_written,
+                'dropped_records': self.dropped_records,
+                'failed_records': self.failed_records
+            }
     
     def save_execution_summary(self, summary_data: Dict[str, Any]):
         """Save execution summary to database"""
@@ -231,7 +373,10 @@ class DatabaseLogHandler(logging.Handler):
         if self.current_phase:
             self._record_phase_end(self.current_phase)
         
-        conn = self.db_connector.get_db_connection()
+        # Make sure the run's log_events rows are in before its summary
+        self.flush()
+        
+        conn = self._get_connection()
         if not conn:
             return
             
@@ -278,7 +423,7 @@ class DatabaseLogHandler(logging.Handler):
                 summary_data.get('error_count', 0),
                 summary_data.get('warning_count', 0),
                 summary_data.get('info_count', 0),
-                json.dumps(self.performance_metrics)
+                json.dumps({**self.performance_metrics, 'log_handler': self.get_stats()})
             ))
             
             conn.commit()
@@ -289,7 +434,7 @@ class DatabaseLogHandler(logging.Handler):
         finally:
             if cursor:
                 cursor.close()
-            conn.close()
+            self._release_connection(conn)
 
 
 class LogMetricsCollector:
@@ -7,8 +7,12 @@ Supports PostgreSQL with new credentials for development_db
 import psycopg2
 import psycopg2.extras
 import psycopg2.extensions
+import psycopg2.pool
 import logging
 import json
+import os
+import threading
+import time
 from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 import uuid
@@ -26,12 +30,21 @@ DB_CONFIG = {
     'password': 'timlesdev'
 }
 
+# Process-wide connection pool settings
+POOL_MIN_CONNECTIONS = int(os.getenv('DB_POOL_MIN', '1'))
+POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX', '5'))
+# Connections idle longer than this are pinged before being handed out
+POOL_HEALTH_CHECK_IDLE_SECONDS = int(os.getenv('DB_POOL_HEALTH_CHECK_IDLE', '30'))
+
 class DatabaseConnector:
     """Database connector for ATM data storage and retrieval"""
     
     def __init__(self):
         """Initialize the database connector"""
         self.config = DB_CONFIG
+        self._pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._last_used: Dict[int, float] = {}  # id(conn) -> time it was returned to the pool
         
     def get_db_connection(self) -> Optional[psycopg2.extensions.connection]:
         """
@@ -55,6 +68,127 @@ class DatabaseConnector:
             log.error(f"Error connecting to PostgreSQL database: {e}")
             return None
     
+    def _get_pool(self) -> Optional[psycopg2.pool.ThreadedConnectionPool]:
+        """Create the process-wide pool on first use (and again after close_pool)"""
+        if self._pool is not None and not self._pool.closed:
+            return self._pool
+        
+        with self._pool_lock:
+            if self._pool is None or self._pool.closed:
+                try:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        POOL_MIN_CONNECTIONS,
+                        POOL_MAX_CONNECTIONS,
+                        host=self.config['host'],
+                        port=self.config['port'],
+                        database=self.config['database'],
+                        user=self.config['user'],
+                        password=self.config['password']
+                    )
+                    self._last_used.clear()
+                    log.info(f"Created PostgreSQL connection pool (min={POOL_MIN_CONNECTIONS}, max={POOL_MAX_CONNECTIONS})")
+                except psycopg2.Error as e:
+                    log.error(f"Error creating PostgreSQL connection pool: {e}")
+                    self._pool = None
+        return self._pool
+    
+    def _is_healthy(self, conn: psycopg2.extensions.connection) -> bool:
+        """Check a pooled connection before handing it out"""
+        if conn.closed:
+            return False
+        
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < POOL_HEALTH_CHECK_IDLE_SECONDS:
+            return True  # Freshly opened or recently used
+        
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+    
+    def get_pooled_connection(self) -> Optional[psycopg2.extensions.connection]:
+        """
+        Check a connection out of the process-wide pool
+        
+        Connections are health-checked and replaced if the server dropped them,
+        so long-running processes reuse warm connections across cycles. Return
+        the connection with release_connection() instead of closing it.
+        
+        Returns:
+            psycopg2 connection object or None if no connection is available
+        """
+        for attempt in range(2):
+            pool = self._get_pool()
+            if pool is None:
+                return None
+            
+            try:
+                conn = pool.getconn()
+            except psycopg2.pool.PoolError as e:
+                log.error(f"Connection pool exhausted: {e}")
+                return None
+            except psycopg2.Error as e:
+                log.error(f"Error getting pooled connection: {e}")
+                continue
+            
+            if self._is_healthy(conn):
+                conn.autocommit = False
+                return conn
+            
+            log.warning("Discarding broken pooled connection and reconnecting")
+            self._discard(pool, conn)
+        
+        log.error("Could not obtain a healthy pooled connection")
+        return None
+    
+    def release_connection(self, conn: Optional[psycopg2.extensions.connection], discard: bool = False) -> None:
+        """
+        Return a connection from get_pooled_connection() to the pool
+        
+        Any open transaction is rolled back. Broken connections (or discard=True)
+        are closed instead of being reused.
+        """
+        if conn is None:
+            return
+        
+        pool = self._pool
+        if pool is None or pool.closed:
+            conn.close()
+            return
+        
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        
+        if discard or conn.closed:
+            self._discard(pool, conn)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+            pool.putconn(conn)
+    
+    def _discard(self, pool: psycopg2.pool.ThreadedConnectionPool, conn: psycopg2.extensions.connection) -> None:
+        """Close a connection and drop it from the pool"""
+        self._last_used.pop(id(conn), None)
+        try:
+            pool.putconn(conn, close=True)
+        except psycopg2.pool.PoolError:
+            conn.close()
+    
+    def close_pool(self) -> None:
+        """Close every pooled connection (on shutdown)"""
+        with self._pool_lock:
+            if self._pool is not None and not self._pool.closed:
+                self._pool.closeall()
+                log.info("Closed PostgreSQL connection pool")
+            self._pool = None
+            self._last_used.clear()
+    
     def test_connection(self) -> bool:
         """
         Test the database connection
@@ -182,6 +316,28 @@ class DatabaseConnector:
                 ON terminal_details(unique_request_id)
             """)
             
+            # Create terminal_current_state table (latest row per terminal, upserted on ingest)
+            log.info("Creating terminal_current_state table...")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS terminal_current_state (
+                    terminal_id VARCHAR(50) PRIMARY KEY,
+                    location TEXT,
+                    issue_state_name VARCHAR(50),
+                    serial_number VARCHAR(50),
+                    retrieved_date TIMESTAMP WITH TIME ZONE NOT NULL,
+                    fetched_status VARCHAR(50) NOT NULL,
+                    raw_terminal_data JSONB NOT NULL,
+                    fault_data JSONB,
+                    metadata JSONB,
+                    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_terminal_current_state_retrieved_date
+                ON terminal_current_state(retrieved_date DESC)
+            """)
+
             # Create legacy table for compatibility (optional)
             log.info("Creating legacy regional_atm_counts table for compatibility...")
             cursor.execute("""
@@ -254,7 +410,7 @@ class DatabaseConnector:
         Returns:
             bool: True if table exists, False otherwise
         """
-        conn = self.get_db_connection()
+        conn = self.get_pooled_connection()
         if not conn:
             return False
         
@@ -276,7 +432,7 @@ class DatabaseConnector:
             return False
         finally:
             cursor.close()
-            conn.close()
+            self.release_connection(conn)
     
     def get_table_info(self) -> Dict[str, Any]:
         """
@@ -332,6 +488,14 @@ def get_db_connection():
     """Global function for compatibility"""
     return db_connector.get_db_connection()
 
+def get_pooled_connection():
+    """Global function for pooled access"""
+    return db_connector.get_pooled_connection()
+
+def release_connection(conn, discard: bool = False):
+    """Global function for pooled access"""
+    return db_connector.release_connection(conn, discard)
+
 def check_regional_atm_counts_table():
     """Global function for compatibility"""
     return db_connector.check_regional_atm_counts_table()
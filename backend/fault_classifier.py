@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Single-pass Fault Classifier for Predictive Analytics
+=====================================================
+
+Classifies JSONB fault entries (from terminal_details.fault_data) for the
+component health and failure prediction scoring:
+1. All component and severity keywords are compiled into ONE regular
+   expression. A single scan of a fault's description and external fault ID
+   yields every component it touches and its severity, instead of one
+   `keyword in text` check per keyword per component
+2. Each fault's creationDate is parsed once (month lookup and format are
+   module constants, not rebuilt per fault)
+3. score_components() walks the fault history once and returns the health
+   statistics of every component together, plus the recent-fault count used
+   by the failure prediction
+
+The fleet summary engine (predictive_fleet_engine) uses the same keyword
+tables, so per-terminal and fleet scores agree.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, FrozenSet
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Component types -> keywords found in fault descriptions / external fault IDs
+COMPONENT_KEYWORDS = {
+    'DISPENSER': ['CDM', 'dispenser', 'notes', 'cash', 'bills', 'currency'],
+    'READER': ['reader', 'card', 'magnetic', 'chip'],
+    'PRINTER': ['printer', 'receipt', 'paper', 'print'],
+    'NETWORK_MODULE': ['network', 'communications', 'connection', 'comms'],
+    'DEPOSIT_MODULE': ['deposit', 'check', 'envelope'],
+    'SENSOR': ['sensor', 'detect', 'proximity', 'motion']
+}
+
+COMPONENT_TYPES = list(COMPONENT_KEYWORDS)
+
+CRITICAL_KEYWORDS = ['timeout', 'failure', 'error', 'jam', 'stuck', 'blocked']
+WARNING_KEYWORDS = ['out of', 'empty', 'low', 'warning', 'check']
+
+# Health points lost per fault by severity
+CRITICAL_IMPACT = 12
+WARNING_IMPACT = 6
+DEFAULT_IMPACT = 8
+
+# Windows used for component health and for the recent-fault count
+COMPONENT_WINDOW_DAYS = 30
+RECENT_WINDOW_DAYS = 7
+
+# Format of creationDate in the crawler data: "11:06:2025 11:40:18"
+CREATION_DATE_FORMAT = "%d:%m:%Y %H:%M:%S"
+
+MONTH_NAMES = {
+    'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4, 'MAY': 5, 'JUNE': 6,
+    'JULY': 7, 'AUGUST': 8, 'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12
+}
+
+# Distinct texts whose keyword matches are remembered per classifier
+MATCH_CACHE_SIZE = 4096
+
+# Tags attached to keywords; severity tags are only read from the description
+CRITICAL = 'critical'
+WARNING = 'warning'
+
+
+def parse_creation_date(value: Any) -> Optional[datetime]:
+    """
+    Parse a fault creationDate
+
+    Accepts the crawler's "dd:mm:YYYY HH:MM:SS" strings (month may also be a
+    month name), ISO strings and epoch milliseconds. Results are naive local
+    time, comparable with datetime.now().
+
+    Raises:
+        ValueError: The value is present but cannot be parsed
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Unsupported creationDate {value!r}")
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value / 1000)
+    if not isinstance(value, str):
+        raise ValueError(f"Unsupported creationDate {value!r}")
+
+    # Fast path for the fixed-width crawler format (strptime dominates the cost otherwise)
+    if len(value) == 19 and value[2] == ':' and value[5] == ':' and value[10] == ' ':
+        try:
+            return datetime(int(value[6:10]), int(value[3:5]), int(value[0:2]),
+                            int(value[11:13]), int(value[14:16]), int(value[17:19]))
+        except ValueError:
+            pass
+
+    parts = value.split(' ')
+    if ':' in value and len(parts) == 2:
+        day, month, year = parts[0].split(':')
+        hour, minute, second = parts[1].split(':')
+        month_int = MONTH_NAMES.get(month.upper()) or int(month)
+        return datetime(int(year), month_int, int(day), int(hour), int(minute), int(second))
+
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(tz=None).replace(tzinfo=None)
+    return parsed
+
+
+@dataclass(frozen=True)
+class ClassifiedFault:
+    """One fault entry after classification"""
+    components: FrozenSet[str]
+    impact: int
+    fault_date: Optional[datetime]
+    has_date: bool
+
+    @property
+    def date_unparseable(self) -> bool:
+        return self.has_date and self.fault_date is None
+
+
+@dataclass
+class ComponentStats:
+    """Health statistics of one component over a fault history"""
+    component_type: str
+    health_score: float = 100.0
+    fault_count: int = 0
+    last_fault_date: Optional[datetime] = None
+
+    @property
+    def risk_level(self) -> str:
+        if self.health_score >= 85:
+            return "LOW"
+        if self.health_score >= 70:
+            return "MEDIUM"
+        if self.health_score >= 50:
+            return "HIGH"
+        return "CRITICAL"
+
+
+@dataclass
+class FaultHistoryScores:
+    """Result of FaultClassifier.score_components"""
+    components: Dict[str, ComponentStats] = field(default_factory=dict)
+    recent_faults: int = 0
+    faults_analyzed: int = 0
+
+
+class FaultClassifier:
+    """Matches all component and severity keywords of a fault in one regex scan"""
+
+    def __init__(self, component_keywords: Optional[Dict[str, List[str]]] = None,
+                 critical_keywords: Optional[List[str]] = None,
+                 warning_keywords: Optional[List[str]] = None):
+        component_keywords = component_keywords or COMPONENT_KEYWORDS
+        self.component_types = list(component_keywords)
+
+        # keyword -> tags (a keyword may belong to a component and a severity, e.g. 'check')
+        self._tags: Dict[str, set] = {}
+        for component, keywords in component_keywords.items():
+            for keyword in keywords:
+                self._tags.setdefault(keyword.lower(), set()).add(component)
+        for keyword in critical_keywords or CRITICAL_KEYWORDS:
+            self._tags.setdefault(keyword.lower(), set()).add(CRITICAL)
+        for keyword in warning_keywords or WARNING_KEYWORDS:
+            self._tags.setdefault(keyword.lower(), set()).add(WARNING)
+
+        # Zero-width lookahead finds a keyword at every position, so overlapping
+        # keywords ("print" inside "printer", "check" inside "checkout") all match
+        alternation = '|'.join(re.escape(k) for k in sorted(self._tags, key=len, reverse=True))
+        self._pattern = re.compile(f'(?=({alternation}))')
+        self._component_set = frozenset(self.component_types)
+        self._match_cache: Dict[str, FrozenSet[str]] = {}
+
+    def match(self, text: str) -> FrozenSet[str]:
+        """All tags (components and severities) whose keywords occur in text"""
+        if not text:
+            return frozenset()
+        tags = self._match_cache.get(text)
+        if tags is None:
+            found = set()
+            for keyword in self._pattern.findall(text.lower()):
+                found |= self._tags[keyword]
+            tags = frozenset(found)
+            # Descriptions and fault IDs come from a small vocabulary; keep the cache bounded anyway
+            if len(self._match_cache) >= MATCH_CACHE_SIZE:
+                self._match_cache.clear()
+            self._match_cache[text] = tags
+        return tags
+
+    def classify(self, fault: Dict[str, Any]) -> ClassifiedFault:
+        """Classify one fault entry: components, severity impact and creation date"""
+        description_tags = self.match(fault.get('agentErrorDescription') or '')
+        external_tags = self.match(fault.get('externalFaultId') or '')
+
+        if CRITICAL in description_tags:
+            impact = CRITICAL_IMPACT
+        elif WARNING in description_tags:
+            impact = WARNING_IMPACT
+        else:
+            impact = DEFAULT_IMPACT
+
+        creation_date = fault.get('creationDate')
+        fault_date = None
+        if creation_date:
+            try:
+                fault_date = parse_creation_date(creation_date)
+            except (ValueError, TypeError, OverflowError, OSError):
+                fault_date = None
+
+        return ClassifiedFault(
+            components=(description_tags | external_tags) & self._component_set,
+            impact=impact,
+            fault_date=fault_date,
+            has_date=bool(creation_date)
+        )
+
+    def score_components(self, fault_history: Iterable[Dict[str, Any]],
+                         component_types: Optional[List[str]] = None,
+                         now: Optional[datetime] = None) -> FaultHistoryScores:
+        """
+        Score every component from one pass over the fault history
+
+        A component loses CRITICAL/WARNING/DEFAULT_IMPACT points for each of its
+        faults in the last COMPONENT_WINDOW_DAYS (undated faults included).
+        Faults of the last RECENT_WINDOW_DAYS, and faults whose date cannot be
+        parsed, count as recent.
+        """
+        component_types = self.component_types if component_types is None else component_types
+        now = now or datetime.now()
+        component_cutoff = now - timedelta(days=COMPONENT_WINDOW_DAYS)
+        recent_cutoff = now - timedelta(days=RECENT_WINDOW_DAYS)
+
+        scores = FaultHistoryScores(components={c: ComponentStats(c) for c in component_types})
+        penalties = dict.fromkeys(component_types, 0)
+
+        for fault in fault_history:
+            classified = self.classify(fault)
+            scores.faults_analyzed += 1
+            fault_date = classified.fault_date
+
+            if classified.date_unparseable or (fault_date is not None and fault_date >= recent_cutoff):
+                scores.recent_faults += 1
+
+            if fault_date is not None and fault_date < component_cutoff:
+                continue
+            for component in classified.components:
+                stats = scores.components.get(component)
+                if stats is None:
+                    continue
+                stats.fault_count += 1
+                penalties[component] += classified.impact
+                if fault_date is not None and (stats.last_fault_date is None or fault_date > stats.last_fault_date):
+                    stats.last_fault_date = fault_date
+
+        for component, stats in scores.components.items():
+            stats.health_score = round(max(0, min(100, 100 - penalties[component])), 1)
+        return scores
+
+
+def predict_failure(average_health: float, recent_faults: int) -> Dict[str, Any]:
+    """
+    Failure risk from the average component health and the faults of the last 7 days
+
+    Returns:
+        Dict with risk_score, risk_level, prediction_horizon, confidence and
+        contributing_factors
+    """
+    risk_score = (100 - average_health) * 0.6 + min(recent_faults * 15, 40)
+    risk_score = max(0, min(100, risk_score))
+
+    if risk_score < 25:
+        risk_level, horizon, confidence = "LOW", "30+ days", 75
+    elif risk_score < 50:
+        risk_level, horizon, confidence = "MEDIUM", "14-30 days", 80
+    elif risk_score < 75:
+        risk_level, horizon, confidence = "HIGH", "7-14 days", 85
+    else:
+        risk_level, horizon, confidence = "CRITICAL", "1-7 days", 90
+
+    factors = []
+    if average_health < 70:
+        factors.append("Component degradation detected")
+    if recent_faults > 3:
+        factors.append("High recent fault frequency")
+    if not factors:
+        factors = ["Normal operational patterns"]
+
+    return {
+        'risk_score': round(risk_score, 1),
+        'risk_level': risk_level,
+        'prediction_horizon': horizon,
+        'confidence': confidence,
+        'contributing_factors': factors
+    }
+
+
+# Shared instance (the compiled pattern is immutable; the match cache only ever holds complete entries)
+fault_classifier = FaultClassifier()
+
+
+def score_fault_history(fault_history: Iterable[Dict[str, Any]],
+                        component_types: Optional[List[str]] = None,
+                        now: Optional[datetime] = None) -> FaultHistoryScores:
+    """Score a fault history with the shared classifier"""
+    return fault_classifier.score_components(fault_history, component_types, now)
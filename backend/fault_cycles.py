@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Persisted ATM Fault Cycles
+
+Maintains the fault_cycles table: one row per fault cycle (a terminal leaving
+AVAILABLE/ONLINE for a fault state until it returns), with its start, end,
+duration and fault description. An ongoing cycle has end_time NULL.
+
+The crawler updates the table incrementally from each batch it saves (see
+CombinedATMRetriever.save_terminal_details_to_new_table): a sample opens a
+cycle when it enters a fault state from AVAILABLE/ONLINE (or is the first
+sample of the terminal) and closes every open cycle of its terminal when it
+returns to AVAILABLE/ONLINE from a fault state. These are the same rules
+fault_history_engine applies to raw terminal_details, so the fault history
+report becomes a range scan on start_time and the ongoing faults an index
+lookup on end_time IS NULL, instead of a window pass over the samples on every
+request.
+
+This script rebuilds the table from the full terminal_details history; run it
+once after deploying, and again whenever terminal_details is reloaded. The
+cycles the crawler adds before then only cover new samples, so the API reads
+fault_cycles only once a rebuild has completed (fault_cycles_backfill).
+
+Usage:
+    python fault_cycles.py [--batch-size TERMINALS]
+"""
+
+import argparse
+import json
+import sys
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fault_history_engine import FAULT_STATES, UP_STATES, FAULT_DESCRIPTION_COLUMNS, fault_cycles_cte
+
+log = logging.getLogger("FaultCycles")
+
+CREATE_FAULT_CYCLES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS fault_cycles (
+        id BIGSERIAL PRIMARY KEY,
+        terminal_id VARCHAR(50) NOT NULL,
+        location TEXT,
+        fault_state VARCHAR(50) NOT NULL,
+        start_time TIMESTAMP WITH TIME ZONE NOT NULL,
+        end_time TIMESTAMP WITH TIME ZONE,
+        duration_minutes DOUBLE PRECISION,
+        fault_description TEXT,
+        fault_type VARCHAR(50),
+        component_type VARCHAR(50),
+        agent_error_description TEXT,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (terminal_id, start_time)
+    )
+"""
+
+CREATE_FAULT_CYCLES_INDEXES_SQL = [
+    # Report date ranges across all terminals
+    """
+    CREATE INDEX IF NOT EXISTS idx_fault_cycles_start_time
+    ON fault_cycles (start_time)
+    """,
+    # Ongoing faults, and the open cycles closed by the crawler
+    """
+    CREATE INDEX IF NOT EXISTS idx_fault_cycles_ongoing
+    ON fault_cycles (terminal_id, start_time)
+    WHERE end_time IS NULL
+    """
+]
+
+# One row once rebuild_fault_cycles has covered the full history; removed while a rebuild runs
+CREATE_BACKFILL_MARKER_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS fault_cycles_backfill (
+        singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+        completed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+CLEAR_BACKFILL_MARKER_SQL = "DELETE FROM fault_cycles_backfill"
+
+SET_BACKFILL_MARKER_SQL = """
+    INSERT INTO fault_cycles_backfill (singleton, completed_at)
+    VALUES (TRUE, CURRENT_TIMESTAMP)
+    ON CONFLICT (singleton) DO UPDATE SET completed_at = EXCLUDED.completed_at
+"""
+
+# Latest known status per terminal, before this batch is applied
+SELECT_PREVIOUS_STATUS_SQL = """
+    SELECT terminal_id, fetched_status, retrieved_date
+    FROM terminal_current_state
+    WHERE terminal_id = ANY(%(terminal_ids)s)
+"""
+
+INSERT_CYCLES_SQL = """
+    INSERT INTO fault_cycles (
+        terminal_id, location, fault_state, start_time, end_time, duration_minutes,
+        fault_description, fault_type, component_type, agent_error_description
+    ) VALUES %s
+    ON CONFLICT (terminal_id, start_time) DO NOTHING
+"""
+
+# Every open cycle of a terminal started before its return to service ends there
+CLOSE_CYCLES_SQL = """
+    UPDATE fault_cycles
+    SET end_time = v.end_time,
+        duration_minutes = EXTRACT(EPOCH FROM (v.end_time - fault_cycles.start_time)) / 60,
+        updated_at = CURRENT_TIMESTAMP
+    FROM (VALUES %s) AS v (terminal_id, end_time)
+    WHERE fault_cycles.terminal_id = v.terminal_id
+      AND fault_cycles.end_time IS NULL
+      AND fault_cycles.start_time < v.end_time
+"""
+
+CLOSE_TEMPLATE = "(%s, %s::timestamptz)"
+
+SELECT_TERMINALS_SQL = """
+    SELECT DISTINCT terminal_id
+    FROM terminal_details
+    ORDER BY terminal_id
+"""
+
+DELETE_TERMINAL_CYCLES_SQL = """
+    DELETE FROM fault_cycles
+    WHERE terminal_id = ANY(%(terminal_ids)s)
+"""
+
+REBUILD_CYCLES_SQL = fault_cycles_cte("terminal_id = ANY(%(terminal_ids)s)") + f"""
+    INSERT INTO fault_cycles (
+        terminal_id, location, fault_state, start_time, end_time, duration_minutes,
+        fault_description, fault_type, component_type, agent_error_description
+    )
+    SELECT
+        terminal_id,
+        location,
+        fault_state,
+        fault_start,
+        fault_end,
+        EXTRACT(EPOCH FROM (fault_end - fault_start)) / 60,
+{FAULT_DESCRIPTION_COLUMNS}
+    FROM cycles
+    WHERE is_start
+    ON CONFLICT (terminal_id, start_time) DO NOTHING
+"""
+
+# Reads used by the API (asyncpg placeholders)
+FAULT_CYCLES_BACKFILLED_QUERY = "SELECT EXISTS (SELECT 1 FROM fault_cycles_backfill)"
+
+# Same parameters and columns as fault_history_engine.FAULT_CYCLES_QUERY:
+# $1/$2: report range, $3: terminal IDs (NULL for all), $4: include ongoing faults.
+# Cycles that started in the range keep their real end, even if it is after the
+# range; ongoing ones are timed up to the end of the range (or now, if sooner).
+FAULT_CYCLES_RANGE_QUERY = """
+    SELECT
+        terminal_id,
+        location,
+        fault_state,
+        start_time AS fault_start,
+        end_time AS fault_end,
+        CASE
+            WHEN end_time IS NOT NULL THEN duration_minutes
+            WHEN LEAST($2::timestamptz, NOW()) > start_time
+                THEN EXTRACT(EPOCH FROM (LEAST($2::timestamptz, NOW()) - start_time)) / 60
+            ELSE NULL
+        END AS duration_minutes,
+        end_time IS NOT NULL AS resolved,
+        fault_description,
+        fault_type,
+        component_type,
+        agent_error_description
+    FROM fault_cycles
+    WHERE start_time BETWEEN $1 AND $2
+      AND ($3::text[] IS NULL OR terminal_id = ANY($3::text[]))
+      AND ($4::boolean OR end_time IS NOT NULL)
+    ORDER BY terminal_id, start_time
+"""
+
+# $1: terminal IDs (NULL for all)
+ONGOING_FAULTS_QUERY = """
+    SELECT
+        terminal_id,
+        location,
+        fault_state,
+        start_time,
+        EXTRACT(EPOCH FROM (NOW() - start_time)) / 60 AS duration_minutes,
+        fault_description,
+        fault_type,
+        component_type,
+        agent_error_description
+    FROM fault_cycles
+    WHERE end_time IS NULL
+      AND ($1::text[] IS NULL OR terminal_id = ANY($1::text[]))
+    ORDER BY start_time
+"""
+
+
+def ensure_fault_cycles_table(cursor) -> None:
+    """Create fault_cycles, its indexes and the backfill marker if they don't exist"""
+    cursor.execute(CREATE_FAULT_CYCLES_TABLE_SQL)
+    for statement in CREATE_FAULT_CYCLES_INDEXES_SQL:
+        cursor.execute(statement)
+    cursor.execute(CREATE_BACKFILL_MARKER_TABLE_SQL)
+
+
+def _description_columns(fault_data: Any) -> Tuple[str, str, str, Optional[str]]:
+    """fault_description, fault_type, component_type, agent_error_description of a sample"""
+    if isinstance(fault_data, str):
+        try:
+            fault_data = json.loads(fault_data)
+        except json.JSONDecodeError:
+            fault_data = None
+    if not isinstance(fault_data, dict):
+        fault_data = {}
+    agent_error = fault_data.get('agentErrorDescription')
+    return (
+        agent_error or fault_data.get('fault_description') or 'No description',
+        fault_data.get('fault_type') or 'Unknown',
+        fault_data.get('component_type') or 'Unknown',
+        agent_error
+    )
+
+
+def plan_cycle_updates(samples: Iterable[Tuple[str, Optional[str], str, datetime, Any]],
+                       previous: Dict[str, Tuple[str, datetime]]
+                       ) -> Tuple[List[tuple], List[Tuple[str, datetime]]]:
+    """
+    Walk a batch of samples per terminal and work out the cycle changes
+
+    Args:
+        samples: (terminal_id, location, fetched_status, retrieved_date, fault_data)
+        previous: terminal_id -> (fetched_status, retrieved_date) before the batch
+
+    Returns:
+        Tuple of the cycles opened in the batch (insert rows, closed in place if
+        the batch also resolves them) and, per terminal, the first return to
+        service that closes the cycles already open in the table
+    """
+    by_terminal: Dict[str, List[tuple]] = defaultdict(list)
+    for sample in samples:
+        if sample[0]:
+            by_terminal[sample[0]].append(sample)
+
+    opened: List[tuple] = []
+    closes: List[Tuple[str, datetime]] = []
+    for terminal_id, terminal_samples in by_terminal.items():
+        prev_status, prev_date = previous.get(terminal_id, (None, None))
+        pending: List[list] = []
+        closed_existing = False
+
+        for _, location, status, retrieved_date, fault_data in sorted(terminal_samples, key=lambda s: s[3]):
+            # Samples not newer than the known state were already applied (or arrived late)
+            if prev_date is not None and retrieved_date <= prev_date:
+                continue
+
+            if status in FAULT_STATES and (prev_status is None or prev_status in UP_STATES):
+                pending.append([terminal_id, location, status, retrieved_date, None, None,
+                                *_description_columns(fault_data)])
+            elif status in UP_STATES and prev_status in FAULT_STATES:
+                if not closed_existing:
+                    closes.append((terminal_id, retrieved_date))
+                    closed_existing = True
+                for cycle in pending:
+                    cycle[4] = retrieved_date
+                    cycle[5] = (retrieved_date - cycle[3]).total_seconds() / 60
+                    opened.append(tuple(cycle))
+                pending = []
+            prev_status = status
+
+        opened.extend(tuple(cycle) for cycle in pending)
+
+    return opened, closes
+
+
+def update_fault_cycles(cursor, samples: Iterable[Tuple[str, Optional[str], str, datetime, Any]]) -> Tuple[int, int]:
+    """
+    Apply a batch of status samples to fault_cycles
+
+    Must run on the caller's cursor *before* terminal_current_state is updated
+    with the same batch, since the stored state is each terminal's status
+    before these samples.
+
+    Args:
+        samples: (terminal_id, location, fetched_status, retrieved_date, fault_data)
+
+    Returns:
+        Tuple[int, int]: Cycles opened, terminals whose open cycles were closed
+    """
+    from psycopg2.extras import execute_values
+
+    samples = list(samples)
+    terminal_ids = sorted({sample[0] for sample in samples if sample[0]})
+    if not terminal_ids:
+        return 0, 0
+
+    cursor.execute(SELECT_PREVIOUS_STATUS_SQL, {'terminal_ids': terminal_ids})
+    previous = {terminal_id: (status, retrieved_date) for terminal_id, status, retrieved_date in cursor.fetchall()}
+
+    opened, closes = plan_cycle_updates(samples, previous)
+
+    # Close the cycles opened by earlier batches first, so the new ones are left alone
+    if closes:
+        execute_values(cursor, CLOSE_CYCLES_SQL, closes, template=CLOSE_TEMPLATE)
+    if opened:
+        execute_values(cursor, INSERT_CYCLES_SQL, opened)
+    return len(opened), len(closes)
+
+
+def rebuild_fault_cycles(conn, batch_size: int = 100) -> int:
+    """
+    Recompute fault_cycles from the full terminal_details history
+
+    Args:
+        conn: psycopg2 connection
+        batch_size: Terminals rebuilt per committed transaction
+
+    Returns:
+        int: Number of fault cycles stored
+    """
+    cursor = conn.cursor()
+    try:
+        ensure_fault_cycles_table(cursor)
+        # The API falls back to terminal_details until the rebuild has finished
+        cursor.execute(CLEAR_BACKFILL_MARKER_SQL)
+        conn.commit()
+
+        cursor.execute(SELECT_TERMINALS_SQL)
+        terminal_ids = [row[0] for row in cursor.fetchall()]
+        if not terminal_ids:
+            # Everything the crawler saves from now on is covered incrementally
+            log.info("No terminal_details history - nothing to rebuild")
+            cursor.execute(SET_BACKFILL_MARKER_SQL)
+            conn.commit()
+            return 0
+
+        stored = 0
+        for start in range(0, len(terminal_ids), batch_size):
+            batch = terminal_ids[start:start + batch_size]
+            cursor.execute(DELETE_TERMINAL_CYCLES_SQL, {'terminal_ids': batch})
+            cursor.execute(REBUILD_CYCLES_SQL, {'terminal_ids': batch})
+            stored += cursor.rowcount
+            conn.commit()
+            log.info(f"Rebuilt fault cycles for terminals {start + 1}-{start + len(batch)} of {len(terminal_ids)}")
+
+        cursor.execute(SET_BACKFILL_MARKER_SQL)
+        conn.commit()
+        return stored
+    except Exception as e:
+        conn.rollback()
+        log.error(f"Error rebuilding fault_cycles: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    """Main function for command line usage"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(funcName)s]: %(message)s",
+        handlers=[
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Rebuild the fault_cycles table from terminal_details status history"
+    )
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Terminals rebuilt per transaction (default: 100)')
+    args = parser.parse_args()
+
+    try:
+        from db_connector_new import db_connector
+    except ImportError:
+        log.error("Database connector not available")
+        return 1
+
+    conn = db_connector.get_db_connection()
+    if not conn:
+        log.error("Failed to connect to database")
+        return 1
+
+    try:
+        stored = rebuild_fault_cycles(conn, batch_size=args.batch_size)
+        log.info(f"✅ fault_cycles rebuilt ({stored} cycles)")
+        return 0
+    except Exception:
+        log.error("❌ fault_cycles rebuild failed")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
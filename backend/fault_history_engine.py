@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Fault History Report Engine
+===========================
+
+Finds ATM fault cycles (a terminal leaving AVAILABLE/ONLINE for a fault state
+until it returns) for GET /api/v1/atm/fault-history-report.
+
+The cycles are computed with a gaps-and-islands pass instead of a correlated
+subquery per fault start:
+1. One window pass over terminal_details marks cycle starts (fault state
+   entered from AVAILABLE/ONLINE or at the start of the range) and cycle ends
+   (AVAILABLE/ONLINE reached from a fault state)
+2. A running count of the ends seen *before* each row gives its run id: a
+   start and the end that resolves it share the same run id
+3. MIN(end time) over (terminal, run id) attaches the resolution to every
+   start in the run
+
+This is linear in the number of samples per terminal, where the previous
+`SELECT MIN(fault_end) ... WHERE fault_end > fault_start` per start was
+quadratic. Rows come back ordered by terminal and start time so they can be
+read with a server-side cursor and streamed, while FaultReportAccumulator
+builds the per-state summaries incrementally.
+"""
+
+import json
+from typing import Dict, Any, List, Optional, Set
+
+# States that open a fault cycle, and states that close it
+FAULT_STATES = ('WARNING', 'WOUNDED', 'ZOMBIE', 'OUT_OF_SERVICE')
+UP_STATES = ('AVAILABLE', 'ONLINE')
+
+# Rows fetched per round trip while streaming a report
+FAULT_REPORT_FETCH_SIZE = 500
+
+_FAULT_LIST = ", ".join(f"'{state}'" for state in FAULT_STATES)
+_UP_LIST = ", ".join(f"'{state}'" for state in UP_STATES)
+
+
+def fault_cycles_cte(sample_filter: str) -> str:
+    """
+    WITH clause ending in a `cycles` relation: every cycle start (is_start) with
+    its terminal, location, fault_state, fault_start, fault_data and fault_end
+
+    Args:
+        sample_filter: SQL condition selecting the terminal_details samples to scan
+            (placeholders in the caller's driver style)
+    """
+    return f"""
+    WITH transitions AS (
+        SELECT
+            terminal_id,
+            location,
+            fetched_status,
+            retrieved_date,
+            fault_data,
+            LAG(fetched_status) OVER (PARTITION BY terminal_id ORDER BY retrieved_date) AS prev_status
+        FROM terminal_details
+        WHERE {sample_filter}
+    ),
+    boundaries AS (
+        -- Only cycle starts and ends matter from here on
+        SELECT
+            terminal_id,
+            location,
+            fetched_status,
+            retrieved_date,
+            fault_data,
+            fetched_status IN ({_FAULT_LIST})
+                AND (prev_status IS NULL OR prev_status IN ({_UP_LIST})) AS is_start,
+            fetched_status IN ({_UP_LIST})
+                AND prev_status IN ({_FAULT_LIST}) AS is_end
+        FROM transitions
+        WHERE (fetched_status IN ({_FAULT_LIST}) AND (prev_status IS NULL OR prev_status IN ({_UP_LIST})))
+           OR (fetched_status IN ({_UP_LIST}) AND prev_status IN ({_FAULT_LIST}))
+    ),
+    runs AS (
+        -- Ends strictly before each row: a start shares its run id with the end that resolves it
+        SELECT
+            *,
+            COALESCE(SUM(is_end::int) OVER (
+                PARTITION BY terminal_id ORDER BY retrieved_date
+                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+            ), 0) AS run_id
+        FROM boundaries
+    ),
+    cycles AS (
+        SELECT
+            terminal_id,
+            location,
+            fetched_status AS fault_state,
+            retrieved_date AS fault_start,
+            fault_data,
+            is_start,
+            MIN(CASE WHEN is_end THEN retrieved_date END)
+                OVER (PARTITION BY terminal_id, run_id) AS fault_end
+        FROM runs
+    )
+"""
+
+
+# Report columns derived from a cycle's fault_data
+FAULT_DESCRIPTION_COLUMNS = """
+        COALESCE(fault_data->>'agentErrorDescription', fault_data->>'fault_description', 'No description') AS fault_description,
+        COALESCE(fault_data->>'fault_type', 'Unknown') AS fault_type,
+        COALESCE(fault_data->>'component_type', 'Unknown') AS component_type,
+        fault_data->>'agentErrorDescription' AS agent_error_description
+"""
+
+# $1/$2: report range, $3: terminal IDs (NULL for all), $4: include ongoing faults
+FAULT_CYCLES_QUERY = fault_cycles_cte(
+    "retrieved_date BETWEEN $1 AND $2 AND ($3::text[] IS NULL OR terminal_id = ANY($3::text[]))"
+) + f"""
+    SELECT
+        terminal_id,
+        location,
+        fault_state,
+        fault_start,
+        fault_end,
+        CASE
+            WHEN fault_end IS NOT NULL THEN EXTRACT(EPOCH FROM (fault_end - fault_start)) / 60
+            WHEN $2 > fault_start THEN EXTRACT(EPOCH FROM ($2 - fault_start)) / 60
+            ELSE NULL
+        END AS duration_minutes,
+        fault_end IS NOT NULL AS resolved,
+{FAULT_DESCRIPTION_COLUMNS}
+    FROM cycles
+    WHERE is_start
+      AND ($4::boolean OR fault_end IS NOT NULL)
+    ORDER BY terminal_id, fault_start
+"""
+
+# Colors used by the frontend fault history charts
+FAULT_STATE_COLORS = {
+    "WARNING": "#ffc107",
+    "WOUNDED": "#fd7e14",
+    "ZOMBIE": "#6f42c1",
+    "OUT_OF_SERVICE": "#dc3545"
+}
+
+
+class FaultReportAccumulator:
+    """Builds the report summaries and chart data one fault cycle at a time"""
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._terminals: Set[str] = set()
+        # Timeline entries are kept pre-serialized; they are a few short fields each
+        self._timeline: List[str] = []
+
+    def add(self, terminal_id: str, fault_state: str, start_time_iso: str,
+            duration_minutes: Optional[float], resolved: bool):
+        """Record one fault cycle"""
+        self._terminals.add(terminal_id)
+        state = self._states.setdefault(fault_state, {
+            'total_faults': 0, 'resolved': 0, 'ongoing': 0,
+            'duration_count': 0, 'duration_sum': 0.0, 'duration_max': None, 'duration_min': None
+        })
+        state['total_faults'] += 1
+        if resolved:
+            state['resolved'] += 1
+        else:
+            state['ongoing'] += 1
+        if duration_minutes:
+            state['duration_count'] += 1
+            state['duration_sum'] += duration_minutes
+            state['duration_max'] = duration_minutes if state['duration_max'] is None else max(state['duration_max'], duration_minutes)
+            state['duration_min'] = duration_minutes if state['duration_min'] is None else min(state['duration_min'], duration_minutes)
+
+        self._timeline.append(json.dumps({
+            "terminal_id": terminal_id,
+            "fault_state": fault_state,
+            "start_time": start_time_iso,
+            "duration_hours": round(duration_minutes / 60, 2) if duration_minutes else None,
+            "resolved": resolved
+        }))
+
+    @property
+    def terminal_count(self) -> int:
+        return len(self._terminals)
+
+    @staticmethod
+    def _summary(total: int, resolved: int, ongoing: int, count: int, total_minutes: float,
+                 max_minutes: Optional[float], min_minutes: Optional[float]) -> Dict[str, Any]:
+        return {
+            'total_faults': total,
+            'avg_duration_minutes': round(total_minutes / count, 2) if count else 0,
+            'max_duration_minutes': int(max_minutes or 0),
+            'min_duration_minutes': int(min_minutes or 0),
+            'faults_resolved': resolved,
+            'faults_ongoing': ongoing
+        }
+
+    def summary_by_state(self) -> Dict[str, Dict[str, Any]]:
+        """FaultDurationSummary fields per fault state"""
+        return {
+            state: self._summary(
+                data['total_faults'], data['resolved'], data['ongoing'], data['duration_count'],
+                data['duration_sum'], data['duration_max'], data['duration_min']
+            )
+            for state, data in self._states.items()
+        }
+
+    def overall_summary(self) -> Dict[str, Any]:
+        """FaultDurationSummary fields across every fault state"""
+        states = self._states.values()
+        maxima = [s['duration_max'] for s in states if s['duration_max'] is not None]
+        minima = [s['duration_min'] for s in states if s['duration_min'] is not None]
+        return self._summary(
+            sum(s['total_faults'] for s in states),
+            sum(s['resolved'] for s in states),
+            sum(s['ongoing'] for s in states),
+            sum(s['duration_count'] for s in states),
+            sum(s['duration_sum'] for s in states),
+            max(maxima) if maxima else None,
+            min(minima) if minima else None
+        )
+
+    def chart_data_json(self) -> str:
+        """chart_data of the report as JSON text (timeline entries are already serialized)"""
+        duration_by_state = [
+            {
+                "state": state,
+                "avg_duration_hours": round(summary['avg_duration_minutes'] / 60, 2),
+                "total_faults": summary['total_faults'],
+                "resolution_rate": round((summary['faults_resolved'] / summary['total_faults'] * 100), 2) if summary['total_faults'] > 0 else 0
+            }
+            for state, summary in self.summary_by_state().items()
+        ]
+        return (
+            '{"duration_by_state": ' + json.dumps(duration_by_state) +
+            ', "timeline_data": [' + ', '.join(self._timeline) + ']' +
+            ', "colors": ' + json.dumps(FAULT_STATE_COLORS) + '}'
+        )
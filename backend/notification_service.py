@@ -21,10 +21,11 @@ Usage:
 """
 
 import asyncio
+import base64
 import json
 import logging
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Optional, Tuple, TypeVar, Callable, Awaitable
+from typing import List, Dict, Any, Optional, Set, Tuple, TypeVar, Callable, Awaitable
 from enum import Enum
 import asyncpg
 import pytz
@@ -72,6 +73,80 @@ STATUS_SEVERITY_MAP = {
     ATMStatus.OUT_OF_SERVICE: NotificationSeverity.CRITICAL,
 }
 
+# PostgreSQL NOTIFY channel carrying notification events to every API worker
+NOTIFICATION_EVENTS_CHANNEL = 'atm_notification_events'
+
+# NOTIFY payloads must stay below 8000 bytes
+MAX_EVENT_PAYLOAD_BYTES = 7900
+
+class NotificationBroadcaster:
+    """
+    In-process fan-out of notification events to streaming subscribers
+    
+    Each subscriber (one per open SSE connection) gets its own bounded queue.
+    publish() pushes an event to every queue at once, so the number of open
+    browser tabs no longer drives database load. A subscriber that stops
+    reading loses its oldest queued events rather than blocking the others.
+    
+    Events are sent over NOTIFICATION_EVENTS_CHANNEL by whichever process
+    made the change; each API worker listens and publishes them locally
+    (handle_event), so streams on every worker receive them.
+    """
+    
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.listening: bool = False  # Channel listener connected
+        self.last_unread_count: Optional[int] = None  # Latest badge count, kept only while listening
+    
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+    
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber and return its event queue"""
+        subscriber: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: asyncio.Queue):
+        """Remove a subscriber (when its connection closes)"""
+        self._subscribers.discard(subscriber)
+    
+    def set_listening(self, listening: bool):
+        """
+        Record whether the channel listener is connected
+        
+        Events sent while it is not are missed, so the cached count is dropped
+        either way and only kept current again through published events.
+        """
+        self.listening = listening
+        self.last_unread_count = None
+    
+    def handle_event(self, payload: str):
+        """Publish an event received on NOTIFICATION_EVENTS_CHANNEL"""
+        try:
+            event = json.loads(payload)
+            self.publish(event['event'], event['data'])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed notification event: {e}")
+    
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Push one event to every subscriber"""
+        if event_type == 'unread_count' and self.listening:
+            self.last_unread_count = data.get('unread_count')
+        
+        for subscriber in list(self._subscribers):
+            if subscriber.full():
+                try:
+                    subscriber.get_nowait()  # Drop the oldest event for a slow reader
+                except asyncio.QueueEmpty:
+                    pass
+            subscriber.put_nowait((event_type, data))
+
+# Shared by the notification service and the API's streaming endpoint
+notification_broadcaster = NotificationBroadcaster()
+
 class NotificationService:
     """Service for managing ATM status change notifications"""
     
@@ -192,6 +267,36 @@ class NotificationService:
                     ON atm_status_history(terminal_id, updated_at DESC)
                 """)
                 
+                # Keyset pagination order (newest first, id breaks ties)
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_notifications_created_id 
+                    ON atm_notifications(created_at DESC, id DESC)
+                """)
+                
+                await conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_notifications_unread_created_id 
+                    ON atm_notifications(created_at DESC, id DESC) WHERE is_read = FALSE
+                """)
+                
+                # Maintained counts ('total', 'unread') so badges and list totals
+                # don't need COUNT(*) over the whole table
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS atm_notification_counters (
+                        counter_name VARCHAR(20) PRIMARY KEY,
+                        value BIGINT NOT NULL DEFAULT 0,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
+                # Seed once from existing rows (no-op when the counters already exist)
+                await conn.execute("""
+                    INSERT INTO atm_notification_counters (counter_name, value)
+                    SELECT 'total', COUNT(*) FROM atm_notifications
+                    UNION ALL
+                    SELECT 'unread', COUNT(*) FROM atm_notifications WHERE is_read = FALSE
+                    ON CONFLICT (counter_name) DO NOTHING
+                """)
+                
                 logger.info("Notification tables ensured")
         
         await self._execute_with_retry(_create_tables)
@@ -203,27 +308,15 @@ class NotificationService:
         return dt.astimezone(DILI_TIMEZONE)
     
     async def get_current_atm_statuses(self) -> Dict[str, Dict[str, Any]]:
-        """Get current ATM statuses from terminal_details table"""
+        """Get current ATM statuses from terminal_current_state table"""
         try:
             if not self.db_pool:
                 await self.init_db_pool()
             
             assert self.db_pool is not None, "Database pool should be initialized"
             
-            # Get latest status for each terminal
+            # Latest status for each terminal is maintained by the crawler on ingest
             query = """
-                WITH latest_data AS (
-                    SELECT DISTINCT ON (terminal_id)
-                        terminal_id,
-                        location,
-                        issue_state_name,
-                        serial_number,
-                        retrieved_date,
-                        fetched_status,
-                        raw_terminal_data
-                    FROM terminal_details
-                    ORDER BY terminal_id, retrieved_date DESC
-                )
                 SELECT 
                     terminal_id,
                     location,
@@ -245,7 +338,7 @@ class NotificationService:
                     retrieved_date,
                     fetched_status,
                     raw_terminal_data
-                FROM latest_data
+                FROM terminal_current_state
             """
             
             # Use connection directly without nested async context managers
@@ -303,33 +396,57 @@ class NotificationService:
             logger.warning(f"Failed to get previous statuses: {e}")
             return {}
     
-    async def update_status_history(self, current_statuses: Dict[str, Dict[str, Any]]):
-        """Update the status history table with current statuses"""
+    async def update_status_history(
+        self,
+        changed_statuses: Dict[str, Dict[str, Any]],
+        conn: Optional[asyncpg.Connection] = None
+    ):
+        """
+        Record status changes in the status history table
+        
+        Only terminals whose status changed are passed in, so the table holds one
+        row per status transition instead of one row per terminal per check.
+        All rows go in a single executemany batch.
+        
+        Args:
+            changed_statuses: Current status data for terminals whose status changed
+            conn: Connection to write on (e.g. inside the caller's transaction);
+                  a pooled connection is used when omitted
+        """
+        if not changed_statuses:
+            return
+        
+        rows = [
+            (
+                terminal_id,
+                data['status'],
+                data['location'],
+                data['issue_state_name'],
+                data['serial_number'],
+                data['fetched_status'],
+                json.dumps(data['raw_terminal_data']) if data['raw_terminal_data'] else None
+            )
+            for terminal_id, data in changed_statuses.items()
+        ]
+        query = """
+            INSERT INTO atm_status_history (
+                terminal_id, status, location, issue_state_name, 
+                serial_number, fetched_status, raw_data
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7)
+        """
+        
+        if conn is not None:
+            await conn.executemany(query, rows)
+            return
+        
         try:
             if not self.db_pool:
                 await self.init_db_pool()
                 
             assert self.db_pool is not None, "Database pool should be initialized"
             
-            conn = await self.db_pool.acquire()
-            try:
-                for terminal_id, data in current_statuses.items():
-                    await conn.execute("""
-                        INSERT INTO atm_status_history (
-                            terminal_id, status, location, issue_state_name, 
-                            serial_number, fetched_status, raw_data
-                        ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    """, 
-                        terminal_id,
-                        data['status'],
-                        data['location'],
-                        data['issue_state_name'],
-                        data['serial_number'],
-                        data['fetched_status'],
-                        json.dumps(data['raw_terminal_data']) if data['raw_terminal_data'] else None
-                    )
-            finally:
-                await self.db_pool.release(conn)
+            async with self.db_pool.acquire() as pooled_conn:
+                await pooled_conn.executemany(query, rows)
                 
         except Exception as e:
             logger.error(f"Error updating status history: {e}")
@@ -340,9 +457,18 @@ class NotificationService:
         location: str,
         previous_status: Optional[str],
         current_status: str,
-        metadata: Optional[Dict[str, Any]] = None
-    ):
-        """Create a new notification for status change"""
+        metadata: Optional[Dict[str, Any]] = None,
+        conn: Optional[asyncpg.Connection] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Create a new notification for status change
+        
+        When conn is given the insert runs on it (inside the caller's transaction)
+        and errors propagate to the caller.
+        
+        Returns:
+            The new notification in the API's response shape, or None if it failed
+        """
         severity = STATUS_SEVERITY_MAP.get(ATMStatus(current_status), NotificationSeverity.INFO)
         
         # Create notification title and message
@@ -364,36 +490,65 @@ class NotificationService:
             **(metadata or {})
         }
         
-        try:
-            if not self.db_pool:
-                await self.init_db_pool()
-                
-            assert self.db_pool is not None, "Database pool should be initialized"
-            
-            conn = await self.db_pool.acquire()
+        query = """
+            WITH inserted AS (
+                INSERT INTO atm_notifications (
+                    terminal_id, location, previous_status, current_status,
+                    severity, title, message, metadata
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                RETURNING notification_id, created_at
+            ), counted AS (
+                UPDATE atm_notification_counters
+                SET value = value + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE counter_name IN ('total', 'unread')
+            )
+            SELECT notification_id, created_at FROM inserted
+        """
+        args = (
+            terminal_id,
+            location,
+            previous_status,
+            current_status,
+            severity.value,
+            title,
+            message,
+            json.dumps(notification_metadata)
+        )
+        
+        if conn is not None:
+            row = await conn.fetchrow(query, *args)
+        else:
             try:
-                await conn.execute("""
-                    INSERT INTO atm_notifications (
-                        terminal_id, location, previous_status, current_status,
-                        severity, title, message, metadata
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-                """,
-                    terminal_id,
-                    location,
-                    previous_status,
-                    current_status,
-                    severity.value,
-                    title,
-                    message,
-                    json.dumps(notification_metadata)
-                )
-            finally:
-                await self.db_pool.release(conn)
+                if not self.db_pool:
+                    await self.init_db_pool()
+                    
+                assert self.db_pool is not None, "Database pool should be initialized"
                 
-        except Exception as e:
-            logger.error(f"Error creating notification: {e}")
+                pooled_conn = await self.db_pool.acquire()
+                try:
+                    row = await pooled_conn.fetchrow(query, *args)
+                finally:
+                    await self.db_pool.release(pooled_conn)
+                    
+            except Exception as e:
+                logger.error(f"Error creating notification: {e}")
+                return None
         
         logger.info(f"Created notification for ATM {terminal_id}: {previous_status} → {current_status}")
+        
+        return {
+            "notification_id": str(row['notification_id']),
+            "terminal_id": terminal_id,
+            "location": location,
+            "previous_status": previous_status,
+            "current_status": current_status,
+            "severity": severity.value,
+            "title": title,
+            "message": message,
+            "created_at": self.convert_to_dili_time(row['created_at']).isoformat(),
+            "is_read": False,
+            "metadata": notification_metadata
+        }
     
     async def check_status_changes(self) -> List[Dict[str, Any]]:
         """Check for ATM status changes and create notifications"""
@@ -406,34 +561,51 @@ class NotificationService:
             previous_statuses = await self.get_previous_statuses()
             
             changes = []
+            changed_statuses = {
+                terminal_id: current_data
+                for terminal_id, current_data in current_statuses.items()
+                if previous_statuses.get(terminal_id) != current_data['status']
+            }
             
-            for terminal_id, current_data in current_statuses.items():
-                current_status = current_data['status']
-                previous_status = previous_statuses.get(terminal_id)
+            if changed_statuses:
+                assert self.db_pool is not None, "Database pool should be initialized"
                 
-                # Check if status changed
-                if previous_status != current_status:
-                    await self.create_notification(
-                        terminal_id=terminal_id,
-                        location=current_data['location'],
-                        previous_status=previous_status,
-                        current_status=current_status,
-                        metadata={
-                            "serial_number": current_data['serial_number'],
-                            "issue_state_name": current_data['issue_state_name'],
-                            "fetched_status": current_data['fetched_status']
-                        }
-                    )
-                    
-                    changes.append({
-                        "terminal_id": terminal_id,
-                        "location": current_data['location'],
-                        "previous_status": previous_status,
-                        "current_status": current_status
-                    })
-            
-            # Update status history
-            await self.update_status_history(current_statuses)
+                # Notifications and their history rows commit (or roll back) together
+                async with self.db_pool.acquire() as conn:
+                    async with conn.transaction():
+                        for terminal_id, current_data in changed_statuses.items():
+                            previous_status = previous_statuses.get(terminal_id)
+                            current_status = current_data['status']
+                            
+                            notification = await self.create_notification(
+                                terminal_id=terminal_id,
+                                location=current_data['location'],
+                                previous_status=previous_status,
+                                current_status=current_status,
+                                metadata={
+                                    "serial_number": current_data['serial_number'],
+                                    "issue_state_name": current_data['issue_state_name'],
+                                    "fetched_status": current_data['fetched_status']
+                                },
+                                conn=conn
+                            )
+                            
+                            changes.append({
+                                "terminal_id": terminal_id,
+                                "location": current_data['location'],
+                                "previous_status": previous_status,
+                                "current_status": current_status,
+                                "severity": notification['severity'],
+                                "notification": notification
+                            })
+                        
+                        # Update status history (changed terminals only)
+                        await self.update_status_history(changed_statuses, conn=conn)
+                        
+                        # Delivered to every worker's streams once this commits
+                        for change in changes:
+                            await self.notify_event(conn, 'notification', change['notification'])
+                        await self.notify_unread_count(conn)
             
             if changes:
                 logger.info(f"Detected {len(changes)} status changes")
@@ -444,13 +616,103 @@ class NotificationService:
             logger.error(f"Error checking status changes: {e}")
             raise
     
+    async def get_notification_counts(self, conn: Optional[asyncpg.Connection] = None) -> Dict[str, int]:
+        """Read the maintained 'total' and 'unread' notification counters"""
+        if conn is None:
+            if not self.db_pool:
+                await self.init_db_pool()
+            
+            assert self.db_pool is not None, "Database pool should be initialized"
+            async with self.db_pool.acquire() as pooled_conn:
+                return await self.get_notification_counts(pooled_conn)
+        
+        rows = await conn.fetch("SELECT counter_name, value FROM atm_notification_counters")
+        counts = {'total': 0, 'unread': 0}
+        counts.update({row['counter_name']: max(0, row['value']) for row in rows})
+        return counts
+    
+    async def get_unread_count(self) -> int:
+        """Count unread notifications (from the maintained counter)"""
+        return (await self.get_notification_counts())['unread']
+    
+    async def recount_notifications(self) -> Dict[str, int]:
+        """Rebuild the counters from atm_notifications (repairs any drift)"""
+        if not self.db_pool:
+            await self.init_db_pool()
+        
+        assert self.db_pool is not None, "Database pool should be initialized"
+        async with self.db_pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO atm_notification_counters (counter_name, value)
+                SELECT 'total', COUNT(*) FROM atm_notifications
+                UNION ALL
+                SELECT 'unread', COUNT(*) FROM atm_notifications WHERE is_read = FALSE
+                ON CONFLICT (counter_name) DO UPDATE SET
+                    value = EXCLUDED.value,
+                    updated_at = CURRENT_TIMESTAMP
+            """)
+            return await self.get_notification_counts(conn)
+    
+    @staticmethod
+    def encode_cursor(created_at: datetime, row_id: int) -> str:
+        """Opaque pagination cursor for the (created_at, id) position of a row"""
+        raw = f"{created_at.isoformat()}|{row_id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Inverse of encode_cursor (raises ValueError for malformed cursors)"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            created_at, row_id = raw.rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(row_id)
+        except Exception as e:
+            raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+    
+    @staticmethod
+    async def notify_event(conn: asyncpg.Connection, event_type: str, data: Dict[str, Any]):
+        """
+        Send an event to every API worker's streams over NOTIFICATION_EVENTS_CHANNEL
+        
+        Inside a transaction the event is only delivered once it commits.
+        """
+        payload = json.dumps({"event": event_type, "data": data}, default=str)
+        if len(payload.encode()) > MAX_EVENT_PAYLOAD_BYTES:
+            # Metadata is the only unbounded part of an event
+            payload = json.dumps({"event": event_type, "data": {**data, "metadata": {}}}, default=str)
+        await conn.execute("SELECT pg_notify($1, $2)", NOTIFICATION_EVENTS_CHANNEL, payload)
+    
+    async def notify_unread_count(self, conn: asyncpg.Connection):
+        """Send the unread count as read on conn (see notify_event)"""
+        counts = await self.get_notification_counts(conn)
+        await self.notify_event(conn, 'unread_count', {
+            "unread_count": counts['unread'],
+            "timestamp": datetime.now(DILI_TIMEZONE).isoformat()
+        })
+    
     async def get_notifications(
         self,
         unread_only: bool = False,
         limit: int = 50,
-        offset: int = 0
-    ) -> Tuple[List[Dict[str, Any]], int]:
-        """Get notifications with pagination"""
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
+        """
+        Get notifications, newest first, with keyset pagination
+        
+        Pages are keyed on (created_at, id): pass the returned next_cursor to get
+        the following page. Each page is an index range scan of `limit` rows and
+        the total comes from the maintained counters, so the cost does not grow
+        with the size of atm_notifications. offset is only used when no cursor
+        is given (legacy page-number callers).
+        
+        Returns:
+            Tuple of (notifications, total_count, next_cursor); next_cursor is
+            None on the last page
+        """
+        # Malformed cursors are the caller's error, not a reason to retry
+        cursor_position = self.decode_cursor(cursor) if cursor else None
+        
         # Try to reconnect if pool is not available or closed
         max_retries = 2
         for attempt in range(max_retries):
@@ -463,16 +725,23 @@ class NotificationService:
                 
                 assert self.db_pool is not None, "Database pool should be initialized"    
                 async with self.db_pool.acquire() as conn:
-                    # Build query
-                    where_clause = "WHERE is_read = FALSE" if unread_only else ""
+                    conditions = ["is_read = FALSE"] if unread_only else []
+                    params: List[Any] = []
+                    if cursor_position:
+                        conditions.append("(created_at, id) < ($1, $2)")
+                        params.extend(cursor_position)
+                    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
                     
-                    # Get total count
-                    count_query = f"SELECT COUNT(*) FROM atm_notifications {where_clause}"
-                    total_count = await conn.fetchval(count_query)
+                    # Fetch one extra row to learn whether another page exists
+                    params.append(limit + 1)
+                    limit_clause = f"LIMIT ${len(params)}"
+                    if offset and not cursor_position:
+                        params.append(offset)
+                        limit_clause += f" OFFSET ${len(params)}"
                     
-                    # Get notifications
                     query = f"""
                         SELECT 
+                            id,
                             notification_id,
                             terminal_id,
                             location,
@@ -487,11 +756,19 @@ class NotificationService:
                             metadata
                         FROM atm_notifications
                         {where_clause}
-                        ORDER BY created_at DESC
-                        LIMIT $1 OFFSET $2
+                        ORDER BY created_at DESC, id DESC
+                        {limit_clause}
                     """
                     
-                    rows = await conn.fetch(query, limit, offset)
+                    rows = await conn.fetch(query, *params)
+                    
+                    next_cursor = None
+                    if len(rows) > limit:
+                        rows = rows[:limit]
+                        next_cursor = self.encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+                    
+                    counts = await self.get_notification_counts(conn)
+                    total_count = counts['unread'] if unread_only else counts['total']
                     
                     notifications = []
                     for row in rows:
@@ -511,20 +788,20 @@ class NotificationService:
                         }
                         notifications.append(notification)
                     
-                    return notifications, total_count
+                    return notifications, total_count, next_cursor
                     
             except Exception as e:
                 logger.error(f"Error getting notifications (attempt {attempt + 1}): {e}")
                 if attempt == max_retries - 1:
                     # Last attempt failed, return empty results
                     logger.error("All attempts failed, returning empty results")
-                    return [], 0
+                    return [], 0, None
                 else:
                     # Wait before retrying
                     await asyncio.sleep(1)
         
         # This should not be reached, but just in case
-        return [], 0
+        return [], 0, None
     
     async def mark_notification_read(self, notification_id: str) -> bool:
         """Mark a notification as read"""
@@ -539,13 +816,32 @@ class NotificationService:
                 
                 assert self.db_pool is not None, "Database pool should be initialized"    
                 async with self.db_pool.acquire() as conn:
-                    result = await conn.execute("""
-                        UPDATE atm_notifications 
-                        SET is_read = TRUE, read_at = CURRENT_TIMESTAMP 
-                        WHERE notification_id = $1
-                    """, notification_id)
-                    
-                    return result == "UPDATE 1"
+                    async with conn.transaction():
+                        # is_read is re-checked under the row lock, so of concurrent
+                        # mark-reads only one gets the row back and decrements
+                        marked = await conn.fetchval("""
+                            UPDATE atm_notifications
+                            SET is_read = TRUE, read_at = CURRENT_TIMESTAMP 
+                            WHERE notification_id = $1
+                              AND is_read = FALSE
+                            RETURNING id
+                        """, notification_id)
+                        
+                        if marked is None:
+                            # Already read, or no such notification
+                            return await conn.fetchval(
+                                "SELECT EXISTS (SELECT 1 FROM atm_notifications WHERE notification_id = $1)",
+                                notification_id
+                            )
+                        
+                        await conn.execute("""
+                            UPDATE atm_notification_counters
+                            SET value = GREATEST(value - 1, 0), updated_at = CURRENT_TIMESTAMP
+                            WHERE counter_name = 'unread'
+                        """)
+                        await self.notify_unread_count(conn)
+                
+                return True
                     
             except Exception as e:
                 logger.error(f"Error marking notification as read (attempt {attempt + 1}): {e}")
@@ -564,15 +860,25 @@ class NotificationService:
         
         assert self.db_pool is not None, "Database pool should be initialized"    
         async with self.db_pool.acquire() as conn:
-            result = await conn.execute("""
-                UPDATE atm_notifications 
-                SET is_read = TRUE, read_at = CURRENT_TIMESTAMP 
-                WHERE is_read = FALSE
+            count = await conn.fetchval("""
+                WITH updated AS (
+                    UPDATE atm_notifications 
+                    SET is_read = TRUE, read_at = CURRENT_TIMESTAMP 
+                    WHERE is_read = FALSE
+                    RETURNING 1
+                ), counted AS (
+                    UPDATE atm_notification_counters
+                    SET value = GREATEST(value - (SELECT COUNT(*) FROM updated), 0),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE counter_name = 'unread'
+                )
+                SELECT COUNT(*) FROM updated
             """)
             
-            # Extract number from result like "UPDATE 5"
-            count = int(result.split()[-1]) if result.startswith("UPDATE") else 0
-            return count
+            if count:
+                await self.notify_unread_count(conn)
+        
+        return count
     
     async def cleanup_old_notifications(self, days_old: int = 30) -> int:
         """Clean up notifications older than specified days"""
@@ -583,19 +889,75 @@ class NotificationService:
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_old)
         
         async with self.db_pool.acquire() as conn:
-            result = await conn.execute("""
-                DELETE FROM atm_notifications 
-                WHERE created_at < $1
+            deleted = await conn.fetchrow("""
+                WITH deleted AS (
+                    DELETE FROM atm_notifications 
+                    WHERE created_at < $1
+                    RETURNING is_read
+                ), counted AS (
+                    UPDATE atm_notification_counters
+                    SET value = GREATEST(value - CASE counter_name
+                            WHEN 'total' THEN (SELECT COUNT(*) FROM deleted)
+                            ELSE (SELECT COUNT(*) FROM deleted WHERE NOT is_read)
+                        END, 0),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE counter_name IN ('total', 'unread')
+                )
+                SELECT COUNT(*) as total, COUNT(*) FILTER (WHERE NOT is_read) as unread FROM deleted
             """, cutoff_date)
             
-            # Also cleanup old status history
+            # Also cleanup old status history, keeping each terminal's latest row:
+            # history is change-only, so that row is the baseline for the next check
             await conn.execute("""
                 DELETE FROM atm_status_history 
                 WHERE updated_at < $1
+                  AND id NOT IN (
+                      SELECT DISTINCT ON (terminal_id) id
+                      FROM atm_status_history
+                      ORDER BY terminal_id, updated_at DESC, id DESC
+                  )
             """, cutoff_date)
             
-            count = int(result.split()[-1]) if result.startswith("DELETE") else 0
+            count = deleted['total']
             logger.info(f"Cleaned up {count} old notifications")
+            
+            if count:
+                # Also tells every worker to drop its cached notification lists
+                await self.notify_unread_count(conn)
+        return count
+
+    async def compact_status_history(self) -> int:
+        """
+        Collapse runs of identical consecutive statuses in atm_status_history
+        
+        One-off cleanup for history written before it became change-only: for
+        each terminal only the first row of every run of the same status is kept,
+        so the remaining rows are exactly the status transitions.
+        
+        Returns:
+            int: Number of rows deleted
+        """
+        if not self.db_pool:
+            await self.init_db_pool()
+        
+        assert self.db_pool is not None, "Database pool should be initialized"
+        
+        async with self.db_pool.acquire() as conn:
+            result = await conn.execute("""
+                DELETE FROM atm_status_history h
+                USING (
+                    SELECT
+                        id,
+                        status,
+                        LAG(status) OVER (PARTITION BY terminal_id ORDER BY updated_at, id) as previous_status
+                    FROM atm_status_history
+                ) runs
+                WHERE h.id = runs.id
+                  AND runs.previous_status = runs.status
+            """)
+            
+            count = int(result.split()[-1]) if result.startswith("DELETE") else 0
+            logger.info(f"Compacted atm_status_history: removed {count} repeated status rows")
             return count
 
 # Singleton instance
@@ -613,6 +975,28 @@ async def run_status_check():
     finally:
         await notification_service.close_db_pool()
 
+async def run_history_compaction():
+    """Standalone function to compact the status history table"""
+    try:
+        removed = await notification_service.compact_status_history()
+        print(f"Status history compaction completed. Removed {removed} repeated rows.")
+        return removed
+    except Exception as e:
+        print(f"Error during status history compaction: {e}")
+        return 0
+    finally:
+        await notification_service.close_db_pool()
+
 if __name__ == "__main__":
-    # For standalone testing
-    asyncio.run(run_status_check())
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="ATM status change notification service")
+    parser.add_argument('--compact-history', action='store_true',
+                        help='Collapse runs of identical consecutive statuses in atm_status_history and exit')
+    args = parser.parse_args()
+    
+    if args.compact_history:
+        asyncio.run(run_history_compaction())
+    else:
+        # For standalone testing
+        asyncio.run(run_status_check())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Pool for the User Management API
+=================================================
+
+bcrypt is deliberately slow (tens to hundreds of milliseconds per call). Run
+directly inside an async handler it stalls every other request on the worker,
+so hashing and verification are submitted to a small dedicated thread pool
+instead. bcrypt releases the GIL while it works, so threads give real
+parallelism without the pickling cost of a process pool.
+
+The pool size caps how many bcrypt operations run at once; anything beyond
+that waits in the executor queue. Queue wait and run time are recorded so a
+login burst shows up as queueing rather than as unexplained latency.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+import logging
+
+import bcrypt
+
+from performance_metrics import LatencyHistogram
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """Runs bcrypt hash/verify on a bounded thread pool and records queue metrics"""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queue_wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            return self._executor
+
+    def _timed(self, submitted_at: float, func, *args):
+        """Executed on a pool thread: record queue wait, then run func"""
+        started_at = time.perf_counter()
+        with self._lock:
+            self.waiting -= 1
+            self.running += 1
+            self.queue_wait.observe(started_at - submitted_at)
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.run_time.observe(time.perf_counter() - started_at)
+
+    async def _submit(self, func, *args):
+        executor = self._get_executor()
+        with self._lock:
+            self.waiting += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                executor, self._timed, time.perf_counter(), func, *args
+            )
+        except RuntimeError:
+            # Executor already shut down, so the job was never queued
+            with self._lock:
+                self.waiting -= 1
+            raise
+        return await future
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with a fresh salt"""
+        hashed = await self._submit(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt())
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Check a password against its bcrypt hash"""
+        return await self._submit(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def shutdown(self):
+        """Stop the pool (queued jobs are finished first)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool occupancy and queue wait / run time summaries (milliseconds)"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'running': self.running,
+                'waiting': self.waiting,
+                'completed': self.completed,
+                'queue_wait': self.queue_wait.summary(),
+                'run_time': self.run_time.summary()
+            }
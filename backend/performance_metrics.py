@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Runtime Performance Metrics for the ATM Dashboard API
+=====================================================
+
+Collects measured (not estimated) performance data for the
+/api/v1/performance/* endpoints:
+1. Per-route request latency histograms (recorded by the API middleware)
+2. Database time per query name, using the same ``query_stats`` shape as
+   DatabaseOptimizer.execute_optimized_query
+3. Connection pool wait time
+4. Response cache hit/miss counts per route
+
+All data lives in process memory and is reset on restart. Values can be
+exported as JSON or in the Prometheus text exposition format.
+"""
+
+import re
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (Prometheus default buckets)
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Table name used to label a query when no explicit name is given
+_TABLE_PATTERN = re.compile(r'\bFROM\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with count, sum and max"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        """Record one observation"""
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct: float) -> float:
+        """Estimate a percentile as the upper bound of the bucket that contains it (capped at max)"""
+        if self.count == 0:
+            return 0.0
+        target = pct / 100 * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(self.buckets[index], self.max) if index < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-friendly summary in milliseconds"""
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 2),
+            'p95_ms': round(self.percentile(95) * 1000, 2),
+            'p99_ms': round(self.percentile(99) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2)
+        }
+
+
+class PerformanceMetrics:
+    """In-process collector behind the /api/v1/performance endpoints"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear all collected metrics"""
+        self.started_at = datetime.utcnow()
+        self.route_latency: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.route_status: Dict[Tuple[str, str, int], int] = {}
+        self.route_cache: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.query_stats: Dict[str, Dict[str, Any]] = {}
+        self.pool_wait = LatencyHistogram()
+
+    def record_request(self, route: str, method: str, status_code: int, duration: float,
+                       cache_status: Optional[str] = None):
+        """Record one HTTP request (called by the API middleware)"""
+        key = (route, method)
+        histogram = self.route_latency.get(key)
+        if histogram is None:
+            histogram = self.route_latency[key] = LatencyHistogram()
+        histogram.observe(duration)
+
+        status_key = (route, method, status_code)
+        self.route_status[status_key] = self.route_status.get(status_key, 0) + 1
+
+        if cache_status or status_code == 304:
+            cache_counts = self.route_cache.setdefault(key, {'hit': 0, 'miss': 0, 'not_modified': 0})
+            if status_code == 304:
+                cache_counts['not_modified'] += 1
+            elif cache_status.upper() == 'HIT':
+                cache_counts['hit'] += 1
+            else:
+                cache_counts['miss'] += 1
+
+    def record_query(self, query_name: str, execution_time: float, failed: bool = False):
+        """Record one database query (same shape as DatabaseOptimizer.query_stats)"""
+        if query_name not in self.query_stats:
+            self.query_stats[query_name] = {
+                'count': 0,
+                'total_time': 0,
+                'avg_time': 0,
+                'max_time': 0,
+                'min_time': float('inf'),
+                'errors': 0
+            }
+
+        stats = self.query_stats[query_name]
+        stats['count'] += 1
+        stats['total_time'] += execution_time
+        stats['avg_time'] = stats['total_time'] / stats['count']
+        stats['max_time'] = max(stats['max_time'], execution_time)
+        stats['min_time'] = min(stats['min_time'], execution_time)
+        if failed:
+            stats['errors'] += 1
+
+    def record_pool_wait(self, wait_time: float):
+        """Record time spent waiting to acquire a pooled connection"""
+        self.pool_wait.observe(wait_time)
+
+    @staticmethod
+    def query_name(prefix: str, query: str) -> str:
+        """Derive a stable query name from the calling endpoint and the first table read"""
+        match = _TABLE_PATTERN.search(query or '')
+        return f"{prefix}:{match.group(1)}" if match else prefix
+
+    def get_route_stats(self) -> List[Dict[str, Any]]:
+        """Per-route latency summaries, slowest p95 first"""
+        routes = []
+        for (route, method), histogram in self.route_latency.items():
+            entry = {'route': route, 'method': method, **histogram.summary()}
+            entry['status_codes'] = {
+                str(status): count for (r, m, status), count in self.route_status.items()
+                if r == route and m == method
+            }
+            if (route, method) in self.route_cache:
+                entry['cache'] = dict(self.route_cache[(route, method)])
+            routes.append(entry)
+        return sorted(routes, key=lambda r: r['p95_ms'], reverse=True)
+
+    def get_query_stats(self) -> List[Dict[str, Any]]:
+        """Per-query database time, highest total time first"""
+        queries = []
+        for name, stats in self.query_stats.items():
+            queries.append({
+                'query_name': name,
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'total_time': round(stats['total_time'], 4),
+                'avg_time': round(stats['avg_time'], 4),
+                'max_time': round(stats['max_time'], 4),
+                'min_time': round(stats['min_time'], 4) if stats['count'] else 0
+            })
+        return sorted(queries, key=lambda q: q['total_time'], reverse=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All collected metrics as a JSON-friendly dict"""
+        return {
+            'collecting_since': self.started_at.isoformat(),
+            'uptime_seconds': round((datetime.utcnow() - self.started_at).total_seconds(), 1),
+            'routes': self.get_route_stats(),
+            'queries': self.get_query_stats(),
+            'pool_wait': self.pool_wait.summary()
+        }
+
+    def render_prometheus(self, cache_stats: Optional[Dict[str, Any]] = None,
+                          pool_info: Optional[Dict[str, Any]] = None) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+
+        def label_str(labels: Dict[str, Any]) -> str:
+            escaped = (
+                f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                for k, v in labels.items()
+            )
+            return '{' + ','.join(escaped) + '}'
+
+        def histogram_lines(name: str, histogram: LatencyHistogram, labels: Dict[str, Any]):
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{label_str({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{name}_bucket{label_str({**labels, 'le': '+Inf'})} {histogram.count}")
+            lines.append(f"{name}_sum{label_str(labels)} {histogram.total:.6f}")
+            lines.append(f"{name}_count{label_str(labels)} {histogram.count}")
+
+        lines.append("# HELP atm_api_request_duration_seconds HTTP request latency by route")
+        lines.append("# TYPE atm_api_request_duration_seconds histogram")
+        for (route, method), histogram in sorted(self.route_latency.items()):
+            histogram_lines('atm_api_request_duration_seconds', histogram, {'route': route, 'method': method})
+
+        lines.append("# HELP atm_api_requests_total HTTP requests by route and status code")
+        lines.append("# TYPE atm_api_requests_total counter")
+        for (route, method, status), count in sorted(self.route_status.items()):
+            lines.append(f"atm_api_requests_total{label_str({'route': route, 'method': method, 'status': status})} {count}")
+
+        lines.append("# HELP atm_api_route_cache_total Response cache outcomes by route")
+        lines.append("# TYPE atm_api_route_cache_total counter")
+        for (route, method), counts in sorted(self.route_cache.items()):
+            for outcome, count in counts.items():
+                lines.append(f"atm_api_route_cache_total{label_str({'route': route, 'method': method, 'outcome': outcome})} {count}")
+
+        lines.append("# HELP atm_api_db_query_seconds_total Database time by query name")
+        lines.append("# TYPE atm_api_db_query_seconds_total counter")
+        for name, stats in sorted(self.query_stats.items()):
+            lines.append(f"atm_api_db_query_seconds_total{label_str({'query': name})} {stats['total_time']:.6f}")
+        lines.append("# HELP atm_api_db_queries_total Database queries by query name")
+        lines.append("# TYPE atm_api_db_queries_total counter")
+        for name, stats in sorted(self.query_stats.items()):
+            lines.append(f"atm_api_db_queries_total{label_str({'query': name})} {stats['count']}")
+        lines.append("# HELP atm_api_db_query_errors_total Failed database queries by query name")
+        lines.append("# TYPE atm_api_db_query_errors_total counter")
+        for name, stats in sorted(self.query_stats.items()):
+            lines.append(f"atm_api_db_query_errors_total{label_str({'query': name})} {stats['errors']}")
+
+        lines.append("# HELP atm_api_db_pool_wait_seconds Time spent waiting for a pooled connection")
+        lines.append("# TYPE atm_api_db_pool_wait_seconds histogram")
+        histogram_lines('atm_api_db_pool_wait_seconds', self.pool_wait, {})
+
+        if pool_info:
+            for key in ('size', 'idle', 'min_size', 'max_size'):
+                if pool_info.get(key) is not None:
+                    lines.append(f"# TYPE atm_api_db_pool_{key} gauge")
+                    lines.append(f"atm_api_db_pool_{key} {pool_info[key]}")
+
+        if cache_stats:
+            counters = {
+                'cache_hits': 'atm_api_cache_hits_total',
+                'cache_misses': 'atm_api_cache_misses_total',
+                'invalidations': 'atm_api_cache_invalidations_total',
+                'evictions': 'atm_api_cache_evictions_total',
+                'not_modified_responses': 'atm_api_cache_not_modified_total'
+            }
+            for key, metric in counters.items():
+                if key in cache_stats:
+                    lines.append(f"# TYPE {metric} counter")
+                    lines.append(f"{metric} {cache_stats[key]}")
+            if 'cached_entries' in cache_stats:
+                lines.append("# TYPE atm_api_cache_entries gauge")
+                lines.append(f"atm_api_cache_entries {cache_stats['cached_entries']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+# Global metrics instance
+performance_metrics = PerformanceMetrics()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Fleet-wide Predictive Analytics Engine
+======================================
+
+Scores every terminal of the fleet in one pass for the predictive analytics
+summary endpoint:
+1. All fault rows for the analysis window are fetched with a single query
+   (instead of one fault_data query per terminal)
+2. The JSONB fault entries are flattened once into a columnar DataFrame and
+   their creation dates parsed once per column
+3. Component keyword matches, severity penalties, health scores, risk scores
+   and risk levels are computed with vectorized pandas/numpy operations and a
+   single groupby over terminal_id
+
+Scoring follows fault_classifier (used by the per-terminal endpoint) and
+predict_atm_failure in api_option_2_fastapi_fixed.py: a component loses
+12/6/8 points per fault in the last 30 days depending on its severity
+keywords, and the failure risk combines the average component health with
+the faults of the last 7 days.
+"""
+
+import json
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable
+import logging
+
+import numpy as np
+import pandas as pd
+
+from fault_classifier import (
+    COMPONENT_KEYWORDS, CRITICAL_KEYWORDS, WARNING_KEYWORDS,
+    CRITICAL_IMPACT, WARNING_IMPACT, DEFAULT_IMPACT,
+    COMPONENT_TYPES, COMPONENT_WINDOW_DAYS, RECENT_WINDOW_DAYS, CREATION_DATE_FORMAT, parse_creation_date
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Components scored by the fleet summary: the same set as the stored scores
+# (predictive_scores), so risk and critical component counts mean the same in both
+SUMMARY_COMPONENT_TYPES = COMPONENT_TYPES
+
+FLEET_FAULTS_QUERY = """
+    SELECT terminal_id, location, fault_data
+    FROM (
+        SELECT
+            terminal_id, location, fault_data, retrieved_date,
+            MAX(retrieved_date) OVER (PARTITION BY terminal_id) AS latest_retrieved
+        FROM terminal_details
+        WHERE retrieved_date >= NOW() - make_interval(days => $1)
+            AND fault_data IS NOT NULL
+    ) windowed
+    WHERE latest_retrieved >= NOW() - make_interval(days => $2)
+    ORDER BY terminal_id, retrieved_date DESC
+"""
+
+FRAME_COLUMNS = ['terminal_id', 'location', 'description', 'external_fault_id', 'creation_date']
+
+
+def _keyword_pattern(keywords: Iterable[str]) -> str:
+    """Case-insensitive alternation of literal keywords"""
+    return '|'.join(re.escape(keyword.lower()) for keyword in keywords)
+
+
+COMPONENT_PATTERNS = {component: _keyword_pattern(keywords) for component, keywords in COMPONENT_KEYWORDS.items()}
+CRITICAL_PATTERN = _keyword_pattern(CRITICAL_KEYWORDS)
+WARNING_PATTERN = _keyword_pattern(WARNING_KEYWORDS)
+
+
+def build_fault_frame(rows: Iterable[Any]) -> pd.DataFrame:
+    """
+    Flatten terminal_details rows into one row per fault entry
+
+    Args:
+        rows: Records with terminal_id, location and fault_data (JSONB object,
+            list of objects, or its JSON text)
+
+    Returns:
+        DataFrame with FRAME_COLUMNS; location is the latest one per terminal
+    """
+    terminal_ids: List[str] = []
+    locations: List[Optional[str]] = []
+    descriptions: List[str] = []
+    external_ids: List[str] = []
+    creation_dates: List[Any] = []
+
+    for row in rows:
+        fault_data = row['fault_data']
+        if isinstance(fault_data, str):
+            try:
+                fault_data = json.loads(fault_data)
+            except json.JSONDecodeError:
+                continue
+        if isinstance(fault_data, dict):
+            faults = [fault_data]
+        elif isinstance(fault_data, list):
+            faults = [item for item in fault_data if isinstance(item, dict)]
+        else:
+            continue
+
+        for fault in faults:
+            terminal_ids.append(row['terminal_id'])
+            locations.append(row['location'])
+            descriptions.append(fault.get('agentErrorDescription') or '')
+            external_ids.append(fault.get('externalFaultId') or '')
+            creation_dates.append(fault.get('creationDate'))
+
+    frame = pd.DataFrame({
+        'terminal_id': terminal_ids,
+        'location': locations,
+        'description': pd.Series(descriptions, dtype=object).astype(str).str.lower(),
+        'external_fault_id': pd.Series(external_ids, dtype=object).astype(str).str.lower(),
+        'creation_date': pd.Series(creation_dates, dtype=object)
+    }, columns=FRAME_COLUMNS)
+    return frame
+
+
+def _parse_single_date(value: Any) -> Optional[datetime]:
+    try:
+        return parse_creation_date(value)
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None
+
+
+def parse_creation_dates(values: pd.Series) -> pd.DataFrame:
+    """
+    Parse a column of creationDate values in one go
+
+    Handles the crawler's "dd:mm:YYYY HH:MM:SS" strings, ISO strings and
+    epoch milliseconds.
+
+    Returns:
+        DataFrame with `fault_date` (naive local time like datetime.now(), NaT
+        when unknown) and
+        `has_date` (a value was present, even if it could not be parsed)
+    """
+    has_date = values.notna() & (values.astype(str) != '')
+    strings = values.where(values.map(lambda v: isinstance(v, str)))
+    numbers = pd.to_numeric(values.where(values.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool))),
+                            errors='coerce')
+
+    parsed = pd.to_datetime(strings, format=CREATION_DATE_FORMAT, errors='coerce')
+    # ISO strings and epoch values are rare; parse them with fault_classifier so they get
+    # the same local-time conversion (including the DST offset in effect at each date)
+    other_mask = (parsed.isna() & strings.notna()) | numbers.notna()
+    if other_mask.any():
+        parsed.loc[other_mask] = pd.to_datetime(values[other_mask].map(_parse_single_date))
+
+    return pd.DataFrame({'fault_date': parsed, 'has_date': has_date})
+
+
+def _risk_level_from_health(health: np.ndarray) -> np.ndarray:
+    return np.select([health >= 85, health >= 70, health >= 50], ["LOW", "MEDIUM", "HIGH"], default="CRITICAL")
+
+
+def score_fleet(frame: pd.DataFrame, component_types: Optional[List[str]] = None,
+                now: Optional[datetime] = None) -> pd.DataFrame:
+    """
+    Score every terminal in the fault frame in one vectorized pass
+
+    Args:
+        frame: Output of build_fault_frame
+        component_types: Components to score (default: SUMMARY_COMPONENT_TYPES)
+        now: Reference time for the 30/7 day windows (default: datetime.now())
+
+    Returns:
+        One row per terminal with location, overall_health_score, risk_score,
+        risk_level, prediction_horizon, confidence, critical_components,
+        recent_faults and a `<COMPONENT>_health` / `<COMPONENT>_faults` column
+        pair per component
+    """
+    component_types = component_types or SUMMARY_COMPONENT_TYPES
+    now = now or datetime.now()
+    if frame.empty:
+        return pd.DataFrame()
+
+    dates = parse_creation_dates(frame['creation_date'])
+    fault_date = dates['fault_date']
+    parse_failed = dates['has_date'] & fault_date.isna()
+
+    # As in the per-terminal scorer: undated faults count towards component health,
+    # and dates that fail to parse count as recent
+    in_component_window = (fault_date >= now - timedelta(days=COMPONENT_WINDOW_DAYS)) | fault_date.isna()
+    is_recent = (fault_date >= now - timedelta(days=RECENT_WINDOW_DAYS)) | parse_failed
+
+    description = frame['description']
+    severity = np.select(
+        [description.str.contains(CRITICAL_PATTERN, regex=True), description.str.contains(WARNING_PATTERN, regex=True)],
+        [CRITICAL_IMPACT, WARNING_IMPACT],
+        default=DEFAULT_IMPACT
+    )
+
+    columns: Dict[str, Any] = {'terminal_id': frame['terminal_id'], 'recent': is_recent.astype(np.int64)}
+    for component in component_types:
+        pattern = COMPONENT_PATTERNS[component]
+        matched = (
+            description.str.contains(pattern, regex=True) |
+            frame['external_fault_id'].str.contains(pattern, regex=True)
+        ) & in_component_window
+        columns[f'{component}_faults'] = matched.astype(np.int64)
+        columns[f'{component}_penalty'] = np.where(matched, severity, 0)
+
+    per_terminal = pd.DataFrame(columns).groupby('terminal_id', sort=True).sum()
+    locations = frame.groupby('terminal_id', sort=True)['location'].first()
+
+    health_columns = []
+    for component in component_types:
+        health = np.clip(100 - per_terminal[f'{component}_penalty'].to_numpy(dtype=float), 0, 100)
+        per_terminal[f'{component}_health'] = np.round(health, 1)
+        health_columns.append(f'{component}_health')
+
+    health_matrix = per_terminal[health_columns].to_numpy(dtype=float)
+    overall_health = health_matrix.mean(axis=1)
+    recent_faults = per_terminal['recent'].to_numpy()
+
+    risk_score = (100 - overall_health) * 0.6 + np.minimum(recent_faults * 15, 40)
+    risk_score = np.clip(risk_score, 0, 100)
+    risk_bands = [risk_score < 25, risk_score < 50, risk_score < 75]
+
+    return pd.DataFrame({
+        'terminal_id': per_terminal.index,
+        'location': locations.reindex(per_terminal.index).to_numpy(),
+        'overall_health_score': np.round(overall_health, 1),
+        'risk_score': np.round(risk_score, 1),
+        'risk_level': np.select(risk_bands, ["LOW", "MEDIUM", "HIGH"], default="CRITICAL"),
+        'prediction_horizon': np.select(risk_bands, ["30+ days", "14-30 days", "7-14 days"], default="1-7 days"),
+        'confidence': np.select(risk_bands, [75, 80, 85], default=90),
+        'critical_components': (_risk_level_from_health(health_matrix) == "CRITICAL").sum(axis=1),
+        'recent_faults': recent_faults,
+        **{f'{component}_health': per_terminal[f'{component}_health'].to_numpy() for component in component_types},
+        **{f'{component}_faults': per_terminal[f'{component}_faults'].to_numpy() for component in component_types}
+    }).reset_index(drop=True)
+
+
+def summarize_fleet(rows: Iterable[Any], component_types: Optional[List[str]] = None,
+                    now: Optional[datetime] = None) -> pd.DataFrame:
+    """Build the fault frame from query rows and score it, sorted by risk score (highest first)"""
+    scores = score_fleet(build_fault_frame(rows), component_types, now)
+    if scores.empty:
+        return scores
+    return scores.sort_values(['risk_score', 'terminal_id'], ascending=[False, True], kind='stable').reset_index(drop=True)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Precomputed Predictive Analytics Scores
+
+Maintains the atm_predictive_scores table: per terminal, one row per
+component (health score, risk, fault frequency) plus an OVERALL row with the
+terminal's failure prediction. The predictive analytics endpoints read this
+table with a primary-key lookup instead of re-scoring raw JSONB fault data on
+every page view.
+
+The crawler rescores terminals from each batch it saves (see
+CombinedATMRetriever.save_terminal_details_to_new_table), so the scoring runs
+once per ingest cycle rather than once per viewer. Only terminals whose scores
+can have changed are rescored: a new sample carries a fault, or their stored
+scores are older than SCORES_MAX_AGE_HOURS (faults age out of the windows).
+This script rebuilds the table for every terminal with fault data in the
+analysis window.
+
+Usage:
+    python predictive_scores.py [--analysis-days DAYS] [--batch-size TERMINALS]
+"""
+
+import argparse
+import json
+import sys
+import logging
+from collections import defaultdict
+from statistics import mean
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fault_classifier import COMPONENT_TYPES, score_fault_history, predict_failure
+
+log = logging.getLogger("PredictiveScores")
+
+# Fault history window used for the stored scores (the endpoint's default analysis_days)
+SCORES_ANALYSIS_DAYS = 30
+
+# Terminals without new faults are rescored once their scores are this old; well
+# inside the 7 days after which the fleet summary stops listing a terminal
+SCORES_MAX_AGE_HOURS = 6
+
+# component_type of the terminal-level prediction row
+OVERALL_COMPONENT = "OVERALL"
+
+CREATE_SCORES_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS atm_predictive_scores (
+        terminal_id VARCHAR(50) NOT NULL,
+        component_type VARCHAR(30) NOT NULL,
+        location TEXT,
+        health_score REAL NOT NULL,
+        risk_level VARCHAR(10) NOT NULL,
+        risk_score REAL,
+        prediction_horizon VARCHAR(20),
+        confidence REAL,
+        contributing_factors JSONB,
+        fault_frequency INTEGER NOT NULL DEFAULT 0,
+        last_fault_date TIMESTAMP,
+        data_points INTEGER NOT NULL DEFAULT 0,
+        analysis_days INTEGER NOT NULL,
+        as_of TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (terminal_id, component_type)
+    )
+"""
+
+# Fleet summary: OVERALL rows ordered by risk
+CREATE_OVERALL_INDEX_SQL = f"""
+    CREATE INDEX IF NOT EXISTS idx_atm_predictive_scores_overall_risk
+    ON atm_predictive_scores (risk_score DESC)
+    WHERE component_type = '{OVERALL_COMPONENT}'
+"""
+
+# Fault rows of the given terminals inside the analysis window, newest first
+SELECT_FAULT_HISTORY_SQL = """
+    SELECT terminal_id, location, fault_data
+    FROM terminal_details
+    WHERE terminal_id = ANY(%(terminal_ids)s)
+      AND retrieved_date >= NOW() - make_interval(days => %(days)s)
+      AND fault_data IS NOT NULL
+    ORDER BY terminal_id, retrieved_date DESC
+"""
+
+# Terminals of a batch whose stored scores are missing or older than max_age_hours
+SELECT_STALE_TERMINALS_SQL = f"""
+    SELECT t.terminal_id
+    FROM unnest(%(terminal_ids)s::text[]) AS t (terminal_id)
+    LEFT JOIN atm_predictive_scores p
+        ON p.terminal_id = t.terminal_id AND p.component_type = '{OVERALL_COMPONENT}'
+    WHERE p.as_of IS NULL
+       OR p.as_of < NOW() - make_interval(hours => %(max_age_hours)s)
+"""
+
+SELECT_TERMINALS_SQL = """
+    SELECT DISTINCT terminal_id
+    FROM terminal_details
+    WHERE retrieved_date >= NOW() - make_interval(days => %(days)s)
+      AND fault_data IS NOT NULL
+    ORDER BY terminal_id
+"""
+
+UPSERT_SCORES_SQL = """
+    INSERT INTO atm_predictive_scores (
+        terminal_id, component_type, location, health_score, risk_level, risk_score,
+        prediction_horizon, confidence, contributing_factors, fault_frequency,
+        last_fault_date, data_points, analysis_days, as_of
+    ) VALUES %s
+    ON CONFLICT (terminal_id, component_type) DO UPDATE SET
+        location = EXCLUDED.location,
+        health_score = EXCLUDED.health_score,
+        risk_level = EXCLUDED.risk_level,
+        risk_score = EXCLUDED.risk_score,
+        prediction_horizon = EXCLUDED.prediction_horizon,
+        confidence = EXCLUDED.confidence,
+        contributing_factors = EXCLUDED.contributing_factors,
+        fault_frequency = EXCLUDED.fault_frequency,
+        last_fault_date = EXCLUDED.last_fault_date,
+        data_points = EXCLUDED.data_points,
+        analysis_days = EXCLUDED.analysis_days,
+        as_of = EXCLUDED.as_of
+"""
+
+UPSERT_TEMPLATE = "(%s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb, %s, %s, %s, %s, CURRENT_TIMESTAMP)"
+
+# Reads used by the API (asyncpg placeholders)
+SELECT_TERMINAL_SCORES_QUERY = """
+    SELECT
+        component_type, location, health_score, risk_level, risk_score, prediction_horizon,
+        confidence, contributing_factors, fault_frequency, last_fault_date, data_points,
+        analysis_days, as_of
+    FROM atm_predictive_scores
+    WHERE terminal_id = $1
+"""
+
+# Terminals rescored in the last 7 days (i.e. still reporting), highest risk first
+SELECT_FLEET_SCORES_QUERY = f"""
+    SELECT
+        o.terminal_id,
+        o.location,
+        o.health_score AS overall_health_score,
+        o.risk_level,
+        o.risk_score,
+        o.prediction_horizon,
+        o.confidence,
+        o.as_of,
+        (
+            SELECT COUNT(*)
+            FROM atm_predictive_scores c
+            WHERE c.terminal_id = o.terminal_id
+              AND c.component_type <> '{OVERALL_COMPONENT}'
+              AND c.risk_level = 'CRITICAL'
+        ) AS critical_components
+    FROM atm_predictive_scores o
+    WHERE o.component_type = '{OVERALL_COMPONENT}'
+      AND o.as_of >= NOW() - INTERVAL '7 days'
+    ORDER BY o.risk_score DESC, o.terminal_id
+"""
+
+
+def ensure_scores_table(cursor) -> None:
+    """Create atm_predictive_scores and its index if they don't exist"""
+    cursor.execute(CREATE_SCORES_TABLE_SQL)
+    cursor.execute(CREATE_OVERALL_INDEX_SQL)
+
+
+def _fault_entries(fault_data: Any) -> List[Dict[str, Any]]:
+    """JSONB fault_data (object, list or JSON text) as a list of fault dicts"""
+    if isinstance(fault_data, str):
+        try:
+            fault_data = json.loads(fault_data)
+        except json.JSONDecodeError:
+            return []
+    if isinstance(fault_data, dict):
+        return [fault_data]
+    if isinstance(fault_data, list):
+        return [item for item in fault_data if isinstance(item, dict)]
+    return []
+
+
+def _has_fault(fault_data: Any) -> bool:
+    """Whether a sample's fault_data holds a fault that affects the scores"""
+    return any(
+        entry.get('agentErrorDescription') or entry.get('externalFaultId') or entry.get('creationDate')
+        for entry in _fault_entries(fault_data)
+    )
+
+
+def select_terminals_to_rescore(cursor, samples: Iterable[Tuple[str, Any]],
+                                max_age_hours: int = SCORES_MAX_AGE_HOURS) -> List[str]:
+    """
+    Terminals of an ingest batch whose scores can have changed
+
+    Args:
+        samples: (terminal_id, fault_data) of the batch
+
+    Returns:
+        List[str]: Terminals with a fault in the batch, plus those whose stored
+            scores are missing or older than max_age_hours
+    """
+    terminal_ids, faulted = set(), set()
+    for terminal_id, fault_data in samples:
+        if terminal_id:
+            terminal_ids.add(terminal_id)
+            if terminal_id not in faulted and _has_fault(fault_data):
+                faulted.add(terminal_id)
+
+    remaining = sorted(terminal_ids - faulted)
+    if remaining:
+        cursor.execute(SELECT_STALE_TERMINALS_SQL, {'terminal_ids': remaining, 'max_age_hours': max_age_hours})
+        faulted.update(row[0] for row in cursor.fetchall())
+    return sorted(faulted)
+
+
+def score_rows(terminal_id: str, location: Optional[str], fault_history: List[Dict[str, Any]],
+               analysis_days: int = SCORES_ANALYSIS_DAYS) -> List[tuple]:
+    """Score one terminal and return its upsert rows (components, then OVERALL)"""
+    scores = score_fault_history(fault_history, COMPONENT_TYPES)
+    components = list(scores.components.values())
+    overall_health = mean(stats.health_score for stats in components)
+    prediction = predict_failure(overall_health, scores.recent_faults)
+    data_points = len(fault_history)
+
+    rows = [
+        (terminal_id, stats.component_type, location, stats.health_score, stats.risk_level,
+         None, None, None, None, stats.fault_count, stats.last_fault_date, data_points, analysis_days)
+        for stats in components
+    ]
+    rows.append((
+        terminal_id, OVERALL_COMPONENT, location, round(overall_health, 1), prediction['risk_level'],
+        prediction['risk_score'], prediction['prediction_horizon'], prediction['confidence'],
+        json.dumps(prediction['contributing_factors']), scores.recent_faults, None, data_points, analysis_days
+    ))
+    return rows
+
+
+def refresh_terminal_scores(cursor, terminal_ids: Iterable[str],
+                            analysis_days: int = SCORES_ANALYSIS_DAYS) -> int:
+    """
+    Rescore the given terminals from their fault history and upsert their rows
+
+    Runs on the caller's cursor so the scores commit together with the
+    terminal_details rows they were computed from.
+
+    Returns:
+        int: Number of terminals scored
+    """
+    from psycopg2.extras import execute_values
+
+    terminal_ids = sorted({t for t in terminal_ids if t})
+    if not terminal_ids:
+        return 0
+
+    cursor.execute(SELECT_FAULT_HISTORY_SQL, {'terminal_ids': terminal_ids, 'days': analysis_days})
+
+    histories: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    locations: Dict[str, Optional[str]] = {}
+    for terminal_id, location, fault_data in cursor.fetchall():
+        # Rows are newest first, so the first location seen is the current one
+        locations.setdefault(terminal_id, location)
+        histories[terminal_id].extend(_fault_entries(fault_data))
+
+    rows = []
+    for terminal_id, fault_history in histories.items():
+        if fault_history:
+            rows.extend(score_rows(terminal_id, locations.get(terminal_id), fault_history, analysis_days))
+
+    if rows:
+        execute_values(cursor, UPSERT_SCORES_SQL, rows, template=UPSERT_TEMPLATE)
+    return len(rows) // (len(COMPONENT_TYPES) + 1)
+
+
+def rebuild_scores(conn, analysis_days: int = SCORES_ANALYSIS_DAYS, batch_size: int = 100) -> int:
+    """
+    Rescore every terminal with fault data in the analysis window
+
+    Args:
+        conn: psycopg2 connection
+        analysis_days: Days of fault history per terminal
+        batch_size: Terminals scored per committed transaction
+
+    Returns:
+        int: Number of terminals scored
+    """
+    cursor = conn.cursor()
+    try:
+        ensure_scores_table(cursor)
+        conn.commit()
+
+        cursor.execute(SELECT_TERMINALS_SQL, {'days': analysis_days})
+        terminal_ids = [row[0] for row in cursor.fetchall()]
+        if not terminal_ids:
+            log.info("No terminals with fault data in the analysis window - nothing to score")
+            return 0
+
+        scored = 0
+        for start in range(0, len(terminal_ids), batch_size):
+            batch = terminal_ids[start:start + batch_size]
+            scored += refresh_terminal_scores(cursor, batch, analysis_days)
+            conn.commit()
+            log.info(f"Scored terminals {start + 1}-{start + len(batch)} of {len(terminal_ids)}")
+
+        return scored
+    except Exception as e:
+        conn.rollback()
+        log.error(f"Error rebuilding atm_predictive_scores: {e}")
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    """Main function for command line usage"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(funcName)s]: %(message)s",
+        handlers=[
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Rebuild the atm_predictive_scores table from terminal_details fault history"
+    )
+    parser.add_argument('--analysis-days', type=int, default=SCORES_ANALYSIS_DAYS,
+                        help=f'Days of fault history per terminal (default: {SCORES_ANALYSIS_DAYS})')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='Terminals scored per transaction (default: 100)')
+    args = parser.parse_args()
+
+    try:
+        from db_connector_new import db_connector
+    except ImportError:
+        log.error("Database connector not available")
+        return 1
+
+    conn = db_connector.get_db_connection()
+    if not conn:
+        log.error("Failed to connect to database")
+        return 1
+
+    try:
+        scored = rebuild_scores(conn, analysis_days=args.analysis_days, batch_size=args.batch_size)
+        log.info(f"✅ atm_predictive_scores rebuilt ({scored} terminals)")
+        return 0
+    except Exception:
+        log.error("❌ atm_predictive_scores rebuild failed")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
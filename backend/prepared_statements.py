@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Prepared Statement Registry for the ATM Dashboard API
+=====================================================
+
+Central list of the API's named, fully parameterized SQL statements:
+1. Every statement has a fixed SQL text. Look-back windows are passed as
+   parameters (make_interval(hours => $n)) and optional filters as
+   `$n IS NULL OR ...` / `= ANY($n::text[])`, so one statement, and one
+   server-side plan, serves every hours value and terminal list instead of a
+   new SQL text per value
+2. StatementRegistry.prepare_connection() is the pool's `init` callback:
+   each pooled connection prepares the registered statements once when it is
+   opened and reuses them for its lifetime (asyncpg's pool reset does not
+   deallocate them)
+3. Executions are timed per statement name; get_statement_stats() backs the
+   prepared_statements section of /api/v1/performance/metrics
+
+Statements that fail to prepare when a connection opens (e.g. an optional
+rollup table has not been built yet) are prepared on first use instead, so
+their errors surface in the endpoint that needs them.
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+import asyncpg
+
+from cash_daily_rollup import (
+    DAILY_CASH_USAGE_QUERY, CASH_USAGE_TRENDS_QUERY, CASH_USAGE_SUMMARY_QUERY, TERMINAL_CASH_RANKINGS_QUERY,
+    live_cash_daily_query
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class StatementRegistry:
+    """Named SQL statements, prepared once per pooled connection"""
+
+    def __init__(self):
+        self._sql: Dict[str, str] = {}
+        # Server PID -> prepared statements of that connection (PIDs are unique among open
+        # connections; entries are dropped when their connection terminates)
+        self._prepared: Dict[int, Dict[str, asyncpg.prepared_stmt.PreparedStatement]] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._on_execute: Optional[Callable[[str, float, bool], None]] = None
+
+    def register(self, name: str, sql: str) -> str:
+        """
+        Add a statement to the registry
+
+        Returns:
+            str: The statement name, for use with fetch/fetchrow/fetchval
+
+        Raises:
+            ValueError: The name is already registered with a different SQL text
+        """
+        if self._sql.get(name, sql) != sql:
+            raise ValueError(f"Statement '{name}' is already registered with different SQL")
+        self._sql[name] = sql
+        self._stats.setdefault(name, {
+            'count': 0, 'total_time': 0, 'max_time': 0, 'min_time': float('inf'),
+            'errors': 0, 'prepares': 0
+        })
+        return name
+
+    def set_execution_listener(self, callback: Optional[Callable[[str, float, bool], None]]):
+        """
+        Also report each execution as callback(query_name, seconds, failed)
+
+        Prepared statement executions bypass asyncpg query loggers, so the API
+        uses this to keep them in its per-query metrics.
+        """
+        self._on_execute = callback
+
+    async def prepare_connection(self, conn: asyncpg.Connection):
+        """Pool `init` callback: prepare every registered statement on a new connection"""
+        statements = self._statements_for(conn)
+        for name in self._sql:
+            try:
+                await self._prepare(conn, statements, name)
+            except asyncpg.PostgresError as e:
+                logger.warning(f"Statement '{name}' not prepared on connect, will retry on first use: {e}")
+
+    def _statements_for(self, conn) -> Dict[str, Any]:
+        pid = conn.get_server_pid()
+        statements = self._prepared.get(pid)
+        if statements is None:
+            statements = self._prepared[pid] = {}
+
+            def forget(_):
+                # Only drop this connection's entry, never a newer connection's with a reused PID
+                if self._prepared.get(pid) is statements:
+                    del self._prepared[pid]
+
+            conn.add_termination_listener(forget)
+        return statements
+
+    async def _prepare(self, conn, statements: Dict[str, Any], name: str):
+        statement = await conn.prepare(self._sql[name])
+        statements[name] = statement
+        self._stats[name]['prepares'] += 1
+        return statement
+
+    async def _run(self, method: str, conn, name: str, args: tuple):
+        if name not in self._sql:
+            raise KeyError(f"Unknown statement '{name}'")
+
+        statements = self._statements_for(conn)
+        started = time.perf_counter()
+        failed = False
+        try:
+            statement = statements.get(name) or await self._prepare(conn, statements, name)
+            try:
+                return await getattr(statement, method)(*args)
+            except asyncpg.InvalidCachedStatementError:
+                # The schema changed under the statement; re-prepare it once (outside a
+                # transaction only, since the failed statement has aborted any open one)
+                if conn.is_in_transaction():
+                    raise
+                statement = await self._prepare(conn, statements, name)
+                return await getattr(statement, method)(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            stats = self._stats[name]
+            stats['count'] += 1
+            stats['total_time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+            stats['min_time'] = min(stats['min_time'], elapsed)
+            if failed:
+                stats['errors'] += 1
+            if self._on_execute:
+                self._on_execute(f"prepared:{name}", elapsed, failed)
+
+    async def fetch(self, conn, name: str, *args) -> List[asyncpg.Record]:
+        """Run a registered statement and return all rows"""
+        return await self._run('fetch', conn, name, args)
+
+    async def fetchrow(self, conn, name: str, *args) -> Optional[asyncpg.Record]:
+        """Run a registered statement and return the first row"""
+        return await self._run('fetchrow', conn, name, args)
+
+    async def fetchval(self, conn, name: str, *args) -> Any:
+        """Run a registered statement and return the first column of the first row"""
+        return await self._run('fetchval', conn, name, args)
+
+    def get_statement_stats(self) -> List[Dict[str, Any]]:
+        """Per-statement execution stats, highest total time first"""
+        statements = []
+        for name, stats in self._stats.items():
+            count = stats['count']
+            statements.append({
+                'statement': name,
+                'count': count,
+                'errors': stats['errors'],
+                'prepares': stats['prepares'],
+                'total_time': round(stats['total_time'], 4),
+                'avg_time': round(stats['total_time'] / count, 4) if count else 0,
+                'max_time': round(stats['max_time'], 4),
+                'min_time': round(stats['min_time'], 4) if count else 0
+            })
+        return sorted(statements, key=lambda s: s['total_time'], reverse=True)
+
+
+# Registry shared by the API
+api_statements = StatementRegistry()
+
+# ATM status: terminal_current_state rows seen in the last $1 hours
+CURRENT_STATE_STATUS = api_statements.register("current_state_status", """
+    SELECT terminal_id, fetched_status, retrieved_date
+    FROM terminal_current_state
+    WHERE retrieved_date >= NOW() - make_interval(hours => $1::int)
+""")
+
+CURRENT_STATE_DETAILS = api_statements.register("current_state_details", """
+    SELECT
+        terminal_id, location, issue_state_name, serial_number,
+        fetched_status, retrieved_date, fault_data, metadata,
+        raw_terminal_data
+    FROM terminal_current_state
+    WHERE retrieved_date >= NOW() - make_interval(hours => $1::int)
+    ORDER BY terminal_id
+""")
+
+# Overall trends: latest availability_rollup bucket per interval.
+# $1: hours to look back, $2: interval length in seconds
+OVERALL_TRENDS_ROLLUP = api_statements.register("overall_trends_rollup", """
+    WITH params AS (
+        SELECT date_trunc('hour', NOW() - make_interval(hours => $1::int)) AS origin
+    )
+    SELECT DISTINCT ON (interval_start)
+        p.origin + make_interval(
+            secs => floor(extract(epoch FROM ar.bucket_start - p.origin) / $2::int) * $2::int
+        ) AS interval_start,
+        ar.total_atms,
+        ar.count_available,
+        ar.count_warning,
+        ar.count_zombie,
+        ar.count_wounded,
+        ar.count_out_of_service
+    FROM availability_rollup ar
+    CROSS JOIN params p
+    WHERE ar.bucket_start >= p.origin
+    ORDER BY interval_start ASC, ar.bucket_start DESC
+""")
+
+# Overall trends straight from terminal_details (rollup not backfilled yet).
+# $1: hours to look back, $2: interval length in minutes
+OVERALL_TRENDS_DETAILS = api_statements.register("overall_trends_details", """
+    WITH time_intervals AS (
+        SELECT generate_series(
+            date_trunc('hour', NOW() - make_interval(hours => $1::int)),
+            date_trunc('hour', NOW()),
+            make_interval(mins => $2::int)
+        ) AS interval_start
+    ),
+    atm_status_at_intervals AS (
+        SELECT
+            ti.interval_start,
+            td.terminal_id,
+            td.fetched_status,
+            ROW_NUMBER() OVER (
+                PARTITION BY ti.interval_start, td.terminal_id
+                ORDER BY td.retrieved_date DESC
+            ) as rn
+        FROM time_intervals ti
+        LEFT JOIN terminal_details td ON
+            td.retrieved_date >= ti.interval_start
+            AND td.retrieved_date < ti.interval_start + make_interval(mins => $2::int)
+        WHERE td.retrieved_date >= NOW() - make_interval(hours => $1::int)
+    ),
+    latest_status_per_interval AS (
+        SELECT
+            interval_start,
+            terminal_id,
+            COALESCE(fetched_status, 'OUT_OF_SERVICE') as status
+        FROM atm_status_at_intervals
+        WHERE rn = 1 OR fetched_status IS NULL
+    )
+    SELECT
+        interval_start,
+        COUNT(*) as total_atms,
+        COUNT(CASE WHEN status = 'AVAILABLE' THEN 1 END) as count_available,
+        COUNT(CASE WHEN status = 'WARNING' THEN 1 END) as count_warning,
+        COUNT(CASE WHEN status = 'ZOMBIE' THEN 1 END) as count_zombie,
+        COUNT(CASE WHEN status IN ('WOUNDED', 'HARD', 'CASH') THEN 1 END) as count_wounded,
+        COUNT(CASE WHEN status IN ('OUT_OF_SERVICE', 'UNAVAILABLE') THEN 1 END) as count_out_of_service
+    FROM latest_status_per_interval
+    GROUP BY interval_start
+    HAVING COUNT(*) > 0
+    ORDER BY interval_start ASC
+""")
+
+# One terminal's samples. $1: terminal ID, $2: hours to look back
+TERMINAL_HISTORY = api_statements.register("terminal_history", """
+    SELECT
+        terminal_id,
+        location,
+        issue_state_name,
+        serial_number,
+        retrieved_date,
+        fetched_status,
+        fault_data,
+        raw_terminal_data
+    FROM terminal_details
+    WHERE terminal_id = $1
+        AND retrieved_date >= NOW() - make_interval(hours => $2::int)
+    ORDER BY retrieved_date ASC
+""")
+
+# ATM list. $1: location pattern (NULL for all), $2/$3: fetched_status /
+# issue_state_name values to match (NULL for all), $4: row limit
+ATM_LIST = api_statements.register("atm_list", """
+    SELECT
+        terminal_id,
+        location,
+        issue_state_name,
+        serial_number,
+        retrieved_date,
+        fetched_status
+    FROM terminal_current_state
+    WHERE ($1::text IS NULL OR location ILIKE $1::text)
+      AND ($2::text[] IS NULL
+           OR fetched_status = ANY($2::text[])
+           OR issue_state_name = ANY($3::text[]))
+    ORDER BY terminal_id
+    LIMIT $4
+""")
+
+# One terminal's fault rows. $1: terminal ID, $2: days to look back
+TERMINAL_FAULT_HISTORY = api_statements.register("terminal_fault_history", """
+    SELECT
+        terminal_id, location, fault_data, retrieved_date
+    FROM terminal_details
+    WHERE terminal_id = $1
+        AND retrieved_date >= NOW() - make_interval(days => $2::int)
+        AND fault_data IS NOT NULL
+    ORDER BY retrieved_date DESC
+""")
+
+# Cash readings. $1: hours to look back, $2: terminal ID, $3: location pattern,
+# $4: low-cash only, $5: cash errors only (NULL/FALSE disables a filter), $6: row limit
+CASH_INFORMATION = api_statements.register("cash_information", """
+    SELECT
+        tci.terminal_id,
+        tci.business_code,
+        tci.technical_code,
+        tci.external_id,
+        tci.total_cash_amount,
+        tci.total_currency,
+        tci.cassette_count,
+        tci.cassettes_data,
+        tci.has_low_cash_warning,
+        tci.has_cash_errors,
+        tci.retrieval_timestamp,
+        tci.event_date,
+        tci.raw_cash_data,
+        td.location
+    FROM terminal_cash_information tci
+    LEFT JOIN terminal_current_state td ON tci.terminal_id = td.terminal_id
+    WHERE tci.retrieval_timestamp >= NOW() - make_interval(hours => $1::int)
+      AND ($2::text IS NULL OR tci.terminal_id = $2::text)
+      AND ($3::text IS NULL OR tci.business_code ILIKE $3::text OR td.location ILIKE $3::text)
+      AND (NOT COALESCE($4::boolean, FALSE) OR tci.has_low_cash_warning = true)
+      AND (NOT COALESCE($5::boolean, FALSE) OR tci.has_cash_errors = true)
+    ORDER BY tci.retrieval_timestamp DESC
+    LIMIT $6
+""")
+
+# One terminal's cash readings. $1: terminal ID, $2: hours to look back
+TERMINAL_CASH_INFORMATION = api_statements.register("terminal_cash_information", """
+    SELECT
+        terminal_id,
+        business_code,
+        technical_code,
+        external_id,
+        total_cash_amount,
+        total_currency,
+        cassette_count,
+        cassettes_data,
+        has_low_cash_warning,
+        has_cash_errors,
+        retrieval_timestamp,
+        event_date,
+        raw_cash_data
+    FROM terminal_cash_information
+    WHERE terminal_id = $1
+        AND retrieval_timestamp >= NOW() - make_interval(hours => $2::int)
+    ORDER BY retrieval_timestamp DESC
+""")
+
+# Cash usage, from the terminal_cash_daily rollup (see cash_daily_rollup.py)
+DAILY_CASH_USAGE = api_statements.register("daily_cash_usage", DAILY_CASH_USAGE_QUERY)
+CASH_USAGE_TRENDS = api_statements.register("cash_usage_trends", CASH_USAGE_TRENDS_QUERY)
+CASH_USAGE_SUMMARY = api_statements.register("cash_usage_summary", CASH_USAGE_SUMMARY_QUERY)
+TERMINAL_CASH_RANKINGS = api_statements.register("terminal_cash_rankings", TERMINAL_CASH_RANKINGS_QUERY)
+
+# The same reads over days aggregated from the raw readings, until the rollup is backfilled
+DAILY_CASH_USAGE_LIVE = api_statements.register(
+    "daily_cash_usage_live", live_cash_daily_query(DAILY_CASH_USAGE_QUERY))
+CASH_USAGE_TRENDS_LIVE = api_statements.register(
+    "cash_usage_trends_live", live_cash_daily_query(CASH_USAGE_TRENDS_QUERY))
+CASH_USAGE_SUMMARY_LIVE = api_statements.register(
+    "cash_usage_summary_live", live_cash_daily_query(CASH_USAGE_SUMMARY_QUERY))
+TERMINAL_CASH_RANKINGS_LIVE = api_statements.register(
+    "terminal_cash_rankings_live", live_cash_daily_query(TERMINAL_CASH_RANKINGS_QUERY))
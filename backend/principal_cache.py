@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Principal Cache for the User Management API
+===========================================
+
+Keeps recently validated bearer tokens in memory so get_current_user can skip
+the users/user_sessions lookup on repeated requests:
+1. Entries are keyed by a SHA-256 of the token and hold the user row
+2. An entry lives until the TTL, the session expiry or the JWT expiry,
+   whichever comes first; the cache is bounded and evicts least recently used
+3. Anything that ends a session or changes a user publishes a NOTIFY on
+   USER_SESSIONS_CHANGED_CHANNEL; every API process LISTENs and drops the
+   affected entries, so logout and revocation take effect immediately
+
+The cache only answers while its LISTEN connection is up. If the listener
+drops, lookups fall through to the database and the cache is cleared when
+the connection is re-established, so a missed notification can never keep a
+revoked session alive.
+"""
+
+import hashlib
+import json
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import logging
+
+import psycopg2
+import psycopg2.extensions
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Channel carrying session/user invalidations (payload is JSON, see make_payload)
+USER_SESSIONS_CHANGED_CHANNEL = "user_sessions_changed"
+
+# Seconds between reconnect attempts and between idle checks of the listener
+LISTENER_RETRY_SECONDS = 5.0
+
+
+def token_key(token: str) -> str:
+    """Cache key for a bearer token (tokens themselves are never stored or broadcast)"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def make_payload(user_id: Optional[str] = None, token: Optional[str] = None) -> str:
+    """NOTIFY payload for an invalidation; neither argument means every principal"""
+    if token is not None:
+        return json.dumps({"token": token_key(token)})
+    if user_id is not None:
+        return json.dumps({"user_id": str(user_id)})
+    return json.dumps({"all": True})
+
+
+class PrincipalCache:
+    """Bounded TTL cache of validated token -> user, invalidated over LISTEN/NOTIFY"""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._listening = threading.Event()
+        self._stop = threading.Event()
+        self._listener_thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """True while the invalidation listener is connected"""
+        return self.ttl_seconds > 0 and self._listening.is_set()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached user for token, or None"""
+        if not self.enabled:
+            return None
+        key = token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] <= time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry['user'])
+
+    @property
+    def generation(self) -> int:
+        """Invalidation counter; read it before a database lookup and pass it to put"""
+        return self.invalidations
+
+    def put(self, token: str, user: Dict[str, Any], expires_at: Optional[float] = None,
+            generation: Optional[int] = None):
+        """
+        Cache a validated principal
+
+        Args:
+            token: Bearer token that was validated
+            user: User row returned to the endpoint
+            expires_at: Epoch seconds after which the session/token is no longer
+                valid; the entry never outlives it
+            generation: Value of `generation` taken before the lookup; if any
+                invalidation arrived since, the row may be stale and is not cached
+        """
+        if not self.enabled:
+            return
+        deadline = time.time() + self.ttl_seconds
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        with self._lock:
+            if generation is not None and generation != self.invalidations:
+                return
+            self._entries[token_key(token)] = {
+                'user': dict(user),
+                'user_id': str(user.get('id')),
+                'expires_at': deadline
+            }
+            self._entries.move_to_end(token_key(token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None, token: Optional[str] = None) -> int:
+        """Drop one token, every token of a user, or everything (no arguments)"""
+        return self._apply(json.loads(make_payload(user_id=user_id, token=token)))
+
+    def clear(self) -> int:
+        """Drop every cached principal"""
+        return self._apply({"all": True})
+
+    def _apply(self, message: Dict[str, Any]) -> int:
+        """Apply a decoded invalidation message and return the number of entries dropped"""
+        with self._lock:
+            if message.get('token'):
+                removed = 1 if self._entries.pop(message['token'], None) is not None else 0
+            elif message.get('user_id'):
+                keys = [k for k, v in self._entries.items() if v['user_id'] == message['user_id']]
+                for key in keys:
+                    del self._entries[key]
+                removed = len(keys)
+            else:
+                removed = len(self._entries)
+                self._entries.clear()
+            self.invalidations += 1
+            return removed
+
+    def handle_notification(self, payload: str):
+        """Apply a NOTIFY payload; unreadable payloads clear everything"""
+        try:
+            message = json.loads(payload) if payload else {"all": True}
+        except (ValueError, TypeError):
+            message = {"all": True}
+        removed = self._apply(message if isinstance(message, dict) else {"all": True})
+        logger.debug(f"Principal cache invalidation {payload or '(all)'} dropped {removed} entries")
+
+    def start_listener(self, connection_config: Dict[str, Any]):
+        """Start the background thread that LISTENs for invalidations"""
+        if self.ttl_seconds <= 0 or (self._listener_thread and self._listener_thread.is_alive()):
+            return
+        self._stop.clear()
+        self._listener_thread = threading.Thread(
+            target=self._listen, args=(connection_config,), name="principal-cache-listener", daemon=True
+        )
+        self._listener_thread.start()
+
+    def stop_listener(self, timeout: float = LISTENER_RETRY_SECONDS + 1):
+        """Stop the listener thread and disable the cache"""
+        self._stop.set()
+        self._listening.clear()
+        if self._listener_thread:
+            self._listener_thread.join(timeout)
+            self._listener_thread = None
+        self.clear()
+
+    def _listen(self, connection_config: Dict[str, Any]):
+        """Listener loop: one dedicated autocommit connection, reconnecting on failure"""
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**connection_config)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {USER_SESSIONS_CHANGED_CHANNEL}")
+
+                # Anything that happened while we were disconnected was missed
+                self.clear()
+                self._listening.set()
+                logger.info(f"Listening on '{USER_SESSIONS_CHANGED_CHANNEL}' for principal cache invalidation")
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], LISTENER_RETRY_SECONDS) == ([], [], []):
+                        # Idle: make sure the connection is still alive
+                        with conn.cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.handle_notification(conn.notifies.pop(0).payload)
+            except Exception as e:
+                logger.error(f"Principal cache listener error: {e}")
+            finally:
+                self._listening.clear()
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+            self._stop.wait(LISTENER_RETRY_SECONDS)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            size = len(self._entries)
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'invalidations': self.invalidations
+        }
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+In-process ATM Refresh Job Runner
+=================================
+
+Runs on-demand ATM data refreshes for POST /api/v1/atm/refresh:
+1. Jobs call CombinedATMRetriever directly on a worker thread. The crawler
+   module is imported once and stays warm, so there is no interpreter start-up,
+   re-import or extra DB pool per refresh.
+2. Progress is reported by the retriever itself (per phase, and per terminal
+   while details are fetched) instead of fixed milestones.
+3. Jobs are stored in atm_refresh_jobs, so status survives restarts and is
+   visible to every API worker.
+4. A partial unique index allows a single queued/running job across all
+   workers. A refresh requested while one is active joins that job instead of
+   starting a second crawl.
+
+A job that stops sending heartbeats (e.g. its worker was killed) is marked
+failed the next time anyone asks for a refresh, so it cannot block new jobs.
+A job still running after JOB_TIMEOUT_SECONDS is marked failed by its own
+worker, even if the retrieval thread is stuck inside a phase.
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import logging
+
+import asyncpg
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Seconds between heartbeats of a running job
+HEARTBEAT_SECONDS = 15
+# An active job without a heartbeat for this long is considered dead
+STALE_JOB_SECONDS = 120
+# Wall-clock limit for one refresh (same limit the subprocess runner had)
+JOB_TIMEOUT_SECONDS = 900
+# Minimum seconds between progress writes (phase changes are always written)
+PROGRESS_WRITE_INTERVAL = 1.0
+
+CREATE_REFRESH_JOBS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS atm_refresh_jobs (
+        job_id UUID PRIMARY KEY,
+        status VARCHAR(20) NOT NULL,
+        phase VARCHAR(50),
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT NOT NULL DEFAULT '',
+        error TEXT,
+        use_new_tables BOOLEAN NOT NULL DEFAULT TRUE,
+        worker VARCHAR(255),
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP WITH TIME ZONE,
+        completed_at TIMESTAMP WITH TIME ZONE,
+        heartbeat_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# At most one queued/running job, enforced by the database across workers
+CREATE_SINGLE_ACTIVE_INDEX_SQL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_atm_refresh_jobs_single_active
+    ON atm_refresh_jobs ((TRUE)) WHERE status IN ('queued', 'running')
+"""
+
+CREATE_CREATED_AT_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_atm_refresh_jobs_created_at
+    ON atm_refresh_jobs (created_at DESC)
+"""
+
+JOB_COLUMNS = "job_id::text AS job_id, status, phase, progress, message, error, created_at, started_at, completed_at"
+
+
+class RefreshJobTimeout(Exception):
+    """Raised from the progress callback once a refresh has exceeded JOB_TIMEOUT_SECONDS"""
+
+
+class RefreshJobRunner:
+    """Starts, tracks and deduplicates ATM refresh jobs"""
+
+    def __init__(self, pool_getter: Callable[[], Optional[asyncpg.Pool]], executor: Executor):
+        """
+        Args:
+            pool_getter: Returns the API's asyncpg pool (it may be recreated)
+            executor: Thread pool the blocking retrieval runs on
+        """
+        self._pool_getter = pool_getter
+        self._executor = executor
+        self._table_ready = False
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _pool(self) -> asyncpg.Pool:
+        pool = self._pool_getter()
+        if pool is None:
+            raise RuntimeError("Database pool not available")
+        return pool
+
+    async def ensure_table(self):
+        """Create atm_refresh_jobs and its indexes once per process"""
+        if self._table_ready:
+            return
+        async with self._pool().acquire() as conn:
+            await conn.execute(CREATE_REFRESH_JOBS_TABLE_SQL)
+            await conn.execute(CREATE_SINGLE_ACTIVE_INDEX_SQL)
+            await conn.execute(CREATE_CREATED_AT_INDEX_SQL)
+        self._table_ready = True
+
+    async def expire_stale_jobs(self) -> int:
+        """Fail active jobs whose worker stopped sending heartbeats"""
+        async with self._pool().acquire() as conn:
+            result = await conn.execute(f"""
+                UPDATE atm_refresh_jobs
+                SET status = 'failed',
+                    completed_at = CURRENT_TIMESTAMP,
+                    error = 'Refresh worker stopped responding',
+                    message = 'ATM data refresh failed'
+                WHERE status IN ('queued', 'running')
+                  AND heartbeat_at < CURRENT_TIMESTAMP - INTERVAL '{STALE_JOB_SECONDS} seconds'
+            """)
+        expired = int(result.split()[-1]) if result.startswith("UPDATE") else 0
+        if expired:
+            logger.warning(f"Marked {expired} stale refresh job(s) as failed")
+        return expired
+
+    async def submit(self, use_new_tables: bool = True) -> Tuple[Dict[str, Any], bool]:
+        """
+        Start a refresh, or join the one already queued/running on any worker
+
+        Returns:
+            Tuple of (job, created) where created is False for a joined job
+        """
+        await self.ensure_table()
+        await self.expire_stale_jobs()
+
+        for _ in range(3):
+            async with self._pool().acquire() as conn:
+                job = await conn.fetchrow(f"""
+                    INSERT INTO atm_refresh_jobs (job_id, status, message, use_new_tables, worker)
+                    VALUES ($1, 'queued', 'Refresh job queued', $2, $3)
+                    ON CONFLICT DO NOTHING
+                    RETURNING {JOB_COLUMNS}
+                """, uuid.uuid4(), use_new_tables, self.worker_id)
+                if job is not None:
+                    job = dict(job)
+                    self._tasks[job['job_id']] = asyncio.create_task(self._run(job['job_id'], use_new_tables))
+                    logger.info(f"ATM refresh job {job['job_id']} queued on {self.worker_id}")
+                    return job, True
+
+                active = await conn.fetchrow(f"""
+                    SELECT {JOB_COLUMNS} FROM atm_refresh_jobs
+                    WHERE status IN ('queued', 'running')
+                """)
+                if active is not None:
+                    logger.info(f"Refresh requested while job {active['job_id']} is active - joining it")
+                    return dict(active), False
+            # The active job finished between the insert and the lookup; try again
+
+        raise RuntimeError("Could not create or find an active refresh job")
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch one job, or None if it does not exist"""
+        try:
+            job_uuid = uuid.UUID(job_id)
+        except ValueError:
+            return None
+        await self.ensure_table()
+        async with self._pool().acquire() as conn:
+            job = await conn.fetchrow(f"SELECT {JOB_COLUMNS} FROM atm_refresh_jobs WHERE job_id = $1", job_uuid)
+        return dict(job) if job else None
+
+    async def list_jobs(self, limit: int = 10, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent jobs first, optionally filtered by status"""
+        await self.ensure_table()
+        async with self._pool().acquire() as conn:
+            if status:
+                rows = await conn.fetch(f"""
+                    SELECT {JOB_COLUMNS} FROM atm_refresh_jobs
+                    WHERE status = $1 ORDER BY created_at DESC LIMIT $2
+                """, status, limit)
+            else:
+                rows = await conn.fetch(f"""
+                    SELECT {JOB_COLUMNS} FROM atm_refresh_jobs
+                    ORDER BY created_at DESC LIMIT $1
+                """, limit)
+        return [dict(row) for row in rows]
+
+    async def _update(self, job_id: str, **fields):
+        """Write job fields (and a heartbeat); failures are logged, not raised"""
+        assignments = [f"{name} = ${index}" for index, name in enumerate(fields, start=2)]
+        assignments.append("heartbeat_at = CURRENT_TIMESTAMP")
+        try:
+            async with self._pool().acquire() as conn:
+                await conn.execute(
+                    f"UPDATE atm_refresh_jobs SET {', '.join(assignments)} WHERE job_id = $1",
+                    uuid.UUID(job_id), *fields.values()
+                )
+        except Exception as e:
+            logger.error(f"Failed to update refresh job {job_id}: {e}")
+
+    async def _heartbeat(self, job_id: str):
+        """Keep the job visibly alive while long phases run without progress updates"""
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            await self._update(job_id)
+
+    async def _run(self, job_id: str, use_new_tables: bool):
+        """Run one refresh on the executor and record the outcome"""
+        loop = asyncio.get_running_loop()
+        timed_out = threading.Event()
+        last_write = {'phase': None, 'at': 0.0}
+
+        def on_progress(phase: str, percent: float, message: str):
+            # Called on the worker thread by CombinedATMRetriever.report_progress; after a
+            # timeout this stops the abandoned retrieval at its next progress report
+            if timed_out.is_set():
+                raise RefreshJobTimeout(f"Refresh exceeded {JOB_TIMEOUT_SECONDS // 60} minutes")
+            now = time.monotonic()
+            if phase == last_write['phase'] and now - last_write['at'] < PROGRESS_WRITE_INTERVAL:
+                return
+            last_write.update(phase=phase, at=now)
+            asyncio.run_coroutine_threadsafe(
+                self._update(job_id, phase=phase, progress=round(percent, 1), message=message), loop
+            )
+
+        def retrieve() -> Dict[str, Any]:
+            from combined_atm_retrieval_script import CombinedATMRetriever
+            retriever = CombinedATMRetriever(progress_callback=on_progress)
+            success, all_data = retriever.retrieve_and_process_all_data(
+                save_to_db=True,
+                use_new_tables=use_new_tables
+            )
+            if not success:
+                raise RuntimeError("Unable to retrieve ATM data")
+            return all_data.get("summary", {})
+
+        await self._update(
+            job_id, status='running', started_at=datetime.now(timezone.utc), progress=0.0,
+            message="Starting ATM data retrieval..."
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            try:
+                summary = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, retrieve), JOB_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # The thread cannot be killed; it is abandoned and stops at its next progress report
+                timed_out.set()
+                heartbeat.cancel()
+                raise RefreshJobTimeout(f"Refresh exceeded {JOB_TIMEOUT_SECONDS // 60} minutes")
+            message = "ATM data refresh completed successfully"
+            if summary.get("failover_activated"):
+                message += f" (failover: {summary.get('connection_status', 'unknown')})"
+            await self._update(
+                job_id, status='completed', completed_at=datetime.now(timezone.utc), progress=100.0,
+                phase='done', message=message
+            )
+            logger.info(f"ATM refresh job {job_id} completed successfully")
+        except RefreshJobTimeout as e:
+            await self._update(
+                job_id, status='failed', completed_at=datetime.now(timezone.utc), error=str(e),
+                message="ATM data refresh timed out"
+            )
+            logger.error(f"ATM refresh job {job_id} timed out")
+        except Exception as e:
+            await self._update(
+                job_id, status='failed', completed_at=datetime.now(timezone.utc), error=f"Unexpected error: {e}",
+                message="ATM data refresh failed"
+            )
+            logger.error(f"ATM refresh job {job_id} failed with error: {e}")
+        finally:
+            heartbeat.cancel()
+            self._tasks.pop(job_id, None)
+
+    async def shutdown(self):
+        """Mark jobs still running in this process as failed (their threads cannot be resumed)"""
+        for job_id, task in list(self._tasks.items()):
+            task.cancel()
+            await self._update(
+                job_id, status='failed', completed_at=datetime.now(timezone.utc),
+                error="API worker shut down during refresh", message="ATM data refresh failed"
+            )
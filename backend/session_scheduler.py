@@ -14,6 +14,12 @@ from psycopg2.extras import RealDictCursor
 import os
 from typing import List, Dict, Any
 
+try:
+    from principal_cache import USER_SESSIONS_CHANGED_CHANNEL, make_payload
+except ImportError:
+    USER_SESSIONS_CHANGED_CHANNEL = None
+    make_payload = None
+
 # Load environment variables from .env file if it exists
 try:
     from dotenv import load_dotenv
@@ -125,6 +131,10 @@ class SessionScheduler:
                             datetime.utcnow()
                         ))
                     
+                    # Tell the API processes to drop their cached principals (sent on commit)
+                    if USER_SESSIONS_CHANGED_CHANNEL:
+                        cursor.execute("SELECT pg_notify(%s, %s)", (USER_SESSIONS_CHANGED_CHANNEL, make_payload()))
+                    
                     conn.commit()
                     
                     logger.info(f"Midnight logout completed for {len(active_sessions)} active sessions")
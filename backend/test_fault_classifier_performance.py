@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the predictive analytics fault classifier
+
+Builds a synthetic 90-day fault history for one terminal and times:
+- legacy:     the previous per-component scoring (one full pass over the
+              history per component, creationDate re-parsed and month_map
+              rebuilt for every fault, nested `keyword in text` checks)
+- classifier: fault_classifier.score_fault_history (one pass, one regex scan
+              per fault, all components scored together)
+- fleet:      predictive_fleet_engine.score_fleet on the same history
+
+The classifier and fleet engine results are cross-checked so both paths keep
+producing the same scores. No database or running API is needed.
+
+Usage:
+    python test_fault_classifier_performance.py
+    python test_fault_classifier_performance.py --days 90 --faults-per-hour 4 --repeat 5 --output classifier.json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Callable
+
+from fault_classifier import COMPONENT_TYPES, score_fault_history
+from predictive_fleet_engine import build_fault_frame, score_fleet
+
+DESCRIPTIONS = [
+    "CDM dispenser timeout error", "Cash cassette out of notes", "Card reader jam",
+    "Chip card read failure", "Receipt printer paper low", "Printer warning",
+    "Network connection lost", "Communications timeout", "Deposit envelope stuck",
+    "Check deposit module", "Proximity sensor blocked", "Motion detect warning",
+    "Safe door open", "Supervisor mode entered", "Device in maintenance"
+]
+EXTERNAL_IDS = ["CDM-001", "READER-17", "PRN-3", "NET-9", "DEP-2", "SNS-5", "GEN-0"]
+
+def synthetic_history(days: int, faults_per_hour: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Fault entries spread over the last `days` days in the crawler's JSONB shape"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    history = []
+    for i in range(days * 24 * faults_per_hour):
+        created = now - timedelta(minutes=rng.uniform(0, days * 24 * 60))
+        history.append({
+            "faultId": str(i),
+            "agentErrorDescription": rng.choice(DESCRIPTIONS),
+            "externalFaultId": rng.choice(EXTERNAL_IDS),
+            "creationDate": created.strftime("%d:%m:%Y %H:%M:%S"),
+            "faultTypeCode": "HARDWARE"
+        })
+    return history
+
+def legacy_component_scores(fault_history: List[Dict[str, Any]], component_types: List[str]) -> Dict[str, float]:
+    """The previous scoring: one pass over the history per component"""
+    scores = {}
+    for component_type in component_types:
+        now = datetime.now()
+        thirty_days_ago = now - timedelta(days=30)
+        component_keywords = {
+            'DISPENSER': ['CDM', 'dispenser', 'notes', 'cash', 'bills', 'currency'],
+            'READER': ['reader', 'card', 'magnetic', 'chip'],
+            'PRINTER': ['printer', 'receipt', 'paper', 'print'],
+            'NETWORK_MODULE': ['network', 'communications', 'connection', 'comms'],
+            'DEPOSIT_MODULE': ['deposit', 'check', 'envelope'],
+            'SENSOR': ['sensor', 'detect', 'proximity', 'motion']
+        }
+        component_faults = []
+        for fault in fault_history:
+            creation_date = fault.get('creationDate')
+            fault_date = None
+            if creation_date:
+                try:
+                    date_part, time_part = creation_date.split(' ')
+                    day, month_num, year = date_part.split(':')
+                    hour, minute, second = time_part.split(':')
+                    month_map = {
+                        '01': 1, '02': 2, '03': 3, '04': 4, '05': 5, '06': 6,
+                        '07': 7, '08': 8, '09': 9, '10': 10, '11': 11, '12': 12,
+                        'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4,
+                        'MAY': 5, 'JUNE': 6, 'JULY': 7, 'AUGUST': 8,
+                        'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12
+                    }
+                    month_int = month_map.get(month_num, int(month_num) if month_num.isdigit() else 1)
+                    fault_date = datetime(int(year), month_int, int(day), int(hour), int(minute), int(second))
+                except Exception:
+                    fault_date = now
+            fault_description = fault.get('agentErrorDescription', '').lower()
+            external_fault_id = fault.get('externalFaultId', '').lower()
+            is_component_fault = False
+            for keyword in component_keywords[component_type]:
+                if keyword.lower() in fault_description or keyword.lower() in external_fault_id:
+                    is_component_fault = True
+                    break
+            if is_component_fault and (not fault_date or fault_date >= thirty_days_ago):
+                component_faults.append(fault)
+
+        base_score = 100
+        for fault in component_faults:
+            fault_description = fault.get('agentErrorDescription', '').lower()
+            critical_keywords = ['timeout', 'failure', 'error', 'jam', 'stuck', 'blocked']
+            warning_keywords = ['out of', 'empty', 'low', 'warning', 'check']
+            if any(keyword in fault_description for keyword in critical_keywords):
+                base_score -= 12
+            elif any(keyword in fault_description for keyword in warning_keywords):
+                base_score -= 6
+            else:
+                base_score -= 8
+        scores[component_type] = round(max(0, min(100, base_score)), 1)
+    return scores
+
+def classifier_component_scores(fault_history: List[Dict[str, Any]], component_types: List[str]) -> Dict[str, float]:
+    scores = score_fault_history(fault_history, component_types)
+    return {component: stats.health_score for component, stats in scores.components.items()}
+
+def fleet_component_scores(fault_history: List[Dict[str, Any]], component_types: List[str]) -> Dict[str, float]:
+    rows = [{"terminal_id": "bench", "location": None, "fault_data": fault} for fault in fault_history]
+    scores = score_fleet(build_fault_frame(rows), component_types)
+    return {component: float(scores.iloc[0][f"{component}_health"]) for component in component_types}
+
+def time_call(func: Callable, repeat: int) -> Dict[str, float]:
+    """Best / median wall time in milliseconds over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"best_ms": round(min(timings), 2), "median_ms": round(statistics.median(timings), 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark for the single-pass fault classifier")
+    parser.add_argument("--days", type=int, default=90, help="Days of synthetic fault history (default: 90)")
+    parser.add_argument("--faults-per-hour", type=int, default=4, help="Fault entries per hour (default: 4)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per implementation (default: 5)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    history = synthetic_history(args.days, args.faults_per_hour)
+    print(f"🧪 Scoring {len(history):,} faults ({args.days} days) for {len(COMPONENT_TYPES)} components")
+    print("=" * 80)
+
+    classifier_scores = classifier_component_scores(history, COMPONENT_TYPES)
+    fleet_scores = fleet_component_scores(history, COMPONENT_TYPES)
+    if classifier_scores != fleet_scores:
+        print(f"❌ Classifier and fleet engine disagree:\n  {classifier_scores}\n  {fleet_scores}")
+        return 1
+
+    implementations = {
+        "legacy": lambda: legacy_component_scores(history, COMPONENT_TYPES),
+        "classifier": lambda: classifier_component_scores(history, COMPONENT_TYPES),
+        "fleet": lambda: fleet_component_scores(history, COMPONENT_TYPES),
+    }
+    results: Dict[str, Any] = {"faults": len(history), "days": args.days, "timings": {}}
+    for name, func in implementations.items():
+        results["timings"][name] = time_call(func, args.repeat)
+        print(f"  {name:<11} best={results['timings'][name]['best_ms']:>9.2f}ms "
+              f"median={results['timings'][name]['median_ms']:>9.2f}ms")
+
+    speedup = results["timings"]["legacy"]["best_ms"] / results["timings"]["classifier"]["best_ms"]
+    results["classifier_speedup"] = round(speedup, 2)
+    print(f"\n⚡ Classifier is {speedup:.1f}x faster than the per-component scan")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the fault history report query
+
+Loads a synthetic year of 15-minute status samples for a few hundred
+terminals into a TEMPORARY terminal_details table (it shadows the real table
+for this session only, so no production data is read or written) and times:
+- legacy:  the previous query, resolving every fault start with a correlated
+           `SELECT MIN(fault_end) ... WHERE fault_end > fault_start`
+- windowed: fault_history_engine.FAULT_CYCLES_QUERY (gaps-and-islands)
+
+Both queries run for each report range (--ranges, in days) under a statement
+timeout, so the quadratic legacy query is reported as timed out rather than
+hanging the run. --verify first checks both queries return the same cycles
+on a short range.
+
+Usage:
+    python test_fault_history_performance.py
+    python test_fault_history_performance.py --terminals 300 --days 365 --ranges 7 30 90 365 --timeout 120
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any
+
+import asyncpg
+
+from benchmark_helpers import save_results
+from fault_history_engine import FAULT_CYCLES_QUERY
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': int(os.getenv('DB_PORT', 5432)),
+    'database': os.getenv('DB_NAME', 'development_db'),
+    'user': os.getenv('DB_USER', 'postgres'),
+    'password': os.getenv('DB_PASSWORD', '')
+}
+
+# The report query as it was before the gaps-and-islands rewrite (all terminals)
+LEGACY_QUERY = """
+    WITH status_transitions AS (
+        SELECT
+            terminal_id, location, fetched_status, retrieved_date,
+            LAG(fetched_status) OVER (PARTITION BY terminal_id ORDER BY retrieved_date) as prev_status,
+            fault_data
+        FROM terminal_details td
+        WHERE retrieved_date BETWEEN $1 AND $2
+    ),
+    fault_cycle_starts AS (
+        SELECT terminal_id, location, fetched_status as fault_state, retrieved_date as fault_start, fault_data
+        FROM status_transitions
+        WHERE fetched_status IN ('WARNING', 'WOUNDED', 'ZOMBIE', 'OUT_OF_SERVICE')
+        AND (prev_status IS NULL OR prev_status IN ('AVAILABLE', 'ONLINE'))
+    ),
+    fault_cycle_ends AS (
+        SELECT terminal_id, prev_status as end_fault_state, retrieved_date as fault_end
+        FROM status_transitions
+        WHERE fetched_status IN ('AVAILABLE', 'ONLINE')
+        AND prev_status IN ('WARNING', 'WOUNDED', 'ZOMBIE', 'OUT_OF_SERVICE')
+    )
+    SELECT
+        fcs.terminal_id, fcs.fault_state, fcs.fault_start,
+        (SELECT MIN(fce.fault_end)
+         FROM fault_cycle_ends fce
+         WHERE fce.terminal_id = fcs.terminal_id
+         AND fce.fault_end > fcs.fault_start) as fault_end
+    FROM fault_cycle_starts fcs
+    ORDER BY fcs.terminal_id, fcs.fault_start
+"""
+
+# Statuses hold for 2-hour blocks; ~80% of blocks are AVAILABLE
+SYNTHETIC_DATA_SQL = """
+    CREATE TEMPORARY TABLE terminal_details (
+        id BIGSERIAL PRIMARY KEY,
+        terminal_id VARCHAR(50) NOT NULL,
+        location TEXT,
+        fetched_status VARCHAR(50),
+        retrieved_date TIMESTAMP WITH TIME ZONE NOT NULL,
+        fault_data JSONB
+    );
+    INSERT INTO terminal_details (terminal_id, location, fetched_status, retrieved_date, fault_data)
+    SELECT
+        t::text,
+        'Synthetic location ' || t,
+        CASE
+            WHEN h < 80 THEN 'AVAILABLE'
+            WHEN h < 87 THEN 'WARNING'
+            WHEN h < 93 THEN 'WOUNDED'
+            WHEN h < 96 THEN 'ZOMBIE'
+            ELSE 'OUT_OF_SERVICE'
+        END,
+        ts,
+        jsonb_build_object('agentErrorDescription', 'Synthetic fault ' || (h % 7), 'externalFaultId', 'SYN' || (h % 7))
+    FROM generate_series(1, {terminals}) AS t
+    CROSS JOIN generate_series('{start}'::timestamptz, '{end}'::timestamptz, INTERVAL '15 minutes') AS ts
+    CROSS JOIN LATERAL (
+        SELECT abs(hashtext(t::text || ':' || floor(extract(epoch FROM ts) / 7200)::text)) % 100 AS h
+    ) block;
+    CREATE INDEX ON terminal_details (terminal_id, retrieved_date);
+    CREATE INDEX ON terminal_details (retrieved_date);
+    ANALYZE terminal_details;
+"""
+
+async def timed_fetch(conn: asyncpg.Connection, query: str, *args) -> Dict[str, Any]:
+    """Run one query and return its wall time and row count (or a timeout marker)"""
+    start = time.perf_counter()
+    try:
+        rows = await conn.fetch(query, *args)
+    except asyncpg.QueryCanceledError:
+        return {"timed_out": True, "seconds": round(time.perf_counter() - start, 2), "rows": None}
+    return {"timed_out": False, "seconds": round(time.perf_counter() - start, 3), "rows": len(rows)}
+
+async def verify(conn: asyncpg.Connection, start: datetime, end: datetime) -> bool:
+    """Both queries must find the same cycles"""
+    legacy = await conn.fetch(LEGACY_QUERY, start, end)
+    windowed = await conn.fetch(FAULT_CYCLES_QUERY, start, end, None, True)
+    legacy_cycles = [(r['terminal_id'], r['fault_state'], r['fault_start'], r['fault_end']) for r in legacy]
+    windowed_cycles = [(r['terminal_id'], r['fault_state'], r['fault_start'], r['fault_end']) for r in windowed]
+    if legacy_cycles != windowed_cycles:
+        print(f"❌ Results differ: legacy {len(legacy_cycles)} cycles, windowed {len(windowed_cycles)} cycles")
+        return False
+    print(f"✅ Both queries return the same {len(windowed_cycles):,} fault cycles")
+    return True
+
+async def run(args) -> int:
+    conn = await asyncpg.connect(**DB_CONFIG)
+    try:
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=args.days)
+
+        print(f"🏗️  Loading {args.terminals} terminals x {args.days} days of 15-minute samples into a temp table...")
+        load_start = time.perf_counter()
+        await conn.execute(SYNTHETIC_DATA_SQL.format(terminals=int(args.terminals), start=start.isoformat(), end=end.isoformat()))
+        samples = await conn.fetchval("SELECT COUNT(*) FROM terminal_details")
+        print(f"   {samples:,} samples loaded in {time.perf_counter() - load_start:.1f}s")
+        print("=" * 80)
+
+        if args.verify and not await verify(conn, end - timedelta(days=args.verify_days), end):
+            return 1
+
+        await conn.execute(f"SET statement_timeout = {int(args.timeout * 1000)}")
+        results: Dict[str, Any] = {"terminals": args.terminals, "days": args.days, "samples": samples, "ranges": {}}
+        for range_days in args.ranges:
+            range_start = end - timedelta(days=range_days)
+            windowed = await timed_fetch(conn, FAULT_CYCLES_QUERY, range_start, end, None, True)
+            legacy = await timed_fetch(conn, LEGACY_QUERY, range_start, end) if not args.skip_legacy else None
+            results["ranges"][str(range_days)] = {"windowed": windowed, "legacy": legacy}
+
+            legacy_text = "skipped" if legacy is None else (
+                f"timed out after {legacy['seconds']:.0f}s" if legacy["timed_out"] else f"{legacy['seconds']:.2f}s"
+            )
+            windowed_text = f"timed out after {windowed['seconds']:.0f}s" if windowed["timed_out"] else f"{windowed['seconds']:.2f}s"
+            print(f"  {range_days:>4} days  windowed={windowed_text:<22} legacy={legacy_text:<22} "
+                  f"cycles={windowed['rows'] if windowed['rows'] is not None else '-'}")
+
+        save_results(results, args.output)
+
+        failed = any(r["windowed"]["timed_out"] for r in results["ranges"].values())
+        return 1 if failed else 0
+    finally:
+        await conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fault history report query on synthetic data")
+    parser.add_argument("--terminals", type=int, default=300, help="Synthetic terminals (default: 300)")
+    parser.add_argument("--days", type=int, default=365, help="Days of 15-minute samples (default: 365)")
+    parser.add_argument("--ranges", type=int, nargs="+", default=[7, 30, 90, 365], help="Report ranges in days")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Statement timeout in seconds (default: 120)")
+    parser.add_argument("--skip-legacy", action="store_true", help="Only time the windowed query")
+    parser.add_argument("--verify", action="store_true", help="Check both queries agree before timing")
+    parser.add_argument("--verify-days", type=int, default=3, help="Range used by --verify (default: 3)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    return asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Login burst load test for the User Management API
+
+Measures the latency of an unrelated, cheap endpoint while a burst of
+concurrent logins is in flight. When bcrypt runs on the event loop, every
+login blocks the worker and the probe latency climbs with the burst; with
+hashing on the worker pool the probe should stay close to its idle latency.
+
+The probe runs twice: once with the API idle (baseline) and once during the
+login burst. The pool's queue metrics are read from /system/auth-metrics
+afterwards when available.
+
+Usage:
+    python test_login_burst_performance.py --username admin --password admin123
+    python test_login_burst_performance.py --logins 100 --concurrency 50 --output burst.json
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any
+
+import requests
+
+from benchmark_helpers import summarize, make_session, timed, run_concurrently, load_stats, save_results
+
+BASE_URL = "http://localhost:8001"
+
+# Cheap endpoint served by the same event loop that never touches bcrypt
+PROBE_PATH = "/openapi.json"
+
+def probe(base_url: str, path: str, stop: threading.Event, interval: float) -> List[float]:
+    """Request the probe endpoint repeatedly until stop is set"""
+    session = requests.Session()
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            response = session.get(f"{base_url}{path}", timeout=60)
+            if response.status_code == 200:
+                latencies.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            pass
+        stop.wait(interval)
+    return latencies
+
+def probe_for(base_url: str, path: str, seconds: float, interval: float) -> List[float]:
+    """Probe for a fixed time with nothing else running"""
+    stop = threading.Event()
+    timer = threading.Timer(seconds, stop.set)
+    timer.start()
+    try:
+        return probe(base_url, path, stop, interval)
+    finally:
+        timer.cancel()
+
+def login_burst(base_url: str, username: str, password: str, logins: int, concurrency: int) -> Dict[str, Any]:
+    """Fire `logins` concurrent logins and return their latency summary"""
+    session = make_session(concurrency)
+
+    def one_login():
+        return timed(lambda: session.post(
+            f"{base_url}/auth/login",
+            json={"username": username, "password": password, "remember_me": False},
+            timeout=120
+        ))
+
+    results, wall_time = run_concurrently(one_login, logins, concurrency)
+    latencies = [latency for latency, _ in filter(None, results)]
+    return {
+        **load_stats(latencies, logins, wall_time),
+        "logins": logins,
+        "wall_time_s": round(wall_time, 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that a login burst does not stall unrelated endpoints")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"User Management API URL (default: {BASE_URL})")
+    parser.add_argument("--username", default="admin", help="Login used for the burst (default: admin)")
+    parser.add_argument("--password", default="admin123", help="Password for --username")
+    parser.add_argument("--logins", type=int, default=50, help="Logins in the burst (default: 50)")
+    parser.add_argument("--concurrency", type=int, default=25, help="Concurrent login clients (default: 25)")
+    parser.add_argument("--probe-path", default=PROBE_PATH, help=f"Unrelated endpoint to probe (default: {PROBE_PATH})")
+    parser.add_argument("--probe-interval", type=float, default=0.02, help="Seconds between probe requests (default: 0.02)")
+    parser.add_argument("--baseline-seconds", type=float, default=3.0, help="Idle probing time (default: 3)")
+    parser.add_argument("--max-slowdown", type=float, default=5.0,
+                        help="Fail if probe p99 during the burst exceeds this multiple of the idle p99 (default: 5)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"🔐 Login burst test against {args.base_url}: {args.logins} logins, {args.concurrency} concurrent")
+    print("=" * 80)
+
+    idle = probe_for(args.base_url, args.probe_path, args.baseline_seconds, args.probe_interval)
+    if not idle:
+        print(f"❌ Probe endpoint {args.probe_path} is not responding")
+        return 1
+    idle_stats = summarize(idle)
+    print(f"  Idle probe     p50={idle_stats['p50_ms']:.1f}ms p99={idle_stats['p99_ms']:.1f}ms ({idle_stats['samples']} samples)")
+
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as probe_executor:
+        probe_future = probe_executor.submit(probe, args.base_url, args.probe_path, stop, args.probe_interval)
+        burst_stats = login_burst(args.base_url, args.username, args.password, args.logins, args.concurrency)
+        stop.set()
+        during = probe_future.result()
+    during_stats = summarize(during)
+
+    print(f"  Burst probe    p50={during_stats['p50_ms']:.1f}ms p99={during_stats['p99_ms']:.1f}ms "
+          f"max={during_stats['max_ms']:.1f}ms ({during_stats['samples']} samples)")
+    print(f"  Logins         p50={burst_stats['p50_ms']:.1f}ms p99={burst_stats['p99_ms']:.1f}ms "
+          f"rps={burst_stats['throughput_rps']:.1f} errors={burst_stats['errors']}")
+
+    results: Dict[str, Any] = {"idle_probe": idle_stats, "burst_probe": during_stats, "logins": burst_stats}
+
+    # Pool queue metrics (admin only; skipped if unavailable)
+    try:
+        token_response = requests.post(
+            f"{args.base_url}/auth/login",
+            json={"username": args.username, "password": args.password, "remember_me": False},
+            timeout=60
+        )
+        metrics_response = requests.get(
+            f"{args.base_url}/system/auth-metrics",
+            headers={"Authorization": f"Bearer {token_response.json()['access_token']}"},
+            timeout=60
+        )
+        if metrics_response.status_code == 200:
+            hashing = metrics_response.json()["password_hashing"]
+            results["password_hashing"] = hashing
+            print(f"  Hash pool      workers={hashing['max_workers']} queue_wait p99={hashing['queue_wait']['p99_ms']:.1f}ms "
+                  f"run p50={hashing['run_time']['p50_ms']:.1f}ms")
+    except Exception:
+        pass
+
+    save_results(results, args.output)
+
+    slowdown = during_stats["p99_ms"] / idle_stats["p99_ms"] if idle_stats["p99_ms"] else 0.0
+    if burst_stats["errors"] or slowdown > args.max_slowdown:
+        print(f"\n❌ Probe p99 slowed down {slowdown:.1f}x during the login burst (limit {args.max_slowdown}x)")
+        return 1
+    print(f"\n✅ Probe p99 slowed down {slowdown:.1f}x during the login burst (limit {args.max_slowdown}x)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Concurrent latency benchmark for the ATM API's database-backed endpoints (p50/p99)
+
+Measures uncached responses only: the response cache is cleared through
+/performance/clear-cache before every request (untimed), and samples still
+served from the cache (X-Cache: HIT, refilled by a concurrent request) are left
+out and counted as cache_hits. Run the API with a single worker, as clear-cache
+only clears the worker that handles it.
+
+Usage:
+    python test_request_connection_performance.py --label before --output before.json
+    python test_request_connection_performance.py --label after --compare before.json
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from benchmark_helpers import (
+    make_session, timed, run_concurrently, load_stats,
+    add_result_arguments, save_results, print_comparison
+)
+
+BASE_URL = "http://localhost:8000/api/v1"
+
+ENDPOINTS = [
+    ("/atm/status/summary", {}),
+    ("/atm/status/regional", {}),
+    ("/atm/list", {"limit": 100}),
+    ("/atm/terminals", {}),
+    ("/atm/status/trends/overall", {"hours": 24}),
+]
+
+def uncached_request(session: requests.Session, path: str, params: dict) -> Optional[Tuple[float, bool]]:
+    """Clear the response cache, then time one request: (latency in ms, served from the cache)"""
+    try:
+        session.post(f"{BASE_URL}/performance/clear-cache", timeout=60)
+    except Exception:
+        return None
+    result = timed(lambda: session.get(f"{BASE_URL}{path}", params=params, timeout=60))
+    if result is None:
+        return None
+    latency, response = result
+    return latency, response.headers.get("X-Cache") == "HIT"
+
+def benchmark_endpoint(path: str, params: dict, requests_count: int, concurrency: int) -> Dict[str, Any]:
+    """Hit one endpoint with the given concurrency and collect latency stats"""
+    session = make_session(concurrency)
+    results, wall_time = run_concurrently(lambda: uncached_request(session, path, params), requests_count, concurrency)
+
+    completed = [r for r in results if r is not None]
+    latencies = [latency for latency, cache_hit in completed if not cache_hit]
+    stats = load_stats(latencies, requests_count, wall_time)
+    stats["errors"] = requests_count - len(completed)
+    stats["cache_hits"] = len(completed) - len(latencies)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent p50/p99 latency benchmark for the ATM API")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients (default: 20)")
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"⏱️  Benchmarking {BASE_URL} with {args.concurrency} concurrent clients, {args.requests} requests per endpoint")
+    print("=" * 80)
+
+    results: Dict[str, Any] = {"label": args.label, "concurrency": args.concurrency, "endpoints": {}}
+    for path, params in ENDPOINTS:
+        stats = benchmark_endpoint(path, params, args.requests, args.concurrency)
+        results["endpoints"][path] = stats
+        status = "✅" if stats["errors"] == 0 else "⚠️ "
+        print(f"  {status} {path:<35} p50={stats['p50_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms "
+              f"rps={stats['throughput_rps']:.1f} errors={stats['errors']} cache_hits={stats['cache_hits']}")
+
+    save_results(results, args.output)
+    print_comparison(args.compare, results, ["p50_ms", "p99_ms"])
+
+    total_errors = sum(stats["errors"] for stats in results["endpoints"].values())
+    return 0 if total_errors == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the User Management API
+
+Fires concurrent requests at /auth/login and /users and reports throughput and
+p50/p99 latency per endpoint.
+
+Usage:
+    python test_user_management_performance.py --label before --output before.json
+    python test_user_management_performance.py --label after --compare before.json
+"""
+
+import argparse
+import sys
+from typing import Any, Dict
+
+import requests
+
+from benchmark_helpers import (
+    make_session, timed, run_concurrently, load_stats,
+    add_result_arguments, save_results, print_comparison
+)
+
+BASE_URL = "http://localhost:8001"
+
+def login(session: requests.Session, base_url: str, username: str, password: str) -> requests.Response:
+    """POST /auth/login"""
+    return session.post(
+        f"{base_url}/auth/login",
+        json={"username": username, "password": password, "remember_me": False},
+        timeout=60
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency benchmark for /auth/login and /users")
+    parser.add_argument("--base-url", default=BASE_URL, help=f"User Management API URL (default: {BASE_URL})")
+    parser.add_argument("--username", default="admin", help="Login used for the benchmark (default: admin)")
+    parser.add_argument("--password", default="admin123", help="Password for --username")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients (default: 20)")
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    session = make_session(args.concurrency)
+
+    # One login up front supplies the bearer token for /users
+    response = login(session, args.base_url, args.username, args.password)
+    if response.status_code != 200:
+        print(f"❌ Login failed ({response.status_code}): {response.text}")
+        return 1
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    benchmarks = {
+        "/auth/login": lambda: login(session, args.base_url, args.username, args.password),
+        "/users": lambda: session.get(f"{args.base_url}/users", params={"limit": 10}, headers=headers, timeout=60),
+    }
+
+    print(f"⏱️  Benchmarking {args.base_url} with {args.concurrency} concurrent clients, {args.requests} requests per endpoint")
+    print("=" * 80)
+
+    results: Dict[str, Any] = {"label": args.label, "concurrency": args.concurrency, "endpoints": {}}
+    for name, call in benchmarks.items():
+        outcomes, wall_time = run_concurrently(lambda: timed(call), args.requests, args.concurrency)
+        latencies = [latency for latency, _ in filter(None, outcomes)]
+        stats = load_stats(latencies, args.requests, wall_time)
+        results["endpoints"][name] = stats
+        status = "✅" if stats["errors"] == 0 else "⚠️ "
+        print(f"  {status} {name:<15} rps={stats['throughput_rps']:.1f} p50={stats['p50_ms']:.1f}ms "
+              f"p99={stats['p99_ms']:.1f}ms errors={stats['errors']}")
+
+    save_results(results, args.output)
+    print_comparison(args.compare, results, ["throughput_rps", "p99_ms"])
+
+    total_errors = sum(stats["errors"] for stats in results["endpoints"].values())
+    return 0 if total_errors == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
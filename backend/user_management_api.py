@@ -10,7 +10,6 @@ from contextlib import asynccontextmanager
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta, timezone
-import bcrypt
 import secrets
 import jwt
 import uuid
@@ -18,14 +17,20 @@ import json
 from enum import Enum
 import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 import os
 import pytz
 from typing import Union
 import hashlib
 import hmac
+from principal_cache import PrincipalCache, USER_SESSIONS_CHANGED_CHANNEL, make_payload
+from password_hasher import PasswordHasher
 
 # Load environment variables
 # Get the directory where this script is located
@@ -43,7 +48,9 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    initialize_default_users()
+    init_db_pool()
+    principal_cache.start_listener(POSTGRES_CONFIG)
+    await initialize_default_users()
     
     # Start session scheduler
     try:
@@ -62,7 +69,10 @@ async def lifespan(app: FastAPI):
         logger.info("Session scheduler stopped")
     except Exception as e:
         logger.error(f"Error stopping session scheduler: {e}")
-    pass
+    
+    principal_cache.stop_listener()
+    password_hasher.shutdown()
+    close_db_pool()
 
 app = FastAPI(title="User Management API", version="1.0.0", lifespan=lifespan)
 
@@ -103,6 +113,13 @@ SESSION_TIMEOUT_WARNING_MINUTES = int(os.getenv('SESSION_TIMEOUT_WARNING_MINUTES
 AUTO_LOGOUT_DILI_TIME = os.getenv('AUTO_LOGOUT_DILI_TIME', '00:00')
 REMEMBER_ME_DAYS = int(os.getenv('REMEMBER_ME_DAYS', '30'))
 
+# Validated-token cache used by get_current_user (0 disables it)
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', '60'))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv('PRINCIPAL_CACHE_MAX_ENTRIES', '10000'))
+
+# Concurrent bcrypt operations (each one keeps a CPU core busy)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
 # PostgreSQL configuration from environment variables
 POSTGRES_CONFIG = {
     "host": os.getenv('DB_HOST'),
@@ -119,6 +136,13 @@ missing_vars = [var for var in required_db_vars if not os.getenv(var)]
 if missing_vars:
     raise ValueError(f"Missing required database environment variables: {', '.join(missing_vars)}")
 
+principal_cache = PrincipalCache(
+    ttl_seconds=PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+password_hasher = PasswordHasher(max_workers=PASSWORD_HASH_WORKERS)
+
 # Enums
 class UserRole(str, Enum):
     SUPER_ADMIN = "super_admin"
@@ -265,32 +289,95 @@ except Exception as e:
     # sys.exit(1)
 
 # Database helper functions
-def get_db_connection():
-    """Get PostgreSQL database connection"""
+# Connections come from a shared psycopg2 pool and every statement runs on a
+# dedicated thread executor, so handlers never block the event loop and never
+# pay connection setup per query. The executor has one thread per pooled
+# connection and _db_slots caps checkouts at the pool size, so a checkout
+# never finds the pool exhausted.
+DB_POOL_MIN = int(os.getenv('USER_DB_POOL_MIN', '2'))
+DB_POOL_MAX = int(os.getenv('USER_DB_POOL_MAX', '10'))
+
+db_pool: Optional[ThreadedConnectionPool] = None
+db_executor: Optional[ThreadPoolExecutor] = None
+_db_pool_lock = threading.Lock()
+_db_slots: Optional[asyncio.Semaphore] = None
+
+def init_db_pool():
+    """Create the shared connection pool and its executor (idempotent)"""
+    global db_pool, db_executor, _db_slots
+    with _db_pool_lock:
+        if db_pool is None:
+            try:
+                db_pool = ThreadedConnectionPool(
+                    DB_POOL_MIN, DB_POOL_MAX, **POSTGRES_CONFIG, cursor_factory=RealDictCursor
+                )
+            except psycopg2.Error as e:
+                logger.error(f"Database connection error: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Database connection failed"
+                )
+            db_executor = ThreadPoolExecutor(max_workers=DB_POOL_MAX, thread_name_prefix="user-db")
+            _db_slots = asyncio.Semaphore(DB_POOL_MAX)
+            logger.info(f"User database pool created (min={DB_POOL_MIN}, max={DB_POOL_MAX})")
+
+def close_db_pool():
+    """Close all pooled connections and stop the executor"""
+    global db_pool, db_executor, _db_slots
+    with _db_pool_lock:
+        if db_executor is not None:
+            db_executor.shutdown(wait=True)
+            db_executor = None
+        if db_pool is not None:
+            db_pool.closeall()
+            db_pool = None
+        _db_slots = None
+        logger.info("User database pool closed")
+
+async def _run_db(func, *args):
+    """Run a blocking database call on the database executor"""
+    if db_pool is None:
+        init_db_pool()
+    return await asyncio.get_running_loop().run_in_executor(db_executor, func, *args)
+
+def _run_statement(conn, query: str, params: Optional[tuple], fetch: Optional[str]):
+    """Execute one statement on conn and return rows (fetch) or the rowcount"""
+    with conn.cursor() as cursor:
+        cursor.execute(query, params or ())
+        if fetch == "one":
+            return cursor.fetchone()
+        elif fetch == "all":
+            return cursor.fetchall()
+        return cursor.rowcount
+
+def _release_connection(conn, broken: bool = False):
+    """Return conn to the pool, closing it if it is no longer usable"""
+    if db_pool is not None:
+        db_pool.putconn(conn, close=broken or conn.closed != 0)
+
+def _execute_query_sync(query: str, params: Optional[tuple], fetch: Optional[str]):
+    """Run one statement in its own transaction on a pooled connection"""
+    conn = db_pool.getconn()
+    broken = False
     try:
-        conn = psycopg2.connect(**POSTGRES_CONFIG, cursor_factory=RealDictCursor)
-        return conn
-    except psycopg2.Error as e:
-        logger.error(f"Database connection error: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection failed"
-        )
+        result = _run_statement(conn, query, params, fetch)
+        conn.commit()
+        return result
+    except psycopg2.Error:
+        broken = conn.closed != 0
+        if not broken:
+            conn.rollback()
+        raise
+    finally:
+        _release_connection(conn, broken)
 
-def execute_query(query: str, params: Optional[tuple] = None, fetch: Optional[str] = None):
+async def execute_query(query: str, params: Optional[tuple] = None, fetch: Optional[str] = None):
     """Execute database query with proper error handling"""
     try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(query, params or ())
-                
-                if fetch == "one":
-                    return cursor.fetchone()
-                elif fetch == "all":
-                    return cursor.fetchall()
-                else:
-                    conn.commit()
-                    return cursor.rowcount
+        if _db_slots is None:
+            init_db_pool()
+        async with _db_slots:
+            return await _run_db(_execute_query_sync, query, params, fetch)
     except psycopg2.Error as e:
         logger.error(f"Database query error: {e}")
         raise HTTPException(
@@ -298,16 +385,73 @@ def execute_query(query: str, params: Optional[tuple] = None, fetch: Optional[st
             detail="Database operation failed"
         )
 
-# Utility Functions
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+class DBTransaction:
+    """Statements that run on one pooled connection and commit together"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+    
+    async def execute(self, query: str, params: Optional[tuple] = None, fetch: Optional[str] = None):
+        """Same contract as execute_query, inside the open transaction"""
+        try:
+            return await _run_db(_run_statement, self.conn, query, params, fetch)
+        except psycopg2.Error as e:
+            logger.error(f"Database query error: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database operation failed"
+            )
 
-def verify_password(password: str, hashed: str) -> bool:
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+@asynccontextmanager
+async def db_transaction():
+    """
+    Run several statements atomically
+    
+    Commits when the block exits normally and rolls back if it raises:
+        async with db_transaction() as tx:
+            await tx.execute(...)
+            await tx.execute(...)
+    """
+    if _db_slots is None:
+        init_db_pool()
+    async with _db_slots:
+        try:
+            conn = await _run_db(db_pool.getconn)
+        except psycopg2.Error as e:
+            logger.error(f"Database connection error: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Database connection failed"
+            )
+        broken = False
+        try:
+            yield DBTransaction(conn)
+            try:
+                await _run_db(conn.commit)
+            except psycopg2.Error as e:
+                logger.error(f"Database commit error: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Database operation failed"
+                )
+        except BaseException:
+            broken = conn.closed != 0
+            if not broken:
+                try:
+                    await _run_db(conn.rollback)
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            _release_connection(conn, broken)
+
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt (on the password hashing pool)"""
+    return await password_hasher.hash(password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """Verify a password against its hash (on the password hashing pool)"""
+    return await password_hasher.verify(password, hashed)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
@@ -389,7 +533,7 @@ def should_auto_logout(user_last_activity: datetime) -> bool:
     
     return False
 
-def update_session_activity(user_id: str, session_token: str) -> None:
+async def update_session_activity(user_id: str, session_token: str) -> None:
     """Update last accessed time for session"""
     try:
         query = """
@@ -397,11 +541,11 @@ def update_session_activity(user_id: str, session_token: str) -> None:
             SET last_accessed_at = CURRENT_TIMESTAMP
             WHERE user_id = %s AND session_token = %s AND is_active = true
         """
-        execute_query(query, (user_id, session_token))
+        await execute_query(query, (user_id, session_token))
     except Exception as e:
         logger.error(f"Failed to update session activity: {e}")
 
-def store_password_reset_token(user_id: str, token: str, email: str) -> None:
+async def store_password_reset_token(user_id: str, token: str, email: str) -> None:
     """Store password reset token in database"""
     try:
         # First, invalidate any existing password reset tokens for this user
@@ -410,7 +554,6 @@ def store_password_reset_token(user_id: str, token: str, email: str) -> None:
             SET is_used = true, updated_at = CURRENT_TIMESTAMP
             WHERE user_id = %s AND is_used = false AND expires_at > CURRENT_TIMESTAMP
         """
-        execute_query(invalidate_query, (user_id,))
         
         # Insert new password reset token
         insert_query = """
@@ -424,9 +567,11 @@ def store_password_reset_token(user_id: str, token: str, email: str) -> None:
         expires_at = datetime.now(timezone.utc) + timedelta(hours=PASSWORD_RESET_TOKEN_EXPIRE_HOURS)
         now = datetime.now(timezone.utc)
         
-        execute_query(insert_query, (
-            token_id, user_id, token_hash, email, expires_at, False, now, now
-        ))
+        async with db_transaction() as tx:
+            await tx.execute(invalidate_query, (user_id,))
+            await tx.execute(insert_query, (
+                token_id, user_id, token_hash, email, expires_at, False, now, now
+            ))
         
         logger.info(f"Password reset token stored for user {user_id}")
         
@@ -434,7 +579,7 @@ def store_password_reset_token(user_id: str, token: str, email: str) -> None:
         logger.error(f"Failed to store password reset token: {e}")
         raise
 
-def verify_password_reset_token_db(token: str) -> Optional[Dict[str, Any]]:
+async def verify_password_reset_token_db(token: str) -> Optional[Dict[str, Any]]:
     """Verify password reset token against database"""
     try:
         token_hash = hashlib.sha256(token.encode()).hexdigest()
@@ -449,7 +594,7 @@ def verify_password_reset_token_db(token: str) -> Optional[Dict[str, Any]]:
                 AND u.is_deleted = false
         """
         
-        result = execute_query(query, (token_hash,), fetch="one")
+        result = await execute_query(query, (token_hash,), fetch="one")
         
         if result:
             return dict(result)
@@ -459,7 +604,7 @@ def verify_password_reset_token_db(token: str) -> Optional[Dict[str, Any]]:
         logger.error(f"Failed to verify password reset token: {e}")
         return None
 
-def mark_password_reset_token_used(token: str) -> None:
+async def mark_password_reset_token_used(token: str) -> None:
     """Mark password reset token as used"""
     try:
         token_hash = hashlib.sha256(token.encode()).hexdigest()
@@ -470,7 +615,7 @@ def mark_password_reset_token_used(token: str) -> None:
             WHERE token_hash = %s AND is_used = false
         """
         
-        execute_query(query, (token_hash,))
+        await execute_query(query, (token_hash,))
         logger.info("Password reset token marked as used")
         
     except Exception as e:
@@ -497,7 +642,7 @@ async def send_password_reset_email(email: str, username: str, reset_token: str,
         logger.error(f"Failed to send password reset email: {e}")
         return False
 
-def log_audit_action(
+async def log_audit_action(
     action: AuditAction,
     user_id: Optional[str] = None,
     entity_type: str = "user",
@@ -527,12 +672,29 @@ def log_audit_action(
             user_agent,
             performed_by
         )
-        execute_query(query, params)
+        await execute_query(query, params)
         logger.info(f"Audit log: {action.value} by user {performed_by} on {entity_type} {entity_id}")
     except Exception as e:
         logger.error(f"Failed to log audit action: {e}")
         # Don't raise exception as audit logging failure shouldn't break the main operation
 
+async def invalidate_principals(user_id: Optional[str] = None, token: Optional[str] = None):
+    """
+    Drop cached principals in this process and tell the other API processes
+    
+    Pass a token for one session, a user_id for all of a user's sessions, or
+    nothing to drop every cached principal.
+    """
+    principal_cache.invalidate(user_id=user_id, token=token)
+    try:
+        await execute_query(
+            "SELECT pg_notify(%s, %s)",
+            (USER_SESSIONS_CHANGED_CHANNEL, make_payload(user_id=user_id, token=token)),
+            fetch="one"
+        )
+    except Exception as e:
+        logger.error(f"Failed to publish principal cache invalidation: {e}")
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get current authenticated user from database"""
     try:
@@ -552,9 +714,25 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    query = "SELECT * FROM users WHERE id = %s AND is_active = true AND is_deleted = false"
-    user = execute_query(query, (user_id,), fetch="one")
+    # Recently validated tokens are answered from memory
+    cached_user = principal_cache.get(token)
+    if cached_user is not None and str(cached_user.get("id")) == str(user_id):
+        return cached_user
+    generation = principal_cache.generation
+    
+    # Get user and check the session is still active in one round trip
+    query = """
+        SELECT u.*, (
+            SELECT EXTRACT(EPOCH FROM (s.expires_at - CURRENT_TIMESTAMP)) FROM user_sessions s
+            WHERE s.session_token = %s AND s.user_id = u.id AND s.is_active = true
+            AND s.expires_at > CURRENT_TIMESTAMP
+            ORDER BY s.expires_at DESC
+            LIMIT 1
+        ) AS session_seconds_left
+        FROM users u
+        WHERE u.id = %s AND u.is_active = true AND u.is_deleted = false
+    """
+    user = await execute_query(query, (token, user_id), fetch="one")
     
     if user is None:
         raise HTTPException(
@@ -563,22 +741,22 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Check if session is still active in database
-    session_query = """
-        SELECT id FROM user_sessions 
-        WHERE session_token = %s AND user_id = %s AND is_active = true
-        AND expires_at > CURRENT_TIMESTAMP
-    """
-    active_session = execute_query(session_query, (token, user_id), fetch="one")
-    
-    if active_session is None:
+    user = dict(user)
+    session_seconds_left = user.pop("session_seconds_left")
+    if session_seconds_left is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session expired or invalid",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return dict(user)
+    # Measured in the database so the cache agrees with its session expiry check
+    expires_at = time.time() + float(session_seconds_left)
+    if payload.get("exp"):
+        expires_at = min(expires_at, float(payload["exp"]))
+    principal_cache.put(token, user, expires_at=expires_at, generation=generation)
+    
+    return user
 
 # API Endpoints
 
@@ -587,10 +765,10 @@ async def login(user_login: UserLogin, request: Request):
     """Authenticate user and return tokens"""
     # Find user by username
     query = "SELECT * FROM users WHERE username = %s AND is_deleted = false"
-    user = execute_query(query, (user_login.username,), fetch="one")
+    user = await execute_query(query, (user_login.username,), fetch="one")
     
     if not user:
-        log_audit_action(
+        await log_audit_action(
             AuditAction.LOGIN,
             ip_address=get_client_ip(request),
             user_agent=request.headers.get("user-agent"),
@@ -612,7 +790,7 @@ async def login(user_login: UserLogin, request: Request):
         )
     
     # Verify password
-    if not verify_password(user_login.password, user_dict["password_hash"]):
+    if not await verify_password(user_login.password, user_dict["password_hash"]):
         # Increment failed attempts
         failed_attempts = user_dict.get("failed_login_attempts", 0) + 1
         
@@ -624,8 +802,8 @@ async def login(user_login: UserLogin, request: Request):
                 SET failed_login_attempts = %s, account_locked_until = %s, updated_at = CURRENT_TIMESTAMP
                 WHERE id = %s
             """
-            execute_query(query, (failed_attempts, lock_until, user_id))
-            log_audit_action(AuditAction.ACCOUNT_LOCK, user_id=user_id, performed_by="system")
+            await execute_query(query, (failed_attempts, lock_until, user_id))
+            await log_audit_action(AuditAction.ACCOUNT_LOCK, user_id=user_id, performed_by="system")
         else:
             # Update failed attempts
             query = """
@@ -633,9 +811,9 @@ async def login(user_login: UserLogin, request: Request):
                 SET failed_login_attempts = %s, updated_at = CURRENT_TIMESTAMP
                 WHERE id = %s
             """
-            execute_query(query, (failed_attempts, user_id))
+            await execute_query(query, (failed_attempts, user_id))
         
-        log_audit_action(
+        await log_audit_action(
             AuditAction.LOGIN,
             user_id=user_id,
             ip_address=get_client_ip(request),
@@ -648,15 +826,14 @@ async def login(user_login: UserLogin, request: Request):
             detail="Invalid username or password"
         )
     
-    # Reset failed attempts on successful login
-    query = """
+    # Reset failed attempts on successful login (written with the session below)
+    reset_attempts_query = """
         UPDATE users 
         SET failed_login_attempts = 0, account_locked_until = NULL, 
             last_login_at = CURRENT_TIMESTAMP, last_login_ip = %s,
             updated_at = CURRENT_TIMESTAMP
         WHERE id = %s
     """
-    execute_query(query, (get_client_ip(request), user_id))
     
     # Create tokens with extended expiration for "Remember Me"
     if user_login.remember_me:
@@ -696,9 +873,11 @@ async def login(user_login: UserLogin, request: Request):
         user_login.remember_me,
         datetime.now(timezone.utc)  # last_accessed_at
     )
-    execute_query(session_query, session_params)
+    async with db_transaction() as tx:
+        await tx.execute(reset_attempts_query, (get_client_ip(request), user_id))
+        await tx.execute(session_query, session_params)
     
-    log_audit_action(
+    await log_audit_action(
         AuditAction.LOGIN,
         user_id=user_id,
         ip_address=get_client_ip(request),
@@ -729,10 +908,11 @@ async def logout(request: Request, current_user: dict = Depends(get_current_user
                 SET is_active = false
                 WHERE user_id = %s AND session_token = %s AND is_active = true
             """
-            execute_query(query, (user_id, token))
+            await execute_query(query, (user_id, token))
+            await invalidate_principals(token=token)
             
             # Log the logout action
-            log_audit_action(
+            await log_audit_action(
                 AuditAction.LOGOUT,
                 user_id=user_id,
                 ip_address=get_client_ip(request),
@@ -774,7 +954,7 @@ async def get_user_sessions(
         WHERE user_id = %s AND is_active = true
         ORDER BY last_accessed_at DESC
     """
-    sessions = execute_query(query, (user_id,), fetch="all")
+    sessions = await execute_query(query, (user_id,), fetch="all")
     
     return {"sessions": [dict(session) for session in sessions] if sessions else []}
 
@@ -792,7 +972,7 @@ async def revoke_session(
             SELECT id FROM user_sessions 
             WHERE session_token = %s AND user_id = %s AND is_active = true
         """
-        existing_session = execute_query(check_query, (session_token, user_id), fetch="one")
+        existing_session = await execute_query(check_query, (session_token, user_id), fetch="one")
         
         if not existing_session:
             raise HTTPException(
@@ -806,10 +986,11 @@ async def revoke_session(
             SET is_active = false, updated_at = %s
             WHERE session_token = %s AND user_id = %s AND is_active = true
         """
-        rows_affected = execute_query(update_query, (datetime.utcnow(), session_token, user_id))
+        rows_affected = await execute_query(update_query, (datetime.utcnow(), session_token, user_id))
         
         if rows_affected and rows_affected > 0:
-            log_audit_action(
+            await invalidate_principals(token=session_token)
+            await log_audit_action(
                 AuditAction.LOGOUT,
                 user_id=user_id,
                 new_values={"action": "session_revoked", "session_token": session_token[:20] + "..."}
@@ -842,14 +1023,14 @@ async def refresh_session(request: Request, current_user: dict = Depends(get_cur
             token = auth_header.split(" ")[1]
             
             # Update session activity
-            update_session_activity(user_id, token)
+            await update_session_activity(user_id, token)
             
             # Check if user should be auto-logged out due to midnight rule
             query = """
                 SELECT last_accessed_at FROM user_sessions 
                 WHERE user_id = %s AND session_token = %s AND is_active = true
             """
-            session_data = execute_query(query, (user_id, token), fetch="one")
+            session_data = await execute_query(query, (user_id, token), fetch="one")
             
             if session_data and should_auto_logout(session_data["last_accessed_at"]):
                 # Force logout due to midnight rule
@@ -858,9 +1039,10 @@ async def refresh_session(request: Request, current_user: dict = Depends(get_cur
                     SET is_active = false, updated_at = CURRENT_TIMESTAMP
                     WHERE user_id = %s AND session_token = %s
                 """
-                execute_query(logout_query, (user_id, token))
+                await execute_query(logout_query, (user_id, token))
+                await invalidate_principals(token=token)
                 
-                log_audit_action(
+                await log_audit_action(
                     AuditAction.LOGOUT,
                     user_id=user_id,
                     new_values={"reason": "auto_logout_midnight_dili"}
@@ -922,7 +1104,7 @@ async def forgot_password(
             FROM users 
             WHERE email = %s AND is_deleted = false
         """
-        user = execute_query(query, (forgot_request.email,), fetch="one")
+        user = await execute_query(query, (forgot_request.email,), fetch="one")
         
         # Always return success message for security (don't reveal if user exists)
         success_message = {
@@ -931,7 +1113,7 @@ async def forgot_password(
         
         if not user:
             # Log the attempt for security monitoring
-            log_audit_action(
+            await log_audit_action(
                 AuditAction.PASSWORD_RESET_REQUEST,
                 ip_address=get_client_ip(request),
                 user_agent=request.headers.get("user-agent"),
@@ -946,7 +1128,7 @@ async def forgot_password(
         
         # Check if user account is active
         if not user_dict["is_active"]:
-            log_audit_action(
+            await log_audit_action(
                 AuditAction.PASSWORD_RESET_REQUEST,
                 user_id=user_dict["id"],
                 ip_address=get_client_ip(request),
@@ -963,7 +1145,7 @@ async def forgot_password(
         reset_token = create_password_reset_token(user_dict["id"], user_dict["email"])
         
         # Store token in database
-        store_password_reset_token(user_dict["id"], reset_token, user_dict["email"])
+        await store_password_reset_token(user_dict["id"], reset_token, user_dict["email"])
         
         # Send password reset email
         email_sent = await send_password_reset_email(
@@ -975,7 +1157,7 @@ async def forgot_password(
         
         if email_sent:
             # Log successful password reset request
-            log_audit_action(
+            await log_audit_action(
                 AuditAction.PASSWORD_RESET_REQUEST,
                 user_id=user_dict["id"],
                 ip_address=get_client_ip(request),
@@ -1015,7 +1197,7 @@ async def reset_password(
             )
         
         # Verify the reset token
-        token_data = verify_password_reset_token_db(reset_request.token)
+        token_data = await verify_password_reset_token_db(reset_request.token)
         
         if not token_data:
             raise HTTPException(
@@ -1027,7 +1209,7 @@ async def reset_password(
         username = token_data["username"]
         
         # Hash the new password
-        new_password_hash = hash_password(reset_request.new_password)
+        new_password_hash = await hash_password(reset_request.new_password)
         now = datetime.now(timezone.utc)
         
         # Update user password
@@ -1041,27 +1223,31 @@ async def reset_password(
             WHERE id = %s AND is_deleted = false
         """
         
-        rows_affected = execute_query(update_query, (new_password_hash, now, now, user_id))
-        
-        if rows_affected == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Unable to reset password - user not found"
-            )
-        
-        # Mark the reset token as used
-        mark_password_reset_token_used(reset_request.token)
-        
         # Invalidate all existing sessions for this user
         invalidate_sessions_query = """
             UPDATE user_sessions 
             SET is_active = false
             WHERE user_id = %s AND is_active = true
         """
-        execute_query(invalidate_sessions_query, (user_id,))
+        
+        # Password change and session invalidation commit together
+        async with db_transaction() as tx:
+            rows_affected = await tx.execute(update_query, (new_password_hash, now, now, user_id))
+            
+            if rows_affected == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Unable to reset password - user not found"
+                )
+            
+            await tx.execute(invalidate_sessions_query, (user_id,))
+        await invalidate_principals(user_id=user_id)
+        
+        # Mark the reset token as used
+        await mark_password_reset_token_used(reset_request.token)
         
         # Log the successful password reset
-        log_audit_action(
+        await log_audit_action(
             AuditAction.PASSWORD_RESET_COMPLETE,
             user_id=user_id,
             ip_address=get_client_ip(request),
@@ -1091,7 +1277,7 @@ async def reset_password(
 async def verify_reset_token(token: str):
     """Verify if a password reset token is valid"""
     try:
-        token_data = verify_password_reset_token_db(token)
+        token_data = await verify_password_reset_token_db(token)
         
         if not token_data:
             raise HTTPException(
@@ -1123,7 +1309,7 @@ async def get_user(
 ):
     """Get a specific user"""
     query = "SELECT * FROM users WHERE id = %s AND is_deleted = false"
-    user = execute_query(query, (user_id,), fetch="one")
+    user = await execute_query(query, (user_id,), fetch="one")
     
     if not user:
         raise HTTPException(
@@ -1178,7 +1364,7 @@ async def get_users(
     
     # Count total users
     count_query = f"SELECT COUNT(*) FROM users WHERE {where_clause}"
-    total_result = execute_query(count_query, tuple(params), fetch="one")
+    total_result = await execute_query(count_query, tuple(params), fetch="one")
     total = total_result['count'] if total_result else 0
     
     # Calculate pagination
@@ -1193,7 +1379,7 @@ async def get_users(
         LIMIT %s OFFSET %s
     """
     users_params = params + [limit, offset]
-    users_result = execute_query(users_query, tuple(users_params), fetch="all")
+    users_result = await execute_query(users_query, tuple(users_params), fetch="all")
     
     # Convert to response format
     users = []
@@ -1230,7 +1416,7 @@ async def create_user(
     try:
         # Check if username already exists
         check_query = "SELECT id FROM users WHERE username = %s AND is_deleted = false"
-        existing_user = execute_query(check_query, (user_data.username,), fetch="one")
+        existing_user = await execute_query(check_query, (user_data.username,), fetch="one")
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -1239,7 +1425,7 @@ async def create_user(
         
         # Check if email already exists
         check_email_query = "SELECT id FROM users WHERE email = %s AND is_deleted = false"
-        existing_email = execute_query(check_email_query, (user_data.email,), fetch="one")
+        existing_email = await execute_query(check_email_query, (user_data.email,), fetch="one")
         if existing_email:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -1248,7 +1434,7 @@ async def create_user(
         
         # Create new user
         user_id = str(uuid.uuid4())
-        password_hash = hash_password(user_data.password)
+        password_hash = await hash_password(user_data.password)
         now = datetime.now(timezone.utc)
         
         insert_query = """
@@ -1257,6 +1443,7 @@ async def create_user(
                 phone, role, is_active, is_deleted, password_changed_at,
                 failed_login_attempts, created_at, updated_at, created_by
             ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING *
         """
         
         params = (
@@ -1277,10 +1464,10 @@ async def create_user(
             current_user.get("id")  # created_by
         )
         
-        execute_query(insert_query, params)
+        user = await execute_query(insert_query, params, fetch="one")
         
         # Log the action
-        log_audit_action(
+        await log_audit_action(
             AuditAction.CREATE_USER,
             user_id=current_user.get("id"),
             entity_id=user_id,
@@ -1295,10 +1482,6 @@ async def create_user(
             performed_by=current_user.get("username")
         )
         
-        # Get the created user
-        get_query = "SELECT * FROM users WHERE id = %s"
-        user = execute_query(get_query, (user_id,), fetch="one")
-        
         logger.info(f"User created successfully: {user_data.username} by {current_user.get('username')}")
         return UserResponse(**dict(user))
         
@@ -1322,7 +1505,7 @@ async def update_user(
     
     # Check if user exists
     user_query = "SELECT * FROM users WHERE id = %s AND is_deleted = false"
-    user = execute_query(user_query, (user_id,), fetch="one")
+    user = await execute_query(user_query, (user_id,), fetch="one")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1372,7 +1555,7 @@ async def update_user(
                 # Check for username uniqueness
                 if field == "username" and value != user["username"]:
                     check_query = "SELECT id FROM users WHERE username = %s AND is_deleted = false AND id != %s"
-                    existing = execute_query(check_query, (value, user_id), fetch="one")
+                    existing = await execute_query(check_query, (value, user_id), fetch="one")
                     if existing:
                         raise HTTPException(
                             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1382,7 +1565,7 @@ async def update_user(
                 # Check for email uniqueness
                 if field == "email" and value != user["email"]:
                     check_query = "SELECT id FROM users WHERE email = %s AND is_deleted = false AND id != %s"
-                    existing = execute_query(check_query, (value, user_id), fetch="one")
+                    existing = await execute_query(check_query, (value, user_id), fetch="one")
                     if existing:
                         raise HTTPException(
                             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1411,10 +1594,11 @@ async def update_user(
             WHERE id = %s
         """
         
-        execute_query(update_query, tuple(params))
+        await execute_query(update_query, tuple(params))
+        await invalidate_principals(user_id=user_id)
         
         # Log the action
-        log_audit_action(
+        await log_audit_action(
             AuditAction.UPDATE_USER,
             user_id=current_user.get("id"),
             entity_id=user_id,
@@ -1426,7 +1610,7 @@ async def update_user(
         )
         
         # Get updated user
-        updated_user = execute_query(user_query, (user_id,), fetch="one")
+        updated_user = await execute_query(user_query, (user_id,), fetch="one")
         
         logger.info(f"User updated successfully: {user['username']} by {current_user.get('username')}")
         return UserResponse(**dict(updated_user))
@@ -1457,7 +1641,7 @@ async def delete_user(
     
     # Check if user exists
     user_query = "SELECT * FROM users WHERE id = %s AND is_deleted = false"
-    user = execute_query(user_query, (user_id,), fetch="one")
+    user = await execute_query(user_query, (user_id,), fetch="one")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1486,14 +1670,17 @@ async def delete_user(
             SET is_deleted = true, is_active = false, updated_at = %s
             WHERE id = %s
         """
-        execute_query(delete_query, (now, user_id))
         
         # Invalidate all sessions for this user
         invalidate_query = "UPDATE user_sessions SET is_active = false WHERE user_id = %s"
-        execute_query(invalidate_query, (user_id,))
+        
+        async with db_transaction() as tx:
+            await tx.execute(delete_query, (now, user_id))
+            await tx.execute(invalidate_query, (user_id,))
+        await invalidate_principals(user_id=user_id)
         
         # Log the action
-        log_audit_action(
+        await log_audit_action(
             AuditAction.DELETE_USER,
             user_id=current_user.get("id"),
             entity_id=user_id,
@@ -1525,7 +1712,7 @@ async def change_password(
     
     # Check if user exists
     user_query = "SELECT * FROM users WHERE id = %s AND is_deleted = false"
-    user = execute_query(user_query, (user_id,), fetch="one")
+    user = await execute_query(user_query, (user_id,), fetch="one")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1544,7 +1731,7 @@ async def change_password(
     
     # For self-updates, verify current password
     if is_self_update:
-        if not verify_password(password_data.current_password, user["password_hash"]):
+        if not await verify_password(password_data.current_password, user["password_hash"]):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Current password is incorrect"
@@ -1559,7 +1746,7 @@ async def change_password(
     
     try:
         # Hash new password
-        new_password_hash = hash_password(password_data.new_password)
+        new_password_hash = await hash_password(password_data.new_password)
         now = datetime.now(timezone.utc)
         
         # Update password
@@ -1570,25 +1757,27 @@ async def change_password(
                 updated_at = %s
             WHERE id = %s
         """
-        execute_query(update_query, (new_password_hash, now, now, user_id))
-        
-        # Invalidate all other sessions for this user (except current one if self-update)
-        if is_self_update:
-            # Keep current session active, invalidate others
-            current_session_token = request.headers.get("authorization", "").replace("Bearer ", "")
-            invalidate_query = """
-                UPDATE user_sessions 
-                SET is_active = false 
-                WHERE user_id = %s AND session_token != %s
-            """
-            execute_query(invalidate_query, (user_id, current_session_token))
-        else:
-            # Invalidate all sessions for user
-            invalidate_query = "UPDATE user_sessions SET is_active = false WHERE user_id = %s"
-            execute_query(invalidate_query, (user_id,))
+        async with db_transaction() as tx:
+            await tx.execute(update_query, (new_password_hash, now, now, user_id))
+            
+            # Invalidate all other sessions for this user (except current one if self-update)
+            if is_self_update:
+                # Keep current session active, invalidate others
+                current_session_token = request.headers.get("authorization", "").replace("Bearer ", "")
+                invalidate_query = """
+                    UPDATE user_sessions 
+                    SET is_active = false 
+                    WHERE user_id = %s AND session_token != %s
+                """
+                await tx.execute(invalidate_query, (user_id, current_session_token))
+            else:
+                # Invalidate all sessions for user
+                invalidate_query = "UPDATE user_sessions SET is_active = false WHERE user_id = %s"
+                await tx.execute(invalidate_query, (user_id,))
+        await invalidate_principals(user_id=user_id)
         
         # Log the action
-        log_audit_action(
+        await log_audit_action(
             AuditAction.PASSWORD_CHANGE,
             user_id=current_user.get("id"),
             entity_id=user_id,
@@ -1676,7 +1865,7 @@ async def get_audit_log(
     
     # Count total entries
     count_query = f"SELECT COUNT(*) FROM user_audit_log WHERE {where_clause}"
-    total_result = execute_query(count_query, tuple(params), fetch="one")
+    total_result = await execute_query(count_query, tuple(params), fetch="one")
     total = total_result['count'] if total_result else 0
     
     # Calculate pagination
@@ -1707,7 +1896,7 @@ async def get_audit_log(
         LIMIT %s OFFSET %s
     """
     audit_params = params + [limit, offset]
-    audit_result = execute_query(audit_query, tuple(audit_params), fetch="all")
+    audit_result = await execute_query(audit_query, tuple(audit_params), fetch="all")
     
     # Convert to response format
     audit_logs = []
@@ -1743,8 +1932,25 @@ async def get_audit_log(
         }
     }
 
+# ==================== SYSTEM METRICS ====================
+
+@app.get("/system/auth-metrics")
+async def get_auth_metrics(current_user: dict = Depends(get_current_user)):
+    """Password hashing pool and principal cache statistics (admin/super_admin only)"""
+    if current_user.get("role") not in ["admin", "super_admin"]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions to view system metrics"
+        )
+    
+    return {
+        "password_hashing": password_hasher.get_stats(),
+        "principal_cache": principal_cache.get_stats(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
 # Initialize with default admin user
-def initialize_default_users():
+async def initialize_default_users():
     """Create default admin user and required tables if they don't exist"""
     try:
         # Create password_reset_tokens table if it doesn't exist
@@ -1760,7 +1966,7 @@ def initialize_default_users():
                 updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
             )
         """
-        execute_query(create_table_query)
+        await execute_query(create_table_query)
         
         # Create index on token_hash for faster lookups
         index_query = """
@@ -1768,20 +1974,20 @@ def initialize_default_users():
             ON password_reset_tokens(token_hash) 
             WHERE is_used = false
         """
-        execute_query(index_query)
+        await execute_query(index_query)
         
         # Create index on user_id for faster cleanup
         user_index_query = """
             CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_user_id 
             ON password_reset_tokens(user_id)
         """
-        execute_query(user_index_query)
+        await execute_query(user_index_query)
         
         logger.info("Password reset tokens table initialized successfully")
         
         # Check if any admin user exists
         query = "SELECT COUNT(*) FROM users WHERE role IN ('super_admin', 'admin') AND is_deleted = false"
-        result = execute_query(query, fetch="one")
+        result = await execute_query(query, fetch="one")
         
         if result["count"] > 0:
             logger.info("Admin user already exists - skipping initialization")
@@ -1789,7 +1995,7 @@ def initialize_default_users():
         
         # Create default admin user
         admin_id = str(uuid.uuid4())
-        password_hash = hash_password("admin123")  # Change this in production!
+        password_hash = await hash_password("admin123")  # Change this in production!
         
         insert_query = """
             INSERT INTO users (
@@ -1816,10 +2022,10 @@ def initialize_default_users():
             now
         )
         
-        execute_query(insert_query, params)
+        await execute_query(insert_query, params)
         
         # Log the creation
-        log_audit_action(
+        await log_audit_action(
             AuditAction.CREATE_USER,
             user_id=admin_id,
             entity_id=admin_id,
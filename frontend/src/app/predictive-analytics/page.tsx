@@ -49,7 +49,7 @@ export default function PredictiveAnalyticsPage() {
       setError(null);
       
       const riskFilter = selectedRiskFilter === 'ALL' ? undefined : selectedRiskFilter as 'LOW' | 'MEDIUM' | 'HIGH' | 'CRITICAL';
-      const result = await predictiveApiService.getPredictiveAnalyticsSummary(riskFilter, 20);
+      const result = await predictiveApiService.getPredictiveAnalyticsSummary(riskFilter);
       setSummaryData(result);
       
     } catch (err) {
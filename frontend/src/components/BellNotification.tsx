@@ -15,7 +15,7 @@ export default function BellNotification({ className }: BellNotificationProps) {
   const [notifications, setNotifications] = useState<Notification[]>([]);
   const [unreadCount, setUnreadCount] = useState(0);
   const [loading, setLoading] = useState(false);
-  const [page, setPage] = useState(1);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [hasMore, setHasMore] = useState(false);
   const dropdownRef = useRef<HTMLDivElement>(null);
   const router = useRouter();
@@ -32,14 +32,29 @@ export default function BellNotification({ className }: BellNotificationProps) {
     return () => document.removeEventListener('mousedown', handleClickOutside);
   }, []);
 
-  // Load unread count on component mount and set up polling
+  // Receive unread count and new notifications pushed from the server;
+  // fall back to polling where EventSource is unavailable
   useEffect(() => {
-    loadUnreadCount();
-    
-    // Poll for unread count every 30 seconds
-    const interval = setInterval(loadUnreadCount, 30000);
-    
-    return () => clearInterval(interval);
+    if (!notificationApiService.supportsStream()) {
+      loadUnreadCount();
+      
+      // Poll for unread count every 30 seconds
+      const interval = setInterval(loadUnreadCount, 30000);
+      
+      return () => clearInterval(interval);
+    }
+
+    return notificationApiService.subscribeToNotifications({
+      onUnreadCount: setUnreadCount,
+      onNotification: (notification) => {
+        // Only prepend once the list has been loaded; otherwise the next open loads it
+        setNotifications(prev =>
+          prev.length === 0 || prev.some(n => n.notification_id === notification.notification_id)
+            ? prev
+            : [notification, ...prev]
+        );
+      },
+    });
   }, []);
 
   const loadUnreadCount = async () => {
@@ -56,28 +71,25 @@ export default function BellNotification({ className }: BellNotificationProps) {
     
     setLoading(true);
     try {
-      const currentPage = reset ? 1 : page;
-      const response = await notificationApiService.getNotifications(currentPage, 10);
+      const response = await notificationApiService.getNotifications(
+        1, 10, false, reset ? null : nextCursor
+      );
       
       if (reset) {
         setNotifications(response.notifications);
-        setPage(1);
       } else {
         setNotifications(prev => [...prev, ...response.notifications]);
       }
       
+      setNextCursor(response.next_cursor ?? null);
       setHasMore(response.has_more);
       setUnreadCount(response.unread_count);
-      
-      if (!reset) {
-        setPage(prev => prev + 1);
-      }
     } catch (error) {
       console.error('Error loading notifications:', error);
     } finally {
       setLoading(false);
     }
-  }, [loading, page]);
+  }, [loading, nextCursor]);
 
   // Load notifications when dropdown opens
   useEffect(() => {
@@ -251,6 +251,7 @@ interface RefreshJobResponse {
   started_at?: string;
   completed_at?: string;
   progress: number;
+  phase?: string;
   message: string;
   error?: string;
 }
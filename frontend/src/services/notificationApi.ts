@@ -20,6 +20,7 @@ export interface NotificationListResponse {
   page: number;
   per_page: number;
   has_more: boolean;
+  next_cursor?: string | null;
 }
 
 export interface UnreadCountResponse {
@@ -39,6 +40,12 @@ export interface StatusCheckResponse {
   timestamp: string;
 }
 
+export interface NotificationStreamHandlers {
+  onUnreadCount: (unreadCount: number) => void;
+  onNotification?: (notification: Notification) => void;
+  onError?: (event: Event) => void;
+}
+
 class NotificationApiService {
   private baseUrl: string;
 
@@ -69,17 +76,24 @@ class NotificationApiService {
 
   /**
    * Get paginated list of notifications
+   *
+   * Pass the previous response's next_cursor to fetch the following page;
+   * the cursor takes precedence over the page number.
    */
   async getNotifications(
     page: number = 1,
     perPage: number = 20,
-    unreadOnly: boolean = false
+    unreadOnly: boolean = false,
+    cursor?: string | null
   ): Promise<NotificationListResponse> {
     const params = new URLSearchParams({
       page: page.toString(),
       per_page: perPage.toString(),
       unread_only: unreadOnly.toString(),
     });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
 
     return this.fetchApi<NotificationListResponse>(`/v1/notifications?${params}`);
   }
@@ -91,6 +105,38 @@ class NotificationApiService {
     return this.fetchApi<UnreadCountResponse>('/v1/notifications/unread-count');
   }
 
+  /**
+   * Whether the browser can use the notification stream
+   */
+  supportsStream(): boolean {
+    return typeof window !== 'undefined' && typeof window.EventSource !== 'undefined';
+  }
+
+  /**
+   * Subscribe to pushed notification events (Server-Sent Events).
+   * The browser reconnects automatically if the connection drops.
+   * Returns a function that closes the stream.
+   */
+  subscribeToNotifications(handlers: NotificationStreamHandlers): () => void {
+    const source = new EventSource(`${this.baseUrl}/v1/notifications/stream`);
+
+    source.addEventListener('unread_count', (event) => {
+      const data = JSON.parse((event as MessageEvent).data) as UnreadCountResponse;
+      handlers.onUnreadCount(data.unread_count);
+    });
+
+    source.addEventListener('notification', (event) => {
+      const notification = JSON.parse((event as MessageEvent).data) as Notification;
+      handlers.onNotification?.(notification);
+    });
+
+    if (handlers.onError) {
+      source.onerror = handlers.onError;
+    }
+
+    return () => source.close();
+  }
+
   /**
    * Mark a specific notification as read
    */
@@ -34,6 +34,7 @@ export interface ATMPredictiveAnalytics {
   data_quality_score: number;
   last_analysis: string;
   analysis_period: string;
+  as_of: string;
 }
 
 export interface PredictiveAnalyticsResponse {
@@ -44,6 +45,7 @@ export interface PredictiveAnalyticsResponse {
     components_analyzed: number;
     algorithm_version: string;
     analysis_timestamp: string;
+    as_of: string;
     data_source: string;
   };
 }
@@ -56,6 +58,7 @@ export interface ATMSummaryItem {
   risk_level: 'LOW' | 'MEDIUM' | 'HIGH' | 'CRITICAL';
   critical_components: number;
   last_analysis: string;
+  as_of: string;
 }
 
 export interface FleetStatistics {
@@ -108,14 +111,16 @@ class PredictiveApiService {
    */
   async getPredictiveAnalyticsSummary(
     riskLevelFilter?: 'LOW' | 'MEDIUM' | 'HIGH' | 'CRITICAL',
-    limit: number = 20
+    limit?: number
   ): Promise<PredictiveAnalyticsSummaryResponse> {
     try {
       const params = new URLSearchParams();
       if (riskLevelFilter) {
         params.append('risk_level_filter', riskLevelFilter);
       }
-      params.append('limit', limit.toString());
+      if (limit !== undefined) {
+        params.append('limit', limit.toString());
+      }
 
       const response = await fetch(
         `${this.baseUrl}/api/v1/atm/predictive-analytics/summary?${params.toString()}`,